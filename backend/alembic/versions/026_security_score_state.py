@@ -0,0 +1,30 @@
+"""Create security_score_state table for the incremental Security Score.
+
+Revision ID: 026_security_score_state
+Revises: 025_ai_audit_program_features
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "026_security_score_state"
+down_revision = "025_ai_audit_program_features"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "security_score_state",
+        sa.Column("pillar", sa.String(30), primary_key=True),
+        sa.Column("inputs", sa.JSON, nullable=True),
+        sa.Column("score", sa.Float(53), nullable=True),
+        sa.Column("is_stale", sa.Boolean, nullable=False, server_default="1"),
+        sa.Column("change_seq", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("computed_on", sa.Date, nullable=True),
+        sa.Column("config_version", sa.Integer, nullable=True),
+        sa.Column("computed_at", sa.DateTime, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("security_score_state")
@@ -0,0 +1,35 @@
+"""Create security_score_rollups table (downsampled snapshot history).
+
+Revision ID: 027_security_score_rollups
+Revises: 026_security_score_state
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "027_security_score_rollups"
+down_revision = "026_security_score_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "security_score_rollups",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("resolution", sa.String(10), nullable=False),
+        sa.Column("bucket_start", sa.DateTime, nullable=False),
+        sa.Column("samples", sa.Integer, nullable=False),
+        sa.Column("total_min", sa.Numeric(5, 2), nullable=False),
+        sa.Column("total_avg", sa.Numeric(5, 2), nullable=False),
+        sa.Column("total_max", sa.Numeric(5, 2), nullable=False),
+        sa.Column("stats", sa.JSON, nullable=False),
+        sa.Column("config_version", sa.Integer, nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("resolution", "bucket_start", name="uq_score_rollup_bucket"),
+    )
+    op.create_index("ix_security_score_snapshots_snapshot_date", "security_score_snapshots", ["snapshot_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_security_score_snapshots_snapshot_date", table_name="security_score_snapshots")
+    op.drop_table("security_score_rollups")
@@ -0,0 +1,29 @@
+"""Materialised CIS assessment scores: dimension percentages + computed marker.
+
+Existing assessments keep scores_computed_at = NULL until backfilled:
+    cd backend && python ../scripts/backfill_cis_scores.py
+
+Revision ID: 028_cis_assessment_scores
+Revises: 027_security_score_rollups
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "028_cis_assessment_scores"
+down_revision = "027_security_score_rollups"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = ("policy_pct", "implementation_pct", "automation_pct", "reporting_pct")
+
+
+def upgrade() -> None:
+    for name in _COLUMNS:
+        op.add_column("cis_assessments", sa.Column(name, sa.Numeric(5, 2), nullable=True))
+    op.add_column("cis_assessments", sa.Column("scores_computed_at", sa.DateTime, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("cis_assessments", "scores_computed_at")
+    for name in reversed(_COLUMNS):
+        op.drop_column("cis_assessments", name)
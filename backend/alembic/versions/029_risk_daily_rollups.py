@@ -0,0 +1,38 @@
+"""Create risk_daily_rollups fact table (risk trend + heatmap history).
+
+Revision ID: 029_risk_daily_rollups
+Revises: 028_cis_assessment_scores
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "029_risk_daily_rollups"
+down_revision = "028_cis_assessment_scores"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "risk_daily_rollups",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("day", sa.Date, nullable=False),
+        # 0 / "" = none: the unique key below would not match NULLs
+        sa.Column("org_unit_id", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("security_area_id", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("impact_level", sa.Integer, nullable=False),
+        sa.Column("probability_level", sa.Integer, nullable=False),
+        sa.Column("risk_level", sa.String(20), nullable=False, server_default=""),
+        sa.Column("risk_count", sa.Integer, nullable=False),
+        sa.Column("score_sum", sa.Numeric(14, 2), nullable=False),
+        sa.Column("computed_at", sa.DateTime, nullable=False),
+        # One row per day and group: concurrent roll-ups upsert instead of adding rows
+        sa.UniqueConstraint(
+            "day", "org_unit_id", "security_area_id", "impact_level", "probability_level", "risk_level",
+            name="uq_risk_rollup_day_group",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("risk_daily_rollups")
@@ -18,6 +18,62 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str
 
+    # Security Score engine: "orm" (row-by-row), "sql" (grouped aggregates)
+    # or "incremental" (persisted per-pillar state, stale pillars only)
+    SCORE_ENGINE_MODE: str = "orm"
+    # Max pillars evaluated in parallel on separate pooled sessions (1 = sequential)
+    SCORE_ENGINE_CONCURRENCY: int = 1
+    # Incremental mode: full-recompute drift check every N minutes (0 = off)
+    SCORE_RECONCILE_INTERVAL_MINUTES: int = 60
+
+    # Scheduled snapshots: scheduler wake-up interval (cadence = config snapshot_frequency; 0 = off)
+    SCORE_SNAPSHOT_POLL_SECONDS: int = 300
+    # History retention per resolution in days (0 = keep forever); weekly roll-ups are kept forever
+    SCORE_SNAPSHOT_RAW_RETENTION_DAYS: int = 30
+    SCORE_ROLLUP_HOURLY_RETENTION_DAYS: int = 180
+    SCORE_ROLLUP_DAILY_RETENTION_DAYS: int = 1095
+
+    # Daily risk roll-up (risk dashboard trend + heatmap): rebuild interval in minutes (0 = off)
+    RISK_ROLLUP_INTERVAL_MINUTES: int = 60
+
+    # Dictionary label cache: max age (seconds) before a reload; 0 = until invalidated
+    DICT_CACHE_TTL_SECONDS: int = 300
+    # Dashboard response cache: LRU caps (entries, approx. JSON bytes; 0 entries = off) and max age
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 512
+    DASHBOARD_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    DASHBOARD_CACHE_TTL_SECONDS: int = 300
+    # ETag time bucket for conditional GETs (bounds staleness after writes by other workers; 0 = counters only)
+    CONDITIONAL_GET_MAX_AGE_SECONDS: int = 300
+    # Keyset pagination of register lists (page size when only a cursor is sent, max page size, X-Total-Count cap)
+    PAGINATION_DEFAULT_LIMIT: int = 100
+    PAGINATION_MAX_LIMIT: int = 1000
+    PAGINATION_COUNT_CAP: int = 10000
+    # Rows per server-side cursor batch in NDJSON streaming (Accept: application/x-ndjson)
+    NDJSON_BATCH_SIZE: int = 500
+    # XLSX reports: rows sampled for column widths before the write-only sheet is started
+    REPORT_WIDTH_SAMPLE_ROWS: int = 500
+    # Background export jobs: artefact directory, parallel jobs, retention of finished jobs/files (minutes),
+    # clean-up interval of expired jobs/files (0 = only on submit)
+    EXPORT_DIR: str = str(Path(__file__).resolve().parent.parent / "exports")
+    EXPORT_JOB_WORKERS: int = 2
+    EXPORT_RETENTION_MINUTES: int = 60
+    EXPORT_PRUNE_POLL_SECONDS: int = 60
+    # Asset graph index: max age (seconds) before a rebuild (writes invalidate it at once); node cap of subgraph responses
+    ASSET_GRAPH_TTL_SECONDS: int = 300
+    ASSET_GRAPH_MAX_NODES: int = 2000
+    # Asset CSV import: rows per multi-row INSERT / UPDATE batch (and per progress line)
+    ASSET_IMPORT_BATCH_SIZE: int = 1000
+    # Automatic audit log: "core" (one executemany INSERT per flush), "orm" (one AuditLog object per entry)
+    # or "async" (queued on commit, written by a background task)
+    AUDIT_WRITE_MODE: str = "core"
+    # Async audit writer: in-memory queue cap (overflow spills to disk), rows per INSERT,
+    # retry delay after a failed write, spill directory, max drain time on shutdown
+    AUDIT_QUEUE_MAX_ENTRIES: int = 50000
+    AUDIT_QUEUE_BATCH_SIZE: int = 1000
+    AUDIT_QUEUE_RETRY_SECONDS: int = 5
+    AUDIT_SPILL_DIR: str = str(Path(__file__).resolve().parent.parent / "audit_spill")
+    AUDIT_QUEUE_SHUTDOWN_SECONDS: int = 10
+
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:5176,http://localhost:3000,http://192.168.200.69:5173,http://192.168.200.69:5176,http://192.168.200.69:3000"
 
     @property
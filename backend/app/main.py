@@ -5,6 +5,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from app.config import settings
 from app.database import check_db_connection
 from app.middleware.audit_auto import install_audit_listeners, set_audit_context
+from app.services.score_state import install_score_state_hooks
 from app.routers.action import router as action_router
 from app.routers.asset import router as asset_router
 from app.routers.asset_category import router as asset_category_router
@@ -30,6 +31,7 @@ from app.routers.awareness import router as awareness_router
 from app.routers.security_score import router as score_router
 from app.routers.org_context import router as org_context_router
 from app.routers.report import router as report_router
+from app.routers.export import router as export_router
 from app.routers.smart_catalog import router as smart_catalog_router
 from app.routers.control_effectiveness import router as control_effectiveness_router
 from app.routers.compliance import router as compliance_router
@@ -55,6 +57,8 @@ app = FastAPI(
 
 # ── Install automatic audit logging ──
 install_audit_listeners()
+# ── Incremental Security Score: mark pillars stale after commits (incremental mode only) ──
+install_score_state_hooks()
 
 
 class AuditContextMiddleware(BaseHTTPMiddleware):
@@ -78,6 +82,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count", "X-Total-Count-Capped"],
 )
 
 app.include_router(dashboard_router)
@@ -105,6 +110,7 @@ app.include_router(domain_router)
 app.include_router(audit_router)
 app.include_router(org_context_router)
 app.include_router(report_router)
+app.include_router(export_router)
 app.include_router(smart_catalog_router)
 app.include_router(control_effectiveness_router)
 app.include_router(compliance_router)
@@ -170,6 +176,79 @@ async def _sync_ai_prompts_on_startup():
         _log.warning("AI prompt startup sync skipped: %s", e)
 
 
+# ── Startup: periodic reconciliation of the incremental Security Score ──
+_background_tasks: set = set()
+
+
+@app.on_event("startup")
+async def _start_score_reconciliation():
+    if settings.SCORE_ENGINE_MODE != "incremental" or settings.SCORE_RECONCILE_INTERVAL_MINUTES <= 0:
+        return
+    import asyncio
+    from app.services.score_state import run_reconciliation_loop
+
+    task = asyncio.create_task(run_reconciliation_loop(settings.SCORE_RECONCILE_INTERVAL_MINUTES))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+# ── Startup: scheduled Security Score snapshots + history downsampling ──
+@app.on_event("startup")
+async def _start_score_snapshot_scheduler():
+    if settings.SCORE_SNAPSHOT_POLL_SECONDS <= 0:
+        return
+    import asyncio
+    from app.services.score_history import run_snapshot_scheduler
+
+    task = asyncio.create_task(run_snapshot_scheduler(settings.SCORE_SNAPSHOT_POLL_SECONDS))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+
+# ── Startup: daily risk roll-up (risk trend + heatmap history) ──
+@app.on_event("startup")
+async def _start_risk_rollup_scheduler():
+    if settings.RISK_ROLLUP_INTERVAL_MINUTES <= 0:
+        return
+    import asyncio
+    from app.services.risk_rollup import run_risk_rollup_scheduler
+
+    task = asyncio.create_task(run_risk_rollup_scheduler(settings.RISK_ROLLUP_INTERVAL_MINUTES))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+# ── Startup: clean-up of expired export jobs and artefacts ──
+@app.on_event("startup")
+async def _start_export_prune_scheduler():
+    if settings.EXPORT_PRUNE_POLL_SECONDS <= 0:
+        return
+    import asyncio
+    from app.services.export_jobs import run_prune_scheduler
+
+    task = asyncio.create_task(run_prune_scheduler(settings.EXPORT_PRUNE_POLL_SECONDS))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+# ── Startup/shutdown: asynchronous audit writer (AUDIT_WRITE_MODE=async) ──
+@app.on_event("startup")
+async def _start_audit_queue():
+    from app.services.audit_queue import audit_queue
+
+    # Also started to replay a spill file left by an earlier run in async mode
+    if settings.AUDIT_WRITE_MODE == "async" or audit_queue.has_spill():
+        audit_queue.start()
+
+
+@app.on_event("shutdown")
+async def _drain_audit_queue():
+    from app.services.audit_queue import audit_queue
+
+    await audit_queue.stop(settings.AUDIT_QUEUE_SHUTDOWN_SECONDS)
+
+
 @app.get("/health")
 async def health():
     """Health check — verifies API is running and database is reachable."""
@@ -13,19 +13,40 @@ Usage:
 
     # In request middleware or dependency:
     set_audit_context(user_id=current_user.id, ip_address=request.client.host)
+
+The same flush hooks also publish *table-change notifications*: in-process
+caches register a callback with ``add_table_change_listener`` and are told
+which tables a session touched on flush, commit and rollback.  Code that has
+to write derived state in the *same transaction* as the change registers a
+``add_flush_hook`` instead (it receives the session).
+
+Write mode (``AUDIT_WRITE_MODE``):
+  * ``core`` (default) – entries are collected as plain tuples before the
+    flush and written right after it with one executemany
+    ``INSERT INTO audit_log`` on the flush connection; no ORM objects,
+  * ``orm`` – the previous behaviour: one ``AuditLog`` instance per entry
+    added to the session (written by the next flush).
+``audit_write_stats()`` reports flush counts and timings per mode, so the
+two can be compared on the same workload.
 """
 from __future__ import annotations
 
 import contextvars
 import logging
+import re
+import time
+from collections.abc import Callable
 from datetime import datetime
-from typing import Any
+from typing import Any, NamedTuple
 
-from sqlalchemy import event, inspect
-from sqlalchemy.orm import Session
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql.elements import TextClause
 
+from app.config import settings
 from app.models.audit import AuditLog
 from app.models.base import Base
+from app.services.audit_queue import audit_queue
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +76,63 @@ def set_audit_context(
 # ---------------------------------------------------------------------------
 _EXCLUDED_TABLES: set[str] = {"audit_log", "alembic_version"}
 
+AUDIT_WRITE_MODES = ("core", "orm", "async")
+
+
+class _Pending(NamedTuple):
+    """One audit entry collected before flush (``obj`` set for creates: PK read after flush)."""
+    module: str
+    action: str
+    entity_type: str
+    entity_id: int | None
+    field_name: str | None
+    old_value: str | None
+    new_value: str | None
+    obj: Any = None
+
+
+# Column attribute keys per mapper (the per-attribute membership test was rebuilt for every attribute)
+_column_keys: dict[Any, tuple[str, ...]] = {}
+
+# ---------------------------------------------------------------------------
+# Flush timing per write mode (``audit_write_stats``).
+#   flushes       – flushes that produced audit entries,
+#   entries       – audit rows written,
+#   flush_seconds – wall time from before_flush to the end of after_flush,
+#   audit_seconds – part of it spent collecting and writing audit entries.
+# In "orm" mode the AuditLog objects are inserted by a later flush; that
+# flush is counted too (as a flush without entries of its own).
+# ---------------------------------------------------------------------------
+_write_stats: dict[str, dict[str, float]] = {}
+
+
+def _stats_for(mode: str) -> dict[str, float]:
+    return _write_stats.setdefault(
+        mode, {"flushes": 0, "entries": 0, "flush_seconds": 0.0, "audit_seconds": 0.0, "max_flush_seconds": 0.0},
+    )
+
+
+def audit_write_stats() -> dict[str, Any]:
+    """Flush counters and timings per write mode (current mode first)."""
+    out: dict[str, Any] = {"mode": settings.AUDIT_WRITE_MODE, "queue": audit_queue.stats()}
+    for mode, st in _write_stats.items():
+        flushes = st["flushes"] or 1
+        entries = st["entries"] or 1
+        out[mode] = {
+            "flushes": int(st["flushes"]),
+            "entries": int(st["entries"]),
+            "flush_ms_total": round(st["flush_seconds"] * 1000, 2),
+            "flush_ms_avg": round(st["flush_seconds"] * 1000 / flushes, 3),
+            "flush_ms_max": round(st["max_flush_seconds"] * 1000, 3),
+            "audit_ms_total": round(st["audit_seconds"] * 1000, 2),
+            "audit_us_per_entry": round(st["audit_seconds"] * 1e6 / entries, 2),
+        }
+    return out
+
+
+def reset_audit_write_stats() -> None:
+    _write_stats.clear()
+
 # ---------------------------------------------------------------------------
 # Table name -> module name mapping.
 #
@@ -149,6 +227,29 @@ def _resolve_module(table_name: str) -> str:
     return table_name
 
 
+def audit_entry(
+    table_name: str,
+    action: str,
+    entity_id: int,
+    field_name: str | None = None,
+    old_value: Any = None,
+    new_value: Any = None,
+) -> dict[str, Any]:
+    """``audit_log`` row values for code that writes in bulk (Core ``insert(AuditLog)``), bypassing flush."""
+    return {
+        "user_id": _ctx_user_id.get(),
+        "module": _resolve_module(table_name),
+        "action": action,
+        "entity_type": table_name,
+        "entity_id": entity_id,
+        "field_name": field_name,
+        "old_value": str(old_value) if old_value is not None else None,
+        "new_value": str(new_value) if new_value is not None else None,
+        "ip_address": _ctx_ip_address.get(),
+        "created_at": datetime.utcnow(),
+    }
+
+
 def _get_entity_id(obj: Any) -> int:
     """Return the primary key value for an ORM instance.
 
@@ -163,20 +264,114 @@ def _get_entity_id(obj: Any) -> int:
     return 0
 
 
+# ---------------------------------------------------------------------------
+# Table-change notifications
+#
+# Listeners are called as ``fn(tables, phase)`` where ``tables`` is the set of
+# table names written by a session and ``phase`` is one of:
+#   "flush"    – rows were written (visible to the writing session only),
+#   "commit"   – the transaction holding those writes was committed,
+#   "rollback" – the transaction was rolled back.
+# Caches should drop entries on every phase: "flush" keeps the writing
+# session consistent, "commit"/"rollback" catch reloads done by concurrent
+# sessions in between.
+# ---------------------------------------------------------------------------
+TableChangeListener = Callable[[set[str], str], None]
+FlushHook = Callable[[Session, set[str]], None]
+
+_table_listeners: list[TableChangeListener] = []
+_flush_hooks: list[FlushHook] = []
+
+_RAW_DML_RE = re.compile(
+    r"^\s*(?:UPDATE|DELETE\s+FROM|INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO)\s+[`\"]?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def add_table_change_listener(fn: TableChangeListener) -> TableChangeListener:
+    """Register ``fn`` for table-change notifications (usable as a decorator)."""
+    if fn not in _table_listeners:
+        _table_listeners.append(fn)
+    return fn
+
+
+def remove_table_change_listener(fn: TableChangeListener) -> None:
+    if fn in _table_listeners:
+        _table_listeners.remove(fn)
+
+
+def add_flush_hook(fn: FlushHook) -> FlushHook:
+    """Register ``fn(session, tables)``, called inside the writing transaction.
+
+    Hooks run right after a flush (and before bulk/raw DML statements) and may
+    execute Core statements on ``session.connection()``; they must not add ORM
+    objects to the session.
+    """
+    if fn not in _flush_hooks:
+        _flush_hooks.append(fn)
+    return fn
+
+
+def _notify_tables(tables: set[str], phase: str) -> None:
+    if not tables:
+        return
+    for fn in list(_table_listeners):
+        try:
+            fn(tables, phase)
+        except Exception:
+            logger.exception("Table-change listener %r failed", fn)
+
+
+def _mark_tables(session: Session, tables: set[str]) -> None:
+    """Remember tables written in the current transaction and notify "flush"."""
+    if not tables:
+        return
+    session.info.setdefault("_changed_tables", set()).update(tables)
+    _notify_tables(tables, "flush")
+    for fn in list(_flush_hooks):
+        try:
+            fn(session, tables)
+        except Exception:
+            logger.exception("Flush hook %r failed", fn)
+
+
+def _touched_tables(session: Session) -> set[str]:
+    tables: set[str] = set()
+    for objs in (session.new, session.dirty, session.deleted):
+        for obj in objs:
+            if isinstance(obj, Base):
+                tables.add(obj.__class__.__tablename__)
+    return tables
+
+
 # ---------------------------------------------------------------------------
 # Event listeners
 # ---------------------------------------------------------------------------
 
+def _column_attr_keys(mapper: Any) -> tuple[str, ...]:
+    keys = _column_keys.get(mapper)
+    if keys is None:
+        keys = _column_keys[mapper] = tuple(c.key for c in mapper.column_attrs)
+    return keys
+
+
+def _str(value: Any) -> str | None:
+    return str(value) if value is not None else None
+
+
 def _before_flush(session: Session, flush_context: Any, instances: Any) -> None:
     """Capture pending audit entries *before* the flush writes to the DB.
 
     At this point ``session.dirty`` objects still carry their old attribute
     values in the history, so we can diff them.
     """
+    session.info["_flush_started"] = t0 = time.perf_counter()
+    session.info["_flush_tables"] = _touched_tables(session)
+
     if session.info.get("_flushing_audit"):
         return
 
-    pending: list[dict[str, Any]] = []
+    pending: list[_Pending] = []
 
     # -- UPDATES -----------------------------------------------------------
     for obj in session.dirty:
@@ -191,28 +386,18 @@ def _before_flush(session: Session, flush_context: Any, instances: Any) -> None:
         insp = inspect(obj)
         module = _resolve_module(table_name)
         entity_id = _get_entity_id(obj)
+        attrs = insp.attrs
 
-        for attr in insp.attrs:
-            hist = attr.history
+        # Only columns – relationship attributes are skipped.
+        for key in _column_attr_keys(insp.mapper):
+            hist = attrs[key].history
             if not hist.has_changes():
                 continue
-            key = attr.key
-            # Skip relationship attributes – we only care about columns.
-            if key not in {c.key for c in insp.mapper.column_attrs}:
-                continue
-
-            old_val = hist.deleted[0] if hist.deleted else None
-            new_val = hist.added[0] if hist.added else None
-
-            pending.append({
-                "module": module,
-                "action": "update",
-                "entity_type": table_name,
-                "entity_id": entity_id,
-                "field_name": key,
-                "old_value": str(old_val) if old_val is not None else None,
-                "new_value": str(new_val) if new_val is not None else None,
-            })
+            pending.append(_Pending(
+                module, "update", table_name, entity_id, key,
+                _str(hist.deleted[0] if hist.deleted else None),
+                _str(hist.added[0] if hist.added else None),
+            ))
 
     # -- INSERTS -----------------------------------------------------------
     for obj in session.new:
@@ -221,17 +406,8 @@ def _before_flush(session: Session, flush_context: Any, instances: Any) -> None:
         table_name = obj.__class__.__tablename__
         if table_name in _EXCLUDED_TABLES:
             continue
-
-        pending.append({
-            "module": _resolve_module(table_name),
-            "action": "create",
-            "entity_type": table_name,
-            "entity_id": None,  # resolved after flush assigns PK
-            "field_name": None,
-            "old_value": None,
-            "new_value": None,
-            "_obj_ref": obj,  # keep reference so we can read PK after flush
-        })
+        # entity_id is resolved after flush assigns the PK
+        pending.append(_Pending(_resolve_module(table_name), "create", table_name, None, None, None, None, obj))
 
     # -- DELETES -----------------------------------------------------------
     for obj in session.deleted:
@@ -240,67 +416,141 @@ def _before_flush(session: Session, flush_context: Any, instances: Any) -> None:
         table_name = obj.__class__.__tablename__
         if table_name in _EXCLUDED_TABLES:
             continue
-
-        pending.append({
-            "module": _resolve_module(table_name),
-            "action": "delete",
-            "entity_type": table_name,
-            "entity_id": _get_entity_id(obj),
-            "field_name": None,
-            "old_value": None,
-            "new_value": None,
-        })
+        pending.append(_Pending(
+            _resolve_module(table_name), "delete", table_name, _get_entity_id(obj), None, None, None,
+        ))
 
     session.info["_audit_pending"] = pending
+    session.info["_audit_seconds"] = time.perf_counter() - t0
 
 
 def _after_flush(session: Session, flush_context: Any) -> None:
-    """Create AuditLog rows from the pending entries collected before flush."""
-    if session.info.get("_flushing_audit"):
-        return
-
-    pending: list[dict[str, Any]] = session.info.pop("_audit_pending", [])
-    if not pending:
-        return
-
+    """Write the audit entries collected before flush (see ``AUDIT_WRITE_MODE``)."""
+    _mark_tables(session, session.info.pop("_flush_tables", set()))
+
+    started = session.info.pop("_flush_started", None)
+    audit_seconds = session.info.pop("_audit_seconds", 0.0)
+    mode = settings.AUDIT_WRITE_MODE
+    if mode == "async" and not audit_queue.running:
+        mode = "core"
+    pending: list[_Pending] = []
+    if not session.info.get("_flushing_audit"):
+        pending = session.info.pop("_audit_pending", [])
+        if pending:
+            t0 = time.perf_counter()
+            if mode == "orm":
+                _add_orm_entries(session, pending)
+            elif mode == "async":
+                session.info.setdefault("_audit_deferred", []).extend(_entry_rows(pending))
+            else:
+                _insert_entries(session, pending)
+            audit_seconds += time.perf_counter() - t0
+
+    if started is not None and (pending or session.info.pop("_audit_orm_queued", False)):
+        elapsed = time.perf_counter() - started
+        st = _stats_for(mode)
+        st["flushes"] += 1
+        st["entries"] += len(pending)
+        st["flush_seconds"] += elapsed
+        st["audit_seconds"] += audit_seconds
+        st["max_flush_seconds"] = max(st["max_flush_seconds"], elapsed)
+
+
+def _entry_rows(pending: list[_Pending]) -> list[dict[str, Any]]:
     user_id = _ctx_user_id.get()
     ip_address = _ctx_ip_address.get()
     now = datetime.utcnow()
+    return [
+        {
+            "user_id": user_id,
+            "module": e.module,
+            "action": e.action,
+            "entity_type": e.entity_type,
+            # For CREATE entries the PK is available now that the flush ran.
+            "entity_id": e.entity_id if e.entity_id is not None else (
+                _get_entity_id(e.obj) if e.obj is not None else 0
+            ),
+            "field_name": e.field_name,
+            "old_value": e.old_value,
+            "new_value": e.new_value,
+            "ip_address": ip_address,
+            "created_at": now,
+        }
+        for e in pending
+    ]
+
+
+def _insert_entries(session: Session, pending: list[_Pending]) -> None:
+    """"core" mode: one executemany INSERT on the flush connection."""
+    try:
+        rows = _entry_rows(pending)
+    except Exception:
+        logger.exception("Failed to create automatic audit log entries")
+        return
+    session.connection().execute(insert(AuditLog.__table__), rows)
 
+
+def _add_orm_entries(session: Session, pending: list[_Pending]) -> None:
+    """"orm" mode: one AuditLog instance per entry, flushed with the next flush."""
     session.info["_flushing_audit"] = True
     try:
-        for entry in pending:
-            # For CREATE entries, resolve the entity_id now that the PK is
-            # available after the flush.
-            entity_id = entry["entity_id"]
-            if entity_id is None:
-                obj_ref = entry.get("_obj_ref")
-                entity_id = _get_entity_id(obj_ref) if obj_ref is not None else 0
-
-            session.add(AuditLog(
-                user_id=user_id,
-                module=entry["module"],
-                action=entry["action"],
-                entity_type=entry["entity_type"],
-                entity_id=entity_id,
-                field_name=entry.get("field_name"),
-                old_value=entry.get("old_value"),
-                new_value=entry.get("new_value"),
-                ip_address=ip_address,
-                created_at=now,
-            ))
+        session.add_all([AuditLog(**row) for row in _entry_rows(pending)])
+        session.info["_audit_orm_queued"] = True
     except Exception:
         logger.exception("Failed to create automatic audit log entries")
     finally:
         session.info["_flushing_audit"] = False
 
 
+def _do_orm_execute(state: ORMExecuteState) -> None:
+    """Track bulk ``update()``/``delete()`` and raw-SQL DML, which bypass flush."""
+    table: str | None = None
+    if state.is_update or state.is_delete or state.is_insert:
+        mapper = state.bind_mapper
+        if mapper is not None:
+            table = mapper.local_table.name
+        else:
+            table = getattr(getattr(state.statement, "table", None), "name", None)
+    elif isinstance(state.statement, TextClause):
+        m = _RAW_DML_RE.match(state.statement.text)
+        if m:
+            table = m.group(1)
+    if table:
+        _mark_tables(state.session, {table})
+
+
+def _after_commit(session: Session) -> None:
+    deferred = session.info.pop("_audit_deferred", None)
+    if deferred:
+        audit_queue.put(deferred)
+    _notify_tables(session.info.pop("_changed_tables", set()), "commit")
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("_audit_deferred", None)
+    _notify_tables(session.info.pop("_changed_tables", set()), "rollback")
+
+
 # ---------------------------------------------------------------------------
 # Public installer – called once at application startup.
 # ---------------------------------------------------------------------------
 
 def install_audit_listeners() -> None:
-    """Register SQLAlchemy ORM event listeners for automatic audit logging."""
+    """Register SQLAlchemy ORM event listeners for automatic audit logging (idempotent).
+
+    Raises ``ValueError`` on an unknown ``AUDIT_WRITE_MODE`` so a typo fails
+    the startup instead of silently falling back to ``core``.
+    """
+    if settings.AUDIT_WRITE_MODE not in AUDIT_WRITE_MODES:
+        raise ValueError(
+            f"Invalid AUDIT_WRITE_MODE {settings.AUDIT_WRITE_MODE!r}; "
+            f"expected one of: {', '.join(AUDIT_WRITE_MODES)}"
+        )
+    if event.contains(Session, "before_flush", _before_flush):
+        return
     event.listen(Session, "before_flush", _before_flush)
     event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
     logger.info("Automatic audit logging listeners installed")
@@ -0,0 +1,81 @@
+"""
+Conditional GET — ETag / If-None-Match for large, rarely changing reads.
+
+Every table has an in-process change counter, bumped by the table-change
+hooks in ``app.middleware.audit_auto`` (flush, commit and rollback — also
+bulk ``update()`` and raw SQL).  An endpoint's ETag hashes the counters of
+the tables it reads together with the request path and query, so computing
+it costs no database access.  When ``If-None-Match`` matches, the endpoint
+answers 304 before its handler runs: no aggregation, no serialisation.
+
+The ETag also contains a per-process token and the current
+``CONDITIONAL_GET_MAX_AGE_SECONDS`` time bucket.  Counters are per process,
+so ETags from another uvicorn worker never match, and writes made by other
+processes (or clock-dependent values) are picked up within one bucket.
+
+Usage in a router:
+    from app.middleware.conditional_get import etag_guard
+
+    @router.get("/tree", dependencies=[Depends(etag_guard({"org_units", "org_levels"}))])
+    async def get_tree(...): ...
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+import uuid
+
+from fastapi import HTTPException, Request, Response
+
+from app.config import settings
+from app.middleware.audit_auto import add_table_change_listener
+
+_versions: dict[str, int] = {}
+_PROCESS_TOKEN = uuid.uuid4().hex[:12]
+
+
+@add_table_change_listener
+def _on_table_change(tables: set[str], phase: str) -> None:
+    for t in tables:
+        _versions[t] = _versions.get(t, 0) + 1
+
+
+def table_version(table: str) -> int:
+    return _versions.get(table, 0)
+
+
+def data_fingerprint(tables, key: str) -> str:
+    """Hex digest of ``key`` and the current versions of ``tables`` (no database access)."""
+    max_age = settings.CONDITIONAL_GET_MAX_AGE_SECONDS
+    bucket = int(time.time() // max_age) if max_age > 0 else 0
+    state = ",".join(f"{t}:{_versions.get(t, 0)}" for t in sorted(tables))
+    raw = f"{_PROCESS_TOKEN}|{bucket}|{key}|{state}"
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+def compute_etag(tables, key: str) -> str:
+    return f'W/"{data_fingerprint(tables, key)}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison (RFC 9110 §13.1.2) against a comma-separated If-None-Match list."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def etag_guard(tables):
+    """Dependency: set ``ETag`` on the response, or answer 304 when the client copy is current."""
+    tags = frozenset(tables)
+
+    async def dependency(request: Request, response: Response) -> None:
+        etag = compute_etag(tags, f"{request.url.path}?{request.url.query}")
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if _matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
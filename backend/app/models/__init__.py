@@ -6,7 +6,7 @@ from .security_area import SecurityArea, SecurityDomain, DomainCisControl
 from .catalog import Threat, Vulnerability, Safeguard
 from .asset import Asset, AssetRelationship
 from .asset_category import AssetCategory, CategoryFieldDefinition, RelationshipType
-from .risk import Risk, RiskSafeguard, RiskReview, RiskReviewConfig
+from .risk import Risk, RiskDailyRollup, RiskSafeguard, RiskReview, RiskReviewConfig
 from .cis import CisControl, CisSubControl, CisAttackMapping, CisAssessment, CisAssessmentAnswer
 from .vulnerability import VulnerabilityRecord
 from .incident import Incident, IncidentRisk, IncidentVulnerability
@@ -15,7 +15,7 @@ from .policy_exception import PolicyException
 from .audit_register import Audit, AuditFinding
 from .vendor import Vendor, VendorAssessment, VendorAssessmentAnswer
 from .awareness import AwarenessCampaign, AwarenessResult, AwarenessEmployeeReport
-from .security_score import SecurityScoreConfig, SecurityScoreSnapshot
+from .security_score import SecurityScoreConfig, SecurityScoreRollup, SecurityScoreSnapshot, SecurityScoreState
 from .action import Action, ActionLink, ActionHistory
 from .audit import AuditLog
 from .org_context import (
@@ -93,7 +93,7 @@ __all__ = [
     "Threat", "Vulnerability", "Safeguard",
     "Asset", "AssetRelationship",
     "AssetCategory", "CategoryFieldDefinition", "RelationshipType",
-    "Risk", "RiskSafeguard", "RiskReview", "RiskReviewConfig",
+    "Risk", "RiskDailyRollup", "RiskSafeguard", "RiskReview", "RiskReviewConfig",
     "Action", "ActionLink", "ActionHistory",
     "CisControl", "CisSubControl", "CisAttackMapping", "CisAssessment", "CisAssessmentAnswer",
     "VulnerabilityRecord",
@@ -103,7 +103,7 @@ __all__ = [
     "Audit", "AuditFinding",
     "Vendor", "VendorAssessment", "VendorAssessmentAnswer",
     "AwarenessCampaign", "AwarenessResult", "AwarenessEmployeeReport",
-    "SecurityScoreConfig", "SecurityScoreSnapshot",
+    "SecurityScoreConfig", "SecurityScoreRollup", "SecurityScoreSnapshot", "SecurityScoreState",
     "AuditLog",
     "OrgContextIssue", "OrgContextObligation", "OrgContextStakeholder",
     "OrgContextScope", "OrgContextRiskAppetite", "OrgContextReview", "OrgContextSnapshot",
@@ -64,6 +64,12 @@ class CisAssessment(Base):
     ig1_score: Mapped[Decimal | None] = mapped_column(Numeric(5, 2))
     ig2_score: Mapped[Decimal | None] = mapped_column(Numeric(5, 2))
     ig3_score: Mapped[Decimal | None] = mapped_column(Numeric(5, 2))
+    # Answer-level averages per dimension (0–100), materialised with the IG scores
+    policy_pct: Mapped[Decimal | None] = mapped_column(Numeric(5, 2))
+    implementation_pct: Mapped[Decimal | None] = mapped_column(Numeric(5, 2))
+    automation_pct: Mapped[Decimal | None] = mapped_column(Numeric(5, 2))
+    reporting_pct: Mapped[Decimal | None] = mapped_column(Numeric(5, 2))
+    scores_computed_at: Mapped[datetime | None] = mapped_column(DateTime)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,8 +1,8 @@
 import math
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -142,3 +142,31 @@ class RiskReview(Base):
     review_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     notes: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class RiskDailyRollup(Base):
+    """Daily risk fact table — one row per (day, org unit, area, W, P, level).
+
+    Written by ``services/risk_rollup.py`` from the state of ``risks`` on
+    that day; the risk dashboard's trend and heatmap read from it.  Ids are
+    plain integers (no FKs) so history survives deleted units and areas;
+    0 / "" stand for "none" so the unique key also covers those groups.
+    """
+    __tablename__ = "risk_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "day", "org_unit_id", "security_area_id", "impact_level", "probability_level", "risk_level",
+            name="uq_risk_rollup_day_group",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    org_unit_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    security_area_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    impact_level: Mapped[int] = mapped_column(Integer, nullable=False)
+    probability_level: Mapped[int] = mapped_column(Integer, nullable=False)
+    risk_level: Mapped[str] = mapped_column(String(20), nullable=False, default="", server_default="")
+    risk_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    score_sum: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,5 +1,7 @@
 """SQLAlchemy models for Security Score module."""
-from sqlalchemy import Boolean, Column, DateTime, Integer, Numeric, String, Text, func
+from sqlalchemy import (
+    JSON, Boolean, Column, Date, DateTime, Float, Integer, Numeric, String, Text, UniqueConstraint, func,
+)
 from .base import Base
 
 
@@ -44,7 +46,7 @@ class SecurityScoreSnapshot(Base):
     __tablename__ = "security_score_snapshots"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    snapshot_date = Column(DateTime, nullable=False, server_default=func.now())
+    snapshot_date = Column(DateTime, nullable=False, server_default=func.now(), index=True)
     total_score = Column(Numeric(5, 2), nullable=False)
     risk_score = Column(Numeric(5, 2))
     vulnerability_score = Column(Numeric(5, 2))
@@ -70,3 +72,47 @@ class SecurityScoreSnapshot(Base):
     triggered_by = Column(String(50))
     created_by = Column(String(100))
     created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class SecurityScoreState(Base):
+    """Incrementally maintained Security Score — one row per pillar.
+
+    ``inputs`` holds the pillar's additive inputs (see ``score_engine``) and
+    ``score`` the resulting 0–100 value.  Writes to a pillar's source tables
+    set ``is_stale`` and bump ``change_seq`` inside the writer's transaction;
+    readers recompute only stale pillars (see ``services/score_state.py``).
+    """
+    __tablename__ = "security_score_state"
+
+    pillar = Column(String(30), primary_key=True)
+    inputs = Column(JSON)
+    score = Column(Float(53))
+    is_stale = Column(Boolean, nullable=False, default=True)
+    change_seq = Column(Integer, nullable=False, default=0)
+    computed_on = Column(Date)
+    config_version = Column(Integer)
+    computed_at = Column(DateTime)
+
+
+class SecurityScoreRollup(Base):
+    """Downsampled snapshot history — one row per (resolution, bucket).
+
+    ``resolution`` is "hour", "day" or "week".  ``stats`` holds
+    ``{"total" | pillar: {"min", "avg", "max"}}`` over the ``samples``
+    snapshots of the bucket (see ``services/score_history.py``).
+    """
+    __tablename__ = "security_score_rollups"
+    __table_args__ = (
+        UniqueConstraint("resolution", "bucket_start", name="uq_score_rollup_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    resolution = Column(String(10), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    samples = Column(Integer, nullable=False)
+    total_min = Column(Numeric(5, 2), nullable=False)
+    total_avg = Column(Numeric(5, 2), nullable=False)
+    total_max = Column(Numeric(5, 2), nullable=False)
+    stats = Column(JSON, nullable=False)
+    config_version = Column(Integer)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -2,14 +2,14 @@
 Actions module — /api/v1/actions
 Track corrective actions, risk treatment plans, CIS remediation tasks.
 """
-import io
 import os
 import uuid
 from collections import defaultdict
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, Response
+from fastapi.responses import FileResponse
+from openpyxl.styles import Font
 from sqlalchemy import case, delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -37,6 +37,10 @@ from app.schemas.action import (
     ActionStatusBreakdown,
     ActionUpdate,
 )
+from app.services.dictionary_cache import dict_cache
+from app.services.export_jobs import register_export
+from app.services.pagination import PageParams, SortSpec, page_params, paginate
+from app.services.xlsx_export import STREAM_BATCH, SheetWriter, new_workbook, xlsx_response
 
 router = APIRouter(prefix="/api/v1/actions", tags=["Dzialania"])
 
@@ -46,10 +50,7 @@ UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file
 # ── helpers ──
 
 async def _de_label(s, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return e.label if e else None
+    return await dict_cache.label(s, entry_id)
 
 
 async def _entity_name(s, entity_type: str, entity_id: int) -> str | None:
@@ -68,7 +69,7 @@ async def _entity_name(s, entity_type: str, entity_id: int) -> str | None:
         inc = await s.get(Incident, entity_id)
         return inc.title if inc else None
     if entity_type == "audit":
-        from app.models.audit import Audit
+        from app.models.audit_register import Audit
         aud = await s.get(Audit, entity_id)
         return aud.title if aud else None
     return f"{entity_type}#{entity_id}"
@@ -346,121 +347,137 @@ async def bulk_update_actions(body: ActionBulkUpdate, s: AsyncSession = Depends(
 
 # ═══════════════════ EXPORT XLSX ═══════════════════
 
-@router.get("/export", summary="Eksport dzialan do Excel (z ryzykami i historia)")
-async def export_actions_xlsx(s: AsyncSession = Depends(get_session)):
-    """Generate rich XLSX with 3 sheets: Actions, Linked Risks, History."""
-    import openpyxl
-    from openpyxl.styles import Alignment, Font, PatternFill
-
-    actions = (await s.execute(
-        select(Action).where(Action.is_active.is_(True)).order_by(
-            case((Action.due_date.is_(None), 1), else_=0), Action.due_date.asc()
-        )
-    )).scalars().all()
+_IN_BATCH = 1000  # ids per IN (...) list
+
+
+async def _linked_entities(s: AsyncSession, pairs: set[tuple[str, int]]) -> tuple[dict, dict]:
+    """Names of linked entities ({(type, id): name}) and {risk_id: (score, level)} — IN-queries per type."""
+    from app.models.audit_register import Audit
+    from app.models.incident import Incident
+    from app.models.policy_exception import PolicyException
+
+    name_cols = {
+        "risk": Risk.asset_name, "asset": Asset.name, "policy_exception": PolicyException.title,
+        "incident": Incident.title, "audit": Audit.title,
+    }
+    ids_by_type: dict[str, set[int]] = defaultdict(set)
+    for entity_type, entity_id in pairs:
+        ids_by_type[entity_type].add(entity_id)
+
+    names: dict[tuple[str, int], str] = {}
+    risk_info: dict[int, tuple] = {}
+    for entity_type, ids in ids_by_type.items():
+        name_col = name_cols.get(entity_type)
+        if name_col is None:
+            names.update({(entity_type, i): f"{entity_type}#{i}" for i in ids})
+            continue
+        pk = name_col.class_.id
+        cols = [pk, name_col] + ([Risk.risk_score, Risk.risk_level] if entity_type == "risk" else [])
+        ordered = sorted(ids)
+        for i in range(0, len(ordered), _IN_BATCH):
+            rows = (await s.execute(select(*cols).where(pk.in_(ordered[i:i + _IN_BATCH])))).all()
+            for row in rows:
+                names[(entity_type, row[0])] = row[1]
+                if entity_type == "risk":
+                    risk_info[row[0]] = (row[2], row[3])
+    return names, risk_info
+
+
+@register_export(
+    "actions", filename_prefix="dzialania_export",
+    tables={Action.__tablename__, ActionLink.__tablename__, ActionHistory.__tablename__,
+            OrgUnit.__tablename__, DictionaryEntry.__tablename__, Risk.__tablename__,
+            Asset.__tablename__, "policy_exceptions", "incidents", "audits"},
+)
+async def _actions_workbook(s: AsyncSession):
+    """Rich XLSX with 3 sheets: Actions, Linked Risks, History.
+
+    Prefetch (org units, labels, linked entity names) first, then each sheet
+    is streamed from a server-side cursor into a write-only sheet.
+    """
+    active = Action.is_active.is_(True)
+    action_order = (case((Action.due_date.is_(None), 1), else_=0), Action.due_date.asc(), Action.id)
+
+    # ── Prefetch ──
+    orgs = dict((await s.execute(select(OrgUnit.id, OrgUnit.name))).all())
+    labels = await dict_cache.label_map(s)
+    pairs = set((await s.execute(
+        select(ActionLink.entity_type, ActionLink.entity_id).join(Action, ActionLink.action_id == Action.id)
+        .where(active).distinct()
+    )).all())
+    entity_names, risk_info = await _linked_entities(s, pairs)
+
+    wb = new_workbook()
+    header_font = Font(color="FFFFFF", bold=True, size=10)
 
-    wb = openpyxl.Workbook()
+    def sheet(title: str, headers: list[str]) -> SheetWriter:
+        return SheetWriter(wb, title, headers, border=False, header_font=header_font, padding=2, max_width=50)
 
     # ── Sheet 1: Actions ──
-    ws1 = wb.active
-    ws1.title = "Dzialania"
-    headers1 = ["ID", "Tytuł", "Opis", "Jednostka org.", "Właściciel", "Odpowiedzialny",
-                 "Priorytet", "Status", "Źródło", "Termin", "Ukończono",
-                 "Skuteczność", "Notatki wdrożenia", "Przeterminowane", "Utworzono"]
-    header_fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True, size=10)
-    for ci, h in enumerate(headers1, 1):
-        cell = ws1.cell(row=1, column=ci, value=h)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center")
-
+    ws1 = sheet("Dzialania", [
+        "ID", "Tytuł", "Opis", "Jednostka org.", "Właściciel", "Odpowiedzialny",
+        "Priorytet", "Status", "Źródło", "Termin", "Ukończono",
+        "Skuteczność", "Notatki wdrożenia", "Przeterminowane", "Utworzono",
+    ])
     now = datetime.utcnow()
-    for ri, a in enumerate(actions, 2):
-        org = await s.get(OrgUnit, a.org_unit_id) if a.org_unit_id else None
-        is_overdue = a.due_date is not None and a.completed_at is None and a.due_date < now
-        ws1.cell(row=ri, column=1, value=f"D-{a.id}")
-        ws1.cell(row=ri, column=2, value=a.title)
-        ws1.cell(row=ri, column=3, value=a.description or "")
-        ws1.cell(row=ri, column=4, value=org.name if org else "")
-        ws1.cell(row=ri, column=5, value=a.owner or "")
-        ws1.cell(row=ri, column=6, value=a.responsible or "")
-        ws1.cell(row=ri, column=7, value=await _de_label(s, a.priority_id) or "")
-        ws1.cell(row=ri, column=8, value=await _de_label(s, a.status_id) or "")
-        ws1.cell(row=ri, column=9, value=await _de_label(s, a.source_id) or "")
-        ws1.cell(row=ri, column=10, value=a.due_date.strftime("%Y-%m-%d") if a.due_date else "")
-        ws1.cell(row=ri, column=11, value=a.completed_at.strftime("%Y-%m-%d") if a.completed_at else "")
-        ws1.cell(row=ri, column=12, value=f"{a.effectiveness_rating}/5" if a.effectiveness_rating else "")
-        ws1.cell(row=ri, column=13, value=a.implementation_notes or "")
-        ws1.cell(row=ri, column=14, value="TAK" if is_overdue else "NIE")
-        ws1.cell(row=ri, column=15, value=a.created_at.strftime("%Y-%m-%d"))
-
-    # Auto-width
-    for col in ws1.columns:
-        max_len = max((len(str(cell.value or "")) for cell in col), default=10)
-        ws1.column_dimensions[col[0].column_letter].width = min(max_len + 2, 50)
+    q = select(
+        Action.id, Action.title, Action.description, Action.org_unit_id, Action.owner, Action.responsible,
+        Action.priority_id, Action.status_id, Action.source_id, Action.due_date, Action.completed_at,
+        Action.effectiveness_rating, Action.implementation_notes, Action.created_at,
+    ).where(active).order_by(*action_order)
+    async for batch in (await s.stream(q.execution_options(yield_per=STREAM_BATCH))).partitions():
+        await ws1.extend([
+            f"D-{a.id}", a.title, a.description or "", orgs.get(a.org_unit_id, ""),
+            a.owner or "", a.responsible or "",
+            labels.get(a.priority_id) or "", labels.get(a.status_id) or "", labels.get(a.source_id) or "",
+            a.due_date.strftime("%Y-%m-%d") if a.due_date else "",
+            a.completed_at.strftime("%Y-%m-%d") if a.completed_at else "",
+            f"{a.effectiveness_rating}/5" if a.effectiveness_rating else "",
+            a.implementation_notes or "",
+            "TAK" if a.due_date is not None and a.completed_at is None and a.due_date < now else "NIE",
+            a.created_at.strftime("%Y-%m-%d"),
+        ] for a in batch)
+    ws1.close()
 
     # ── Sheet 2: Linked Risks ──
-    ws2 = wb.create_sheet("Powiazane ryzyka")
-    headers2 = ["Działanie ID", "Działanie tytuł", "Typ", "Obiekt ID", "Nazwa obiektu", "Score", "Poziom ryzyka"]
-    for ci, h in enumerate(headers2, 1):
-        cell = ws2.cell(row=1, column=ci, value=h)
-        cell.fill = header_fill
-        cell.font = header_font
-    row2 = 2
-    for a in actions:
-        links = (await s.execute(select(ActionLink).where(ActionLink.action_id == a.id))).scalars().all()
-        for lnk in links:
-            ename = await _entity_name(s, lnk.entity_type, lnk.entity_id)
-            eextra = await _entity_extra(s, lnk.entity_type, lnk.entity_id)
-            ws2.cell(row=row2, column=1, value=f"D-{a.id}")
-            ws2.cell(row=row2, column=2, value=a.title)
-            ws2.cell(row=row2, column=3, value=lnk.entity_type)
-            ws2.cell(row=row2, column=4, value=lnk.entity_id)
-            ws2.cell(row=row2, column=5, value=ename or "")
-            ws2.cell(row=row2, column=6, value=eextra.get("risk_score") if eextra else None)
-            ws2.cell(row=row2, column=7, value=eextra.get("risk_level") if eextra else "")
-            row2 += 1
-
-    for col in ws2.columns:
-        max_len = max((len(str(cell.value or "")) for cell in col), default=10)
-        ws2.column_dimensions[col[0].column_letter].width = min(max_len + 2, 50)
+    ws2 = sheet("Powiazane ryzyka", [
+        "Działanie ID", "Działanie tytuł", "Typ", "Obiekt ID", "Nazwa obiektu", "Score", "Poziom ryzyka",
+    ])
+    q = (
+        select(Action.id, Action.title, ActionLink.entity_type, ActionLink.entity_id)
+        .join(ActionLink, ActionLink.action_id == Action.id)
+        .where(active).order_by(*action_order, ActionLink.id)
+    )
+    no_risk = (None, "")
+    async for batch in (await s.stream(q.execution_options(yield_per=STREAM_BATCH))).partitions():
+        await ws2.extend([
+            f"D-{r.id}", r.title, r.entity_type, r.entity_id,
+            entity_names.get((r.entity_type, r.entity_id)) or "",
+            *(risk_info.get(r.entity_id, no_risk) if r.entity_type == "risk" else no_risk),
+        ] for r in batch)
+    ws2.close()
 
     # ── Sheet 3: History ──
-    ws3 = wb.create_sheet("Historia zmian")
-    headers3 = ["Działanie ID", "Pole", "Stara wartość", "Nowa wartość", "Powód", "Data"]
-    for ci, h in enumerate(headers3, 1):
-        cell = ws3.cell(row=1, column=ci, value=h)
-        cell.fill = header_fill
-        cell.font = header_font
-    row3 = 2
-    for a in actions:
-        hist = (await s.execute(
-            select(ActionHistory).where(ActionHistory.action_id == a.id).order_by(ActionHistory.created_at.desc())
-        )).scalars().all()
-        for h in hist:
-            ws3.cell(row=row3, column=1, value=f"D-{a.id}")
-            ws3.cell(row=row3, column=2, value=h.field_name)
-            ws3.cell(row=row3, column=3, value=h.old_value or "")
-            ws3.cell(row=row3, column=4, value=h.new_value or "")
-            ws3.cell(row=row3, column=5, value=h.change_reason or "")
-            ws3.cell(row=row3, column=6, value=h.created_at.strftime("%Y-%m-%d %H:%M"))
-            row3 += 1
-
-    for col in ws3.columns:
-        max_len = max((len(str(cell.value or "")) for cell in col), default=10)
-        ws3.column_dimensions[col[0].column_letter].width = min(max_len + 2, 50)
-
-    # Write to buffer
-    buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-
-    filename = f"dzialania_export_{datetime.utcnow().strftime('%Y%m%d_%H%M')}.xlsx"
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    ws3 = sheet("Historia zmian", ["Działanie ID", "Pole", "Stara wartość", "Nowa wartość", "Powód", "Data"])
+    q = (
+        select(Action.id, ActionHistory.field_name, ActionHistory.old_value, ActionHistory.new_value,
+               ActionHistory.change_reason, ActionHistory.created_at)
+        .join(ActionHistory, ActionHistory.action_id == Action.id)
+        .where(active).order_by(*action_order, ActionHistory.created_at.desc(), ActionHistory.id.desc())
     )
+    async for batch in (await s.stream(q.execution_options(yield_per=STREAM_BATCH))).partitions():
+        await ws3.extend([
+            f"D-{h.id}", h.field_name, h.old_value or "", h.new_value or "",
+            h.change_reason or "", h.created_at.strftime("%Y-%m-%d %H:%M"),
+        ] for h in batch)
+    ws3.close()
+
+    return wb
+
+
+@router.get("/export", summary="Eksport dzialan do Excel (z ryzykami i historia)")
+async def export_actions_xlsx(s: AsyncSession = Depends(get_session)):
+    return await xlsx_response(await _actions_workbook(s), "dzialania_export")
 
 
 # ═══════════════════ LIST (optimized — batch loading) ═══════════════════
@@ -613,8 +630,17 @@ async def _batch_action_outs(s: AsyncSession, actions: list[Action]) -> list[Act
     return results
 
 
+_ACTION_SORT = SortSpec({
+    "due_date": Action.due_date,
+    "title": Action.title,
+    "created_at": Action.created_at,
+    "updated_at": Action.updated_at,
+}, default="due_date,-created_at", pk=Action.id)
+
+
 @router.get("", response_model=list[ActionOut], summary="Lista dzialan")
 async def list_actions(
+    response: Response,
     org_unit_id: int | None = Query(None),
     status_id: int | None = Query(None),
     source_id: int | None = Query(None),
@@ -622,6 +648,7 @@ async def list_actions(
     include_archived: bool = Query(False),
     entity_type: str | None = Query(None, description="Filter by linked entity type"),
     entity_id: int | None = Query(None, description="Filter by linked entity id"),
+    page: PageParams = Depends(page_params),
     s: AsyncSession = Depends(get_session),
 ):
     q = select(Action)
@@ -641,12 +668,7 @@ async def list_actions(
             ActionLink.entity_id == entity_id,
         )
         q = q.where(Action.id.in_(link_sub))
-    q = q.order_by(
-        case((Action.due_date.is_(None), 1), else_=0),
-        Action.due_date.asc(),
-        Action.created_at.desc(),
-    )
-    actions = (await s.execute(q)).scalars().all()
+    actions = await paginate(s, q, _ACTION_SORT, page, response)
     try:
         return await _batch_action_outs(s, actions)
     except Exception:
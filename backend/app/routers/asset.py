@@ -1,108 +1,150 @@
 """
 Asset registry module — /api/v1/assets
 """
-import csv
-import io
-import json
+import os
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
+from app.config import settings
 from app.database import get_session
+from app.middleware.conditional_get import etag_guard
 from app.models.asset import Asset, AssetRelationship
 from app.models.asset_category import AssetCategory
-from app.models.dictionary import DictionaryEntry
 from app.models.org_unit import OrgUnit
 from app.models.risk import Risk
 from app.schemas.asset import (
-    AssetCreate, AssetGraph, AssetGraphEdge, AssetGraphNode,
+    AssetBlastRadius, AssetCreate, AssetGraph, AssetGraphReachNode,
     AssetOut, AssetRelationshipCreate, AssetRelationshipOut, AssetUpdate,
 )
+from app.services.asset_graph import DIRECTIONS, asset_graph, edge_out, node_attributes, risk_totals
+from app.services.asset_import import IMPORT_KEYS, CsvSource, import_assets, progress_response, spool_upload
+from app.services.dictionary_cache import dict_cache
+from app.services.ndjson import ndjson_response, wants_ndjson
+from app.services.pagination import PageParams, SortSpec, page_params, paginate, sort_query
+from app.services.projection import Projection, fields_param, partial_response, wants
 
 router = APIRouter(prefix="/api/v1/assets", tags=["Rejestr aktywów"])
 
 
-# ── helper: build full AssetOut from row ──
+# ── helper: build full AssetOut from rows ──
+
+# AssetOut fields resolved from other tables -> Asset column they are keyed by
+_ASSET_LABELS = {
+    "asset_type_name": "asset_type_id",
+    "category_name": "category_id",
+    "sensitivity_name": "sensitivity_id",
+    "criticality_name": "criticality_id",
+    "environment_name": "environment_id",
+    "status_name": "status_id",
+}
+_ASSET_CATEGORY_FIELDS = {
+    "asset_category_name": "name",
+    "asset_category_code": "code",
+    "asset_category_icon": "icon",
+    "asset_category_color": "color",
+}
+_ASSET_PROJECTION = Projection(AssetOut, Asset, derived={
+    **{f: (fk,) for f, fk in _ASSET_LABELS.items()},
+    **{f: ("asset_category_id",) for f in _ASSET_CATEGORY_FIELDS},
+    "org_unit_name": ("org_unit_id",),
+    "parent_name": ("parent_id",),
+    "risk_count": (),
+})
+
+
+async def _asset_outs(s: AsyncSession, assets: list[Asset], fields: set[str] | None = None) -> list:
+    """Build AssetOut for many assets with a fixed number of IN-queries.
+
+    With ``fields`` only those keys are built (as dicts) and only the lookups
+    they need are run.
+    """
+    if not assets:
+        return []
+    rows = [_ASSET_PROJECTION.column_values(a, fields) for a in assets]
+
+    if wants(fields, "org_unit_name"):
+        ids = {a.org_unit_id for a in assets if a.org_unit_id}
+        names = dict((await s.execute(select(OrgUnit.id, OrgUnit.name).where(OrgUnit.id.in_(ids)))).all()) if ids else {}
+        for row, a in zip(rows, assets):
+            row["org_unit_name"] = names.get(a.org_unit_id)
+
+    if wants(fields, "parent_name"):
+        ids = {a.parent_id for a in assets if a.parent_id}
+        names = dict((await s.execute(select(Asset.id, Asset.name).where(Asset.id.in_(ids)))).all()) if ids else {}
+        for row, a in zip(rows, assets):
+            row["parent_name"] = names.get(a.parent_id)
+
+    cat_fields = [f for f in _ASSET_CATEGORY_FIELDS if wants(fields, f)]
+    if cat_fields:
+        ids = {a.asset_category_id for a in assets if a.asset_category_id}
+        cats = {
+            c.id: c for c in (await s.execute(select(AssetCategory).where(AssetCategory.id.in_(ids)))).scalars()
+        } if ids else {}
+        for row, a in zip(rows, assets):
+            acat = cats.get(a.asset_category_id)
+            for f in cat_fields:
+                row[f] = getattr(acat, _ASSET_CATEGORY_FIELDS[f]) if acat else None
+
+    label_fields = [f for f in _ASSET_LABELS if wants(fields, f)]
+    if label_fields:
+        labels = await dict_cache.labels(s, {
+            getattr(a, _ASSET_LABELS[f]) for a in assets for f in label_fields if getattr(a, _ASSET_LABELS[f])
+        })
+        for row, a in zip(rows, assets):
+            for f in label_fields:
+                row[f] = labels.get(getattr(a, _ASSET_LABELS[f]))
+
+    if wants(fields, "risk_count"):
+        # Count linked risks
+        risk_count_q = (
+            select(Risk.asset_id, func.count())
+            .where(Risk.asset_id.in_({a.id for a in assets}))
+            .group_by(Risk.asset_id)
+        )
+        counts = dict((await s.execute(risk_count_q)).all())
+        for row, a in zip(rows, assets):
+            row["risk_count"] = counts.get(a.id, 0)
+
+    return [AssetOut(**row) for row in rows] if fields is None else rows
+
 
 async def _asset_out(s: AsyncSession, asset: Asset) -> AssetOut:
     """Load all joined names for a single Asset entity."""
-    async def _de_label(entry_id: int | None) -> str | None:
-        if entry_id is None:
-            return None
-        e = await s.get(DictionaryEntry, entry_id)
-        return e.label if e else None
-
-    org = await s.get(OrgUnit, asset.org_unit_id) if asset.org_unit_id else None
-    parent = await s.get(Asset, asset.parent_id) if asset.parent_id else None
-    acat = await s.get(AssetCategory, asset.asset_category_id) if asset.asset_category_id else None
-
-    # Count linked risks
-    risk_count_q = select(func.count()).select_from(Risk).where(Risk.asset_id == asset.id)
-    risk_count = (await s.execute(risk_count_q)).scalar() or 0
-
-    return AssetOut(
-        id=asset.id,
-        ref_id=asset.ref_id,
-        name=asset.name,
-        asset_type_id=asset.asset_type_id,
-        asset_type_name=await _de_label(asset.asset_type_id),
-        category_id=asset.category_id,
-        category_name=await _de_label(asset.category_id),
-        org_unit_id=asset.org_unit_id,
-        org_unit_name=org.name if org else None,
-        parent_id=asset.parent_id,
-        parent_name=parent.name if parent else None,
-        owner=asset.owner,
-        description=asset.description,
-        location=asset.location,
-        sensitivity_id=asset.sensitivity_id,
-        sensitivity_name=await _de_label(asset.sensitivity_id),
-        criticality_id=asset.criticality_id,
-        criticality_name=await _de_label(asset.criticality_id),
-        # CMDB extension
-        asset_subtype=asset.asset_subtype,
-        technical_owner=asset.technical_owner,
-        environment_id=asset.environment_id,
-        environment_name=await _de_label(asset.environment_id),
-        ip_address=asset.ip_address,
-        hostname=asset.hostname,
-        os_version=asset.os_version,
-        vendor=asset.vendor,
-        support_end_date=asset.support_end_date,
-        status_id=asset.status_id,
-        status_name=await _de_label(asset.status_id),
-        last_scan_date=asset.last_scan_date,
-        notes=asset.notes,
-        # CMDB Phase 2
-        asset_category_id=asset.asset_category_id,
-        asset_category_name=acat.name if acat else None,
-        asset_category_code=acat.code if acat else None,
-        asset_category_icon=acat.icon if acat else None,
-        asset_category_color=acat.color if acat else None,
-        custom_attributes=asset.custom_attributes,
-        is_active=asset.is_active,
-        risk_count=risk_count,
-        created_at=asset.created_at,
-        updated_at=asset.updated_at,
-    )
+    return (await _asset_outs(s, [asset]))[0]
 
 
 # ═══════════════════ LIST ═══════════════════
 
+_ASSET_SORT = SortSpec({
+    "name": Asset.name,
+    "ref_id": Asset.ref_id,
+    "created_at": Asset.created_at,
+    "updated_at": Asset.updated_at,
+}, default="name", pk=Asset.id)
+
+
 @router.get("", response_model=list[AssetOut], summary="Lista aktywów")
 async def list_assets(
+    response: Response,
     org_unit_id: int | None = Query(None),
     category_id: int | None = Query(None),
     asset_type_id: int | None = Query(None),
     asset_category_id: int | None = Query(None),
     include_children: bool = Query(True),
     include_archived: bool = Query(False),
+    page: PageParams = Depends(page_params),
+    fields: set[str] | None = Depends(fields_param),
+    ndjson: bool = Depends(wants_ndjson),
     s: AsyncSession = Depends(get_session),
 ):
+    fields = _ASSET_PROJECTION.resolve(fields)
     q = select(Asset)
+    if fields is not None:
+        q = q.options(_ASSET_PROJECTION.load_only(fields))
     if not include_archived:
         q = q.where(Asset.is_active.is_(True))
     if org_unit_id is not None:
@@ -120,9 +162,12 @@ async def list_assets(
             q = q.where(Asset.asset_category_id.in_(all_ids))
         else:
             q = q.where(Asset.asset_category_id == asset_category_id)
-    q = q.order_by(Asset.name)
-    assets = (await s.execute(q)).scalars().all()
-    return [await _asset_out(s, a) for a in assets]
+    if ndjson:
+        return ndjson_response(sort_query(q, _ASSET_SORT, page.sort), lambda bs, batch: _asset_outs(bs, batch, fields))
+    assets = await paginate(s, q, _ASSET_SORT, page, response)
+    if fields is None:
+        return await _asset_outs(s, assets)
+    return partial_response(await _asset_outs(s, assets, fields), response)
 
 
 # ═══════════════════ GET ═══════════════════
@@ -246,67 +291,93 @@ async def delete_relationship(rel_id: int, s: AsyncSession = Depends(get_session
     return {"status": "deleted", "id": rel_id}
 
 
-@router.get("/graph/data", response_model=AssetGraph, summary="Graf relacji aktywow")
-async def get_asset_graph(s: AsyncSession = Depends(get_session)):
-    # All active assets
-    assets_q = select(Asset).where(Asset.is_active.is_(True))
-    assets = (await s.execute(assets_q)).scalars().all()
-    asset_map = {a.id: a for a in assets}
-
-    # All relationships
-    rels_q = select(AssetRelationship)
-    rels = (await s.execute(rels_q)).scalars().all()
-
-    # Find connected asset IDs
-    connected_ids = set()
-    valid_edges = []
-    for r in rels:
-        if r.source_asset_id in asset_map and r.target_asset_id in asset_map:
-            connected_ids.add(r.source_asset_id)
-            connected_ids.add(r.target_asset_id)
-            valid_edges.append(r)
+_GRAPH_ETAG = etag_guard({"assets", "asset_relationships", "risks", "org_units", "dictionary_entries"})
 
-    # Also add parent-child relationships
-    for a in assets:
-        if a.parent_id and a.parent_id in asset_map:
-            connected_ids.add(a.id)
-            connected_ids.add(a.parent_id)
-
-    # Build nodes for connected assets only
-    nodes = []
-    for aid in connected_ids:
-        a = asset_map[aid]
-        risk_count_q = select(func.count()).select_from(Risk).where(Risk.asset_id == a.id)
-        risk_count = (await s.execute(risk_count_q)).scalar() or 0
-        org = await s.get(OrgUnit, a.org_unit_id) if a.org_unit_id else None
-        async def _dl(eid):
-            if not eid: return None
-            e = await s.get(DictionaryEntry, eid)
-            return e.label if e else None
-        nodes.append(AssetGraphNode(
-            id=a.id, name=a.name,
-            asset_type_name=await _dl(a.asset_type_id),
-            criticality_name=await _dl(a.criticality_id),
-            org_unit_name=org.name if org else None,
-            risk_count=risk_count,
-        ))
 
-    # Build edges
-    edges = []
-    for r in valid_edges:
-        edges.append(AssetGraphEdge(
-            id=r.id, source=r.source_asset_id, target=r.target_asset_id,
-            type=r.relationship_type, description=r.description,
-        ))
-    # Parent-child edges
-    for a in assets:
-        if a.parent_id and a.parent_id in asset_map and a.id in connected_ids:
-            edges.append(AssetGraphEdge(
-                id=-a.id, source=a.parent_id, target=a.id,
-                type="contains", description="Relacja nadrzedny-podrzedny",
-            ))
+def _direction(direction: str) -> str:
+    if direction not in DIRECTIONS:
+        raise HTTPException(400, f"Nieprawidlowy kierunek: {direction}. Dostepne: {', '.join(DIRECTIONS)}")
+    return direction
 
-    return AssetGraph(nodes=nodes, edges=edges)
+
+async def _graph_asset(s: AsyncSession, asset_id: int) -> None:
+    await asset_graph.ensure_loaded(s)
+    if not asset_graph.has(asset_id):
+        raise HTTPException(404, "Aktywo nie istnieje")
+
+
+async def _subgraph(s: AsyncSession, ids, edges, truncated: bool = False) -> AssetGraph:
+    attrs = await node_attributes(s, ids)
+    return AssetGraph(
+        nodes=[attrs[i] for i in ids if i in attrs],
+        edges=[edge_out(e) for e in edges],
+        truncated=truncated,
+    )
+
+
+@router.get("/graph/data", response_model=AssetGraph, summary="Graf relacji aktywow",
+            dependencies=[Depends(_GRAPH_ETAG)])
+async def get_asset_graph(s: AsyncSession = Depends(get_session)):
+    """Whole graph (connected assets only) — prefer the subgraph endpoints for large CMDBs."""
+    await asset_graph.ensure_loaded(s)
+    ids, edges = asset_graph.connected()
+    return await _subgraph(s, sorted(ids), edges)
+
+
+@router.get("/graph/neighbourhood/{asset_id}", response_model=AssetGraph,
+            summary="Sasiedztwo aktywa (k krokow)", dependencies=[Depends(_GRAPH_ETAG)])
+async def get_asset_neighbourhood(
+    asset_id: int,
+    depth: int = Query(1, ge=1, le=6),
+    direction: str = Query("both", description="out | in | both"),
+    s: AsyncSession = Depends(get_session),
+):
+    await _graph_asset(s, asset_id)
+    dist, truncated = asset_graph.reachable(asset_id, depth, _direction(direction), settings.ASSET_GRAPH_MAX_NODES)
+    return await _subgraph(s, list(dist), asset_graph.induced_edges(dist), truncated)
+
+
+@router.get("/graph/path", response_model=AssetGraph, summary="Najkrotsza sciezka miedzy aktywami",
+            dependencies=[Depends(_GRAPH_ETAG)])
+async def get_asset_path(
+    source: int = Query(...),
+    target: int = Query(...),
+    direction: str = Query("both", description="out | in | both"),
+    s: AsyncSession = Depends(get_session),
+):
+    await _graph_asset(s, source)
+    await _graph_asset(s, target)
+    path = asset_graph.shortest_path(source, target, _direction(direction))
+    if path is None:
+        raise HTTPException(404, "Brak sciezki miedzy aktywami")
+    ids = [source]
+    for e in path:
+        ids.append(e.target if e.source == ids[-1] else e.source)
+    return await _subgraph(s, ids, path)
+
+
+@router.get("/graph/blast-radius/{asset_id}", response_model=AssetBlastRadius,
+            summary="Zasieg wplywu aktywa (osiagalne aktywa i ich ryzyka)", dependencies=[Depends(_GRAPH_ETAG)])
+async def get_asset_blast_radius(
+    asset_id: int,
+    depth: int = Query(3, ge=1, le=10),
+    direction: str = Query("out", description="out | in | both"),
+    s: AsyncSession = Depends(get_session),
+):
+    await _graph_asset(s, asset_id)
+    direction = _direction(direction)
+    dist, truncated = asset_graph.reachable(asset_id, depth, direction, settings.ASSET_GRAPH_MAX_NODES)
+    reached = [i for i in dist if i != asset_id]
+    attrs = await node_attributes(s, reached)
+    totals = await risk_totals(s, reached)
+    return AssetBlastRadius(
+        asset_id=asset_id, depth=depth, direction=direction, truncated=truncated,
+        asset_count=len(reached), **totals,
+        assets=sorted(
+            (AssetGraphReachNode(**attrs[i].model_dump(), distance=dist[i]) for i in reached if i in attrs),
+            key=lambda n: (n.distance, n.name),
+        ),
+    )
 
 
 # ═══════════════════ CSV IMPORT ═══════════════════
@@ -315,61 +386,39 @@ async def get_asset_graph(s: AsyncSession = Depends(get_session)):
 async def import_csv(
     file: UploadFile = File(...),
     asset_category_id: int | None = Query(None),
+    key: str | None = Query(None, description="Kolumna klucza upsert: ref_id | name | hostname (brak = tylko nowe)"),
+    dry_run: bool = Query(False, description="Tylko walidacja — nic nie jest zapisywane"),
+    ndjson: bool = Depends(wants_ndjson),
     s: AsyncSession = Depends(get_session),
 ):
     """Import assets from CSV file. Expected columns: name (required),
-    owner, description, location, plus any custom attribute keys."""
+    owner, description, location, plus any custom attribute keys.
+
+    With ``key`` rows matching an active asset on that column update it.
+    With ``Accept: application/x-ndjson`` progress is streamed per batch.
+    """
     if not file.filename or not file.filename.endswith(".csv"):
         raise HTTPException(400, "Plik musi byc w formacie CSV")
+    if key is not None and key not in IMPORT_KEYS:
+        raise HTTPException(400, f"Nieznana kolumna klucza: {key}. Dostepne: {', '.join(IMPORT_KEYS)}")
 
-    content = await file.read()
+    path = await spool_upload(file)
     try:
-        text = content.decode("utf-8-sig")
-    except UnicodeDecodeError:
-        text = content.decode("latin-1")
-
-    reader = csv.DictReader(io.StringIO(text), delimiter=";")
-    if not reader.fieldnames:
-        # Try comma-separated
-        reader = csv.DictReader(io.StringIO(text), delimiter=",")
-    if not reader.fieldnames:
-        raise HTTPException(400, "Nie mozna odczytac naglowkow CSV")
-
-    core_fields = {"name", "owner", "description", "location"}
-    created = 0
-    errors = []
-
-    for row_num, row in enumerate(reader, start=2):
-        name = (row.get("name") or "").strip()
-        if not name:
-            errors.append(f"Wiersz {row_num}: brak nazwy")
-            continue
-
-        custom_attrs = {}
-        for k, v in row.items():
-            if k and k not in core_fields and v and v.strip():
-                custom_attrs[k] = v.strip()
-
-        asset = Asset(
-            name=name,
-            owner=(row.get("owner") or "").strip() or None,
-            description=(row.get("description") or "").strip() or None,
-            location=(row.get("location") or "").strip() or None,
-            asset_category_id=asset_category_id,
-            custom_attributes=custom_attrs if custom_attrs else None,
-        )
-        s.add(asset)
-        await s.flush()
-        asset.ref_id = f"AST-{asset.id:04d}"
-        created += 1
+        source = CsvSource(path, key)
+    except Exception:
+        if os.path.exists(path):
+            os.unlink(path)
+        raise
+    options = {"key": key, "asset_category_id": asset_category_id, "dry_run": dry_run}
+    if ndjson:
+        return progress_response(source, **options)
 
-    await s.commit()
-    return JSONResponse({
-        "status": "ok",
-        "created": created,
-        "errors": errors[:20],
-        "total_errors": len(errors),
-    })
+    try:
+        async for result in import_assets(s, source, **options):
+            pass
+    finally:
+        source.close()
+    return JSONResponse(result.as_dict())
 
 
 # ═══════════════════ BULK OPERATIONS ═══════════════════
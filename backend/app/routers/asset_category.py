@@ -6,6 +6,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
+from app.middleware.conditional_get import etag_guard
 from app.models.asset import Asset
 from app.models.asset_category import AssetCategory, CategoryFieldDefinition, RelationshipType
 from app.schemas.asset_category import (
@@ -52,7 +53,10 @@ def _build_tree(flat: list[AssetCategoryOut]) -> list[AssetCategoryTreeNode]:
 
 # ═══════════════════ CATEGORY TREE ═══════════════════
 
-@router.get("/tree", response_model=list[AssetCategoryTreeNode], summary="Drzewo kategorii aktywow")
+@router.get(
+    "/tree", response_model=list[AssetCategoryTreeNode], summary="Drzewo kategorii aktywow",
+    dependencies=[Depends(etag_guard({"asset_categories", "assets"}))],
+)
 async def get_category_tree(
     include_inactive: bool = Query(False),
     s: AsyncSession = Depends(get_session),
@@ -7,6 +7,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
+from app.middleware.audit_auto import audit_write_stats
 from app.models.audit import AuditLog
 from app.models.user import User
 from app.schemas.audit import AuditLogOut, AuditLogPage
@@ -66,3 +67,8 @@ async def list_audit_logs(
         for log, un in rows
     ]
     return AuditLogPage(items=items, total=total, page=page, per_page=per_page)
+
+
+@router.get("/write-stats", summary="Statystyki zapisu logów zmian (czasy flush per tryb)")
+async def audit_log_write_stats():
+    return audit_write_stats()
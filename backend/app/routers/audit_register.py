@@ -1,28 +1,26 @@
 """
 Audit & Findings registry module — /api/v1/audits
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
 from app.models.audit_register import Audit, AuditFinding
-from app.models.dictionary import DictionaryEntry
 from app.models.org_unit import OrgUnit
 from app.models.security_area import SecurityDomain
 from app.schemas.audit_register import (
     AuditCreate, AuditOut, AuditUpdate,
     FindingCreate, FindingOut, FindingUpdate,
 )
+from app.services.dictionary_cache import dict_cache
+from app.services.pagination import PageParams, SortSpec, page_params, paginate
 
 router = APIRouter(prefix="/api/v1/audits", tags=["Rejestr audytów"])
 
 
 async def _de_label(s: AsyncSession, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return e.label if e else None
+    return await dict_cache.label(s, entry_id)
 
 
 async def _audit_out(s: AsyncSession, a: Audit) -> AuditOut:
@@ -128,17 +126,26 @@ async def archive_audit(audit_id: int, s: AsyncSession = Depends(get_session)):
 
 # ═══════════════════ FINDINGS ═══════════════════
 
+_FINDING_SORT = SortSpec({
+    "created_at": AuditFinding.created_at,
+    "updated_at": AuditFinding.updated_at,
+    "title": AuditFinding.title,
+    "ref_id": AuditFinding.ref_id,
+}, default="-created_at", pk=AuditFinding.id)
+
+
 @router.get("/{audit_id}/findings", response_model=list[FindingOut], summary="Findings audytu")
 async def list_findings(
+    response: Response,
     audit_id: int,
     include_archived: bool = Query(False),
+    page: PageParams = Depends(page_params),
     s: AsyncSession = Depends(get_session),
 ):
     q = select(AuditFinding).where(AuditFinding.audit_id == audit_id)
     if not include_archived:
         q = q.where(AuditFinding.is_active.is_(True))
-    q = q.order_by(AuditFinding.created_at.desc())
-    findings = (await s.execute(q)).scalars().all()
+    findings = await paginate(s, q, _FINDING_SORT, page, response)
     return [await _finding_out(s, f) for f in findings]
 
 
@@ -4,7 +4,7 @@ Formal audit lifecycle: program → engagement → tests → findings → report
 """
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -33,6 +33,7 @@ from app.schemas.compliance import (
     AuditReportOut,
     AuditReportUpsert,
 )
+from app.services.pagination import PageParams, SortSpec, page_params, paginate
 
 router = APIRouter(tags=["Audit Workflow"])
 
@@ -379,19 +380,28 @@ async def upsert_report(eng_id: int, body: AuditReportUpsert, s: AsyncSession =
 findings_router = APIRouter(prefix="/api/v1/audit-findings", tags=["Audit Findings"])
 
 
+_FINDING_SORT = SortSpec({
+    "created_at": ComplianceAuditFinding.created_at,
+    "updated_at": ComplianceAuditFinding.updated_at,
+    "severity": ComplianceAuditFinding.severity,
+    "status": ComplianceAuditFinding.status,
+    "ref_id": ComplianceAuditFinding.ref_id,
+}, default="-created_at", pk=ComplianceAuditFinding.id)
+
+
 @findings_router.get("/", response_model=list[ComplianceFindingOut])
 async def list_all_findings(
+    response: Response,
     severity: str | None = None,
     status: str | None = None,
+    page: PageParams = Depends(page_params),
     s: AsyncSession = Depends(get_session),
 ):
     """List all audit findings across all engagements."""
-    q = select(ComplianceAuditFinding).order_by(
-        ComplianceAuditFinding.created_at.desc(),
-    )
+    q = select(ComplianceAuditFinding)
     if severity:
         q = q.where(ComplianceAuditFinding.severity == severity)
     if status:
         q = q.where(ComplianceAuditFinding.status == status)
-    rows = (await s.execute(q)).scalars().all()
+    rows = await paginate(s, q, _FINDING_SORT, page, response)
     return [ComplianceFindingOut.model_validate(f) for f in rows]
@@ -9,22 +9,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
 from app.models.awareness import AwarenessCampaign, AwarenessResult, AwarenessEmployeeReport
-from app.models.dictionary import DictionaryEntry, DictionaryType
+from app.models.dictionary import DictionaryType
 from app.models.org_unit import OrgUnit
 from app.schemas.awareness import (
     AwarenessResultCreate, AwarenessResultOut,
     CampaignCreate, CampaignOut, CampaignStatusChange, CampaignUpdate,
     EmployeeReportCreate, EmployeeReportOut,
 )
+from app.services.dictionary_cache import dict_cache
 
 router = APIRouter(tags=["Security Awareness"])
 
 
 async def _de_label(s: AsyncSession, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return e.label if e else None
+    return await dict_cache.label(s, entry_id)
 
 
 async def _campaign_out(s: AsyncSession, c: AwarenessCampaign) -> CampaignOut:
@@ -77,10 +75,7 @@ async def _report_out(s: AsyncSession, r: AwarenessEmployeeReport) -> EmployeeRe
 
 # Helper to get campaign type label for scoring
 async def _get_type_label(s: AsyncSession, type_id: int | None) -> str | None:
-    if type_id is None:
-        return None
-    e = await s.get(DictionaryEntry, type_id)
-    return e.label if e else None
+    return await dict_cache.label(s, type_id)
 
 
 # ═══════════════════ METRICS ═══════════════════
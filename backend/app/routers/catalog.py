@@ -1,5 +1,5 @@
 """
-Catalogs module — /api/v1/threats, /api/v1/vulnerabilities, /api/v1/safeguards
+Catalogs module — /api/v1/threats, /api/v1/vulnerability-catalog, /api/v1/safeguards
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
@@ -21,16 +21,14 @@ from app.schemas.catalog import (
     VulnerabilityOut,
     VulnerabilityUpdate,
 )
+from app.services.dictionary_cache import dict_cache
 
 router = APIRouter(tags=["Katalogi"])
 
 
 # helper: resolve asset_type_name from id
 async def _asset_type_label(s: AsyncSession, asset_type_id: int | None) -> str | None:
-    if asset_type_id is None:
-        return None
-    e = await s.get(DictionaryEntry, asset_type_id)
-    return e.label if e else None
+    return await dict_cache.label(s, asset_type_id)
 
 
 # ═══════════════════ THREATS ═══════════════════
@@ -128,8 +126,9 @@ async def archive_threat(threat_id: int, s: AsyncSession = Depends(get_session))
 
 
 # ═══════════════════ VULNERABILITIES ═══════════════════
+# /api/v1/vulnerabilities belongs to the vulnerability registry (routers/vulnerability.py).
 
-@router.get("/api/v1/vulnerabilities", response_model=list[VulnerabilityOut], summary="Lista podatności")
+@router.get("/api/v1/vulnerability-catalog", response_model=list[VulnerabilityOut], summary="Lista podatności")
 async def list_vulnerabilities(
     include_archived: bool = Query(False),
     security_area_id: int | None = Query(None),
@@ -161,7 +160,7 @@ async def list_vulnerabilities(
     ]
 
 
-@router.get("/api/v1/vulnerabilities/{vuln_id}", response_model=VulnerabilityOut, summary="Pobierz podatność")
+@router.get("/api/v1/vulnerability-catalog/{vuln_id}", response_model=VulnerabilityOut, summary="Pobierz podatność")
 async def get_vulnerability(vuln_id: int, s: AsyncSession = Depends(get_session)):
     atype = aliased(DictionaryEntry)
     q = (
@@ -180,7 +179,7 @@ async def get_vulnerability(vuln_id: int, s: AsyncSession = Depends(get_session)
                             is_active=v.is_active, created_at=v.created_at, updated_at=v.updated_at)
 
 
-@router.post("/api/v1/vulnerabilities", response_model=VulnerabilityOut, status_code=201, summary="Utwórz podatność")
+@router.post("/api/v1/vulnerability-catalog", response_model=VulnerabilityOut, status_code=201, summary="Utwórz podatność")
 async def create_vulnerability(body: VulnerabilityCreate, s: AsyncSession = Depends(get_session)):
     v = Vulnerability(**body.model_dump())
     s.add(v)
@@ -193,7 +192,7 @@ async def create_vulnerability(body: VulnerabilityCreate, s: AsyncSession = Depe
                             created_at=v.created_at, updated_at=v.updated_at)
 
 
-@router.put("/api/v1/vulnerabilities/{vuln_id}", response_model=VulnerabilityOut, summary="Edytuj podatność")
+@router.put("/api/v1/vulnerability-catalog/{vuln_id}", response_model=VulnerabilityOut, summary="Edytuj podatność")
 async def update_vulnerability(vuln_id: int, body: VulnerabilityUpdate, s: AsyncSession = Depends(get_session)):
     v = await s.get(Vulnerability, vuln_id)
     if not v:
@@ -209,7 +208,7 @@ async def update_vulnerability(vuln_id: int, body: VulnerabilityUpdate, s: Async
                             created_at=v.created_at, updated_at=v.updated_at)
 
 
-@router.delete("/api/v1/vulnerabilities/{vuln_id}", summary="Archiwizuj podatność")
+@router.delete("/api/v1/vulnerability-catalog/{vuln_id}", summary="Archiwizuj podatność")
 async def archive_vulnerability(vuln_id: int, s: AsyncSession = Depends(get_session)):
     v = await s.get(Vulnerability, vuln_id)
     if not v:
@@ -6,7 +6,7 @@ Controls (reference, read-only) + Assessments CRUD + Answers + Scoring.
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -17,7 +17,6 @@ from app.models.cis import (
     CisControl,
     CisSubControl,
 )
-from app.models.dictionary import DictionaryEntry
 from app.models.org_unit import OrgUnit
 from app.schemas.cis import (
     CisAnswerOut,
@@ -29,6 +28,8 @@ from app.schemas.cis import (
     CisControlOut,
     CisSubControlOut,
 )
+from app.services.cis_scores import recalc_assessment_scores
+from app.services.dictionary_cache import dict_cache
 
 router = APIRouter(prefix="/api/v1/cis", tags=["CIS Benchmark"])
 
@@ -41,10 +42,7 @@ def _d(v: Decimal | None) -> float | None:
 
 async def _assessment_out(s: AsyncSession, a: CisAssessment) -> CisAssessmentOut:
     org = await s.get(OrgUnit, a.org_unit_id) if a.org_unit_id else None
-    status_label = None
-    if a.status_id:
-        de = await s.get(DictionaryEntry, a.status_id)
-        status_label = de.label if de else None
+    status_label = await dict_cache.label(s, a.status_id)
     return CisAssessmentOut(
         id=a.id, org_unit_id=a.org_unit_id,
         org_unit_name=org.name if org else None,
@@ -55,58 +53,12 @@ async def _assessment_out(s: AsyncSession, a: CisAssessment) -> CisAssessmentOut
         risk_addressed_pct=_d(a.risk_addressed_pct),
         ig1_score=_d(a.ig1_score), ig2_score=_d(a.ig2_score),
         ig3_score=_d(a.ig3_score),
+        policy_pct=_d(a.policy_pct), implementation_pct=_d(a.implementation_pct),
+        automation_pct=_d(a.automation_pct), reporting_pct=_d(a.reporting_pct),
         created_at=a.created_at, updated_at=a.updated_at,
     )
 
 
-async def _recalc_scores(s: AsyncSession, assessment_id: int):
-    """Recalculate and store aggregate scores on the assessment row."""
-    # Overall risk_addressed_pct
-    q = select(
-        func.avg(
-            (
-                func.coalesce(CisAssessmentAnswer.policy_value, 0)
-                + func.coalesce(CisAssessmentAnswer.impl_value, 0)
-                + func.coalesce(CisAssessmentAnswer.auto_value, 0)
-                + func.coalesce(CisAssessmentAnswer.report_value, 0)
-            ) / 4
-        ).label("overall"),
-    ).where(
-        CisAssessmentAnswer.assessment_id == assessment_id,
-        CisAssessmentAnswer.is_not_applicable.is_(False),
-    )
-    overall = (await s.execute(q)).scalar()
-
-    # IG scores
-    ig_scores = {}
-    for ig_label, ig_val in [("ig1", "1"), ("ig2", "2"), ("ig3", "3")]:
-        q = select(
-            func.avg(
-                (
-                    func.coalesce(CisAssessmentAnswer.policy_value, 0)
-                    + func.coalesce(CisAssessmentAnswer.impl_value, 0)
-                    + func.coalesce(CisAssessmentAnswer.auto_value, 0)
-                    + func.coalesce(CisAssessmentAnswer.report_value, 0)
-                ) / 4
-            )
-        ).join(CisSubControl, CisAssessmentAnswer.sub_control_id == CisSubControl.id).where(
-            CisAssessmentAnswer.assessment_id == assessment_id,
-            CisAssessmentAnswer.is_not_applicable.is_(False),
-            func.find_in_set(ig_val, CisSubControl.implementation_groups) > 0,
-        )
-        ig_scores[ig_label] = (await s.execute(q)).scalar()
-
-    assessment = await s.get(CisAssessment, assessment_id)
-    if assessment:
-        assessment.risk_addressed_pct = round(float(overall or 0) * 100, 2)
-        assessment.ig1_score = round(float(ig_scores["ig1"] or 0) * 100, 2) if ig_scores["ig1"] else None
-        assessment.ig2_score = round(float(ig_scores["ig2"] or 0) * 100, 2) if ig_scores["ig2"] else None
-        assessment.ig3_score = round(float(ig_scores["ig3"] or 0) * 100, 2) if ig_scores["ig3"] else None
-        # Maturity rating (simplified 0–5 scale)
-        pct = float(overall or 0)
-        assessment.maturity_rating = round(pct * 5, 2)
-
-
 # ═══════════════════ CONTROLS (read-only) ═══════════════════
 
 @router.get("/controls", response_model=list[CisControlOut], summary="18 kontroli CIS z sub-kontrolami")
@@ -186,7 +138,7 @@ async def create_assessment(body: CisAssessmentCreate, s: AsyncSession = Depends
                     report_value=ans.report_value,
                 ))
             await s.flush()
-            await _recalc_scores(s, a.id)
+            await recalc_assessment_scores(s, [a.id])
 
     await s.commit()
     await s.refresh(a)
@@ -282,7 +234,7 @@ async def upsert_answers(
 
     # Recalculate assessment scores
     await s.flush()
-    await _recalc_scores(s, assessment_id)
+    await recalc_assessment_scores(s, [assessment_id])
     await s.commit()
 
     return {"status": "ok", "created": created, "updated": updated}
@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
+from app.middleware.conditional_get import etag_guard
 from app.schemas.dashboard import (
     CisComparison,
     CisDashboard,
@@ -17,12 +18,15 @@ from app.schemas.dashboard import (
     RiskDashboard,
 )
 from app.services import dashboard as svc
+from app.services import risk_rollup
+from app.services.dashboard_cache import dashboard_cache
 
 router = APIRouter(prefix="/api/v1/dashboard", tags=["Dashboard"])
 
 
 @router.get(
     "/executive-summary",
+    dependencies=[Depends(etag_guard(svc.get_executive_summary.cache_tables))],
     response_model=ExecutiveSummary,
     summary="Executive Summary — KPI, ryzyka, CIS maturity, posture score",
 )
@@ -35,6 +39,7 @@ async def executive_summary(
 
 @router.get(
     "/risks",
+    dependencies=[Depends(etag_guard(svc.get_risk_dashboard.cache_tables))],
     response_model=RiskDashboard,
     summary="Risk Dashboard — rozkład, macierz, trend, przeterminowane",
 )
@@ -47,6 +52,7 @@ async def risk_dashboard(
 
 @router.get(
     "/cis",
+    dependencies=[Depends(etag_guard(svc.get_cis_dashboard.cache_tables))],
     response_model=CisDashboard,
     summary="CIS Dashboard — 18 kontroli, 4 wymiary, IG scores, ATT&CK",
 )
@@ -59,6 +65,7 @@ async def cis_dashboard(
 
 @router.get(
     "/cis/comparison",
+    dependencies=[Depends(etag_guard(svc.get_cis_comparison.cache_tables))],
     response_model=CisComparison,
     summary="CIS Comparison — porównanie jednostek side-by-side",
 )
@@ -82,6 +89,7 @@ async def cis_comparison(
 
 @router.get(
     "/cis/trend",
+    dependencies=[Depends(etag_guard(svc.get_cis_trend.cache_tables))],
     response_model=CisTrend,
     summary="CIS Trend — trend maturity w czasie (reoceny)",
 )
@@ -94,6 +102,7 @@ async def cis_trend(
 
 @router.get(
     "/posture-score",
+    dependencies=[Depends(etag_guard(svc.get_posture_score.cache_tables))],
     response_model=PostureScoreResponse,
     summary="Security Posture Score — zintegrowana ocena bezpieczeństwa",
 )
@@ -102,3 +111,20 @@ async def posture_score(
     s: AsyncSession = Depends(get_session),
 ):
     return await svc.get_posture_score(s, org_unit_id)
+
+
+@router.get(
+    "/admin/cache-stats",
+    summary="Statystyki cache dashboardów",
+)
+async def dashboard_cache_stats():
+    return dashboard_cache.stats()
+
+
+@router.post(
+    "/admin/risk-rollup",
+    summary="Przelicz dzienny roll-up ryzyk (trend + heatmapa) na dziś",
+)
+async def run_risk_rollup():
+    rows = await risk_rollup.run_rollup()
+    return {"status": "ok", "rows": rows}
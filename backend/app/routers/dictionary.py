@@ -20,6 +20,7 @@ from app.schemas.dictionary import (
     DictionaryTypeWithEntries,
     ReorderRequest,
 )
+from app.services.dictionary_cache import dict_cache
 
 # ── Pydantic models for usage / reassign endpoints ──
 
@@ -544,3 +545,13 @@ async def dedup_entries(
         "reassigned": total_reassigned,
         "unique_index_created": idx_created,
     }
+
+
+# ── CACHE stats (label cache used by all registers / reports) ──
+
+@router.get(
+    "/admin/cache-stats",
+    summary="Statystyki cache etykiet słownikowych",
+)
+async def dictionary_cache_stats():
+    return dict_cache.stats()
@@ -80,9 +80,10 @@ async def _sync_cis(s: AsyncSession, domain_id: int, cis_control_ids: list[int])
 )
 async def domain_dashboard(
     org_unit_id: int | None = Query(None, description="ID jednostki org. (puste = cala organizacja)"),
+    top_n: int = Query(3, ge=0, le=50, description="Liczba top ryzyk na domene"),
     s: AsyncSession = Depends(get_session),
 ):
-    return await get_domain_dashboard(s, org_unit_id)
+    return await get_domain_dashboard(s, org_unit_id, top_n)
 
 
 # ── LIST ──
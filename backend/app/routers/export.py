@@ -0,0 +1,50 @@
+"""
+Background export jobs — /api/v1/exports
+Submit an Excel export, poll its status and download the cached artefact.
+"""
+import os
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from app.schemas.export import ExportJobCreate, ExportJobOut
+from app.services import export_jobs
+from app.services.xlsx_export import XLSX_MEDIA_TYPE
+
+router = APIRouter(prefix="/api/v1/exports", tags=["Eksporty"])
+
+
+def _job_out(job: export_jobs.ExportJob, cached: bool = False) -> ExportJobOut:
+    return ExportJobOut(
+        id=job.id, kind=job.kind, params=job.params, status=job.status, cached=cached,
+        created_at=job.created_at, finished_at=job.finished_at, size=job.size, error=job.error,
+        download_url=f"/api/v1/exports/{job.id}/download" if job.status == "done" else None,
+    )
+
+
+@router.get("/kinds", summary="Dostepne typy eksportu i ich parametry")
+async def list_export_kinds():
+    return export_jobs.export_kinds()
+
+
+@router.post("", response_model=ExportJobOut, status_code=202, summary="Zlec eksport w tle")
+async def create_export(body: ExportJobCreate):
+    job, cached = await export_jobs.submit(body.kind, body.params)
+    return _job_out(job, cached)
+
+
+@router.get("/{job_id}", response_model=ExportJobOut, summary="Status zadania eksportu")
+async def get_export(job_id: str):
+    return _job_out(await export_jobs.get_job(job_id))
+
+
+@router.get("/{job_id}/download", summary="Pobierz plik eksportu")
+async def download_export(job_id: str):
+    job = await export_jobs.get_job(job_id)
+    if job.status == "failed":
+        raise HTTPException(409, f"Eksport nie powiodl sie: {job.error}")
+    if job.status != "done" or not job.path:
+        raise HTTPException(409, "Eksport jeszcze trwa")
+    if not os.path.exists(job.path):
+        raise HTTPException(410, "Plik eksportu wygasl lub zostal usuniety — zlec eksport ponownie")
+    return FileResponse(job.path, media_type=XLSX_MEDIA_TYPE, filename=export_jobs.download_name(job))
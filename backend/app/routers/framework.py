@@ -14,7 +14,7 @@ from __future__ import annotations
 import logging
 from datetime import datetime, date, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Response
 
 logger = logging.getLogger(__name__)
 from sqlalchemy import select, func, update, and_
@@ -22,7 +22,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.database import get_session
-from app.models.dictionary import DictionaryEntry
+from app.middleware.conditional_get import etag_guard
 from app.models.framework import (
     AssessmentDimension, DimensionLevel, Framework, FrameworkNode,
     FrameworkNodeSecurityArea, FrameworkVersionHistory, FrameworkOrgUnit,
@@ -41,7 +41,10 @@ from app.schemas.framework import (
     FrameworkReviewCreate, FrameworkReviewOut,
     FrameworkUpdate, FrameworkVersionOut, LifecycleChangeRequest,
 )
+from app.services.dictionary_cache import dict_cache
 from app.services.framework_import import import_from_excel, import_from_yaml
+from app.services.pagination import PageParams, SortSpec, page_params, paginate
+from app.services.projection import Projection, fields_param, partial_response
 
 router = APIRouter(prefix="/api/v1/frameworks", tags=["Repozytorium Wymagań"])
 
@@ -73,11 +76,7 @@ async def _reload_framework(s: AsyncSession, fw_id: int) -> Framework | None:
 async def _enrich_framework_out(fw: Framework, s: AsyncSession) -> dict:
     """Add computed fields for FrameworkOut / FrameworkBrief."""
     extra: dict = {}
-    if fw.document_type_id:
-        dt = await s.get(DictionaryEntry, fw.document_type_id)
-        extra["document_type_name"] = dt.label if dt else None
-    else:
-        extra["document_type_name"] = None
+    extra["document_type_name"] = await dict_cache.label(s, fw.document_type_id)
     extra["display_version"] = fw.display_version
     if fw.updates_document_id:
         upd = await s.get(Framework, fw.updates_document_id)
@@ -541,7 +540,10 @@ async def get_versions(fw_id: int, s: AsyncSession = Depends(get_session)):
 # FRAMEWORK NODES -- tree & list
 # ===================================================
 
-@router.get("/{fw_id}/tree", response_model=list[FrameworkNodeTreeOut], summary="Drzewo nodes")
+@router.get(
+    "/{fw_id}/tree", response_model=list[FrameworkNodeTreeOut], summary="Drzewo nodes",
+    dependencies=[Depends(etag_guard({"framework_nodes"}))],
+)
 async def get_framework_tree(fw_id: int, s: AsyncSession = Depends(get_session)):
     q = (
         select(FrameworkNode)
@@ -578,27 +580,43 @@ async def get_framework_tree(fw_id: int, s: AsyncSession = Depends(get_session))
     return roots
 
 
+_NODE_SORT = SortSpec({
+    "order_id": FrameworkNode.order_id,
+    "depth": FrameworkNode.depth,
+    "ref_id": FrameworkNode.ref_id,
+    "name": FrameworkNode.name,
+}, default="order_id", pk=FrameworkNode.id)
+_NODE_PROJECTION = Projection(FrameworkNodeBrief, FrameworkNode)
+
+
 @router.get("/{fw_id}/nodes", response_model=list[FrameworkNodeBrief], summary="Filtrowane nodes")
 async def list_nodes(
+    response: Response,
     fw_id: int,
     assessable: bool | None = Query(None),
     ig: str | None = Query(None, description="Implementation Group filter (e.g. IG1)"),
     depth: int | None = Query(None),
+    page: PageParams = Depends(page_params),
+    fields: set[str] | None = Depends(fields_param),
     s: AsyncSession = Depends(get_session),
 ):
+    fields = _NODE_PROJECTION.resolve(fields)
     q = (
         select(FrameworkNode)
         .where(FrameworkNode.framework_id == fw_id, FrameworkNode.is_active.is_(True))
     )
+    if fields is not None:
+        q = q.options(_NODE_PROJECTION.load_only(fields))
     if assessable is not None:
         q = q.where(FrameworkNode.assessable == assessable)
     if depth is not None:
         q = q.where(FrameworkNode.depth == depth)
     if ig:
         q = q.where(func.find_in_set(ig, FrameworkNode.implementation_groups) > 0)
-    q = q.order_by(FrameworkNode.order_id)
-    rows = (await s.execute(q)).scalars().all()
-    return [FrameworkNodeBrief.model_validate(n) for n in rows]
+    rows = await paginate(s, q, _NODE_SORT, page, response)
+    if fields is None:
+        return [FrameworkNodeBrief.model_validate(n) for n in rows]
+    return partial_response([_NODE_PROJECTION.column_values(n, fields) for n in rows], response)
 
 
 # ===================================================
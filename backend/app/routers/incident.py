@@ -3,7 +3,7 @@ Incident registry module — /api/v1/incidents
 """
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -21,54 +21,65 @@ from app.schemas.incident import (
     IncidentStatusChange,
     IncidentUpdate,
 )
+from app.services.dictionary_cache import dict_cache
+from app.services.ndjson import ndjson_response, wants_ndjson
+from app.services.pagination import PageParams, SortSpec, page_params, paginate, sort_query
 
 router = APIRouter(prefix="/api/v1/incidents", tags=["Rejestr incydentów"])
 
 
 # ── helper ──
 
-async def _de_label(s: AsyncSession, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return e.label if e else None
+async def _inc_outs(s: AsyncSession, incidents: list[Incident]) -> list[IncidentOut]:
+    """Build IncidentOut for many incidents with a fixed number of IN-queries (no per-row lookups)."""
+    if not incidents:
+        return []
+    org_ids = {i.org_unit_id for i in incidents if i.org_unit_id}
+    orgs = dict((await s.execute(select(OrgUnit.id, OrgUnit.name).where(OrgUnit.id.in_(org_ids)))).all()) if org_ids else {}
+    asset_ids = {i.asset_id for i in incidents if i.asset_id}
+    assets = dict((await s.execute(select(Asset.id, Asset.name).where(Asset.id.in_(asset_ids)))).all()) if asset_ids else {}
+    labels = await dict_cache.labels(s, {
+        eid for i in incidents for eid in (i.category_id, i.severity_id, i.status_id, i.impact_id) if eid
+    })
+    return [
+        IncidentOut(
+            id=i.id,
+            ref_id=i.ref_id,
+            title=i.title,
+            description=i.description,
+            category_id=i.category_id,
+            category_name=labels.get(i.category_id),
+            severity_id=i.severity_id,
+            severity_name=labels.get(i.severity_id),
+            org_unit_id=i.org_unit_id,
+            org_unit_name=orgs.get(i.org_unit_id),
+            asset_id=i.asset_id,
+            asset_name=assets.get(i.asset_id),
+            reported_by=i.reported_by,
+            assigned_to=i.assigned_to,
+            status_id=i.status_id,
+            status_name=labels.get(i.status_id),
+            reported_at=i.reported_at,
+            detected_at=i.detected_at,
+            closed_at=i.closed_at,
+            ttr_minutes=i.ttr_minutes,
+            impact_id=i.impact_id,
+            impact_name=labels.get(i.impact_id),
+            personal_data_breach=i.personal_data_breach,
+            authority_notification=i.authority_notification,
+            actions_taken=i.actions_taken,
+            root_cause=i.root_cause,
+            lessons_learned=i.lessons_learned,
+            is_active=i.is_active,
+            created_at=i.created_at,
+            updated_at=i.updated_at,
+        )
+        for i in incidents
+    ]
 
 
 async def _inc_out(s: AsyncSession, i: Incident) -> IncidentOut:
-    org = await s.get(OrgUnit, i.org_unit_id) if i.org_unit_id else None
-    asset = await s.get(Asset, i.asset_id) if i.asset_id else None
-    return IncidentOut(
-        id=i.id,
-        ref_id=i.ref_id,
-        title=i.title,
-        description=i.description,
-        category_id=i.category_id,
-        category_name=await _de_label(s, i.category_id),
-        severity_id=i.severity_id,
-        severity_name=await _de_label(s, i.severity_id),
-        org_unit_id=i.org_unit_id,
-        org_unit_name=org.name if org else None,
-        asset_id=i.asset_id,
-        asset_name=asset.name if asset else None,
-        reported_by=i.reported_by,
-        assigned_to=i.assigned_to,
-        status_id=i.status_id,
-        status_name=await _de_label(s, i.status_id),
-        reported_at=i.reported_at,
-        detected_at=i.detected_at,
-        closed_at=i.closed_at,
-        ttr_minutes=i.ttr_minutes,
-        impact_id=i.impact_id,
-        impact_name=await _de_label(s, i.impact_id),
-        personal_data_breach=i.personal_data_breach,
-        authority_notification=i.authority_notification,
-        actions_taken=i.actions_taken,
-        root_cause=i.root_cause,
-        lessons_learned=i.lessons_learned,
-        is_active=i.is_active,
-        created_at=i.created_at,
-        updated_at=i.updated_at,
-    )
+    return (await _inc_outs(s, [i]))[0]
 
 
 # ═══════════════════ METRICS (before {id}) ═══════════════════
@@ -144,12 +155,25 @@ async def get_incident_metrics(s: AsyncSession = Depends(get_session)):
 
 # ═══════════════════ LIST ═══════════════════
 
+_INCIDENT_SORT = SortSpec({
+    "reported_at": Incident.reported_at,
+    "detected_at": Incident.detected_at,
+    "title": Incident.title,
+    "ref_id": Incident.ref_id,
+    "created_at": Incident.created_at,
+    "updated_at": Incident.updated_at,
+}, default="-reported_at", pk=Incident.id)
+
+
 @router.get("", response_model=list[IncidentOut], summary="Lista incydentów")
 async def list_incidents(
+    response: Response,
     org_unit_id: int | None = Query(None),
     severity_id: int | None = Query(None),
     status_id: int | None = Query(None),
     include_archived: bool = Query(False),
+    page: PageParams = Depends(page_params),
+    ndjson: bool = Depends(wants_ndjson),
     s: AsyncSession = Depends(get_session),
 ):
     q = select(Incident)
@@ -161,9 +185,10 @@ async def list_incidents(
         q = q.where(Incident.severity_id == severity_id)
     if status_id is not None:
         q = q.where(Incident.status_id == status_id)
-    q = q.order_by(Incident.reported_at.desc())
-    incidents = (await s.execute(q)).scalars().all()
-    return [await _inc_out(s, i) for i in incidents]
+    if ndjson:
+        return ndjson_response(sort_query(q, _INCIDENT_SORT, page.sort), _inc_outs)
+    incidents = await paginate(s, q, _INCIDENT_SORT, page, response)
+    return await _inc_outs(s, incidents)
 
 
 # ═══════════════════ GET ═══════════════════
@@ -50,6 +50,7 @@ from app.schemas.org_context import (
     OrgUnitContextOut,
     OrgUnitContextUpdate,
 )
+from app.services.dictionary_cache import dict_cache
 
 router = APIRouter(tags=["Kontekst organizacyjny"])
 
@@ -85,10 +86,7 @@ async def _get_ancestor_chain(s: AsyncSession, org_unit_id: int) -> list[int]:
 
 
 async def _get_dict_name(s: AsyncSession, dict_id: int | None) -> str | None:
-    if dict_id is None:
-        return None
-    entry = await s.get(DictionaryEntry, dict_id)
-    return entry.label if entry else None
+    return await dict_cache.label(s, dict_id)
 
 
 async def _get_unit_name(s: AsyncSession, uid: int) -> str | None:
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.database import get_session
+from app.middleware.conditional_get import etag_guard
 from app.models.org_unit import OrgLevel, OrgUnit
 from app.schemas.org_unit import (
     OrgLevelCreate,
@@ -92,7 +93,10 @@ async def list_units_flat(
     return [{"id": r.id, "name": r.name} for r in rows]
 
 
-@router.get("/api/v1/org-units/tree", response_model=list[OrgUnitTreeNode], summary="Drzewo jednostek")
+@router.get(
+    "/api/v1/org-units/tree", response_model=list[OrgUnitTreeNode], summary="Drzewo jednostek",
+    dependencies=[Depends(etag_guard({"org_units", "org_levels"}))],
+)
 async def get_tree(
     include_inactive: bool = Query(False),
     s: AsyncSession = Depends(get_session),
@@ -7,21 +7,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
 from app.models.policy import Policy, PolicyStandardMapping, PolicyAcknowledgment
-from app.models.dictionary import DictionaryEntry
 from app.schemas.policy import (
     PolicyAcknowledgmentCreate, PolicyAcknowledgmentOut,
     PolicyCreate, PolicyMappingCreate, PolicyMappingOut,
     PolicyOut, PolicyUpdate,
 )
+from app.services.dictionary_cache import dict_cache
 
 router = APIRouter(prefix="/api/v1/policies", tags=["Rejestr polityk"])
 
 
 async def _de_label(s: AsyncSession, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return e.label if e else None
+    return await dict_cache.label(s, entry_id)
 
 
 async def _policy_out(s: AsyncSession, p: Policy) -> PolicyOut:
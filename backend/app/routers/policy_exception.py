@@ -3,7 +3,7 @@ Policy exception registry module — /api/v1/exceptions
 """
 from datetime import date, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,15 +19,14 @@ from app.schemas.policy_exception import (
     PolicyExceptionCreate, PolicyExceptionOut,
     PolicyExceptionStatusChange, PolicyExceptionUpdate,
 )
+from app.services.dictionary_cache import dict_cache
+from app.services.pagination import PageParams, SortSpec, page_params, paginate
 
 router = APIRouter(prefix="/api/v1/exceptions", tags=["Rejestr wyjątków"])
 
 
 async def _de_label(s: AsyncSession, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return e.label if e else None
+    return await dict_cache.label(s, entry_id)
 
 
 async def _exc_out(s: AsyncSession, ex: PolicyException) -> PolicyExceptionOut:
@@ -64,12 +63,23 @@ async def _exc_out(s: AsyncSession, ex: PolicyException) -> PolicyExceptionOut:
 
 # ═══════════════════ LIST ═══════════════════
 
+_EXCEPTION_SORT = SortSpec({
+    "expiry_date": PolicyException.expiry_date,
+    "title": PolicyException.title,
+    "ref_id": PolicyException.ref_id,
+    "created_at": PolicyException.created_at,
+    "updated_at": PolicyException.updated_at,
+}, default="expiry_date", pk=PolicyException.id)
+
+
 @router.get("", response_model=list[PolicyExceptionOut], summary="Lista wyjątków")
 async def list_exceptions(
+    response: Response,
     org_unit_id: int | None = Query(None),
     status_id: int | None = Query(None),
     asset_id: int | None = Query(None),
     include_archived: bool = Query(False),
+    page: PageParams = Depends(page_params),
     s: AsyncSession = Depends(get_session),
 ):
     q = select(PolicyException)
@@ -81,8 +91,7 @@ async def list_exceptions(
         q = q.where(PolicyException.status_id == status_id)
     if asset_id is not None:
         q = q.where(PolicyException.asset_id == asset_id)
-    q = q.order_by(PolicyException.expiry_date)
-    excs = (await s.execute(q)).scalars().all()
+    excs = await paginate(s, q, _EXCEPTION_SORT, page, response)
     return [await _exc_out(s, ex) for ex in excs]
 
 
@@ -1,19 +1,19 @@
 """
 Report generation — /api/v1/reports
 Generates Excel reports for risks, assets, assessments, and executive summary.
+The workbook builders are also registered as background export jobs (/api/v1/exports).
 """
-import io
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse, StreamingResponse
-from sqlalchemy import case, func, select
+from fastapi.responses import JSONResponse
+from openpyxl.styles import Font
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
 from app.models.asset import Asset, AssetRelationship
 from app.models.asset_category import AssetCategory
-from app.models.dictionary import DictionaryEntry
 from app.models.framework import Assessment, Framework
 from app.models.incident import Incident
 from app.models.org_unit import OrgUnit
@@ -21,197 +21,163 @@ from app.models.risk import Risk
 from app.models.security_area import SecurityDomain
 from app.models.vendor import Vendor
 from app.models.vulnerability import VulnerabilityRecord
+from app.models.dictionary import DictionaryEntry
+from app.services.dictionary_cache import dict_cache
+from app.services.export_jobs import register_export
+from app.services.xlsx_export import STREAM_BATCH, SheetWriter, cell, new_workbook, xlsx_response
 
 router = APIRouter(prefix="/api/v1/reports", tags=["Raporty"])
 
+_DICT_TABLE = DictionaryEntry.__tablename__
 
-def _wb():
-    """Create openpyxl workbook (lazy import)."""
-    try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-        return Workbook(), Font, PatternFill, Alignment, Border, Side
-    except ImportError:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-        return Workbook(), Font, PatternFill, Alignment, Border, Side
-
-
-def _styled_header(ws, row, headers, Font, PatternFill, Alignment, Border, Side):
-    """Apply styled headers to a worksheet row."""
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    header_fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
-    header_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    thin_border = Border(
-        left=Side(style="thin"), right=Side(style="thin"),
-        top=Side(style="thin"), bottom=Side(style="thin"),
-    )
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_align
-        cell.border = thin_border
-    return thin_border
-
-
-def _stream_xlsx(wb) -> StreamingResponse:
-    """Stream workbook as xlsx download."""
-    buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=raport_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"},
-    )
 
+async def _names(s: AsyncSession, model) -> dict[int, str]:
+    """{id: name} of a small lookup table, read once per report."""
+    return dict((await s.execute(select(model.id, model.name))).all())
 
-async def _de_label(s: AsyncSession, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return e.label if e else None
 
+def _iso(d) -> str:
+    return d.isoformat() if d else ""
 
-# ═══════════════════ RISK REPORT ═══════════════════
 
-@router.get("/risks", summary="Raport ryzyk (Excel)")
-async def report_risks(
-    org_unit_id: int | None = Query(None),
-    s: AsyncSession = Depends(get_session),
-):
-    wb, Font, PatternFill, Alignment, Border, Side = _wb()
-    ws = wb.active
-    ws.title = "Rejestr Ryzyk"
-
-    headers = [
-        "ID", "Aktywo", "Jednostka org.", "Domena bezp.", "Kategoria ryzyka",
-        "Wplyw (W)", "Prawdop. (P)", "Zabezp. (Z)", "Ocena ryzyka (R)", "Poziom",
-        "Status", "Strategia", "Wlasciciel", "Termin realizacji",
-        "Ryzyko rezydualne", "Zaakceptowal", "Data akceptacji",
-    ]
-    border = _styled_header(ws, 1, headers, Font, PatternFill, Alignment, Border, Side)
+# ═══════════════════ RISK REPORT ═══════════════════
 
-    q = select(Risk).where(Risk.is_active.is_(True))
+_RISK_HEADERS = [
+    "ID", "Aktywo", "Jednostka org.", "Domena bezp.", "Kategoria ryzyka",
+    "Wplyw (W)", "Prawdop. (P)", "Zabezp. (Z)", "Ocena ryzyka (R)", "Poziom",
+    "Status", "Strategia", "Wlasciciel", "Termin realizacji",
+    "Ryzyko rezydualne", "Zaakceptowal", "Data akceptacji",
+]
+
+
+@register_export(
+    "risks", params=("org_unit_id",),
+    tables={Risk.__tablename__, OrgUnit.__tablename__, SecurityDomain.__tablename__, _DICT_TABLE},
+)
+async def _risks_workbook(s: AsyncSession, org_unit_id: int | None = None):
+    # Lookups first — no other statements may run while the cursor is open
+    orgs = await _names(s, OrgUnit)
+    domains = await _names(s, SecurityDomain)
+    labels = await dict_cache.label_map(s)
+
+    wb = new_workbook()
+    sheet = SheetWriter(wb, "Rejestr Ryzyk", _RISK_HEADERS)
+
+    q = select(
+        Risk.id, Risk.asset_name, Risk.org_unit_id, Risk.security_area_id, Risk.risk_category_id,
+        Risk.impact_level, Risk.probability_level, Risk.safeguard_rating, Risk.risk_score,
+        Risk.risk_level, Risk.status_id, Risk.strategy_id, Risk.owner, Risk.treatment_deadline,
+        Risk.residual_risk, Risk.accepted_by, Risk.accepted_at,
+    ).where(Risk.is_active.is_(True))
     if org_unit_id:
         q = q.where(Risk.org_unit_id == org_unit_id)
-    q = q.order_by(Risk.risk_score.desc())
-    risks = (await s.execute(q)).scalars().all()
-
-    for row_idx, r in enumerate(risks, 2):
-        org = await s.get(OrgUnit, r.org_unit_id) if r.org_unit_id else None
-        area = await s.get(SecurityDomain, r.security_area_id) if r.security_area_id else None
-        values = [
-            f"R-{r.id}", r.asset_name, org.name if org else "",
-            area.name if area else "", await _de_label(s, r.risk_category_id),
+    q = q.order_by(Risk.risk_score.desc(), Risk.id)
+
+    result = await s.stream(q.execution_options(yield_per=STREAM_BATCH))
+    async for batch in result.partitions():
+        await sheet.extend([
+            f"R-{r.id}", r.asset_name, orgs.get(r.org_unit_id, ""),
+            domains.get(r.security_area_id, ""), labels.get(r.risk_category_id),
             r.impact_level, r.probability_level, float(r.safeguard_rating),
             float(r.risk_score) if r.risk_score else 0, r.risk_level,
-            await _de_label(s, r.status_id), await _de_label(s, r.strategy_id),
-            r.owner, r.treatment_deadline.isoformat() if r.treatment_deadline else "",
+            labels.get(r.status_id), labels.get(r.strategy_id),
+            r.owner, _iso(r.treatment_deadline),
             float(r.residual_risk) if r.residual_risk else "", r.accepted_by or "",
-            r.accepted_at.isoformat() if r.accepted_at else "",
-        ]
-        for col_idx, val in enumerate(values, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=val)
-            cell.border = border
-
-    # Auto-width
-    for col in ws.columns:
-        max_len = max(len(str(c.value or "")) for c in col)
-        ws.column_dimensions[col[0].column_letter].width = min(max_len + 3, 40)
+            _iso(r.accepted_at),
+        ] for r in batch)
+    sheet.close()
+    return wb
 
-    return _stream_xlsx(wb)
 
-
-# ═══════════════════ ASSET REPORT ═══════════════════
-
-@router.get("/assets", summary="Raport aktywow (Excel)")
-async def report_assets(
-    asset_category_id: int | None = Query(None),
+@router.get("/risks", summary="Raport ryzyk (Excel)")
+async def report_risks(
     org_unit_id: int | None = Query(None),
     s: AsyncSession = Depends(get_session),
 ):
-    wb, Font, PatternFill, Alignment, Border, Side = _wb()
-    ws = wb.active
-    ws.title = "Rejestr Aktywow"
-
-    headers = [
-        "ID", "Ref", "Nazwa", "Kategoria CMDB", "Jednostka org.",
-        "Wlasciciel", "Lokalizacja", "Wrazliwosc", "Krytycznosc",
-        "Ilosc ryzyk", "Utworzono",
-    ]
-    border = _styled_header(ws, 1, headers, Font, PatternFill, Alignment, Border, Side)
+    return await xlsx_response(await _risks_workbook(s, org_unit_id))
+
 
-    q = select(Asset).where(Asset.is_active.is_(True))
+# ═══════════════════ ASSET REPORT ═══════════════════
+
+_ASSET_HEADERS = [
+    "ID", "Ref", "Nazwa", "Kategoria CMDB", "Jednostka org.",
+    "Wlasciciel", "Lokalizacja", "Wrazliwosc", "Krytycznosc",
+    "Ilosc ryzyk", "Utworzono",
+]
+
+
+@register_export(
+    "assets", params=("asset_category_id", "org_unit_id"),
+    tables={Asset.__tablename__, Risk.__tablename__, OrgUnit.__tablename__,
+            AssetCategory.__tablename__, _DICT_TABLE},
+)
+async def _assets_workbook(s: AsyncSession, asset_category_id: int | None = None, org_unit_id: int | None = None):
+    orgs = await _names(s, OrgUnit)
+    categories = await _names(s, AssetCategory)
+    labels = await dict_cache.label_map(s)
+    risk_counts = dict((await s.execute(
+        select(Risk.asset_id, func.count()).where(Risk.asset_id.isnot(None)).group_by(Risk.asset_id)
+    )).all())
+
+    wb = new_workbook()
+    sheet = SheetWriter(wb, "Rejestr Aktywow", _ASSET_HEADERS)
+
+    q = select(
+        Asset.id, Asset.ref_id, Asset.name, Asset.asset_category_id, Asset.org_unit_id,
+        Asset.owner, Asset.location, Asset.sensitivity_id, Asset.criticality_id, Asset.created_at,
+    ).where(Asset.is_active.is_(True))
     if asset_category_id:
         q = q.where(Asset.asset_category_id == asset_category_id)
     if org_unit_id:
         q = q.where(Asset.org_unit_id == org_unit_id)
-    q = q.order_by(Asset.name)
-    assets = (await s.execute(q)).scalars().all()
-
-    for row_idx, a in enumerate(assets, 2):
-        org = await s.get(OrgUnit, a.org_unit_id) if a.org_unit_id else None
-        cat = await s.get(AssetCategory, a.asset_category_id) if a.asset_category_id else None
-        rc_q = select(func.count()).select_from(Risk).where(Risk.asset_id == a.id)
-        rc = (await s.execute(rc_q)).scalar() or 0
-        values = [
+    q = q.order_by(Asset.name, Asset.id)
+
+    result = await s.stream(q.execution_options(yield_per=STREAM_BATCH))
+    async for batch in result.partitions():
+        await sheet.extend([
             a.id, a.ref_id or "", a.name,
-            cat.name if cat else "", org.name if org else "",
+            categories.get(a.asset_category_id, ""), orgs.get(a.org_unit_id, ""),
             a.owner or "", a.location or "",
-            await _de_label(s, a.sensitivity_id), await _de_label(s, a.criticality_id),
-            rc, a.created_at.strftime("%Y-%m-%d"),
-        ]
-        for col_idx, val in enumerate(values, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=val)
-            cell.border = border
-
-    for col in ws.columns:
-        max_len = max(len(str(c.value or "")) for c in col)
-        ws.column_dimensions[col[0].column_letter].width = min(max_len + 3, 40)
-
-    return _stream_xlsx(wb)
+            labels.get(a.sensitivity_id), labels.get(a.criticality_id),
+            risk_counts.get(a.id, 0), a.created_at.strftime("%Y-%m-%d"),
+        ] for a in batch)
+    sheet.close()
+    return wb
 
 
-# ═══════════════════ EXECUTIVE REPORT ═══════════════════
-
-@router.get("/executive", summary="Raport Executive Summary (Excel)")
-async def report_executive(
+@router.get("/assets", summary="Raport aktywow (Excel)")
+async def report_assets(
+    asset_category_id: int | None = Query(None),
     org_unit_id: int | None = Query(None),
     s: AsyncSession = Depends(get_session),
 ):
-    wb, Font, PatternFill, Alignment, Border, Side = _wb()
+    return await xlsx_response(await _assets_workbook(s, asset_category_id, org_unit_id))
 
-    # Resolve org unit name for header
-    org_unit_name = None
-    if org_unit_id:
-        ou = await s.get(OrgUnit, org_unit_id)
-        org_unit_name = ou.name if ou else None
 
-    # Sheet 1: Summary
-    ws1 = wb.active
-    ws1.title = "Podsumowanie"
-    title_font = Font(bold=True, size=14, color="1F4E79")
-    title_text = "SecurePosture — Raport Executive Summary"
-    if org_unit_name:
-        title_text += f" — {org_unit_name}"
-    ws1.cell(row=1, column=1, value=title_text).font = title_font
-    ws1.cell(row=2, column=1, value=f"Data generacji: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+# ═══════════════════ EXECUTIVE REPORT ═══════════════════
 
-    # KPIs
-    ws1.cell(row=4, column=1, value="Kluczowe wskazniki (KPI)").font = Font(bold=True, size=12)
+@register_export(
+    "executive", params=("org_unit_id",),
+    tables={Risk.__tablename__, Asset.__tablename__, VulnerabilityRecord.__tablename__,
+            Incident.__tablename__, AssetCategory.__tablename__, OrgUnit.__tablename__,
+            SecurityDomain.__tablename__, _DICT_TABLE},
+)
+async def _executive_workbook(s: AsyncSession, org_unit_id: int | None = None):
+    orgs = await _names(s, OrgUnit)
+    domains = await _names(s, SecurityDomain)
+    labels = await dict_cache.label_map(s)
+    org_unit_name = orgs.get(org_unit_id) if org_unit_id else None
 
     # Risk base filter
     risk_base = [Risk.is_active.is_(True)]
     if org_unit_id:
         risk_base.append(Risk.org_unit_id == org_unit_id)
 
-    # Risk counts
-    total_risks = (await s.execute(select(func.count()).select_from(Risk).where(*risk_base))).scalar() or 0
-    high_risks = (await s.execute(select(func.count()).select_from(Risk).where(*risk_base, Risk.risk_level == "high"))).scalar() or 0
-    medium_risks = (await s.execute(select(func.count()).select_from(Risk).where(*risk_base, Risk.risk_level == "medium"))).scalar() or 0
-    low_risks = (await s.execute(select(func.count()).select_from(Risk).where(*risk_base, Risk.risk_level == "low"))).scalar() or 0
+    # Risk counts — one pass
+    level_counts = dict((await s.execute(
+        select(Risk.risk_level, func.count()).where(*risk_base).group_by(Risk.risk_level)
+    )).all())
+    total_risks = sum(level_counts.values())
 
     # Asset base filter
     asset_base = [Asset.is_active.is_(True)]
@@ -235,43 +201,13 @@ async def report_executive(
         inc_base.append(Incident.org_unit_id == org_unit_id)
     open_incidents = (await s.execute(select(func.count()).select_from(Incident).where(*inc_base))).scalar() or 0
 
-    kpis = [
-        ("Ryzyka ogolnie", total_risks),
-        ("Ryzyka wysokie", high_risks),
-        ("Ryzyka srednie", medium_risks),
-        ("Ryzyka niskie", low_risks),
-        ("Aktywow ogolnie", total_assets),
-        ("Aktywa z ryzykami", assets_with_risks),
-        ("Otwarte podatnosci", open_vulns),
-        ("Otwarte incydenty", open_incidents),
-    ]
-    for idx, (label, val) in enumerate(kpis):
-        ws1.cell(row=6 + idx, column=1, value=label)
-        ws1.cell(row=6 + idx, column=2, value=val).font = Font(bold=True)
+    top_q = (
+        select(Risk.id, Risk.asset_name, Risk.org_unit_id, Risk.security_area_id,
+               Risk.risk_score, Risk.risk_level, Risk.status_id, Risk.owner)
+        .where(*risk_base).order_by(Risk.risk_score.desc(), Risk.id).limit(20)
+    )
+    top_risks = (await s.execute(top_q)).all()
 
-    # Sheet 2: Risk summary
-    ws2 = wb.create_sheet("Ryzyka - Top 20")
-    headers = ["ID", "Aktywo", "Jednostka", "Domena", "Ocena (R)", "Poziom", "Status", "Wlasciciel"]
-    border = _styled_header(ws2, 1, headers, Font, PatternFill, Alignment, Border, Side)
-    top_q = select(Risk).where(*risk_base).order_by(Risk.risk_score.desc()).limit(20)
-    top_risks = (await s.execute(top_q)).scalars().all()
-    for i, r in enumerate(top_risks, 2):
-        org = await s.get(OrgUnit, r.org_unit_id) if r.org_unit_id else None
-        area = await s.get(SecurityDomain, r.security_area_id) if r.security_area_id else None
-        vals = [f"R-{r.id}", r.asset_name, org.name if org else "", area.name if area else "",
-                float(r.risk_score) if r.risk_score else 0, r.risk_level,
-                await _de_label(s, r.status_id), r.owner or ""]
-        for c, v in enumerate(vals, 1):
-            ws2.cell(row=i, column=c, value=v).border = border
-
-    for col in ws2.columns:
-        max_len = max(len(str(c.value or "")) for c in col)
-        ws2.column_dimensions[col[0].column_letter].width = min(max_len + 3, 40)
-
-    # Sheet 3: Assets overview
-    ws3 = wb.create_sheet("Aktywa - Przeglad")
-    headers3 = ["Kategoria CMDB", "Ilosc aktywow"]
-    _styled_header(ws3, 1, headers3, Font, PatternFill, Alignment, Border, Side)
     cat_q = (
         select(AssetCategory.name, func.count(Asset.id))
         .join(Asset, Asset.asset_category_id == AssetCategory.id, isouter=True)
@@ -281,11 +217,61 @@ async def report_executive(
         cat_q = cat_q.where(Asset.org_unit_id == org_unit_id)
     cat_q = cat_q.group_by(AssetCategory.id, AssetCategory.name).order_by(func.count(Asset.id).desc())
     cat_rows = (await s.execute(cat_q)).all()
-    for i, (name, count) in enumerate(cat_rows, 2):
-        ws3.cell(row=i, column=1, value=name)
-        ws3.cell(row=i, column=2, value=count)
 
-    return _stream_xlsx(wb)
+    wb = new_workbook()
+
+    # Sheet 1: Summary
+    ws1 = wb.create_sheet("Podsumowanie")
+    title_text = "SecurePosture — Raport Executive Summary"
+    if org_unit_name:
+        title_text += f" — {org_unit_name}"
+    ws1.append([cell(ws1, title_text, font=Font(bold=True, size=14, color="1F4E79"))])
+    ws1.append([f"Data generacji: {datetime.now().strftime('%Y-%m-%d %H:%M')}"])
+    ws1.append([])
+    ws1.append([cell(ws1, "Kluczowe wskazniki (KPI)", font=Font(bold=True, size=12))])
+    ws1.append([])
+
+    kpis = [
+        ("Ryzyka ogolnie", total_risks),
+        ("Ryzyka wysokie", level_counts.get("high", 0)),
+        ("Ryzyka srednie", level_counts.get("medium", 0)),
+        ("Ryzyka niskie", level_counts.get("low", 0)),
+        ("Aktywow ogolnie", total_assets),
+        ("Aktywa z ryzykami", assets_with_risks),
+        ("Otwarte podatnosci", open_vulns),
+        ("Otwarte incydenty", open_incidents),
+    ]
+    bold = Font(bold=True)
+    for label, val in kpis:
+        ws1.append([label, cell(ws1, val, font=bold)])
+
+    # Sheet 2: Risk summary
+    sheet2 = SheetWriter(
+        wb, "Ryzyka - Top 20",
+        ["ID", "Aktywo", "Jednostka", "Domena", "Ocena (R)", "Poziom", "Status", "Wlasciciel"],
+    )
+    for r in top_risks:
+        sheet2.append([
+            f"R-{r.id}", r.asset_name, orgs.get(r.org_unit_id, ""), domains.get(r.security_area_id, ""),
+            float(r.risk_score) if r.risk_score else 0, r.risk_level,
+            labels.get(r.status_id), r.owner or "",
+        ])
+    sheet2.close()
+
+    # Sheet 3: Assets overview (header only styled, as before)
+    sheet3 = SheetWriter(wb, "Aktywa - Przeglad", ["Kategoria CMDB", "Ilosc aktywow"], border=False)
+    for name, count in cat_rows:
+        sheet3.append([name, count])
+    sheet3.close()
+    return wb
+
+
+@router.get("/executive", summary="Raport Executive Summary (Excel)")
+async def report_executive(
+    org_unit_id: int | None = Query(None),
+    s: AsyncSession = Depends(get_session),
+):
+    return await xlsx_response(await _executive_workbook(s, org_unit_id))
 
 
 # ═══════════════════ AI MANAGEMENT REPORT ═══════════════════
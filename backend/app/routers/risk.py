@@ -9,7 +9,7 @@ Residual R = EXP(target_W) x target_P / target_Z
 import math
 from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import case, delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
@@ -26,142 +26,152 @@ from app.schemas.risk import (
     LinkedActionRef, RiskAcceptRequest, RiskCreate, RiskOut,
     RiskThreatRef, RiskVulnerabilityRef, RiskSafeguardRef, RiskUpdate,
 )
+from app.services.dictionary_cache import dict_cache
+from app.services.ndjson import ndjson_response, wants_ndjson
+from app.services.pagination import PageParams, SortSpec, page_params, paginate, sort_query
+from app.services.projection import Projection, fields_param, partial_response, wants
 
 router = APIRouter(prefix="/api/v1/risks", tags=["Analiza ryzyka"])
 
 
-# -- helper: build full RiskOut from row --
+# -- helper: build full RiskOut from rows --
 
-async def _risk_out(s: AsyncSession, risk: Risk) -> RiskOut:
-    """Load all joined names for a single Risk entity."""
-    async def _de_label(entry_id: int | None) -> str | None:
-        if entry_id is None:
-            return None
-        e = await s.get(DictionaryEntry, entry_id)
-        return e.label if e else None
-
-    org = await s.get(OrgUnit, risk.org_unit_id)
-    asset = await s.get(Asset, risk.asset_id) if risk.asset_id else None
-    area = await s.get(SecurityArea, risk.security_area_id) if risk.security_area_id else None
-
-    # threats (M2M) — from smart catalog
-    th_q = (
-        select(RiskThreat.threat_id, ThreatCatalog.name)
-        .join(ThreatCatalog, RiskThreat.threat_id == ThreatCatalog.id)
-        .where(RiskThreat.risk_id == risk.id)
-    )
-    th_rows = (await s.execute(th_q)).all()
+_IN_BATCH = 1000  # ids per IN (...) list
 
-    # vulnerabilities (M2M) — from smart catalog (weakness_catalog)
-    vl_q = (
-        select(RiskVulnerability.vulnerability_id, WeaknessCatalog.name)
-        .join(WeaknessCatalog, RiskVulnerability.vulnerability_id == WeaknessCatalog.id)
-        .where(RiskVulnerability.risk_id == risk.id)
-    )
-    vl_rows = (await s.execute(vl_q)).all()
 
-    # safeguards (M2M) — from smart catalog (control_catalog)
-    sg_q = (
-        select(RiskSafeguard.safeguard_id, ControlCatalog.name)
-        .join(ControlCatalog, RiskSafeguard.safeguard_id == ControlCatalog.id)
-        .where(RiskSafeguard.risk_id == risk.id)
-    )
-    sg_rows = (await s.execute(sg_q)).all()
-
-    return RiskOut(
-        id=risk.id,
-        # Kontekst
-        org_unit_id=risk.org_unit_id,
-        org_unit_name=org.name if org else None,
-        risk_category_id=risk.risk_category_id,
-        risk_category_name=await _de_label(risk.risk_category_id),
-        risk_source=risk.risk_source,
-        identification_source_id=risk.identification_source_id,
-        identification_source_name=await _de_label(risk.identification_source_id),
-        # Identyfikacja
-        asset_id=risk.asset_id,
-        asset_id_name=asset.name if asset else None,
-        asset_category_id=risk.asset_category_id,
-        asset_category_name=await _de_label(risk.asset_category_id),
-        asset_name=risk.asset_name,
-        sensitivity_id=risk.sensitivity_id,
-        sensitivity_name=await _de_label(risk.sensitivity_id),
-        criticality_id=risk.criticality_id,
-        criticality_name=await _de_label(risk.criticality_id),
-        security_area_id=risk.security_area_id,
-        security_area_name=area.name if area else None,
-        existing_controls=risk.existing_controls,
-        consequence_description=risk.consequence_description,
-        # Analiza
-        impact_level=risk.impact_level,
-        probability_level=risk.probability_level,
-        safeguard_rating=float(risk.safeguard_rating),
-        risk_score=float(risk.risk_score) if risk.risk_score is not None else None,
-        risk_level=risk.risk_level,
-        # Postepowanie
-        status_id=risk.status_id,
-        status_name=await _de_label(risk.status_id),
-        strategy_id=risk.strategy_id,
-        strategy_name=await _de_label(risk.strategy_id),
-        owner=risk.owner,
-        planned_actions=risk.planned_actions,
-        treatment_plan=risk.treatment_plan,
-        planned_safeguard_id=risk.planned_safeguard_id,
-        planned_safeguard_name=(await s.get(ControlCatalog, risk.planned_safeguard_id)).name if risk.planned_safeguard_id else None,
-        treatment_deadline=risk.treatment_deadline,
-        treatment_resources=risk.treatment_resources,
-        residual_risk=float(risk.residual_risk) if risk.residual_risk is not None else None,
-        target_impact=risk.target_impact,
-        target_probability=risk.target_probability,
-        target_safeguard=float(risk.target_safeguard) if risk.target_safeguard is not None else None,
-        # Akceptacja
-        accepted_by=risk.accepted_by,
-        accepted_at=risk.accepted_at,
-        acceptance_justification=risk.acceptance_justification,
-        # Monitorowanie
-        next_review_date=risk.next_review_date,
-        identified_at=risk.identified_at,
-        last_review_at=risk.last_review_at,
-        is_active=risk.is_active,
-        created_at=risk.created_at,
-        updated_at=risk.updated_at,
-        threats=[RiskThreatRef(threat_id=tid, threat_name=tn) for tid, tn in th_rows],
-        vulnerabilities=[RiskVulnerabilityRef(vulnerability_id=vid, vulnerability_name=vn) for vid, vn in vl_rows],
-        safeguards=[RiskSafeguardRef(safeguard_id=sid, safeguard_name=sn) for sid, sn in sg_rows],
-        linked_actions=await _get_linked_actions(s, risk.id),
-    )
+def _batches(ids: set[int]) -> list[list[int]]:
+    ordered = sorted(ids)
+    return [ordered[i:i + _IN_BATCH] for i in range(0, len(ordered), _IN_BATCH)]
 
 
-async def _get_linked_actions(s: AsyncSession, risk_id: int) -> list[LinkedActionRef]:
-    """Get actions linked to this risk via action_links table."""
-    q = (
-        select(
-            Action.id,
-            Action.title,
-            Action.owner,
-            Action.due_date,
-            DictionaryEntry.label.label("status_name"),
+async def _names_by_id(s: AsyncSession, model, ids: set[int]) -> dict[int, str]:
+    out: dict[int, str] = {}
+    for chunk in _batches(ids):
+        rows = (await s.execute(select(model.id, model.name).where(model.id.in_(chunk)))).all()
+        out.update({rid: name for rid, name in rows})
+    return out
+
+
+async def _m2m_by_risk(s: AsyncSession, link, fk_col, catalog, risk_ids: set[int]) -> dict[int, list[tuple[int, str]]]:
+    """{risk_id: [(catalog_id, name), ...]} for one M2M link table."""
+    out: dict[int, list[tuple[int, str]]] = {}
+    for chunk in _batches(risk_ids):
+        q = (
+            select(link.risk_id, fk_col, catalog.name)
+            .join(catalog, fk_col == catalog.id)
+            .where(link.risk_id.in_(chunk))
         )
-        .join(ActionLink, ActionLink.action_id == Action.id)
-        .join(DictionaryEntry, Action.status_id == DictionaryEntry.id, isouter=True)
-        .where(ActionLink.entity_type == "risk")
-        .where(ActionLink.entity_id == risk_id)
-        .where(Action.is_active.is_(True))
-        .order_by(case((Action.due_date.is_(None), 1), else_=0), Action.due_date.asc())
-    )
-    rows = (await s.execute(q)).all()
+        for risk_id, cid, name in (await s.execute(q)).all():
+            out.setdefault(risk_id, []).append((cid, name))
+    return out
+
+
+# RiskOut fields resolved from other tables -> Risk column they are keyed by
+_RISK_NAMES = {
+    "org_unit_name": ("org_unit_id", OrgUnit),
+    "asset_id_name": ("asset_id", Asset),
+    "security_area_name": ("security_area_id", SecurityArea),
+    "planned_safeguard_name": ("planned_safeguard_id", ControlCatalog),
+}
+_RISK_LABELS = {
+    "risk_category_name": "risk_category_id",
+    "identification_source_name": "identification_source_id",
+    "asset_category_name": "asset_category_id",
+    "sensitivity_name": "sensitivity_id",
+    "criticality_name": "criticality_id",
+    "status_name": "status_id",
+    "strategy_name": "strategy_id",
+}
+# M2M — from smart catalog (threat / weakness / control catalog)
+_RISK_M2M = {
+    "threats": (RiskThreat, RiskThreat.threat_id, ThreatCatalog, RiskThreatRef, "threat"),
+    "vulnerabilities": (RiskVulnerability, RiskVulnerability.vulnerability_id, WeaknessCatalog,
+                        RiskVulnerabilityRef, "vulnerability"),
+    "safeguards": (RiskSafeguard, RiskSafeguard.safeguard_id, ControlCatalog, RiskSafeguardRef, "safeguard"),
+}
+_RISK_PROJECTION = Projection(RiskOut, Risk, derived={
+    **{f: (fk,) for f, (fk, _) in _RISK_NAMES.items()},
+    **{f: (fk,) for f, fk in _RISK_LABELS.items()},
+    **{f: () for f in (*_RISK_M2M, "linked_actions")},
+})
+
+
+async def _risk_outs(s: AsyncSession, risks: list[Risk], fields: set[str] | None = None) -> list:
+    """Build RiskOut for many risks with a fixed number of IN-queries (no per-row lookups).
+
+    With ``fields`` only those keys are built (as dicts) and only the lookups
+    they need are run.
+    """
+    if not risks:
+        return []
+    risk_ids = {r.id for r in risks}
+    rows = [_RISK_PROJECTION.column_values(r, fields) for r in risks]
+
+    for field, (fk, model) in _RISK_NAMES.items():
+        if wants(fields, field):
+            names = await _names_by_id(s, model, {getattr(r, fk) for r in risks if getattr(r, fk)})
+            for row, r in zip(rows, risks):
+                row[field] = names.get(getattr(r, fk))
+
+    label_fields = [f for f in _RISK_LABELS if wants(fields, f)]
+    if label_fields:
+        labels = await dict_cache.labels(s, {
+            getattr(r, _RISK_LABELS[f]) for r in risks for f in label_fields if getattr(r, _RISK_LABELS[f])
+        })
+        for row, r in zip(rows, risks):
+            for f in label_fields:
+                row[f] = labels.get(getattr(r, _RISK_LABELS[f]))
+
+    for field, (link, fk_col, catalog, ref, prefix) in _RISK_M2M.items():
+        if wants(fields, field):
+            by_risk = await _m2m_by_risk(s, link, fk_col, catalog, risk_ids)
+            for row, r in zip(rows, risks):
+                row[field] = [ref(**{f"{prefix}_id": cid, f"{prefix}_name": name}) for cid, name in by_risk.get(r.id, [])]
+
+    if wants(fields, "linked_actions"):
+        actions = await _linked_actions_by_risk(s, risk_ids)
+        for row, r in zip(rows, risks):
+            row["linked_actions"] = actions.get(r.id, [])
+
+    return [RiskOut(**row) for row in rows] if fields is None else rows
+
+
+async def _risk_out(s: AsyncSession, risk: Risk) -> RiskOut:
+    """Load all joined names for a single Risk entity."""
+    return (await _risk_outs(s, [risk]))[0]
+
+
+async def _linked_actions_by_risk(s: AsyncSession, risk_ids: set[int]) -> dict[int, list[LinkedActionRef]]:
+    """Get actions linked to the risks via action_links table, grouped by risk id."""
     now = datetime.utcnow()
-    return [
-        LinkedActionRef(
-            action_id=r.id,
-            title=r.title,
-            status_name=r.status_name,
-            owner=r.owner,
-            due_date=r.due_date,
-            is_overdue=r.due_date is not None and r.due_date < now,
+    out: dict[int, list[LinkedActionRef]] = {}
+    for chunk in _batches(risk_ids):
+        q = (
+            select(
+                ActionLink.entity_id,
+                Action.id,
+                Action.title,
+                Action.owner,
+                Action.due_date,
+                DictionaryEntry.label.label("status_name"),
+            )
+            .join(ActionLink, ActionLink.action_id == Action.id)
+            .join(DictionaryEntry, Action.status_id == DictionaryEntry.id, isouter=True)
+            .where(ActionLink.entity_type == "risk")
+            .where(ActionLink.entity_id.in_(chunk))
+            .where(Action.is_active.is_(True))
+            .order_by(case((Action.due_date.is_(None), 1), else_=0), Action.due_date.asc())
         )
-        for r in rows
-    ]
+        for r in (await s.execute(q)).all():
+            out.setdefault(r.entity_id, []).append(LinkedActionRef(
+                action_id=r.id,
+                title=r.title,
+                status_name=r.status_name,
+                owner=r.owner,
+                due_date=r.due_date,
+                is_overdue=r.due_date is not None and r.due_date < now,
+            ))
+    return out
 
 
 def _calc_residual(tw: int | None, tp: int | None, tz: float | None) -> float | None:
@@ -191,17 +201,33 @@ async def _sync_safeguards(s: AsyncSession, risk_id: int, safeguard_ids: list[in
 
 # =================== LIST ===================
 
+_RISK_SORT = SortSpec({
+    "risk_score": Risk.risk_score,
+    "asset_name": Risk.asset_name,
+    "next_review_date": Risk.next_review_date,
+    "created_at": Risk.created_at,
+    "updated_at": Risk.updated_at,
+}, default="-risk_score", pk=Risk.id)
+
+
 @router.get("", response_model=list[RiskOut], summary="Lista ryzyk z filtrami")
 async def list_risks(
+    response: Response,
     org_unit_id: int | None = Query(None),
     security_area_id: int | None = Query(None),
     status_id: int | None = Query(None),
     risk_level: str | None = Query(None, description="high / medium / low"),
     risk_category_id: int | None = Query(None),
     include_archived: bool = Query(False),
+    page: PageParams = Depends(page_params),
+    fields: set[str] | None = Depends(fields_param),
+    ndjson: bool = Depends(wants_ndjson),
     s: AsyncSession = Depends(get_session),
 ):
+    fields = _RISK_PROJECTION.resolve(fields)
     q = select(Risk)
+    if fields is not None:
+        q = q.options(_RISK_PROJECTION.load_only(fields))
     if not include_archived:
         q = q.where(Risk.is_active.is_(True))
     if org_unit_id is not None:
@@ -214,9 +240,12 @@ async def list_risks(
         q = q.where(Risk.risk_level == risk_level)
     if risk_category_id is not None:
         q = q.where(Risk.risk_category_id == risk_category_id)
-    q = q.order_by(Risk.risk_score.desc())
-    risks = (await s.execute(q)).scalars().all()
-    return [await _risk_out(s, r) for r in risks]
+    if ndjson:
+        return ndjson_response(sort_query(q, _RISK_SORT, page.sort), lambda bs, batch: _risk_outs(bs, batch, fields))
+    risks = await paginate(s, q, _RISK_SORT, page, response)
+    if fields is None:
+        return await _risk_outs(s, risks)
+    return partial_response(await _risk_outs(s, risks, fields), response)
 
 
 # =================== GET ===================
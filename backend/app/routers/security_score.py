@@ -3,17 +3,22 @@ Security Score module — /api/v1/security-score
 """
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
-from app.models.security_score import SecurityScoreConfig, SecurityScoreSnapshot
+from app.models.security_score import SecurityScoreConfig
 from app.schemas.security_score import (
     ConfigOut, ConfigUpdate, MethodologyOut, MethodologyPillar,
-    PillarDetail, SecurityScoreOut, SnapshotOut,
+    OrgScoreTreeOut, PillarDetail, ReconcileOut, SecurityScoreOut, SnapshotOut,
+    WhatIfOut, WhatIfRequest,
 )
 from app.services.score_engine import calculate_all_pillars, get_active_config
+from app.services.score_history import get_history as history_points, take_snapshot
+from app.services.score_org import get_org_scores
+from app.services.score_state import last_reconcile_report, reconcile_score_state
+from app.services.score_whatif import expand_grid, simulate
 
 router = APIRouter(prefix="/api/v1/security-score", tags=["Security Score"])
 
@@ -66,21 +71,36 @@ async def get_security_score(s: AsyncSession = Depends(get_session)):
         pillars=pillars,
         config_version=result["config_version"],
         calculated_at=datetime.now(),
+        timings_ms=result.get("timings_ms"),
     )
 
 
+# ═══════════════════ PER ORG UNIT ═══════════════════
+
+@router.get("/org-units", response_model=OrgScoreTreeOut, summary="Security Score wszystkich jednostek org. (roll-up drzewa)")
+async def get_org_unit_scores(s: AsyncSession = Depends(get_session)):
+    return await get_org_scores(s)
+
+
 # ═══════════════════ HISTORY ═══════════════════
 
 @router.get("/history", response_model=list[SnapshotOut], summary="Historia snapshotów")
 async def get_history(
-    limit: int = Query(30, ge=1, le=365),
+    response: Response,
+    limit: int = Query(30, ge=1, le=365, description="Limit punktów (bez zakresu dat)"),
+    date_from: datetime | None = Query(None, description="Początek zakresu"),
+    date_to: datetime | None = Query(None, description="Koniec zakresu (puste = teraz)"),
+    resolution: str = Query("auto", description="auto | raw | hour | day | week"),
     s: AsyncSession = Depends(get_session),
 ):
-    q = (select(SecurityScoreSnapshot)
-         .order_by(SecurityScoreSnapshot.snapshot_date.desc())
-         .limit(limit))
-    snapshots = (await s.execute(q)).scalars().all()
-    return snapshots
+    try:
+        used, points = await history_points(
+            s, date_from, date_to, resolution, limit=None if date_from else limit,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    response.headers["X-History-Resolution"] = used
+    return points
 
 
 # ═══════════════════ SNAPSHOT ═══════════════════
@@ -91,34 +111,19 @@ async def force_snapshot(
     created_by: str = Query("admin"),
     s: AsyncSession = Depends(get_session),
 ):
-    result = await calculate_all_pillars(s)
-    cfg = await get_active_config(s)
+    return await take_snapshot(s, triggered_by=triggered_by, created_by=created_by)
+
+
+# ═══════════════════ INCREMENTAL STATE RECONCILIATION ═══════════════════
+
+@router.post("/reconcile", response_model=ReconcileOut, summary="Porównaj stan przyrostowy z pełnym przeliczeniem")
+async def reconcile(repair: bool = Query(True)):
+    return await reconcile_score_state(repair=repair)
 
-    snap = SecurityScoreSnapshot(
-        total_score=result["total_score"],
-        risk_score=result["pillars"]["risk"],
-        vulnerability_score=result["pillars"]["vulnerability"],
-        incident_score=result["pillars"]["incident"],
-        exception_score=result["pillars"]["exception"],
-        maturity_score=result["pillars"]["maturity"],
-        audit_score=result["pillars"]["audit"],
-        asset_score=result["pillars"]["asset"],
-        tprm_score=result["pillars"]["tprm"],
-        policy_score=result["pillars"]["policy"],
-        awareness_score=result["pillars"]["awareness"],
-        w_risk=cfg.w_risk, w_vulnerability=cfg.w_vulnerability,
-        w_incident=cfg.w_incident, w_exception=cfg.w_exception,
-        w_maturity=cfg.w_maturity, w_audit=cfg.w_audit,
-        w_asset=cfg.w_asset, w_tprm=cfg.w_tprm,
-        w_policy=cfg.w_policy, w_awareness=cfg.w_awareness,
-        config_version=cfg.version,
-        triggered_by=triggered_by,
-        created_by=created_by,
-    )
-    s.add(snap)
-    await s.commit()
-    await s.refresh(snap)
-    return snap
+
+@router.get("/reconcile", response_model=ReconcileOut | None, summary="Ostatni raport rekonsyliacji")
+async def get_last_reconcile():
+    return last_reconcile_report()
 
 
 # ═══════════════════ METHODOLOGY ═══════════════════
@@ -242,3 +247,20 @@ async def get_config_history(s: AsyncSession = Depends(get_session)):
     q = select(SecurityScoreConfig).order_by(SecurityScoreConfig.version.desc())
     configs = (await s.execute(q)).scalars().all()
     return configs
+
+
+# ═══════════════════ WHAT-IF SIMULATION ═══════════════════
+
+@router.post("/what-if", response_model=WhatIfOut, summary="Symulacja wyniku dla wielu wariantów konfiguracji")
+async def what_if(body: WhatIfRequest, s: AsyncSession = Depends(get_session)):
+    """Score candidate configs without changing the active one."""
+    labels = [c.label for c in body.candidates]
+    candidates = [c.model_dump(exclude_none=True, exclude={"label"}) for c in body.candidates]
+    try:
+        if body.grid:
+            grid = expand_grid(body.grid)
+            candidates += grid
+            labels += [None] * len(grid)
+        return await simulate(s, candidates, labels)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
@@ -4,7 +4,7 @@ Smart Catalog API — catalogs CRUD, suggestions, correlations, AI config, featu
 import time
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func, select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -72,6 +72,7 @@ from app.schemas.smart_catalog import (
     WeaknessControlLinkUpdate,
     WeaknessSuggestion,
 )
+from app.services.pagination import PageParams, SortSpec, page_params, paginate
 from app.services.suggestion_engine import SuggestionEngine
 
 router = APIRouter(tags=["Smart Catalog"])
@@ -120,13 +121,23 @@ async def _auto_ref_id(session: AsyncSession, model_class, prefix: str) -> str:
 # THREAT CATALOG CRUD
 # ═══════════════════════════════════════════════════════════════════
 
+_THREAT_SORT = SortSpec({
+    "ref_id": ThreatCatalog.ref_id,
+    "name": ThreatCatalog.name,
+    "created_at": ThreatCatalog.created_at,
+    "updated_at": ThreatCatalog.updated_at,
+}, default="ref_id", pk=ThreatCatalog.id)
+
+
 @router.get("/api/v1/threat-catalog", response_model=list[ThreatCatalogOut], summary="Lista zagrozenia (Smart Catalog)")
 async def list_threat_catalog(
+    response: Response,
     asset_category_id: int | None = Query(None),
     category: str | None = Query(None),
     cia: str | None = Query(None, description="C,I,A filter e.g. 'C,I'"),
     search: str | None = Query(None),
     is_active: bool = Query(True),
+    page: PageParams = Depends(page_params),
     s: AsyncSession = Depends(get_session),
 ):
     q = select(ThreatCatalog)
@@ -145,8 +156,7 @@ async def list_threat_catalog(
         q = q.join(ThreatAssetCategory).where(
             ThreatAssetCategory.asset_category_id == asset_category_id
         )
-    q = q.order_by(ThreatCatalog.ref_id)
-    rows = (await s.execute(q)).scalars().all()
+    rows = await paginate(s, q, _THREAT_SORT, page, response)
 
     result = []
     for t in rows:
@@ -240,12 +250,22 @@ async def archive_threat_catalog(item_id: int, s: AsyncSession = Depends(get_ses
 # WEAKNESS CATALOG CRUD
 # ═══════════════════════════════════════════════════════════════════
 
+_WEAKNESS_SORT = SortSpec({
+    "ref_id": WeaknessCatalog.ref_id,
+    "name": WeaknessCatalog.name,
+    "created_at": WeaknessCatalog.created_at,
+    "updated_at": WeaknessCatalog.updated_at,
+}, default="ref_id", pk=WeaknessCatalog.id)
+
+
 @router.get("/api/v1/weakness-catalog", response_model=list[WeaknessCatalogOut], summary="Lista slabosci")
 async def list_weakness_catalog(
+    response: Response,
     asset_category_id: int | None = Query(None),
     category: str | None = Query(None),
     search: str | None = Query(None),
     is_active: bool = Query(True),
+    page: PageParams = Depends(page_params),
     s: AsyncSession = Depends(get_session),
 ):
     q = select(WeaknessCatalog)
@@ -264,8 +284,7 @@ async def list_weakness_catalog(
         q = q.join(WeaknessAssetCategory).where(
             WeaknessAssetCategory.asset_category_id == asset_category_id
         )
-    q = q.order_by(WeaknessCatalog.ref_id)
-    rows = (await s.execute(q)).scalars().all()
+    rows = await paginate(s, q, _WEAKNESS_SORT, page, response)
 
     result = []
     for w in rows:
@@ -354,13 +373,23 @@ async def archive_weakness_catalog(item_id: int, s: AsyncSession = Depends(get_s
 # CONTROL CATALOG CRUD
 # ═══════════════════════════════════════════════════════════════════
 
+_CONTROL_SORT = SortSpec({
+    "ref_id": ControlCatalog.ref_id,
+    "name": ControlCatalog.name,
+    "created_at": ControlCatalog.created_at,
+    "updated_at": ControlCatalog.updated_at,
+}, default="ref_id", pk=ControlCatalog.id)
+
+
 @router.get("/api/v1/control-catalog", response_model=list[ControlCatalogOut], summary="Lista zabezpieczen")
 async def list_control_catalog(
+    response: Response,
     asset_category_id: int | None = Query(None),
     category: str | None = Query(None),
     implementation_type: str | None = Query(None),
     search: str | None = Query(None),
     is_active: bool = Query(True),
+    page: PageParams = Depends(page_params),
     s: AsyncSession = Depends(get_session),
 ):
     q = select(ControlCatalog)
@@ -381,8 +410,7 @@ async def list_control_catalog(
         q = q.join(ControlAssetCategory).where(
             ControlAssetCategory.asset_category_id == asset_category_id
         )
-    q = q.order_by(ControlCatalog.ref_id)
-    rows = (await s.execute(q)).scalars().all()
+    rows = await paginate(s, q, _CONTROL_SORT, page, response)
 
     result = []
     for c in rows:
@@ -3,7 +3,7 @@ Vendor (TPRM) registry module — /api/v1/vendors
 """
 from datetime import date, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -14,15 +14,14 @@ from app.schemas.vendor import (
     VendorAssessmentCreate, VendorAssessmentOut,
     VendorCreate, VendorOut, VendorStatusChange, VendorUpdate,
 )
+from app.services.dictionary_cache import dict_cache
+from app.services.pagination import PageParams, SortSpec, page_params, paginate
 
 router = APIRouter(prefix="/api/v1/vendors", tags=["Zarządzanie dostawcami (TPRM)"])
 
 
 async def _de_label(s: AsyncSession, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return e.label if e else None
+    return await dict_cache.label(s, entry_id)
 
 
 async def _vendor_out(s: AsyncSession, v: Vendor) -> VendorOut:
@@ -115,13 +114,24 @@ async def vendor_metrics(s: AsyncSession = Depends(get_session)):
 
 # ═══════════════════ LIST ═══════════════════
 
+_VENDOR_SORT = SortSpec({
+    "name": Vendor.name,
+    "ref_id": Vendor.ref_id,
+    "risk_score": Vendor.risk_score,
+    "created_at": Vendor.created_at,
+    "updated_at": Vendor.updated_at,
+}, default="name", pk=Vendor.id)
+
+
 @router.get("", response_model=list[VendorOut], summary="Lista dostawców")
 async def list_vendors(
+    response: Response,
     category_id: int | None = Query(None),
     criticality_id: int | None = Query(None),
     status_id: int | None = Query(None),
     risk_rating_id: int | None = Query(None),
     include_archived: bool = Query(False),
+    page: PageParams = Depends(page_params),
     s: AsyncSession = Depends(get_session),
 ):
     q = select(Vendor)
@@ -135,8 +145,7 @@ async def list_vendors(
         q = q.where(Vendor.status_id == status_id)
     if risk_rating_id is not None:
         q = q.where(Vendor.risk_rating_id == risk_rating_id)
-    q = q.order_by(Vendor.name)
-    vendors = (await s.execute(q)).scalars().all()
+    vendors = await paginate(s, q, _VENDOR_SORT, page, response)
     return [await _vendor_out(s, v) for v in vendors]
 
 
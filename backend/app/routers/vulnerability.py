@@ -3,7 +3,7 @@ Vulnerability registry module — /api/v1/vulnerabilities
 """
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,55 +19,67 @@ from app.schemas.vulnerability import (
     VulnerabilityStatusChange,
     VulnerabilityUpdate,
 )
+from app.services.dictionary_cache import dict_cache
+from app.services.ndjson import ndjson_response, wants_ndjson
+from app.services.pagination import PageParams, SortSpec, page_params, paginate, sort_query
 
 router = APIRouter(prefix="/api/v1/vulnerabilities", tags=["Rejestr podatności"])
 
 
 # ── helper ──
 
-async def _de_label(s: AsyncSession, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return e.label if e else None
+async def _vuln_outs(s: AsyncSession, vulns: list[VulnerabilityRecord]) -> list[VulnerabilityOut]:
+    """Build VulnerabilityOut for many records with a fixed number of IN-queries (no per-row lookups)."""
+    if not vulns:
+        return []
+    org_ids = {v.org_unit_id for v in vulns if v.org_unit_id}
+    orgs = dict((await s.execute(select(OrgUnit.id, OrgUnit.name).where(OrgUnit.id.in_(org_ids)))).all()) if org_ids else {}
+    asset_ids = {v.asset_id for v in vulns if v.asset_id}
+    assets = dict((await s.execute(select(Asset.id, Asset.name).where(Asset.id.in_(asset_ids)))).all()) if asset_ids else {}
+    labels = await dict_cache.labels(s, {
+        eid for v in vulns
+        for eid in (v.source_id, v.category_id, v.severity_id, v.status_id, v.remediation_priority_id) if eid
+    })
+    return [
+        VulnerabilityOut(
+            id=v.id,
+            ref_id=v.ref_id,
+            title=v.title,
+            description=v.description,
+            source_id=v.source_id,
+            source_name=labels.get(v.source_id),
+            org_unit_id=v.org_unit_id,
+            org_unit_name=orgs.get(v.org_unit_id),
+            asset_id=v.asset_id,
+            asset_name=assets.get(v.asset_id),
+            category_id=v.category_id,
+            category_name=labels.get(v.category_id),
+            severity_id=v.severity_id,
+            severity_name=labels.get(v.severity_id),
+            cvss_score=float(v.cvss_score) if v.cvss_score is not None else None,
+            cvss_vector=v.cvss_vector,
+            cve_id=v.cve_id,
+            status_id=v.status_id,
+            status_name=labels.get(v.status_id),
+            remediation_priority_id=v.remediation_priority_id,
+            remediation_priority_name=labels.get(v.remediation_priority_id),
+            owner=v.owner,
+            detected_at=v.detected_at,
+            closed_at=v.closed_at,
+            sla_deadline=v.sla_deadline,
+            remediation_notes=v.remediation_notes,
+            risk_id=v.risk_id,
+            created_by=v.created_by,
+            is_active=v.is_active,
+            created_at=v.created_at,
+            updated_at=v.updated_at,
+        )
+        for v in vulns
+    ]
 
 
 async def _vuln_out(s: AsyncSession, v: VulnerabilityRecord) -> VulnerabilityOut:
-    org = await s.get(OrgUnit, v.org_unit_id) if v.org_unit_id else None
-    asset = await s.get(Asset, v.asset_id) if v.asset_id else None
-    return VulnerabilityOut(
-        id=v.id,
-        ref_id=v.ref_id,
-        title=v.title,
-        description=v.description,
-        source_id=v.source_id,
-        source_name=await _de_label(s, v.source_id),
-        org_unit_id=v.org_unit_id,
-        org_unit_name=org.name if org else None,
-        asset_id=v.asset_id,
-        asset_name=asset.name if asset else None,
-        category_id=v.category_id,
-        category_name=await _de_label(s, v.category_id),
-        severity_id=v.severity_id,
-        severity_name=await _de_label(s, v.severity_id),
-        cvss_score=float(v.cvss_score) if v.cvss_score is not None else None,
-        cvss_vector=v.cvss_vector,
-        cve_id=v.cve_id,
-        status_id=v.status_id,
-        status_name=await _de_label(s, v.status_id),
-        remediation_priority_id=v.remediation_priority_id,
-        remediation_priority_name=await _de_label(s, v.remediation_priority_id),
-        owner=v.owner,
-        detected_at=v.detected_at,
-        closed_at=v.closed_at,
-        sla_deadline=v.sla_deadline,
-        remediation_notes=v.remediation_notes,
-        risk_id=v.risk_id,
-        created_by=v.created_by,
-        is_active=v.is_active,
-        created_at=v.created_at,
-        updated_at=v.updated_at,
-    )
+    return (await _vuln_outs(s, [v]))[0]
 
 
 async def _next_ref_id(s: AsyncSession) -> str:
@@ -139,13 +151,26 @@ async def get_vulnerability_metrics(s: AsyncSession = Depends(get_session)):
 
 # ═══════════════════ LIST ═══════════════════
 
+_VULN_SORT = SortSpec({
+    "detected_at": VulnerabilityRecord.detected_at,
+    "title": VulnerabilityRecord.title,
+    "ref_id": VulnerabilityRecord.ref_id,
+    "cvss_score": VulnerabilityRecord.cvss_score,
+    "created_at": VulnerabilityRecord.created_at,
+    "updated_at": VulnerabilityRecord.updated_at,
+}, default="-detected_at", pk=VulnerabilityRecord.id)
+
+
 @router.get("", response_model=list[VulnerabilityOut], summary="Lista podatności")
 async def list_vulnerabilities(
+    response: Response,
     org_unit_id: int | None = Query(None),
     asset_id: int | None = Query(None),
     severity_id: int | None = Query(None),
     status_id: int | None = Query(None),
     include_archived: bool = Query(False),
+    page: PageParams = Depends(page_params),
+    ndjson: bool = Depends(wants_ndjson),
     s: AsyncSession = Depends(get_session),
 ):
     q = select(VulnerabilityRecord)
@@ -159,9 +184,10 @@ async def list_vulnerabilities(
         q = q.where(VulnerabilityRecord.severity_id == severity_id)
     if status_id is not None:
         q = q.where(VulnerabilityRecord.status_id == status_id)
-    q = q.order_by(VulnerabilityRecord.detected_at.desc())
-    vulns = (await s.execute(q)).scalars().all()
-    return [await _vuln_out(s, v) for v in vulns]
+    if ndjson:
+        return ndjson_response(sort_query(q, _VULN_SORT, page.sort), _vuln_outs)
+    vulns = await paginate(s, q, _VULN_SORT, page, response)
+    return await _vuln_outs(s, vulns)
 
 
 # ═══════════════════ GET ═══════════════════
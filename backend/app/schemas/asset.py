@@ -118,6 +118,24 @@ class AssetGraphEdge(BaseModel):
 class AssetGraph(BaseModel):
     nodes: list[AssetGraphNode]
     edges: list[AssetGraphEdge]
+    truncated: bool = False  # node cap (ASSET_GRAPH_MAX_NODES) reached
+
+
+class AssetGraphReachNode(AssetGraphNode):
+    distance: int  # hops from the start asset
+
+
+class AssetBlastRadius(BaseModel):
+    asset_id: int
+    depth: int
+    direction: str
+    truncated: bool = False
+    asset_count: int  # reachable assets, the start asset excluded
+    risk_count: int
+    risk_score_sum: float
+    risk_score_max: float
+    high_risk_count: int
+    assets: list[AssetGraphReachNode]
 
 
 class AssetUpdate(BaseModel):
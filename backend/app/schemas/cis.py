@@ -45,6 +45,10 @@ class CisAssessmentOut(BaseModel):
     ig1_score: float | None = None
     ig2_score: float | None = None
     ig3_score: float | None = None
+    policy_pct: float | None = None
+    implementation_pct: float | None = None
+    automation_pct: float | None = None
+    reporting_pct: float | None = None
 
     created_at: datetime
     updated_at: datetime
@@ -210,6 +210,10 @@ class CisTrendPoint(BaseModel):
     ig1: float | None = None
     ig2: float | None = None
     ig3: float | None = None
+    policy_pct: float | None = None
+    implementation_pct: float | None = None
+    automation_pct: float | None = None
+    reporting_pct: float | None = None
 
 
 class CisTrend(BaseModel):
@@ -241,3 +245,4 @@ class PostureScoreResponse(BaseModel):
     dimensions: list[PostureDimension] = []
     config_version: int | None = None
     benchmark_avg: float | None = None  # average across all org units for context
+    timings_ms: dict[str, float] | None = None  # per-pillar engine timings (ms) + "total"
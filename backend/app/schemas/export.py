@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ExportJobCreate(BaseModel):
+    kind: str  # risks | assets | executive | actions
+    params: dict[str, int | None] = {}
+
+
+class ExportJobOut(BaseModel):
+    id: str
+    kind: str
+    params: dict[str, int | None]
+    status: str  # queued | running | done | failed
+    cached: bool = False
+    created_at: datetime
+    finished_at: datetime | None = None
+    size: int | None = None
+    error: str | None = None
+    download_url: str | None = None
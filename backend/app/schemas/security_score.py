@@ -20,6 +20,8 @@ class SecurityScoreOut(BaseModel):
     pillars: list[PillarDetail]
     config_version: int
     calculated_at: datetime
+    # Wall-clock time per pillar (ms) plus "total"
+    timings_ms: dict[str, float] | None = None
 
 
 class SnapshotOut(BaseModel):
@@ -39,6 +41,12 @@ class SnapshotOut(BaseModel):
     config_version: int | None = None
     triggered_by: str | None = None
     created_by: str | None = None
+    # Roll-up points (resolution != "raw"): scores above are bucket averages
+    resolution: str = "raw"
+    samples: int = 1
+    total_min: float | None = None
+    total_max: float | None = None
+    stats: dict[str, dict[str, float]] | None = None
     model_config = {"from_attributes": True}
 
 
@@ -122,3 +130,104 @@ class MethodologyOut(BaseModel):
     pillars: list[MethodologyPillar]
     total_score: float
     rating: str
+
+
+class PillarDriftOut(BaseModel):
+    stored: float
+    actual: float
+    delta: float
+
+
+class ReconcileOut(BaseModel):
+    checked_at: datetime
+    full_mode: str
+    total_score: float
+    checked: list[str]
+    skipped: list[str]
+    drift: dict[str, PillarDriftOut]
+    max_delta: float
+    repaired: bool
+
+
+class OrgUnitScoreOut(BaseModel):
+    org_unit_id: int
+    parent_id: int | None = None
+    name: str
+    symbol: str
+    is_active: bool
+    total_score: float
+    pillars: dict[str, float]
+
+
+class OrgScoreTreeOut(BaseModel):
+    config_version: int | None = None
+    computed_at: datetime
+    weights: dict[str, float]
+    inherited_pillars: list[str]
+    units: list[OrgUnitScoreOut]
+
+
+class WhatIfCandidate(BaseModel):
+    """Partial override of the active config (omitted fields keep their value)."""
+    label: str | None = Field(None, max_length=100)
+    w_risk: float | None = Field(None, ge=0, le=100)
+    w_vulnerability: float | None = Field(None, ge=0, le=100)
+    w_incident: float | None = Field(None, ge=0, le=100)
+    w_exception: float | None = Field(None, ge=0, le=100)
+    w_maturity: float | None = Field(None, ge=0, le=100)
+    w_audit: float | None = Field(None, ge=0, le=100)
+    w_asset: float | None = Field(None, ge=0, le=100)
+    w_tprm: float | None = Field(None, ge=0, le=100)
+    w_policy: float | None = Field(None, ge=0, le=100)
+    w_awareness: float | None = Field(None, ge=0, le=100)
+    vuln_threshold_critical: int | None = Field(None, ge=1)
+    vuln_threshold_high: int | None = Field(None, ge=1)
+    vuln_threshold_medium: int | None = Field(None, ge=1)
+    vuln_threshold_low: int | None = Field(None, ge=1)
+    incident_ttr_critical: int | None = Field(None, ge=1)
+    incident_ttr_high: int | None = Field(None, ge=1)
+    incident_ttr_medium: int | None = Field(None, ge=1)
+    incident_ttr_low: int | None = Field(None, ge=1)
+    incident_window_days: int | None = Field(None, ge=1, le=3650)
+
+
+class WhatIfRequest(BaseModel):
+    candidates: list[WhatIfCandidate] = []
+    grid: dict[str, list[float]] | None = Field(
+        None, description="Siatka {pole: [wartości]} — symulowany jest iloczyn kartezjański",
+    )
+
+
+class WhatIfCandidateOut(BaseModel):
+    index: int
+    label: str | None = None
+    overrides: dict[str, float]
+    weights_sum: float
+    valid: bool
+    total_score: float
+    delta: float
+    pillars: dict[str, float]
+
+
+class WhatIfBaselineOut(BaseModel):
+    total_score: float
+    pillars: dict[str, float]
+
+
+class ScoreDistributionOut(BaseModel):
+    min: float
+    max: float
+    mean: float
+    std: float
+    p10: float
+    p50: float
+    p90: float
+
+
+class WhatIfOut(BaseModel):
+    config_version: int | None = None
+    baseline: WhatIfBaselineOut
+    candidates: list[WhatIfCandidateOut]
+    distribution: ScoreDistributionOut
+    pillar_distribution: dict[str, ScoreDistributionOut]
+    timings_ms: dict[str, float]
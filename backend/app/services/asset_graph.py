@@ -0,0 +1,250 @@
+"""
+Server-side asset graph: cached adjacency index + subgraph queries.
+
+The CMDB graph (``asset_relationships`` plus ``assets.parent_id`` as
+"contains" edges, active assets only) is loaded in two queries into an
+in-memory adjacency list and kept per process.  Queries then walk the index
+without touching the database:
+
+  * ``neighbourhood`` — k-hop subgraph around an asset,
+  * ``shortest_path`` — fewest-hops path between two assets,
+  * ``reachable`` — assets reachable within a depth (blast radius).
+
+Only the node attributes of the returned subgraph (name, type, criticality,
+org unit, risk count) are read from the database, in a few IN-queries
+(``node_attributes``), so the frontend can fetch small subgraphs of a large
+CMDB instead of the whole graph.
+
+Direction follows the stored edges: ``out`` = source → target (parent →
+child), ``in`` = the reverse, ``both`` = undirected.
+
+Invalidation works like the dictionary cache: the table-change hooks in
+``app.middleware.audit_auto`` drop the index on writes to ``assets`` or
+``asset_relationships``; ``ASSET_GRAPH_TTL_SECONDS`` covers other processes.
+"""
+from __future__ import annotations
+
+import time
+from collections import defaultdict, deque
+from typing import NamedTuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.middleware.audit_auto import add_table_change_listener
+from app.models.asset import Asset, AssetRelationship
+from app.models.org_unit import OrgUnit
+from app.models.risk import Risk
+from app.schemas.asset import AssetGraphEdge, AssetGraphNode
+from app.services.dictionary_cache import dict_cache
+
+GRAPH_TABLES = frozenset({"assets", "asset_relationships"})
+DIRECTIONS = ("out", "in", "both")
+_IN_BATCH = 1000  # ids per IN (...) list
+
+
+class GraphEdge(NamedTuple):
+    id: int  # relationship id; -child_id for parent → child edges
+    source: int
+    target: int
+    type: str
+    description: str | None
+
+
+class AssetGraphIndex:
+    def __init__(self, ttl_seconds: float | None = None):
+        self.ttl_seconds = ttl_seconds
+        self._nodes: set[int] = set()
+        self._out: dict[int, list[GraphEdge]] = {}
+        self._in: dict[int, list[GraphEdge]] = {}
+        self._loaded_at: float | None = None
+        # Bumped on every invalidation so a load racing with a write is discarded
+        self._generation = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    # ── lifecycle ──
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._loaded_at = None
+        self.invalidations += 1
+
+    def _is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        ttl = self.ttl_seconds if self.ttl_seconds is not None else settings.ASSET_GRAPH_TTL_SECONDS
+        return ttl <= 0 or time.monotonic() - self._loaded_at < ttl
+
+    async def ensure_loaded(self, s: AsyncSession) -> None:
+        if self._is_fresh():
+            return
+        generation = self._generation
+        assets = (await s.execute(
+            select(Asset.id, Asset.parent_id).where(Asset.is_active.is_(True))
+        )).all()
+        rels = (await s.execute(
+            select(
+                AssetRelationship.id, AssetRelationship.source_asset_id, AssetRelationship.target_asset_id,
+                AssetRelationship.relationship_type, AssetRelationship.description,
+            )
+        )).all()
+
+        nodes = {a.id for a in assets}
+        out: dict[int, list[GraphEdge]] = defaultdict(list)
+        in_: dict[int, list[GraphEdge]] = defaultdict(list)
+        edges = [GraphEdge(*r) for r in rels if r[1] in nodes and r[2] in nodes]
+        edges += [
+            GraphEdge(-a.id, a.parent_id, a.id, "contains", "Relacja nadrzedny-podrzedny")
+            for a in assets if a.parent_id and a.parent_id in nodes
+        ]
+        for e in edges:
+            out[e.source].append(e)
+            in_[e.target].append(e)
+
+        if generation != self._generation:
+            return  # an asset/relationship write happened while we were reading
+        self._nodes, self._out, self._in = nodes, dict(out), dict(in_)
+        self._loaded_at = time.monotonic()
+        self.loads += 1
+
+    # ── queries (index must be loaded) ──
+
+    def has(self, asset_id: int) -> bool:
+        return asset_id in self._nodes
+
+    def _neighbours(self, node: int, direction: str):
+        if direction in ("out", "both"):
+            for e in self._out.get(node, ()):
+                yield e, e.target
+        if direction in ("in", "both"):
+            for e in self._in.get(node, ()):
+                yield e, e.source
+
+    def reachable(self, start: int, depth: int, direction: str = "both",
+                  max_nodes: int | None = None) -> tuple[dict[int, int], bool]:
+        """BFS: {asset_id: hops} within ``depth`` (start included) and whether ``max_nodes`` cut it short."""
+        dist = {start: 0}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if dist[node] >= depth:
+                continue
+            for _, other in self._neighbours(node, direction):
+                if other in dist:
+                    continue
+                if max_nodes is not None and len(dist) >= max_nodes:
+                    return dist, True
+                dist[other] = dist[node] + 1
+                queue.append(other)
+        return dist, False
+
+    def induced_edges(self, nodes) -> list[GraphEdge]:
+        """All edges with both ends in ``nodes``."""
+        nodes = set(nodes)
+        return [e for n in nodes for e in self._out.get(n, ()) if e.target in nodes]
+
+    def shortest_path(self, source: int, target: int, direction: str = "both") -> list[GraphEdge] | None:
+        """Edges of a fewest-hops path (empty for source == target), or None if unreachable."""
+        if source == target:
+            return []
+        parent: dict[int, GraphEdge | None] = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for e, other in self._neighbours(node, direction):
+                if other in parent:
+                    continue
+                parent[other] = e
+                if other == target:
+                    path = []
+                    while other != source:
+                        edge = parent[other]
+                        path.append(edge)
+                        other = edge.source if edge.target == other else edge.target
+                    return path[::-1]
+                queue.append(other)
+        return None
+
+    def connected(self) -> tuple[set[int], list[GraphEdge]]:
+        """Assets with at least one edge, and all edges (the full graph view)."""
+        edges = [e for lst in self._out.values() for e in lst]
+        return {n for e in edges for n in (e.source, e.target)}, edges
+
+    def stats(self) -> dict:
+        return {
+            "nodes": len(self._nodes),
+            "edges": sum(len(v) for v in self._out.values()),
+            "loaded": self._loaded_at is not None,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+        }
+
+
+asset_graph = AssetGraphIndex()
+
+
+@add_table_change_listener
+def _on_table_change(tables: set[str], phase: str) -> None:
+    if tables & GRAPH_TABLES:
+        asset_graph.invalidate()
+
+
+def _batches(ids) -> list[list[int]]:
+    ordered = sorted(ids)
+    return [ordered[i:i + _IN_BATCH] for i in range(0, len(ordered), _IN_BATCH)]
+
+
+async def node_attributes(s: AsyncSession, ids) -> dict[int, AssetGraphNode]:
+    """Graph nodes for ``ids`` — assets, org units and risk counts in IN-queries, labels from the cache."""
+    ids = set(ids)
+    labels = await dict_cache.label_map(s)
+    assets, risk_counts = [], {}
+    for chunk in _batches(ids):
+        assets += (await s.execute(
+            select(Asset.id, Asset.name, Asset.asset_type_id, Asset.criticality_id, Asset.org_unit_id)
+            .where(Asset.id.in_(chunk))
+        )).all()
+        risk_counts.update((await s.execute(
+            select(Risk.asset_id, func.count()).where(Risk.asset_id.in_(chunk)).group_by(Risk.asset_id)
+        )).all())
+    orgs: dict[int, str] = {}
+    for chunk in _batches({a.org_unit_id for a in assets if a.org_unit_id}):
+        orgs.update((await s.execute(select(OrgUnit.id, OrgUnit.name).where(OrgUnit.id.in_(chunk)))).all())
+    return {
+        a.id: AssetGraphNode(
+            id=a.id, name=a.name,
+            asset_type_name=labels.get(a.asset_type_id),
+            criticality_name=labels.get(a.criticality_id),
+            org_unit_name=orgs.get(a.org_unit_id),
+            risk_count=risk_counts.get(a.id, 0),
+        )
+        for a in assets
+    }
+
+
+async def risk_totals(s: AsyncSession, ids) -> dict:
+    """Aggregated active risks of the assets in ``ids``."""
+    count, score_sum, score_max, high = 0, 0.0, 0.0, 0
+    for chunk in _batches(ids):
+        r = (await s.execute(
+            select(
+                func.count(Risk.id), func.sum(Risk.risk_score), func.max(Risk.risk_score),
+                func.sum(case((Risk.risk_level == "high", 1), else_=0)),
+            ).where(Risk.asset_id.in_(chunk), Risk.is_active.is_(True))
+        )).one()
+        count += r[0] or 0
+        score_sum += float(r[1] or 0)
+        score_max = max(score_max, float(r[2] or 0))
+        high += r[3] or 0
+    return {
+        "risk_count": count,
+        "risk_score_sum": round(score_sum, 2),
+        "risk_score_max": round(score_max, 2),
+        "high_risk_count": high,
+    }
+
+
+def edge_out(e: GraphEdge) -> AssetGraphEdge:
+    return AssetGraphEdge(id=e.id, source=e.source, target=e.target, type=e.type, description=e.description)
@@ -0,0 +1,326 @@
+"""
+Streaming asset CSV import — ``POST /api/v1/assets/import/csv``.
+
+The upload is copied to a temporary file in chunks and parsed row by row
+(``csv`` over a text stream), so memory does not depend on the file size.
+Rows are applied in batches of ``ASSET_IMPORT_BATCH_SIZE``:
+
+  * new assets go in with one multi-row INSERT; ``AST-%04d`` ref_ids are
+    assigned afterwards with one SELECT + one executemany UPDATE (the batch
+    is tagged with a temporary ref_id to find its rows),
+  * with ``key`` (``ref_id`` / ``name`` / ``hostname``) rows matching an
+    active asset update it instead (upsert) — only changed columns, one
+    executemany UPDATE; empty cells never clear a value,
+  * audit entries are written with one executemany INSERT per batch instead
+    of the per-object flush listener.
+
+``dry_run`` validates and counts what would be created/updated without
+writing.  The import is one transaction: it is committed after the last
+batch and rolled back on a broken file.  ``import_assets`` yields the running
+totals after every batch; the router streams them as NDJSON progress lines
+(``Accept: application/x-ndjson``) or returns the final totals.
+
+Encoding: UTF-8 (with or without BOM) unless the first 64 KB are not valid
+UTF-8, then Latin-1.  Delimiter: ``;`` or ``,``, whichever the header uses.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import itertools
+import json
+import os
+import tempfile
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.middleware.audit_auto import audit_entry
+from app.models.asset import Asset
+from app.models.audit import AuditLog
+from app.services.ndjson import NDJSON_MEDIA_TYPE
+
+IMPORT_KEYS = ("ref_id", "name", "hostname")
+_CORE_FIELDS = ("name", "owner", "description", "location")
+_SNIFF_BYTES = 64 * 1024
+_COPY_CHUNK = 1024 * 1024
+_MAX_REPORTED_ERRORS = 20
+_TABLE = Asset.__tablename__
+
+
+@dataclass
+class ImportResult:
+    dry_run: bool = False
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: list[str] = field(default_factory=list)
+    total_errors: int = 0
+    aborted: bool = False
+    done: bool = False
+
+    def error(self, message: str) -> None:
+        self.total_errors += 1
+        if len(self.errors) < _MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def as_dict(self) -> dict:
+        return {
+            "status": "error" if self.aborted else "ok",
+            "done": self.done,
+            "dry_run": self.dry_run,
+            "processed": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "errors": self.errors,
+            "total_errors": self.total_errors,
+        }
+
+
+async def spool_upload(file: UploadFile) -> str:
+    """Copy the upload to a temporary file in chunks; returns its path."""
+    fd, path = tempfile.mkstemp(prefix="asset_import_", suffix=".csv")
+    with os.fdopen(fd, "wb") as out:
+        while chunk := await file.read(_COPY_CHUNK):
+            out.write(chunk)
+    return path
+
+
+class CsvSource:
+    """Spooled CSV file with a row reader; ``close()`` removes the file."""
+
+    def __init__(self, path: str, key: str | None):
+        self.path = path
+        with open(path, "rb") as raw:
+            sample = raw.read(_SNIFF_BYTES)
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+            encoding = "utf-8-sig"
+        except UnicodeDecodeError:
+            encoding = "latin-1"
+        self._file = open(path, encoding=encoding, newline="")
+        try:
+            header = self._file.readline()
+            if not header.strip():
+                raise HTTPException(400, "Nie mozna odczytac naglowkow CSV")
+            delimiter = ";" if header.count(";") >= header.count(",") else ","
+            self.reader = csv.DictReader(itertools.chain([header], self._file), delimiter=delimiter)
+            self.fields = [f.strip() for f in (self.reader.fieldnames or []) if f]
+            if key is not None and key not in self.fields:
+                raise HTTPException(400, f"Brak kolumny klucza '{key}' w naglowku CSV")
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+@dataclass(slots=True)
+class _Row:
+    num: int
+    values: dict
+    custom: dict
+
+    def key(self, key: str | None):
+        return self.values.get(key) if key else None
+
+
+class _Importer:
+    def __init__(self, s: AsyncSession, fields: list[str], key: str | None,
+                 asset_category_id: int | None, result: ImportResult):
+        self.s = s
+        self.key = key
+        self.asset_category_id = asset_category_id
+        self.result = result
+        self.core = set(_CORE_FIELDS) | ({key} if key else set())
+        self.columns = [c for c in _CORE_FIELDS if c in fields]
+        if key and key not in self.columns:
+            self.columns.append(key)
+        if "name" not in self.columns:
+            self.columns.insert(0, "name")
+        self._planned: set = set()  # dry run: keys "created" by earlier batches
+
+    def parse(self, num: int, row: dict) -> _Row | None:
+        name = (row.get("name") or "").strip()
+        if not name:
+            self.result.error(f"Wiersz {num}: brak nazwy")
+            return None
+        values = {c: (row.get(c) or "").strip() or None for c in self.columns}
+        values["name"] = name
+        if self.key and not values.get(self.key):
+            self.result.error(f"Wiersz {num}: brak wartosci klucza '{self.key}'")
+            return None
+        custom = {
+            k: v.strip() for k, v in row.items()
+            if k and k not in self.core and isinstance(v, str) and v.strip()
+        }
+        return _Row(num, values, custom)
+
+    async def _existing(self, rows: list[_Row]) -> tuple[dict, set]:
+        """{key value: matching active asset row} — ambiguous keys reported and left out."""
+        key_col = getattr(Asset, self.key)
+        found = (await self.s.execute(
+            select(Asset.id, Asset.asset_category_id, Asset.custom_attributes,
+                   *(getattr(Asset, c) for c in self.columns if c != self.key), key_col)
+            .where(key_col.in_({r.key(self.key) for r in rows}), Asset.is_active.is_(True))
+        )).all()
+        matches: dict = {}
+        ambiguous = set()
+        for m in found:
+            k = getattr(m, self.key)
+            if k in matches:
+                ambiguous.add(k)
+            matches[k] = m
+        for k in ambiguous:
+            del matches[k]
+        return matches, ambiguous
+
+    async def apply(self, batch: list[_Row], dry_run: bool) -> None:
+        result = self.result
+        matches, ambiguous = {}, set()
+        if self.key:
+            latest: dict = {}
+            for r in batch:
+                prev = latest.get(r.key(self.key))
+                if prev is not None:
+                    result.error(f"Wiersz {prev.num}: powtorzony klucz '{r.key(self.key)}' (uzyto wiersza {r.num})")
+                latest[r.key(self.key)] = r
+            batch = list(latest.values())
+            matches, ambiguous = await self._existing(batch)
+
+        inserts, updates, audit = [], [], []
+        for r in batch:
+            k = r.key(self.key)
+            if k in ambiguous:
+                result.error(f"Wiersz {r.num}: klucz '{k}' pasuje do wielu aktywow")
+                continue
+            match = matches.get(k) if self.key else None
+            if match is None:
+                if dry_run and self.key and k in self._planned:
+                    result.updated += 1
+                    continue
+                inserts.append({
+                    **{c: r.values.get(c) for c in self.columns}, "ref_id": r.values.get("ref_id"),
+                    "asset_category_id": self.asset_category_id, "custom_attributes": r.custom or None,
+                })
+                if self.key:
+                    self._planned.add(k)
+                continue
+
+            changes = {
+                c: v for c, v in r.values.items()
+                if c != self.key and v is not None and v != getattr(match, c)
+            }
+            if self.asset_category_id and match.asset_category_id != self.asset_category_id:
+                changes["asset_category_id"] = self.asset_category_id
+            if r.custom:
+                merged = {**(match.custom_attributes or {}), **r.custom}
+                if merged != (match.custom_attributes or {}):
+                    changes["custom_attributes"] = merged
+            if not changes:
+                result.unchanged += 1
+                continue
+            updates.append({"id": match.id, **changes})
+            audit += [
+                audit_entry(_TABLE, "update", match.id, c,
+                            json.dumps(getattr(match, c)) if c == "custom_attributes" else getattr(match, c),
+                            json.dumps(v) if c == "custom_attributes" else v)
+                for c, v in changes.items()
+            ]
+            result.updated += 1
+
+        result.created += len(inserts)
+        if dry_run:
+            return
+        if inserts:
+            audit += [audit_entry(_TABLE, "create", i) for i in await self._insert(inserts)]
+        if updates:
+            await self.s.execute(update(Asset), updates)
+        if audit:
+            await self.s.execute(insert(AuditLog), audit)
+
+    async def _insert(self, rows: list[dict]) -> list[int]:
+        """Multi-row INSERT; generated ref_ids are set afterwards. Returns the new ids."""
+        token = f"~{uuid.uuid4().hex[:19]}"  # temporary ref_id of this batch (fits String(20))
+        given = [r["ref_id"] for r in rows if r["ref_id"]]
+        for r in rows:
+            r["ref_id"] = r["ref_id"] or token
+        await self.s.execute(insert(Asset), rows)
+
+        new_ids = list((await self.s.execute(select(Asset.id).where(Asset.ref_id == token))).scalars())
+        if new_ids:
+            await self.s.execute(update(Asset), [{"id": i, "ref_id": f"AST-{i:04d}"} for i in new_ids])
+        if given:
+            new_ids += (await self.s.execute(
+                select(Asset.id).where(Asset.ref_id.in_(given), Asset.is_active.is_(True))
+            )).scalars().all()
+        return new_ids
+
+
+async def import_assets(
+    s: AsyncSession,
+    source: CsvSource,
+    *,
+    key: str | None = None,
+    asset_category_id: int | None = None,
+    dry_run: bool = False,
+    batch_size: int | None = None,
+) -> AsyncIterator[ImportResult]:
+    """Import ``source`` batch by batch, yielding the running totals after each batch (last one: ``done``)."""
+    batch_size = batch_size or settings.ASSET_IMPORT_BATCH_SIZE
+    result = ImportResult(dry_run=dry_run)
+    importer = _Importer(s, source.fields, key, asset_category_id, result)
+    batch: list[_Row] = []
+    num = 1
+    try:
+        for num, raw in enumerate(source.reader, start=2):
+            result.processed += 1
+            row = importer.parse(num, raw)
+            if row is not None:
+                batch.append(row)
+            if len(batch) >= batch_size:
+                await importer.apply(batch, dry_run)
+                batch = []
+                yield result
+        if batch:
+            await importer.apply(batch, dry_run)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        await s.rollback()
+        result.aborted = True
+        result.error(f"Wiersz {num + 1}: nie mozna odczytac pliku ({exc.__class__.__name__}) — import wycofany")
+    except Exception:
+        await s.rollback()
+        raise
+    else:
+        if dry_run:
+            await s.rollback()
+        else:
+            await s.commit()
+    result.done = True
+    yield result
+
+
+def progress_response(source: CsvSource, **options) -> StreamingResponse:
+    """NDJSON stream of ``import_assets`` totals; runs on its own session and closes ``source``."""
+    async def body():
+        try:
+            async with async_session() as s:
+                async for progress in import_assets(s, source, **options):
+                    yield json.dumps(progress.as_dict(), ensure_ascii=False) + "\n"
+        finally:
+            source.close()
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,357 @@
+"""
+Asynchronous audit trail writer — ``AUDIT_WRITE_MODE=async``.
+
+The flush hooks in ``app.middleware.audit_auto`` still capture the diffs
+(they need the pre-flush attribute history), but instead of inserting them in
+the request's transaction they keep the rows on the session and hand them to
+this queue when the transaction commits (a rollback drops them).  A writer
+task on the event loop drains the queue in batches of
+``AUDIT_QUEUE_BATCH_SIZE`` with one executemany INSERT on its own connection,
+so request latency no longer includes the audit write.
+
+Backpressure: the in-memory queue holds at most ``AUDIT_QUEUE_MAX_ENTRIES``
+rows.  Overflow — and batches the writer failed to insert — is appended to an
+NDJSON spill file in ``AUDIT_SPILL_DIR`` (flushed and fsynced), which the
+writer replays once the memory queue is empty and the database accepts
+writes again.  All spill-file I/O runs in one dedicated thread, so appends
+stay in order and a slow disk never stalls the event loop (the commit hook
+only schedules the append).  Delivery is at-least-once: a batch interrupted after its
+commit may be written twice.
+
+Spill files are per process (``audit_spill.<pid>.ndjson``), so workers never
+append to the same file.  Before replaying, a writer claims a file by renaming
+it to its own ``audit_spill.<pid>.replay.ndjson``: its own spill file and the
+files of processes that are gone (an earlier run) qualify, and when two
+workers race for the same orphan only one rename succeeds.  Lines that do not
+parse are moved to ``<replay file>.bad`` instead of blocking the replay.
+Outside POSIX there is no liveness probe, so only the process's own files are
+replayed there.
+
+``stop()`` drains the queue on shutdown (``AUDIT_QUEUE_SHUTDOWN_SECONDS``);
+whatever is still in memory after the timeout is spilled and replayed on the
+next start.  ``stats()`` reports queue depth, lag and counters.
+
+The queue is per process and must be used from the event loop thread.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.database import engine
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# audit_spill[.<pid>][.replay].ndjson — no pid: file of a version with one shared spill file
+_SPILL_NAME = re.compile(r"^audit_spill(?:\.(\d+))?(?:\.replay)?\.ndjson$")
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _dump(row: dict) -> str:
+    return json.dumps({**row, "created_at": row["created_at"].isoformat()}, ensure_ascii=False)
+
+
+def _load(line: str) -> dict:
+    row = json.loads(line)
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+def _read_lines(f, size: int) -> list[str]:
+    return list(itertools.islice(f, size))
+
+
+class AuditQueue:
+    def __init__(self):
+        self._items: deque[tuple[float, dict]] = deque()  # (enqueued at, audit_log row)
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        # Spill-file I/O: one thread keeps appends, claims and replay reads in order
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-spill")
+        self._pending_spills: set[asyncio.Future] = set()
+        self.enqueued = 0
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.batches = 0
+        self.failures = 0
+        self.bad_lines = 0
+        self.max_depth = 0
+        self.last_lag_seconds: float | None = None
+
+    # ── paths ──
+
+    @property
+    def spill_path(self) -> str:
+        return os.path.join(settings.AUDIT_SPILL_DIR, f"audit_spill.{os.getpid()}.ndjson")
+
+    @property
+    def replay_path(self) -> str:
+        return os.path.join(settings.AUDIT_SPILL_DIR, f"audit_spill.{os.getpid()}.replay.ndjson")
+
+    def _claimable(self) -> list[str]:
+        """Spill / replay files this process may replay: its own and those of processes that are gone."""
+        if not os.path.isdir(settings.AUDIT_SPILL_DIR):
+            return []
+        own = os.getpid()
+        paths = []
+        for name in sorted(os.listdir(settings.AUDIT_SPILL_DIR)):
+            m = _SPILL_NAME.match(name)
+            if m is None:
+                continue
+            pid = int(m.group(1)) if m.group(1) else None
+            if pid is None or pid == own or not _pid_alive(pid):
+                paths.append(os.path.join(settings.AUDIT_SPILL_DIR, name))
+        return paths
+
+    def has_spill(self) -> bool:
+        return bool(self._pending_spills) or bool(self._claimable())
+
+    # ── producer side (flush / commit hooks) ──
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    def put(self, rows: list[dict]) -> None:
+        """Enqueue committed audit rows; overflow beyond the queue cap is spilled to disk."""
+        if not rows:
+            return
+        if self._task is None:  # committed after stop(): keep them for the next start
+            self._spill(rows)
+            self.enqueued += len(rows)
+            return
+        now = time.monotonic()
+        room = max(settings.AUDIT_QUEUE_MAX_ENTRIES - len(self._items), 0)
+        self._items.extend((now, r) for r in rows[:room])
+        if len(rows) > room:
+            self._spill(rows[room:])
+        self.enqueued += len(rows)
+        self.max_depth = max(self.max_depth, len(self._items))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _spill(self, rows: list[dict]) -> None:
+        """Schedule an append of ``rows`` to the spill file in the spill thread."""
+        self.spilled += len(rows)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # no event loop (scripts): write in place
+            self._append(rows)
+            return
+        fut = loop.run_in_executor(self._io, self._append, rows)
+        self._pending_spills.add(fut)
+        fut.add_done_callback(self._spill_done)
+
+    def _spill_done(self, fut: asyncio.Future) -> None:
+        self._pending_spills.discard(fut)
+        if not fut.cancelled() and fut.exception() is not None:
+            self.failures += 1
+            logger.error("Audit spill write failed, entries lost", exc_info=fut.exception())
+
+    def _append(self, rows: list[dict]) -> None:
+        os.makedirs(settings.AUDIT_SPILL_DIR, exist_ok=True)
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            f.writelines(_dump(r) + "\n" for r in rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _in_io(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self._io, functools.partial(fn, *args, **kwargs))
+
+    # ── writer ──
+
+    def start(self) -> None:
+        """Start the writer task (replays a spill file left by an earlier run first)."""
+        if self.running:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """Drain the queue and stop the writer; leftovers after ``timeout`` are spilled."""
+        task = self._task
+        if task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Audit queue not drained within %ss, spilling %d entries", timeout, len(self._items))
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        finally:
+            self._task = None
+            if self._items:
+                self._spill([r for _, r in self._items])
+                self._items.clear()
+            if self._pending_spills:
+                await asyncio.gather(*self._pending_spills, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            ok = await self._drain()
+            if self._stopping:
+                return
+            if not ok:
+                await asyncio.sleep(settings.AUDIT_QUEUE_RETRY_SECONDS)
+                self._wakeup.set()
+
+    async def _drain(self) -> bool:
+        """Write the memory queue, then the spill file; False after a failed write."""
+        size = max(settings.AUDIT_QUEUE_BATCH_SIZE, 1)
+        while self._items:
+            batch = [self._items.popleft() for _ in range(min(size, len(self._items)))]
+            try:
+                await self._write([r for _, r in batch])
+            except asyncio.CancelledError:
+                self._spill([r for _, r in batch])
+                raise
+            except Exception:
+                logger.exception("Audit queue write failed, spilling %d entries", len(batch) + len(self._items))
+                self.failures += 1
+                self._spill([r for _, r in itertools.chain(batch, self._items)])
+                self._items.clear()
+                return False
+            self.last_lag_seconds = time.monotonic() - batch[0][0]
+        if self.has_spill():
+            return await self._replay(size)
+        return True
+
+    async def _write(self, rows: list[dict]) -> None:
+        async with engine.begin() as conn:
+            await conn.execute(insert(AuditLog.__table__), rows)
+        self.written += len(rows)
+        self.batches += 1
+
+    def _claim(self) -> str | None:
+        """Rename the next claimable file to this process's replay file; None when nothing is left."""
+        replay = self.replay_path
+        if os.path.exists(replay):
+            return replay
+        for path in self._claimable():
+            try:
+                os.replace(path, replay)  # new overflow goes to a fresh spill file
+            except FileNotFoundError:  # claimed by another worker meanwhile
+                continue
+            return replay
+        return None
+
+    def _parse(self, lines: list[str]) -> list[dict]:
+        """Rows of the parsable lines; the others are appended to the ``.bad`` file."""
+        rows, bad = [], []
+        for line in lines:
+            try:
+                rows.append(_load(line))
+            except (ValueError, KeyError, TypeError):
+                bad.append(line if line.endswith("\n") else line + "\n")
+        if bad:
+            with open(f"{self.replay_path}.bad", "a", encoding="utf-8") as f:
+                f.writelines(bad)
+            logger.error("Audit spill replay: %d unparsable entries moved to %s.bad", len(bad), self.replay_path)
+            self.bad_lines += len(bad)
+        return rows
+
+    async def _replay(self, size: int) -> bool:
+        # Claims run in the spill thread, after any append still queued for the file
+        while (path := await self._in_io(self._claim)) is not None:
+            if not await self._replay_file(path, size):
+                return False
+        return True
+
+    async def _replay_file(self, path: str, size: int) -> bool:
+        f = await self._in_io(open, path, encoding="utf-8")
+        try:
+            while lines := await self._in_io(_read_lines, f, size):
+                rows = await self._in_io(self._parse, lines)
+                try:
+                    if rows:
+                        await self._write(rows)
+                except asyncio.CancelledError:
+                    self._keep_rest(f, path, rows)  # shutdown: no further awaits
+                    raise
+                except Exception:
+                    kept = await self._in_io(self._keep_rest, f, path, rows)
+                    logger.exception("Audit spill replay failed, %d entries kept on disk", kept)
+                    self.failures += 1
+                    return False
+                self.replayed += len(rows)
+        finally:
+            f.close()
+        await self._in_io(self._remove, path)
+        return True
+
+    @staticmethod
+    def _keep_rest(f, path: str, rows: list[dict]) -> int:
+        """Rewrite ``path`` with the failed batch and everything after it, for the next attempt."""
+        rest = [_dump(r) + "\n" for r in rows] + f.readlines()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as out:
+            out.writelines(rest)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, path)
+        return len(rest)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+    # ── metrics ──
+
+    def stats(self) -> dict:
+        spill_bytes = 0
+        for path in self._claimable():
+            with contextlib.suppress(FileNotFoundError):
+                spill_bytes += os.path.getsize(path)
+        return {
+            "running": self.running,
+            "depth": len(self._items),
+            "max_entries": settings.AUDIT_QUEUE_MAX_ENTRIES,
+            "max_depth": self.max_depth,
+            "oldest_age_seconds": round(time.monotonic() - self._items[0][0], 3) if self._items else 0.0,
+            "last_lag_seconds": round(self.last_lag_seconds, 3) if self.last_lag_seconds is not None else None,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "bad_lines": self.bad_lines,
+            "spill_bytes": spill_bytes,
+        }
+
+
+audit_queue = AuditQueue()
@@ -0,0 +1,104 @@
+"""CIS assessment scores — computed once per answer upsert and stored on the assessment.
+
+``recalc_assessment_scores`` aggregates the answers of any number of
+assessments in one grouped query: overall risk addressed, maturity rating,
+IG1/IG2/IG3 and the four dimension percentages.  The values are written to
+``cis_assessments`` together with ``scores_computed_at``, so trend charts
+read a pre-aggregated series instead of re-aggregating answers.
+
+Rows with ``scores_computed_at IS NULL`` (created before the columns
+existed) are filled by ``backfill_assessment_scores`` — see
+``scripts/backfill_cis_scores.py``.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cis import CisAssessment, CisAssessmentAnswer, CisSubControl
+
+DIMENSIONS = {
+    "policy_pct": CisAssessmentAnswer.policy_value,
+    "implementation_pct": CisAssessmentAnswer.impl_value,
+    "automation_pct": CisAssessmentAnswer.auto_value,
+    "reporting_pct": CisAssessmentAnswer.report_value,
+}
+IG_FIELDS = {"ig1_score": "1", "ig2_score": "2", "ig3_score": "3"}
+
+
+def _pct(v) -> float | None:
+    return round(float(v) * 100, 2) if v is not None else None
+
+
+async def aggregate_assessment_scores(s: AsyncSession, assessment_ids: list[int]) -> dict[int, dict]:
+    """Score fields (as stored on CisAssessment) for every assessment in one grouped query."""
+    if not assessment_ids:
+        return {}
+    answer_score = (
+        func.coalesce(CisAssessmentAnswer.policy_value, 0)
+        + func.coalesce(CisAssessmentAnswer.impl_value, 0)
+        + func.coalesce(CisAssessmentAnswer.auto_value, 0)
+        + func.coalesce(CisAssessmentAnswer.report_value, 0)
+    ) / 4
+    q = (
+        select(
+            CisAssessmentAnswer.assessment_id,
+            func.avg(answer_score).label("overall"),
+            *(
+                func.avg(case((func.find_in_set(ig, CisSubControl.implementation_groups) > 0, answer_score)))
+                .label(field)
+                for field, ig in IG_FIELDS.items()
+            ),
+            *(func.avg(col).label(field) for field, col in DIMENSIONS.items()),
+        )
+        .join(CisSubControl, CisAssessmentAnswer.sub_control_id == CisSubControl.id)
+        .where(
+            CisAssessmentAnswer.assessment_id.in_(assessment_ids),
+            CisAssessmentAnswer.is_not_applicable.is_(False),
+        )
+        .group_by(CisAssessmentAnswer.assessment_id)
+    )
+    rows = {r.assessment_id: r for r in (await s.execute(q)).all()}
+
+    out: dict[int, dict] = {}
+    for aid in assessment_ids:
+        r = rows.get(aid)
+        overall = float(r.overall or 0) if r else 0.0
+        scores = {
+            "risk_addressed_pct": round(overall * 100, 2),
+            # Maturity rating (simplified 0–5 scale)
+            "maturity_rating": round(overall * 5, 2),
+        }
+        for field in (*IG_FIELDS, *DIMENSIONS):
+            scores[field] = _pct(getattr(r, field)) if r else None
+        out[aid] = scores
+    return out
+
+
+async def recalc_assessment_scores(s: AsyncSession, assessment_ids: list[int]) -> None:
+    """Recalculate and store aggregate scores on the assessment rows (caller commits)."""
+    scores = await aggregate_assessment_scores(s, assessment_ids)
+    assessments = (await s.execute(
+        select(CisAssessment).where(CisAssessment.id.in_(assessment_ids))
+    )).scalars().all()
+    now = datetime.utcnow()
+    for a in assessments:
+        for field, value in scores[a.id].items():
+            setattr(a, field, value)
+        a.scores_computed_at = now
+
+
+async def backfill_assessment_scores(
+    s: AsyncSession, only_missing: bool = True, batch_size: int = 500,
+) -> int:
+    """Materialise scores of existing assessments in batches; returns the number updated."""
+    q = select(CisAssessment.id).order_by(CisAssessment.id)
+    if only_missing:
+        q = q.where(CisAssessment.scores_computed_at.is_(None))
+    ids = list((await s.execute(q)).scalars().all())
+    for i in range(0, len(ids), batch_size):
+        await recalc_assessment_scores(s, ids[i:i + batch_size])
+        await s.commit()
+    return len(ids)
@@ -9,7 +9,7 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import case, func, select, text
+from sqlalchemy import case, func, or_, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
@@ -29,7 +29,12 @@ from app.models.asset_category import AssetCategory
 from app.models.incident import Incident
 from app.models.vulnerability import VulnerabilityRecord
 from app.models.security_area import SecurityDomain as SecurityArea
+from app.services.cis_scores import aggregate_assessment_scores
+from app.services import risk_rollup
+from app.services.dashboard_cache import dashboard_cache
 from app.services.score_engine import calculate_all_pillars
+from app.services.score_org import get_org_unit_score
+from app.services.score_state import PILLAR_TABLES
 from app.schemas.dashboard import (
     AttackCapability,
     CisComparisonUnit,
@@ -56,6 +61,20 @@ from app.schemas.dashboard import (
 )
 
 
+# Tables read by each dashboard — cached results are evicted when any of them changes.
+_RISK_TABLES = {
+    "risks", "risk_daily_rollups", "dictionary_entries", "security_domains", "org_units", "risk_review_config",
+}
+_CIS_TABLES = {
+    "cis_assessments", "cis_assessment_answers", "cis_controls", "cis_sub_controls",
+    "cis_attack_mapping", "org_units",
+}
+_SCORE_TABLES = {"org_units"}.union(*PILLAR_TABLES.values())
+_EXECUTIVE_TABLES = _RISK_TABLES | _CIS_TABLES | _SCORE_TABLES | {
+    "frameworks", "assets", "vulnerabilities_registry", "incidents",
+}
+
+
 # ──────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────
@@ -88,10 +107,10 @@ def _attack_level(score: float | None) -> str:
 
 
 def _org_filter(col, org_unit_id: int | None):
-    """Return a WHERE clause fragment filtering by org_unit, or True (no filter)."""
+    """Return a WHERE clause fragment filtering by org_unit, or TRUE (no filter)."""
     if org_unit_id is not None:
         return col == org_unit_id
-    return True
+    return true()
 
 
 async def _get_org_ref(s: AsyncSession, org_unit_id: int | None) -> OrgUnitRef | None:
@@ -110,6 +129,7 @@ async def _get_org_ref(s: AsyncSession, org_unit_id: int | None) -> OrgUnitRef |
 #  RISK DASHBOARD
 # ══════════════════════════════════════════════
 
+@dashboard_cache.cached(_RISK_TABLES)
 async def get_risk_dashboard(s: AsyncSession, org_unit_id: int | None = None) -> RiskDashboard:
     org_ref = await _get_org_ref(s, org_unit_id)
     flt = _org_filter(Risk.org_unit_id, org_unit_id)
@@ -207,51 +227,12 @@ async def get_risk_dashboard(s: AsyncSession, org_unit_id: int | None = None) ->
             for r in org_rows
         ]
 
-    # --- risk matrix (3×3) ---
-    matrix_q = (
-        select(
-            Risk.impact_level,
-            Risk.probability_level,
-            func.count().label("cnt"),
-            func.group_concat(Risk.id).label("ids"),
-        )
-        .where(flt)
-        .group_by(Risk.impact_level, Risk.probability_level)
-    )
-    matrix_rows = (await s.execute(matrix_q)).all()
+    # --- risk matrix (3×3) and monthly trend — latest daily roll-up (written by the scheduler) ---
     matrix = [
-        RiskMatrixCell(
-            impact=r.impact_level,
-            probability=r.probability_level,
-            count=r.cnt,
-            risk_ids=[int(x) for x in r.ids.split(",")] if r.ids else [],
-        )
-        for r in matrix_rows
-    ]
-
-    # --- trend by month (last 12) ---
-    trend_q = (
-        select(
-            func.date_format(Risk.identified_at, "%Y-%m").label("period"),
-            func.sum(case((Risk.risk_level == "high", 1), else_=0)).label("high"),
-            func.sum(case((Risk.risk_level == "medium", 1), else_=0)).label("medium"),
-            func.sum(case((Risk.risk_level == "low", 1), else_=0)).label("low"),
-            func.count().label("total"),
-            func.round(func.avg(Risk.risk_score), 1).label("avg"),
-        )
-        .where(flt)
-        .group_by(text("period"))
-        .order_by(text("period"))
-        .limit(12)
-    )
-    trend_rows = (await s.execute(trend_q)).all()
-    trend = [
-        RiskTrendPoint(
-            period=r.period, high=r.high, medium=r.medium,
-            low=r.low, total=r.total, avg_score=_d(r.avg),
-        )
-        for r in trend_rows
+        RiskMatrixCell(impact=r.impact_level, probability=r.probability_level, count=r.cnt)
+        for r in await risk_rollup.risk_matrix(s, org_unit_id)
     ]
+    trend = [RiskTrendPoint(**p) for p in await risk_rollup.risk_trend(s, org_unit_id)]
 
     # --- overdue reviews ---
     overdue = await _get_overdue_risks(s, org_unit_id)
@@ -320,41 +301,75 @@ async def _latest_assessment(
     return (await s.execute(q)).scalar_one_or_none()
 
 
-async def _control_scores(
-    s: AsyncSession, assessment_id: int
-) -> list[CisControlScore]:
+def _answer_score():
+    """Average of the four CIS dimensions of one answer (0..1)."""
+    return (
+        func.coalesce(CisAssessmentAnswer.policy_value, 0)
+        + func.coalesce(CisAssessmentAnswer.impl_value, 0)
+        + func.coalesce(CisAssessmentAnswer.auto_value, 0)
+        + func.coalesce(CisAssessmentAnswer.report_value, 0)
+    ) / 4
+
+
+async def _latest_assessments(
+    s: AsyncSession, org_unit_ids: list[int | None]
+) -> dict[int | None, CisAssessment]:
+    """Latest assessment per org unit (None = whole org) in one query (ROW_NUMBER window)."""
+    ids = [uid for uid in org_unit_ids if uid is not None]
+    scope = []
+    if ids:
+        scope.append(CisAssessment.org_unit_id.in_(ids))
+    if None in org_unit_ids:
+        scope.append(CisAssessment.org_unit_id.is_(None))
+    if not scope:
+        return {}
+    ranked = (
+        select(
+            CisAssessment.id,
+            func.row_number().over(
+                partition_by=CisAssessment.org_unit_id,
+                order_by=(CisAssessment.assessment_date.desc(), CisAssessment.id.desc()),
+            ).label("rn"),
+        )
+        .where(or_(*scope))
+        .subquery()
+    )
+    q = select(CisAssessment).join(ranked, ranked.c.id == CisAssessment.id).where(ranked.c.rn == 1)
+    return {a.org_unit_id: a for a in (await s.execute(q)).scalars().all()}
+
+
+async def _control_scores_by_assessment(
+    s: AsyncSession, assessment_ids: list[int]
+) -> dict[int, list[CisControlScore]]:
+    if not assessment_ids:
+        return {}
+    applicable = CisAssessmentAnswer.is_not_applicable.is_(False)
     q = (
         select(
+            CisAssessmentAnswer.assessment_id,
             CisControl.control_number,
             CisControl.name_pl,
             CisControl.name_en,
-            func.count(case((CisAssessmentAnswer.is_not_applicable.is_(False), 1))).label("applicable"),
+            func.count(case((applicable, 1))).label("applicable"),
             func.count(case((CisAssessmentAnswer.is_not_applicable.is_(True), 1))).label("na"),
-            func.round(
-                func.avg(case((
-                    CisAssessmentAnswer.is_not_applicable.is_(False),
-                    (
-                        func.coalesce(CisAssessmentAnswer.policy_value, 0)
-                        + func.coalesce(CisAssessmentAnswer.impl_value, 0)
-                        + func.coalesce(CisAssessmentAnswer.auto_value, 0)
-                        + func.coalesce(CisAssessmentAnswer.report_value, 0)
-                    ) / 4,
-                ))) * 100, 1
-            ).label("risk_addressed"),
-            func.round(func.avg(case((CisAssessmentAnswer.is_not_applicable.is_(False), CisAssessmentAnswer.policy_value))) * 100, 1).label("policy"),
-            func.round(func.avg(case((CisAssessmentAnswer.is_not_applicable.is_(False), CisAssessmentAnswer.impl_value))) * 100, 1).label("impl"),
-            func.round(func.avg(case((CisAssessmentAnswer.is_not_applicable.is_(False), CisAssessmentAnswer.auto_value))) * 100, 1).label("auto"),
-            func.round(func.avg(case((CisAssessmentAnswer.is_not_applicable.is_(False), CisAssessmentAnswer.report_value))) * 100, 1).label("report"),
+            func.round(func.avg(case((applicable, _answer_score()))) * 100, 1).label("risk_addressed"),
+            func.round(func.avg(case((applicable, CisAssessmentAnswer.policy_value))) * 100, 1).label("policy"),
+            func.round(func.avg(case((applicable, CisAssessmentAnswer.impl_value))) * 100, 1).label("impl"),
+            func.round(func.avg(case((applicable, CisAssessmentAnswer.auto_value))) * 100, 1).label("auto"),
+            func.round(func.avg(case((applicable, CisAssessmentAnswer.report_value))) * 100, 1).label("report"),
         )
         .join(CisSubControl, CisAssessmentAnswer.sub_control_id == CisSubControl.id)
         .join(CisControl, CisSubControl.control_id == CisControl.id)
-        .where(CisAssessmentAnswer.assessment_id == assessment_id)
-        .group_by(CisControl.id, CisControl.control_number, CisControl.name_pl, CisControl.name_en)
-        .order_by(CisControl.control_number)
+        .where(CisAssessmentAnswer.assessment_id.in_(assessment_ids))
+        .group_by(
+            CisAssessmentAnswer.assessment_id,
+            CisControl.id, CisControl.control_number, CisControl.name_pl, CisControl.name_en,
+        )
+        .order_by(CisAssessmentAnswer.assessment_id, CisControl.control_number)
     )
-    rows = (await s.execute(q)).all()
-    return [
-        CisControlScore(
+    out: dict[int, list[CisControlScore]] = {aid: [] for aid in assessment_ids}
+    for r in (await s.execute(q)).all():
+        out[r.assessment_id].append(CisControlScore(
             control_number=r.control_number,
             name_pl=r.name_pl,
             name_en=r.name_en,
@@ -367,36 +382,44 @@ async def _control_scores(
                 automation_pct=_d(r.auto),
                 reporting_pct=_d(r.report),
             ),
-        )
-        for r in rows
+        ))
+    return out
+
+
+async def _control_scores(
+    s: AsyncSession, assessment_id: int
+) -> list[CisControlScore]:
+    return (await _control_scores_by_assessment(s, [assessment_id]))[assessment_id]
+
+
+async def _ig_scores_by_assessment(
+    s: AsyncSession, assessment_ids: list[int]
+) -> dict[int, CisIGScores]:
+    """IG1/IG2/IG3 scores for many assessments — one grouped query, one conditional AVG per IG."""
+    if not assessment_ids:
+        return {}
+    igs = [
+        func.round(func.avg(case((
+            func.find_in_set(value, CisSubControl.implementation_groups) > 0, _answer_score(),
+        ))) * 100, 1).label(label)
+        for label, value in (("ig1", "1"), ("ig2", "2"), ("ig3", "3"))
     ]
+    q = (
+        select(CisAssessmentAnswer.assessment_id, *igs)
+        .join(CisSubControl, CisAssessmentAnswer.sub_control_id == CisSubControl.id)
+        .where(CisAssessmentAnswer.assessment_id.in_(assessment_ids))
+        .where(CisAssessmentAnswer.is_not_applicable.is_(False))
+        .group_by(CisAssessmentAnswer.assessment_id)
+    )
+    out = {aid: CisIGScores() for aid in assessment_ids}
+    for r in (await s.execute(q)).all():
+        out[r.assessment_id] = CisIGScores(ig1=_d(r.ig1), ig2=_d(r.ig2), ig3=_d(r.ig3))
+    return out
 
 
 async def _ig_scores(s: AsyncSession, assessment_id: int) -> CisIGScores:
     """Compute IG1/IG2/IG3 scores from assessment answers."""
-    scores = CisIGScores()
-    for ig_label, ig_value in [("ig1", "1"), ("ig2", "2"), ("ig3", "3")]:
-        q = (
-            select(
-                func.round(
-                    func.avg(
-                        (
-                            func.coalesce(CisAssessmentAnswer.policy_value, 0)
-                            + func.coalesce(CisAssessmentAnswer.impl_value, 0)
-                            + func.coalesce(CisAssessmentAnswer.auto_value, 0)
-                            + func.coalesce(CisAssessmentAnswer.report_value, 0)
-                        ) / 4
-                    ) * 100, 1
-                )
-            )
-            .join(CisSubControl, CisAssessmentAnswer.sub_control_id == CisSubControl.id)
-            .where(CisAssessmentAnswer.assessment_id == assessment_id)
-            .where(CisAssessmentAnswer.is_not_applicable.is_(False))
-            .where(func.find_in_set(ig_value, CisSubControl.implementation_groups) > 0)
-        )
-        val = (await s.execute(q)).scalar()
-        setattr(scores, ig_label, _d(val))
-    return scores
+    return (await _ig_scores_by_assessment(s, [assessment_id]))[assessment_id]
 
 
 async def _attack_capabilities(
@@ -446,6 +469,7 @@ async def _attack_capabilities(
     ]
 
 
+@dashboard_cache.cached(_CIS_TABLES)
 async def get_cis_dashboard(
     s: AsyncSession, org_unit_id: int | None = None
 ) -> CisDashboard:
@@ -489,26 +513,39 @@ async def get_cis_dashboard(
 #  CIS COMPARISON  (side-by-side)
 # ══════════════════════════════════════════════
 
+@dashboard_cache.cached(_CIS_TABLES)
 async def get_cis_comparison(
     s: AsyncSession, org_unit_ids: list[int | None]
 ) -> list[CisComparisonUnit]:
+    """Side-by-side comparison in a constant number of queries, whatever the unit count."""
+    ids = {uid for uid in org_unit_ids if uid is not None}
+    org_refs = {}
+    if ids:
+        rows = (await s.execute(
+            select(OrgUnit.id, OrgUnit.name, OrgUnit.symbol).where(OrgUnit.id.in_(ids))
+        )).all()
+        org_refs = {r.id: OrgUnitRef(id=r.id, name=r.name, symbol=r.symbol) for r in rows}
+
+    latest = await _latest_assessments(s, org_unit_ids)
+    assessment_ids = [a.id for a in latest.values()]
+    controls = await _control_scores_by_assessment(s, assessment_ids)
+    igs = await _ig_scores_by_assessment(s, assessment_ids)
+
     result: list[CisComparisonUnit] = []
     for uid in org_unit_ids:
-        org_ref = await _get_org_ref(s, uid)
-        assessment = await _latest_assessment(s, uid)
+        org_ref = org_refs.get(uid)
+        assessment = latest.get(uid)
         if assessment is None:
             result.append(CisComparisonUnit(org_unit=org_ref))
             continue
-        controls = await _control_scores(s, assessment.id)
-        ig = await _ig_scores(s, assessment.id)
         result.append(CisComparisonUnit(
             org_unit=org_ref,
             assessment_id=assessment.id,
             assessment_date=assessment.assessment_date,
             maturity_rating=_d(assessment.maturity_rating),
             risk_addressed_pct=_d(assessment.risk_addressed_pct),
-            ig_scores=ig,
-            controls=controls,
+            ig_scores=igs[assessment.id],
+            controls=controls[assessment.id],
         ))
     return result
 
@@ -517,6 +554,7 @@ async def get_cis_comparison(
 #  CIS TREND
 # ══════════════════════════════════════════════
 
+@dashboard_cache.cached(_CIS_TABLES)
 async def get_cis_trend(
     s: AsyncSession, org_unit_id: int | None = None
 ) -> CisTrend:
@@ -528,18 +566,31 @@ async def get_cis_trend(
     )
     assessments = (await s.execute(q)).scalars().all()
 
-    points: list[CisTrendPoint] = []
-    for a in assessments:
-        ig = await _ig_scores(s, a.id)
-        points.append(CisTrendPoint(
+    # Scores are materialised on answer upsert; rows not yet backfilled are aggregated on the fly
+    missing = await aggregate_assessment_scores(
+        s, [a.id for a in assessments if a.scores_computed_at is None]
+    )
+
+    def _score(a: CisAssessment, field: str, digits: int = 2) -> float | None:
+        v = missing[a.id][field] if a.id in missing else _d(getattr(a, field))
+        return round(v, digits) if v is not None else None
+
+    points = [
+        CisTrendPoint(
             assessment_id=a.id,
             assessment_date=a.assessment_date,
             maturity_rating=_d(a.maturity_rating),
             risk_addressed_pct=_d(a.risk_addressed_pct),
-            ig1=ig.ig1,
-            ig2=ig.ig2,
-            ig3=ig.ig3,
-        ))
+            ig1=_score(a, "ig1_score", 1),
+            ig2=_score(a, "ig2_score", 1),
+            ig3=_score(a, "ig3_score", 1),
+            policy_pct=_score(a, "policy_pct"),
+            implementation_pct=_score(a, "implementation_pct"),
+            automation_pct=_score(a, "automation_pct"),
+            reporting_pct=_score(a, "reporting_pct"),
+        )
+        for a in assessments
+    ]
 
     return CisTrend(org_unit=org_ref, points=points)
 
@@ -585,13 +636,18 @@ def _score_rating(score: float) -> str:
     return "Krytyczny"
 
 
+@dashboard_cache.cached(_SCORE_TABLES)
 async def get_posture_score(
     s: AsyncSession, org_unit_id: int | None = None
 ) -> PostureScoreResponse:
     org_ref = await _get_org_ref(s, org_unit_id)
 
-    # Use the 10-pillar Security Score engine
-    result = await calculate_all_pillars(s)
+    # Use the 10-pillar Security Score engine; a unit gets its subtree roll-up
+    result = None
+    if org_ref is not None:
+        result = await get_org_unit_score(s, org_ref.id)
+    if result is None:
+        result = await calculate_all_pillars(s)
 
     total = result["total_score"]
     dims = []
@@ -616,6 +672,7 @@ async def get_posture_score(
         dimensions=dims,
         config_version=result["config_version"],
         benchmark_avg=None,
+        timings_ms=result.get("timings_ms"),
     )
 
 
@@ -623,6 +680,7 @@ async def get_posture_score(
 #  EXECUTIVE SUMMARY
 # ══════════════════════════════════════════════
 
+@dashboard_cache.cached(_EXECUTIVE_TABLES)
 async def get_executive_summary(
     s: AsyncSession, org_unit_id: int | None = None
 ) -> ExecutiveSummary:
@@ -0,0 +1,197 @@
+"""
+Process-wide LRU cache for dashboard responses.
+
+Dashboard aggregates are expensive and their source tables change a few
+times an hour, so results of the public ``app.services.dashboard`` functions
+are kept in memory, keyed by function and arguments (``org_unit_id`` …).
+
+Every entry is tagged with the tables its function reads.  The table-change
+hooks in ``app.middleware.audit_auto`` evict exactly the entries whose tags
+intersect the written tables (on flush, commit and rollback — including bulk
+``update()`` and raw SQL).  ``DASHBOARD_CACHE_TTL_SECONDS`` is a safety net
+for writes made by other processes and for values that depend on the clock
+(overdue reviews, SLA breaches).
+
+Size is capped both by entry count (``DASHBOARD_CACHE_MAX_ENTRIES``; 0
+disables the cache) and by the approximate JSON size of the cached responses
+(``DASHBOARD_CACHE_MAX_BYTES``); the least recently used entries go first.
+
+Usage:
+    from app.services.dashboard_cache import dashboard_cache
+
+    @dashboard_cache.cached({"risks", "org_units"})
+    async def get_risk_dashboard(s, org_unit_id=None): ...
+
+Cached values are shared between requests — callers must not mutate them.
+"""
+from __future__ import annotations
+
+import functools
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.config import settings
+from app.middleware.audit_auto import add_table_change_listener
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: object
+    tables: frozenset[str]
+    size: int
+    stored_at: float
+
+
+def _approx_size(value) -> int:
+    if isinstance(value, (list, tuple)):
+        return sum(_approx_size(v) for v in value)
+    dump = getattr(value, "model_dump_json", None)
+    if dump is not None:
+        return len(dump())
+    return sys.getsizeof(value)
+
+
+def _freeze(v):
+    return tuple(v) if isinstance(v, (list, set)) else v
+
+
+class DashboardCache:
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._bytes = 0
+        # Per-table write counters: a value computed while one of its tables
+        # was written is not stored (it may already be stale).
+        self._table_versions: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ── limits ──
+
+    def _max_entries(self) -> int:
+        return self.max_entries if self.max_entries is not None else settings.DASHBOARD_CACHE_MAX_ENTRIES
+
+    def _max_bytes(self) -> int:
+        return self.max_bytes if self.max_bytes is not None else settings.DASHBOARD_CACHE_MAX_BYTES
+
+    def _ttl(self) -> float:
+        return self.ttl_seconds if self.ttl_seconds is not None else settings.DASHBOARD_CACHE_TTL_SECONDS
+
+    # ── lifecycle ──
+
+    def _drop(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def invalidate_tables(self, tables: set[str]) -> int:
+        """Evict every entry tagged with one of ``tables``; returns the number evicted."""
+        for t in tables:
+            self._table_versions[t] = self._table_versions.get(t, 0) + 1
+        stale = [k for k, e in self._entries.items() if not e.tables.isdisjoint(tables)]
+        for k in stale:
+            self._drop(k)
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    # ── get / put ──
+
+    def get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        ttl = self._ttl()
+        if ttl > 0 and time.monotonic() - entry.stored_at >= ttl:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, value, tables: frozenset[str], versions: tuple[int, ...] | None = None) -> bool:
+        """Store ``value`` unless caching is off, it is too big, or its tables changed since ``versions``."""
+        max_entries, max_bytes = self._max_entries(), self._max_bytes()
+        if max_entries <= 0:
+            return False
+        if versions is not None and versions != self._versions(tables):
+            return False
+        size = _approx_size(value)
+        if max_bytes > 0 and size > max_bytes:
+            return False
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = _Entry(value, tables, size, time.monotonic())
+        self._bytes += size
+        while self._entries and (len(self._entries) > max_entries or (max_bytes > 0 and self._bytes > max_bytes)):
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+        return True
+
+    def _versions(self, tables: frozenset[str]) -> tuple[int, ...]:
+        return tuple(self._table_versions.get(t, 0) for t in sorted(tables))
+
+    # ── decorator ──
+
+    def cached(self, tables):
+        """Cache an ``async fn(s, *args)``; the session is not part of the key."""
+        tags = frozenset(tables)
+
+        def decorator(fn):
+            name = f"{fn.__module__}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            async def wrapper(s, *args, **kwargs):
+                key = (name, tuple(_freeze(a) for a in args),
+                       tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+                entry = self.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry.value
+                self.misses += 1
+                versions = self._versions(tags)
+                value = await fn(s, *args, **kwargs)
+                self.put(key, value, tags, versions)
+                return value
+
+            wrapper.cache_tables = tags
+            return wrapper
+
+        return decorator
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self._max_entries(),
+            "max_bytes": self._max_bytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+dashboard_cache = DashboardCache()
+
+
+@add_table_change_listener
+def _on_table_change(tables: set[str], phase: str) -> None:
+    dashboard_cache.invalidate_tables(tables)
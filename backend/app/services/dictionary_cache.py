@@ -0,0 +1,183 @@
+"""
+Process-wide cache of dictionary entries and types.
+
+Dictionary labels are resolved for almost every row the API returns
+(status, severity, category…).  Instead of one ``session.get`` per id the
+whole ``dictionary_entries`` / ``dictionary_types`` tables are loaded in a
+single pass and kept in memory.
+
+Invalidation is write-through: the table-change hooks in
+``app.middleware.audit_auto`` drop the cache whenever a session flushes,
+commits or rolls back a change to either table (including bulk ``update()``
+and raw SQL).  ``DICT_CACHE_TTL_SECONDS`` is a safety net for writes made by
+other processes (e.g. a second uvicorn worker or a maintenance script).
+
+Usage:
+    from app.services.dictionary_cache import dict_cache
+
+    name = await dict_cache.label(s, risk.status_id)
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.middleware.audit_auto import add_table_change_listener
+from app.models.dictionary import DictionaryEntry, DictionaryType
+
+DICTIONARY_TABLES = frozenset({"dictionary_entries", "dictionary_types"})
+
+
+@dataclass(frozen=True, slots=True)
+class CachedEntry:
+    id: int
+    dict_type_id: int
+    code: str | None
+    label: str
+    color: str | None
+    is_active: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CachedType:
+    id: int
+    code: str
+    name: str
+
+
+class DictionaryCache:
+    def __init__(self, ttl_seconds: float | None = None):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[int, CachedEntry] = {}
+        self._types: dict[int, CachedType] = {}
+        self._type_ids: dict[str, int] = {}
+        self._loaded_at: float | None = None
+        # Bumped on every invalidation so a load racing with a write is discarded
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    # ── lifecycle ──
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._loaded_at = None
+        self._entries = {}
+        self._types = {}
+        self._type_ids = {}
+        self.invalidations += 1
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.loads = self.invalidations = 0
+
+    def _is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        ttl = self.ttl_seconds if self.ttl_seconds is not None else settings.DICT_CACHE_TTL_SECONDS
+        return ttl <= 0 or time.monotonic() - self._loaded_at < ttl
+
+    async def ensure_loaded(self, s: AsyncSession) -> None:
+        if self._is_fresh():
+            return
+        generation = self._generation
+        type_rows = (await s.execute(
+            select(DictionaryType.id, DictionaryType.code, DictionaryType.name)
+        )).all()
+        entry_rows = (await s.execute(
+            select(
+                DictionaryEntry.id, DictionaryEntry.dict_type_id, DictionaryEntry.code,
+                DictionaryEntry.label, DictionaryEntry.color, DictionaryEntry.is_active,
+            )
+        )).all()
+        if generation != self._generation:
+            # A dictionary write happened while we were reading — don't keep it.
+            return
+        self._types = {r.id: CachedType(r.id, r.code, r.name) for r in type_rows}
+        self._type_ids = {t.code: t.id for t in self._types.values()}
+        self._entries = {
+            r.id: CachedEntry(r.id, r.dict_type_id, r.code, r.label, r.color, bool(r.is_active))
+            for r in entry_rows
+        }
+        self._loaded_at = time.monotonic()
+        self.loads += 1
+
+    # ── lookups ──
+
+    async def entry(self, s: AsyncSession, entry_id: int | None) -> CachedEntry | None:
+        if not entry_id:
+            return None
+        await self.ensure_loaded(s)
+        e = self._entries.get(entry_id)
+        if e is not None:
+            self.hits += 1
+            return e
+        # Not cached (unknown id, or the cache was just invalidated) — ask the session.
+        self.misses += 1
+        row = await s.get(DictionaryEntry, entry_id)
+        if row is None:
+            return None
+        return CachedEntry(row.id, row.dict_type_id, row.code, row.label, row.color, bool(row.is_active))
+
+    async def label(self, s: AsyncSession, entry_id: int | None) -> str | None:
+        e = await self.entry(s, entry_id)
+        return e.label if e else None
+
+    async def code(self, s: AsyncSession, entry_id: int | None) -> str | None:
+        e = await self.entry(s, entry_id)
+        return e.code if e else None
+
+    async def color(self, s: AsyncSession, entry_id: int | None) -> str | None:
+        e = await self.entry(s, entry_id)
+        return e.color if e else None
+
+    async def labels(self, s: AsyncSession, entry_ids) -> dict[int, str]:
+        """Bulk variant: {entry_id: label} for every known id in ``entry_ids``."""
+        out: dict[int, str] = {}
+        for eid in set(entry_ids):
+            label = await self.label(s, eid)
+            if label is not None:
+                out[eid] = label
+        return out
+
+    async def label_map(self, s: AsyncSession) -> dict[int, str]:
+        """Snapshot {entry_id: label} of all entries — for loops that must not query (e.g. while streaming)."""
+        await self.ensure_loaded(s)
+        return {eid: e.label for eid, e in self._entries.items()}
+
+    async def type_entries(self, s: AsyncSession, type_code: str) -> list[CachedEntry]:
+        """All cached entries of a dictionary type (by type code)."""
+        await self.ensure_loaded(s)
+        type_id = self._type_ids.get(type_code)
+        if type_id is None:
+            self.misses += 1
+            return []
+        self.hits += 1
+        return [e for e in self._entries.values() if e.dict_type_id == type_id]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "types": len(self._types),
+            "loaded": self._loaded_at is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+        }
+
+
+dict_cache = DictionaryCache()
+
+
+@add_table_change_listener
+def _on_table_change(tables: set[str], phase: str) -> None:
+    if tables & DICTIONARY_TABLES:
+        dict_cache.invalidate()
@@ -18,10 +18,10 @@ Grade: A(≥90) B(≥75) C(≥60) D(≥40) F(<40)
 """
 from __future__ import annotations
 
-from sqlalchemy import case, func, select
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.cis import CisAssessment, CisAssessmentAnswer, CisControl, CisSubControl
+from app.models.cis import CisAssessment, CisAssessmentAnswer, CisSubControl
 from app.models.org_unit import OrgUnit
 from app.models.risk import Risk
 from app.models.security_area import DomainCisControl, SecurityDomain
@@ -59,45 +59,113 @@ async def _latest_assessment_id(s: AsyncSession, org_unit_id: int | None) -> int
     return (await s.execute(q)).scalar()
 
 
-async def _cis_score_for_controls(
-    s: AsyncSession, cis_control_ids: list[int], assessment_id: int
-) -> float | None:
-    """Average risk_addressed_pct for specific CIS controls in an assessment."""
-    if not cis_control_ids:
-        return None
-
+async def _risk_stats_by_domain(s: AsyncSession, domain_ids: list[int], risk_flt) -> dict:
+    """Risk count / level split / average score per domain — one grouped query."""
     q = (
         select(
-            func.round(
-                func.avg(
-                    case(
-                        (
-                            CisAssessmentAnswer.is_not_applicable.is_(False),
-                            (
-                                func.coalesce(CisAssessmentAnswer.policy_value, 0)
-                                + func.coalesce(CisAssessmentAnswer.impl_value, 0)
-                                + func.coalesce(CisAssessmentAnswer.auto_value, 0)
-                                + func.coalesce(CisAssessmentAnswer.report_value, 0)
-                            ) / 4,
-                        )
-                    )
-                )
-                * 100,
-                1,
-            )
+            Risk.security_area_id,
+            func.count(Risk.id).label("cnt"),
+            func.sum(case((Risk.risk_level == "high", 1), else_=0)).label("high"),
+            func.sum(case((Risk.risk_level == "medium", 1), else_=0)).label("medium"),
+            func.sum(case((Risk.risk_level == "low", 1), else_=0)).label("low"),
+            func.avg(Risk.risk_score).label("avg"),
+        )
+        .where(risk_flt)
+        .where(Risk.security_area_id.in_(domain_ids))
+        .group_by(Risk.security_area_id)
+    )
+    return {r.security_area_id: r for r in (await s.execute(q)).all()}
+
+
+async def _cis_by_domain(
+    s: AsyncSession, domain_ids: list[int], assessment_id: int | None
+) -> dict[int, tuple[int, float | None]]:
+    """(mapped CIS control count, avg risk_addressed_pct in the assessment) per domain.
+
+    Answers are outer-joined, so domains with mapped controls but no answers
+    (or no assessment) still report their control count.
+    """
+    answer_score = case(
+        (
+            CisAssessmentAnswer.is_not_applicable.is_(False),
+            (
+                func.coalesce(CisAssessmentAnswer.policy_value, 0)
+                + func.coalesce(CisAssessmentAnswer.impl_value, 0)
+                + func.coalesce(CisAssessmentAnswer.auto_value, 0)
+                + func.coalesce(CisAssessmentAnswer.report_value, 0)
+            ) / 4,
+        )
+    )
+    q = (
+        select(
+            DomainCisControl.domain_id,
+            func.count(DomainCisControl.cis_control_id.distinct()).label("controls"),
+            func.round(func.avg(answer_score) * 100, 1).label("pct"),
+        )
+        .select_from(DomainCisControl)
+        .outerjoin(CisSubControl, CisSubControl.control_id == DomainCisControl.cis_control_id)
+        .outerjoin(
+            CisAssessmentAnswer,
+            and_(
+                CisAssessmentAnswer.sub_control_id == CisSubControl.id,
+                CisAssessmentAnswer.assessment_id == assessment_id,
+            ),
+        )
+        .where(DomainCisControl.domain_id.in_(domain_ids))
+        .group_by(DomainCisControl.domain_id)
+    )
+    return {
+        r.domain_id: (r.controls, float(r.pct) if r.pct is not None and assessment_id else None)
+        for r in (await s.execute(q)).all()
+    }
+
+
+async def _top_risks_by_domain(
+    s: AsyncSession, domain_ids: list[int], risk_flt, top_n: int
+) -> dict[int, list[DomainTopRisk]]:
+    """Top ``top_n`` risks by score per domain — one ROW_NUMBER() windowed query."""
+    out: dict[int, list[DomainTopRisk]] = {}
+    if top_n <= 0:
+        return out
+    ranked = (
+        select(
+            Risk.id,
+            Risk.security_area_id,
+            Risk.asset_name,
+            Risk.risk_score,
+            Risk.risk_level,
+            OrgUnit.name.label("org_unit_name"),
+            func.row_number().over(
+                partition_by=Risk.security_area_id,
+                order_by=(Risk.risk_score.desc(), Risk.id),
+            ).label("rn"),
         )
-        .join(CisSubControl, CisAssessmentAnswer.sub_control_id == CisSubControl.id)
-        .where(CisAssessmentAnswer.assessment_id == assessment_id)
-        .where(CisSubControl.control_id.in_(cis_control_ids))
+        .join(OrgUnit, Risk.org_unit_id == OrgUnit.id)
+        .where(risk_flt)
+        .where(Risk.security_area_id.in_(domain_ids))
+        .subquery()
     )
-    val = (await s.execute(q)).scalar()
-    return float(val) if val is not None else None
+    q = select(ranked).where(ranked.c.rn <= top_n).order_by(ranked.c.security_area_id, ranked.c.rn)
+    for r in (await s.execute(q)).all():
+        out.setdefault(r.security_area_id, []).append(DomainTopRisk(
+            id=r.id,
+            asset_name=r.asset_name,
+            risk_score=float(r.risk_score),
+            risk_level=r.risk_level,
+            org_unit_name=r.org_unit_name,
+        ))
+    return out
 
 
 async def get_domain_dashboard(
-    s: AsyncSession, org_unit_id: int | None = None
+    s: AsyncSession, org_unit_id: int | None = None, top_n: int = 3
 ) -> DomainDashboardResponse:
-    """Build the full domain dashboard with score cards."""
+    """Build the full domain dashboard with score cards.
+
+    The number of queries does not depend on the number of domains: one
+    grouped pass each for risk stats and CIS coverage plus one windowed
+    query for the top ``top_n`` risks of every domain.
+    """
 
     # Org info
     org_name = None
@@ -112,36 +180,31 @@ async def get_domain_dashboard(
         .order_by(SecurityDomain.sort_order, SecurityDomain.name)
     )
     domains = (await s.execute(domains_q)).scalars().all()
-
-    # Latest CIS assessment
-    assessment_id = await _latest_assessment_id(s, org_unit_id)
+    domain_ids = [d.id for d in domains]
 
     # Org filter for risks
     risk_flt = Risk.is_active.is_(True)
     if org_unit_id is not None:
         risk_flt = risk_flt & (Risk.org_unit_id == org_unit_id)
 
+    if domain_ids:
+        # Latest CIS assessment
+        assessment_id = await _latest_assessment_id(s, org_unit_id)
+        stats_by_domain = await _risk_stats_by_domain(s, domain_ids, risk_flt)
+        cis_by_domain = await _cis_by_domain(s, domain_ids, assessment_id)
+        top_by_domain = await _top_risks_by_domain(s, domain_ids, risk_flt, top_n)
+    else:
+        stats_by_domain, cis_by_domain, top_by_domain = {}, {}, {}
+
     cards: list[DomainScoreOut] = []
 
     for domain in domains:
-        # Risk stats for this domain
-        risk_stats_q = (
-            select(
-                func.count(Risk.id).label("cnt"),
-                func.sum(case((Risk.risk_level == "high", 1), else_=0)).label("high"),
-                func.sum(case((Risk.risk_level == "medium", 1), else_=0)).label("medium"),
-                func.sum(case((Risk.risk_level == "low", 1), else_=0)).label("low"),
-                func.avg(Risk.risk_score).label("avg"),
-            )
-            .where(risk_flt)
-            .where(Risk.security_area_id == domain.id)
-        )
-        stats = (await s.execute(risk_stats_q)).first()
-        risk_count = stats.cnt or 0
-        risk_high = stats.high or 0
-        risk_medium = stats.medium or 0
-        risk_low = stats.low or 0
-        avg_risk = float(stats.avg) if stats.avg is not None else None
+        stats = stats_by_domain.get(domain.id)
+        risk_count = stats.cnt if stats else 0
+        risk_high = (stats.high or 0) if stats else 0
+        risk_medium = (stats.medium or 0) if stats else 0
+        risk_low = (stats.low or 0) if stats else 0
+        avg_risk = float(stats.avg) if stats and stats.avg is not None else None
 
         # Risk dimension
         if avg_risk is not None:
@@ -150,15 +213,7 @@ async def get_domain_dashboard(
             risk_dim = 100.0  # No risks = perfect score
 
         # CIS dimension
-        cis_control_ids_q = (
-            select(DomainCisControl.cis_control_id)
-            .where(DomainCisControl.domain_id == domain.id)
-        )
-        cis_control_ids = list((await s.execute(cis_control_ids_q)).scalars().all())
-        cis_pct = None
-
-        if cis_control_ids and assessment_id:
-            cis_pct = await _cis_score_for_controls(s, cis_control_ids, assessment_id)
+        cis_control_count, cis_pct = cis_by_domain.get(domain.id, (0, None))
 
         # Final score
         if cis_pct is not None:
@@ -168,33 +223,6 @@ async def get_domain_dashboard(
 
         score = round(min(100, max(0, score)), 1)
 
-        # Top 3 risks in this domain
-        top_q = (
-            select(
-                Risk.id,
-                Risk.asset_name,
-                Risk.risk_score,
-                Risk.risk_level,
-                OrgUnit.name.label("org_unit_name"),
-            )
-            .join(OrgUnit, Risk.org_unit_id == OrgUnit.id)
-            .where(risk_flt)
-            .where(Risk.security_area_id == domain.id)
-            .order_by(Risk.risk_score.desc())
-            .limit(3)
-        )
-        top_rows = (await s.execute(top_q)).all()
-        top_risks = [
-            DomainTopRisk(
-                id=r.id,
-                asset_name=r.asset_name,
-                risk_score=float(r.risk_score),
-                risk_level=r.risk_level,
-                org_unit_name=r.org_unit_name,
-            )
-            for r in top_rows
-        ]
-
         cards.append(DomainScoreOut(
             domain_id=domain.id,
             domain_name=domain.name,
@@ -209,8 +237,8 @@ async def get_domain_dashboard(
             risk_low=risk_low,
             avg_risk_score=round(avg_risk, 1) if avg_risk is not None else None,
             cis_pct=cis_pct,
-            cis_control_count=len(cis_control_ids),
-            top_risks=top_risks,
+            cis_control_count=cis_control_count,
+            top_risks=top_by_domain.get(domain.id, []),
         ))
 
     # Overall score = weighted average by risk count (min weight 1 per domain)
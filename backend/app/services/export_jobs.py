@@ -0,0 +1,287 @@
+"""
+Background export jobs with cached XLSX artefacts.
+
+Large exports no longer hold a request open while they are built:
+
+    POST /api/v1/exports                 {"kind": "risks", "params": {"org_unit_id": 3}}  -> 202 job
+    GET  /api/v1/exports/{job_id}        status: queued | running | done | failed
+    GET  /api/v1/exports/{job_id}/download
+
+Report builders register themselves with ``register_export`` (next to the
+synchronous endpoint they share the code with).  A job runs as a task on the
+event loop with its own session; at most ``EXPORT_JOB_WORKERS`` jobs build at
+the same time, the rest wait for a slot.  Only the queries run on the loop:
+builders hand each cursor batch to ``SheetWriter.extend``, which writes the
+rows in a worker thread, and the workbook is saved to ``EXPORT_DIR`` in a
+worker thread as well.
+
+Artefacts are keyed by kind, parameters and a data version of the tables
+the report reads (row count, highest primary key and latest ``updated_at``
+of each, read with one query), so every worker derives the same key for
+the same data.  The key is also the job id.  Submitting an export whose data
+has not changed returns the finished job — or the one still running —
+instead of building the file again.
+
+Job state is kept next to the artefact in ``EXPORT_DIR`` as a JSON manifest
+(``<job_id>.json``, replaced atomically on every status change), so status
+polls and downloads work on any worker (``uvicorn --workers N``, no sticky
+sessions).  Finished jobs and their files — and jobs left "running" by a
+worker that died — are removed after ``EXPORT_RETENTION_MINUTES`` by
+``run_prune_scheduler`` (started on app startup) and on every submit.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import async_session
+from app.models.base import Base
+
+logger = logging.getLogger(__name__)
+
+Builder = Callable[..., Awaitable]  # async (session, **params) -> openpyxl Workbook
+
+
+@dataclass(frozen=True, slots=True)
+class ExportSpec:
+    kind: str
+    build: Builder
+    tables: frozenset[str]
+    params: tuple[str, ...]
+    filename_prefix: str
+
+
+@dataclass(slots=True)
+class ExportJob:
+    id: str
+    kind: str
+    params: dict
+    status: str = "queued"
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: datetime | None = None
+    path: str | None = None
+    size: int | None = None
+    error: str | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(dataclasses.asdict(self), default=datetime.isoformat)
+
+    @classmethod
+    def from_json(cls, raw: str) -> ExportJob:
+        data = json.loads(raw)
+        for f in ("created_at", "finished_at"):
+            if data.get(f):
+                data[f] = datetime.fromisoformat(data[f])
+        return cls(**data)
+
+
+_specs: dict[str, ExportSpec] = {}
+_tasks: set[asyncio.Task] = set()
+_slots: asyncio.Semaphore | None = None
+_JOB_ID = re.compile(r"[0-9a-f]{24}")
+
+
+def register_export(kind: str, tables, params: tuple[str, ...] = (), filename_prefix: str = "raport"):
+    """Decorator: make an async workbook builder available as an export job ``kind``."""
+    def decorator(fn: Builder) -> Builder:
+        _specs[kind] = ExportSpec(kind, fn, frozenset(tables), tuple(params), filename_prefix)
+        return fn
+    return decorator
+
+
+def export_kinds() -> dict[str, tuple[str, ...]]:
+    return {k: spec.params for k, spec in sorted(_specs.items())}
+
+
+def _validate(kind: str, params: dict) -> ExportSpec:
+    spec = _specs.get(kind)
+    if spec is None:
+        raise HTTPException(400, f"Nieznany typ eksportu: {kind}. Dostepne: {', '.join(sorted(_specs))}")
+    unknown = set(params) - set(spec.params)
+    if unknown:
+        raise HTTPException(400, f"Nieznane parametry eksportu: {', '.join(sorted(unknown))}")
+    return spec
+
+
+async def _data_version(s: AsyncSession, tables: frozenset[str]) -> str:
+    """Row count, highest primary key and latest ``updated_at`` of ``tables`` (one query)."""
+    cols = []
+    for name in sorted(tables):
+        t = Base.metadata.tables.get(name)
+        if t is None:
+            continue
+        cols.append(select(func.count()).select_from(t).scalar_subquery())
+        pk = list(t.primary_key.columns)
+        if len(pk) == 1:
+            cols.append(select(func.max(pk[0])).scalar_subquery())
+        if "updated_at" in t.c:
+            cols.append(select(func.max(t.c.updated_at)).scalar_subquery())
+    if not cols:
+        return ""
+    return ",".join(map(str, (await s.execute(select(*cols))).one()))
+
+
+async def _cache_key(spec: ExportSpec, params: dict) -> str:
+    canonical = "&".join(f"{k}={params[k]}" for k in sorted(params) if params[k] is not None)
+    async with async_session() as s:
+        version = await _data_version(s, spec.tables)
+    raw = f"export:{spec.kind}?{canonical}|{version}"
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+def _manifest_path(job_id: str) -> str:
+    return os.path.join(settings.EXPORT_DIR, f"{job_id}.json")
+
+
+def _store(job: ExportJob) -> None:
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    path = _manifest_path(job.id)
+    part = f"{path}.{uuid.uuid4().hex}.part"
+    with open(part, "w", encoding="utf-8") as f:
+        f.write(job.to_json())
+    os.replace(part, path)
+
+
+def _load(job_id: str) -> ExportJob | None:
+    if not _JOB_ID.fullmatch(job_id):
+        return None
+    try:
+        with open(_manifest_path(job_id), encoding="utf-8") as f:
+            return ExportJob.from_json(f.read())
+    except (FileNotFoundError, ValueError, TypeError):
+        return None
+
+
+def _artefact_ready(job: ExportJob) -> bool:
+    return job.status == "done" and job.path is not None and os.path.exists(job.path)
+
+
+async def submit(kind: str, params: dict) -> tuple[ExportJob, bool]:
+    """Queue an export, or return the in-flight job / finished artefact for the same data.
+
+    The flag is True when a finished artefact is reused.
+    """
+    spec = _validate(kind, params)
+    await run_in_threadpool(prune)
+    key = await _cache_key(spec, params)
+
+    existing = await run_in_threadpool(_load, key)
+    if existing is not None and (
+        existing.status in ("queued", "running") or await run_in_threadpool(_artefact_ready, existing)
+    ):
+        return existing, existing.status == "done"
+
+    job = ExportJob(id=key, kind=kind, params=dict(params))
+    await run_in_threadpool(_store, job)
+    task = asyncio.create_task(_run(spec, job))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job, False
+
+
+async def get_job(job_id: str) -> ExportJob:
+    job = await run_in_threadpool(_load, job_id)
+    if job is None:
+        raise HTTPException(404, "Zadanie eksportu nie znalezione (wygaslo)")
+    return job
+
+
+def download_name(job: ExportJob) -> str:
+    prefix = _specs[job.kind].filename_prefix if job.kind in _specs else "raport"
+    return f"{prefix}_{(job.finished_at or job.created_at).strftime('%Y%m%d_%H%M')}.xlsx"
+
+
+def _save(wb, path: str) -> int:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique part name: two workers may build the same key at the same time
+    part = f"{path}.{uuid.uuid4().hex}.part"
+    try:
+        wb.save(part)
+        os.replace(part, path)
+    finally:
+        if os.path.exists(part):
+            os.unlink(part)
+    return os.path.getsize(path)
+
+
+async def _run(spec: ExportSpec, job: ExportJob) -> None:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(settings.EXPORT_JOB_WORKERS, 1))
+    async with _slots:
+        job.status = "running"
+        path = os.path.join(settings.EXPORT_DIR, f"{spec.kind}_{job.id}.xlsx")
+        try:
+            await run_in_threadpool(_store, job)
+            async with async_session() as s:
+                wb = await spec.build(s, **job.params)
+            job.size = await run_in_threadpool(_save, wb, path)
+            job.path = path
+            job.status = "done"
+        except Exception as exc:
+            logger.exception("Export job %s (%s) failed", job.id, spec.kind)
+            job.status = "failed"
+            job.error = str(exc) or exc.__class__.__name__
+        finally:
+            job.finished_at = datetime.utcnow()
+            await run_in_threadpool(_store, job)
+
+
+def prune() -> int:
+    """Drop jobs and artefact files older than the retention; returns removed jobs.
+
+    A manifest is rewritten on every status change, so its mtime is the time
+    the job finished (or last changed state, for jobs of a dead worker).
+    """
+    if not os.path.isdir(settings.EXPORT_DIR):
+        return 0
+    cutoff = time.time() - settings.EXPORT_RETENTION_MINUTES * 60
+    removed = 0
+    for name in os.listdir(settings.EXPORT_DIR):
+        path = os.path.join(settings.EXPORT_DIR, name)
+        with contextlib.suppress(FileNotFoundError):
+            if not os.path.isfile(path) or os.path.getmtime(path) >= cutoff:
+                continue
+            if name.endswith(".json"):
+                job = _load(name[:-5])
+                if job is not None and job.path:
+                    _remove(job.path)
+                removed += 1
+            # Manifests, artefacts and leftovers of interrupted builds
+            _remove(path)
+    return removed
+
+
+def _remove(path: str) -> None:
+    # Another worker may prune the same directory at the same time
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+
+async def run_prune_scheduler(poll_seconds: int) -> None:
+    """In-process clean-up of expired export jobs and artefacts (started on app startup)."""
+    while True:
+        try:
+            removed = await run_in_threadpool(prune)
+            if removed:
+                logger.info("Pruned %d expired export job(s)", removed)
+        except Exception:
+            logger.exception("Export job clean-up failed")
+        await asyncio.sleep(poll_seconds)
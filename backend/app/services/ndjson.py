@@ -0,0 +1,69 @@
+"""
+NDJSON streaming for large register reads.
+
+With ``Accept: application/x-ndjson`` the main list endpoints answer with one
+JSON object per line instead of a JSON array.  Rows come from a server-side
+cursor (``stream_scalars``) in batches of ``NDJSON_BATCH_SIZE``; every batch
+goes through the endpoint's bulk loader (names, labels, M2M) and is written
+out before the next one is fetched, so memory stays flat and the first line
+is sent after the first batch — independent of the table size.
+
+The response outlives the request's session dependency, so the stream opens
+its own sessions: one holds the cursor, the other runs the per-batch lookups
+(MariaDB cannot run other statements on a connection with an open unbuffered
+cursor).  ``limit`` / ``cursor`` do not apply; ``sort`` and ``fields`` do.
+
+Usage in a router:
+    from app.services.ndjson import ndjson_response, wants_ndjson
+
+    async def list_risks(..., ndjson: bool = Depends(wants_ndjson)):
+        if ndjson:
+            return ndjson_response(sort_query(q, _SORT, page.sort), lambda s, batch: _risk_outs(s, batch))
+"""
+from __future__ import annotations
+
+import json
+from collections.abc import Awaitable, Callable
+
+from fastapi import Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(accept: str | None = Header(None)) -> bool:
+    return accept is not None and NDJSON_MEDIA_TYPE in accept
+
+
+def _line(item) -> str:
+    if isinstance(item, BaseModel):
+        return item.model_dump_json() + "\n"
+    return json.dumps(jsonable_encoder(item), ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def ndjson_response(
+    q,
+    build: Callable[[AsyncSession, list], Awaitable[list]],
+    batch_size: int | None = None,
+) -> StreamingResponse:
+    """Stream the entities selected by ``q``, built batch by batch with ``build(session, batch)``."""
+    batch_size = batch_size or settings.NDJSON_BATCH_SIZE
+
+    async def body():
+        async with async_session() as cursor_s, async_session() as s:
+            result = await cursor_s.stream_scalars(q.execution_options(yield_per=batch_size))
+            async for batch in result.partitions(batch_size):
+                items = await build(s, batch)
+                yield "".join(_line(i) for i in items).encode()
+                # Keep both identity maps from growing with the table
+                for obj in batch:
+                    cursor_s.expunge(obj)
+                s.expunge_all()
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,191 @@
+"""
+Keyset (cursor) pagination and server-side sorting for register list endpoints.
+
+List endpoints keep returning a plain JSON array, so existing clients that
+send no paging parameters still get the whole (sorted) list.  Paging is
+opt-in:
+
+    GET /api/v1/risks?limit=100                  first page
+    GET /api/v1/risks?limit=100&cursor=<X-Next-Cursor>
+    GET /api/v1/risks?sort=-created_at,asset_name&limit=50&include_total=true
+
+Response headers:
+  * ``X-Next-Cursor`` — opaque cursor of the next page (absent on the last page),
+  * ``X-Total-Count`` — with ``include_total``: number of matching rows,
+    counted up to ``PAGINATION_COUNT_CAP``; ``X-Total-Count-Capped: true``
+    marks the value as a lower bound.
+
+The cursor carries the sort values of the last row, so the next page is a
+``WHERE (k1, k2, …, id) > (…)`` range scan instead of an OFFSET.  The primary
+key is always the final sort key, which makes the order total and stable.
+NULLs sort last in both directions (a ``col IS NULL`` key precedes nullable
+columns), identically on MariaDB and SQLite.
+
+Usage in a router:
+    from app.services.pagination import PageParams, SortSpec, page_params, paginate
+
+    _SORT = SortSpec({"name": Asset.name, "created_at": Asset.created_at}, default="name", pk=Asset.id)
+
+    @router.get("", response_model=list[AssetOut])
+    async def list_assets(..., response: Response, page: PageParams = Depends(page_params)):
+        assets = await paginate(s, select(Asset).where(...), _SORT, page, response)
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class PageParams:
+    limit: int | None = None
+    cursor: str | None = None
+    sort: str | None = None
+    include_total: bool = False
+
+
+def page_params(
+    limit: int | None = Query(
+        None, ge=1, le=settings.PAGINATION_MAX_LIMIT,
+        description="Rozmiar strony (puste = cala lista)",
+    ),
+    cursor: str | None = Query(None, description="Kursor kolejnej strony (naglowek X-Next-Cursor)"),
+    sort: str | None = Query(None, description="Pola sortowania, np. -created_at,name"),
+    include_total: bool = Query(False, description="Zwroc X-Total-Count"),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, sort=sort, include_total=include_total)
+
+
+class SortSpec:
+    """Sortable fields of one list endpoint: ``{name: column}``, default sort and primary key."""
+
+    def __init__(self, fields: dict, default: str, pk):
+        self.fields = fields
+        self.default = default
+        self.pk = pk
+
+    def keys(self, sort: str | None) -> list[tuple]:
+        """(expression, descending, python type) per key, NULL markers and the pk included."""
+        keys = []
+        for token in (sort or self.default).split(","):
+            token = token.strip()
+            name = token.lstrip("-")
+            col = self.fields.get(name)
+            if col is None:
+                raise HTTPException(400, f"Nieznane pole sortowania: {name}. Dostepne: {', '.join(sorted(self.fields))}")
+            if getattr(col.expression, "nullable", True):
+                keys.append((case((col.is_(None), 1), else_=0), False, int))
+            keys.append((col, token.startswith("-"), _python_type(col)))
+        keys.append((self.pk, False, int))
+        return keys
+
+
+def _python_type(col):
+    try:
+        return col.type.python_type
+    except NotImplementedError:
+        return str
+
+
+# ── cursor encoding ──
+
+def _encode_value(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return v
+
+
+def _decode_value(v, py_type):
+    if v is None:
+        return None
+    if py_type is datetime:
+        return datetime.fromisoformat(v)
+    if py_type is date:
+        return date.fromisoformat(v)
+    if py_type is Decimal:
+        return Decimal(v)
+    return v
+
+
+def encode_cursor(sort: str | None, values: list) -> str:
+    raw = json.dumps({"s": sort, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str | None, keys: list[tuple]) -> list:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = data["v"]
+        if data["s"] != sort or len(values) != len(keys):
+            raise ValueError
+        return [_decode_value(v, py_type) for v, (_, _, py_type) in zip(values, keys)]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(400, "Nieprawidlowy kursor (zmienione sortowanie lub uszkodzona wartosc)") from None
+
+
+def _after(keys: list[tuple], values: list):
+    """Rows strictly after ``values`` in the order given by ``keys`` (lexicographic)."""
+    terms = []
+    for i, ((expr, desc, _), v) in enumerate(zip(keys, values)):
+        if v is None:
+            continue  # within a NULL group only later keys can advance
+        prefix = [
+            e.is_(None) if pv is None else e == pv
+            for (e, _, _), pv in zip(keys[:i], values[:i])
+        ]
+        terms.append(and_(*prefix, expr < v if desc else expr > v))
+    return or_(*terms)
+
+
+def _ordered(q, keys: list[tuple]):
+    return q.order_by(None).order_by(*(expr.desc() if desc else expr.asc() for expr, desc, _ in keys))
+
+
+def sort_query(q, spec: SortSpec, sort: str | None):
+    """``q`` ordered by ``sort`` (or the default) with the pk tie-breaker — for unpaged reads."""
+    return _ordered(q, spec.keys(sort))
+
+
+async def paginate(s: AsyncSession, q, spec: SortSpec, page: PageParams, response: Response) -> list:
+    """Apply sorting and the requested page to ``q``; sets paging headers on ``response``.
+
+    Returns scalars for single-entity selects, rows otherwise.
+    """
+    keys = spec.keys(page.sort)
+    n_cols = len(q.column_descriptions)
+
+    if page.include_total:
+        cap = settings.PAGINATION_COUNT_CAP
+        capped = q.order_by(None).limit(cap + 1).subquery()
+        total = (await s.execute(select(func.count()).select_from(capped))).scalar() or 0
+        response.headers["X-Total-Count"] = str(min(total, cap))
+        if total > cap:
+            response.headers["X-Total-Count-Capped"] = "true"
+
+    limit = page.limit
+    if page.cursor is not None:
+        q = q.where(_after(keys, decode_cursor(page.cursor, page.sort, keys)))
+        limit = limit or settings.PAGINATION_DEFAULT_LIMIT
+
+    q = _ordered(q, keys)
+    q = q.add_columns(*(expr.label(f"_page_k{i}") for i, (expr, _, _) in enumerate(keys)))
+    if limit is not None:
+        q = q.limit(limit + 1)
+    rows = (await s.execute(q)).all()
+
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(page.sort, list(rows[-1][n_cols:]))
+    return [r[0] if n_cols == 1 else tuple(r[:n_cols]) for r in rows]
@@ -0,0 +1,82 @@
+"""
+Sparse fieldsets (``fields=``) for heavy list endpoints.
+
+Grid views show a handful of columns, while ``RiskOut`` / ``AssetOut`` carry
+long texts and names resolved from other tables.  With
+``?fields=id,asset_name,risk_score,org_unit_name`` an endpoint:
+
+  * loads only the requested entity columns (``load_only`` — the long text
+    columns are not read from the database),
+  * runs only the lookups the requested derived fields need (a name, a
+    dictionary label or an M2M list nobody asked for is not queried),
+  * returns just those keys (``id`` is always included).
+
+Without ``fields`` the endpoint behaves as before and returns full models.
+
+Usage in a router:
+    from app.services.projection import Projection, fields_param, partial_response
+
+    _PROJECTION = Projection(AssetOut, Asset, derived={"org_unit_name": ("org_unit_id",), ...})
+
+    async def list_assets(..., fields: set[str] | None = Depends(fields_param)):
+        fields = _PROJECTION.resolve(fields)
+        if fields is not None:
+            q = q.options(_PROJECTION.load_only(fields))
+        ...
+        return items if fields is None else partial_response(items, response)
+"""
+from __future__ import annotations
+
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import load_only
+
+
+def fields_param(
+    fields: str | None = Query(None, description="Wybrane pola odpowiedzi, np. id,name,risk_score"),
+) -> set[str] | None:
+    if fields is None:
+        return None
+    return {f.strip() for f in fields.split(",") if f.strip()}
+
+
+class Projection:
+    """Output fields of a schema: entity columns plus ``derived`` fields and the columns they need."""
+
+    def __init__(self, schema, model, derived: dict[str, tuple[str, ...]] | None = None):
+        self.schema = schema
+        self.model = model
+        self.derived = derived or {}
+        mapped = set(model.__mapper__.column_attrs.keys())
+        self.columns = [f for f in schema.model_fields if f not in self.derived and f in mapped]
+
+    def resolve(self, fields: set[str] | None) -> set[str] | None:
+        """Validated field set (with ``id``), or None for the full model."""
+        if fields is None:
+            return None
+        unknown = fields - set(self.schema.model_fields)
+        if unknown:
+            raise HTTPException(400, f"Nieznane pola: {', '.join(sorted(unknown))}")
+        return fields | {"id"}
+
+    def load_only(self, fields: set[str]):
+        """ORM option loading the requested columns and those the requested derived fields need."""
+        needed = {f for f in fields if f in self.columns}
+        for f in fields & self.derived.keys():
+            needed.update(self.derived[f])
+        return load_only(*(getattr(self.model, c) for c in sorted(needed)))
+
+    def column_values(self, obj, fields: set[str] | None) -> dict:
+        """Entity column values of the (requested) output fields."""
+        return {f: getattr(obj, f) for f in self.columns if fields is None or f in fields}
+
+
+def wants(fields: set[str] | None, *names: str) -> bool:
+    """True if any of ``names`` is part of the response (always, without ``fields``)."""
+    return fields is None or not fields.isdisjoint(names)
+
+
+def partial_response(items: list[dict], response: Response) -> JSONResponse:
+    """Plain JSON for projected rows (keeps headers such as X-Next-Cursor)."""
+    return JSONResponse(jsonable_encoder(items), headers=dict(response.headers))
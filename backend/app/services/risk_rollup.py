@@ -0,0 +1,181 @@
+"""Daily risk roll-ups — history for the risk dashboard's trend and heatmap.
+
+``rollup_day`` aggregates the current ``risks`` table into
+``risk_daily_rollups`` (one row per day, org unit, security area, W, P and
+level with the risk count and score sum) with a single INSERT … SELECT.
+Only the current state can be captured, so history starts with the first
+roll-up; a day's rows are refreshed on every run and the last run of the
+day stays as its record.
+
+The write is an upsert on the unique key ``(day, *_GROUP_COLUMNS)``, so runs
+of several workers (or a scheduled run racing the admin endpoint) overwrite
+each other instead of doubling the counts.  "No org unit / area / level" is
+stored as 0 / 0 / "" because a unique key does not match NULLs.  The day's
+groups that no longer match any risk are deleted afterwards.
+
+Runs, each on its own session:
+* ``run_risk_rollup_scheduler`` (started on app startup) every
+  ``RISK_ROLLUP_INTERVAL_MINUTES``,
+* on demand via ``POST /api/v1/dashboard/admin/risk-rollup``.
+
+Reads (``risk_matrix``, ``risk_trend``) never write: they use the latest
+rolled-up day and touch only the compact fact table.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, case, delete, func, literal, select, true
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.models.risk import Risk, RiskDailyRollup
+
+logger = logging.getLogger(__name__)
+
+_GROUP_COLUMNS = ("org_unit_id", "security_area_id", "impact_level", "probability_level", "risk_level")
+_VALUE_COLUMNS = ("risk_count", "score_sum", "computed_at")
+
+
+def _upsert(dialect: str, src):
+    """INSERT … SELECT ``src`` that updates the value columns of existing (day, group) rows."""
+    cols = ["day", *_GROUP_COLUMNS, *_VALUE_COLUMNS]
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(RiskDailyRollup).from_select(cols, src)
+        return stmt.on_conflict_do_update(
+            index_elements=["day", *_GROUP_COLUMNS],
+            set_={c: stmt.excluded[c] for c in _VALUE_COLUMNS},
+        )
+    stmt = mysql.insert(RiskDailyRollup).from_select(cols, src)
+    return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in _VALUE_COLUMNS})
+
+
+async def rollup_day(s: AsyncSession, day: date | None = None) -> int:
+    """Refresh the roll-up of ``day`` (default today) from the current risks; returns groups written."""
+    day = day or date.today()
+    computed_at = datetime.utcnow().replace(microsecond=0)
+    cols = [
+        func.coalesce(Risk.org_unit_id, 0),
+        func.coalesce(Risk.security_area_id, 0),
+        Risk.impact_level,
+        Risk.probability_level,
+        func.coalesce(Risk.risk_level, ""),
+    ]
+    src = (
+        select(
+            literal(day, Date),
+            *cols,
+            func.count(),
+            func.coalesce(func.sum(Risk.risk_score), 0),
+            literal(computed_at, DateTime),
+        )
+        .where(true())  # SQLite: INSERT … SELECT … ON CONFLICT needs a WHERE clause
+        .group_by(*cols)
+    )
+    await s.execute(_upsert(s.get_bind().dialect.name, src))
+    # Groups that disappeared since an earlier run of the day (DATETIME keeps
+    # whole seconds only, so computed_at cannot tell two runs apart)
+    group_key = (
+        RiskDailyRollup.org_unit_id,
+        RiskDailyRollup.security_area_id,
+        RiskDailyRollup.impact_level,
+        RiskDailyRollup.probability_level,
+        RiskDailyRollup.risk_level,
+    )
+    await s.execute(delete(RiskDailyRollup).where(
+        RiskDailyRollup.day == day,
+        ~select(Risk.id).where(*(c == k for c, k in zip(cols, group_key))).exists(),
+    ))
+    groups = (await s.execute(
+        select(func.count()).select_from(RiskDailyRollup).where(RiskDailyRollup.day == day)
+    )).scalar() or 0
+    await s.commit()
+    return groups
+
+
+async def run_rollup(day: date | None = None) -> int:
+    """``rollup_day`` on a session of its own (never on a request's session)."""
+    async with async_session() as s:
+        return await rollup_day(s, day)
+
+
+def _org_filter(org_unit_id: int | None):
+    return RiskDailyRollup.org_unit_id == org_unit_id if org_unit_id is not None else true()
+
+
+async def risk_matrix(s: AsyncSession, org_unit_id: int | None = None, day: date | None = None) -> list:
+    """(impact_level, probability_level, count) cells of the latest roll-up day (<= ``day``)."""
+    day = day or date.today()
+    latest = (await s.execute(
+        select(func.max(RiskDailyRollup.day)).where(RiskDailyRollup.day <= day)
+    )).scalar()
+    if latest is None:
+        return []
+    q = (
+        select(
+            RiskDailyRollup.impact_level,
+            RiskDailyRollup.probability_level,
+            func.sum(RiskDailyRollup.risk_count).label("cnt"),
+        )
+        .where(RiskDailyRollup.day == latest, _org_filter(org_unit_id))
+        .group_by(RiskDailyRollup.impact_level, RiskDailyRollup.probability_level)
+        .order_by(RiskDailyRollup.impact_level, RiskDailyRollup.probability_level)
+    )
+    return (await s.execute(q)).all()
+
+
+async def risk_trend(s: AsyncSession, org_unit_id: int | None = None, months: int = 12) -> list[dict]:
+    """Month-end risk population for the last ``months`` months that have roll-ups."""
+    today = date.today()
+    y, m = divmod(today.year * 12 + today.month - 1 - (months - 1), 12)
+    since = date(y, m + 1, 1)
+    days = (await s.execute(
+        select(RiskDailyRollup.day).where(RiskDailyRollup.day >= since).distinct()
+    )).scalars().all()
+    month_end: dict[str, date] = {}
+    for d in sorted(days):
+        month_end[d.strftime("%Y-%m")] = d
+    if not month_end:
+        return []
+
+    count = RiskDailyRollup.risk_count
+    q = (
+        select(
+            RiskDailyRollup.day,
+            func.sum(case((RiskDailyRollup.risk_level == "high", count), else_=0)).label("high"),
+            func.sum(case((RiskDailyRollup.risk_level == "medium", count), else_=0)).label("medium"),
+            func.sum(case((RiskDailyRollup.risk_level == "low", count), else_=0)).label("low"),
+            func.sum(count).label("total"),
+            func.sum(RiskDailyRollup.score_sum).label("score_sum"),
+        )
+        .where(RiskDailyRollup.day.in_(list(month_end.values())), _org_filter(org_unit_id))
+        .group_by(RiskDailyRollup.day)
+    )
+    by_day = {r.day: r for r in (await s.execute(q)).all()}
+
+    points = []
+    for period, d in month_end.items():
+        r = by_day.get(d)
+        total = int(r.total or 0) if r else 0
+        points.append({
+            "period": period,
+            "high": int(r.high or 0) if r else 0,
+            "medium": int(r.medium or 0) if r else 0,
+            "low": int(r.low or 0) if r else 0,
+            "total": total,
+            "avg_score": round(float(r.score_sum) / total, 1) if total else None,
+        })
+    return points
+
+
+async def run_risk_rollup_scheduler(interval_minutes: int) -> None:
+    """In-process roll-up job (started on app startup)."""
+    while True:
+        try:
+            await run_rollup()
+        except Exception:
+            logger.exception("Scheduled risk roll-up failed")
+        await asyncio.sleep(interval_minutes * 60)
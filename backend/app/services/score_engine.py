@@ -1,9 +1,24 @@
-"""Security Score calculation engine — computes all 10 pillar scores."""
+"""Security Score calculation engine — computes all 10 pillar scores.
+
+Each pillar is split into two steps:
+  1. gather additive *inputs* (counts and sums keyed by short names),
+  2. turn the inputs into a 0–100 score with a pure ``_*_pillar`` function.
+
+The ORM engine below gathers inputs by iterating rows; the set-based engine in
+``score_engine_sql`` gathers the very same inputs from grouped aggregates.
+Both share the pillar functions, so they always produce identical numbers.
+"""
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
 from datetime import date, datetime, timedelta
+from typing import Any
 
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.database import async_session
 from app.models.risk import Risk
 from app.models.vulnerability import VulnerabilityRecord
 from app.models.incident import Incident
@@ -13,21 +28,31 @@ from app.models.audit_register import Audit, AuditFinding
 from app.models.asset import Asset
 from app.models.vendor import Vendor
 from app.models.awareness import AwarenessCampaign, AwarenessResult
-from app.models.dictionary import DictionaryEntry, DictionaryType
 from app.models.framework import Assessment, AssessmentAnswer, DimensionLevel
 from app.models.control_effectiveness import ControlImplementation
 from app.models.security_score import SecurityScoreConfig
+from app.services.dictionary_cache import dict_cache
+
+PILLARS = (
+    "risk", "vulnerability", "incident", "exception", "maturity",
+    "audit", "asset", "tprm", "policy", "awareness",
+)
+
+# Pillar inputs: additive counters/sums, e.g. {"n": 12, "impact": 3.4}
+PillarInputs = dict[str, float]
 
 
 def _clamp(v: float) -> float:
     return max(0.0, min(100.0, v))
 
 
+def _add(x: PillarInputs, key: str, value: float = 1) -> None:
+    x[key] = x.get(key, 0) + value
+
+
 async def _de_label(s: AsyncSession, entry_id: int | None) -> str | None:
-    if entry_id is None:
-        return None
-    e = await s.get(DictionaryEntry, entry_id)
-    return (e.label or "").lower() if e else None
+    label = await dict_cache.label(s, entry_id)
+    return label.lower() if label is not None else None
 
 
 async def get_active_config(s: AsyncSession) -> SecurityScoreConfig:
@@ -40,173 +65,213 @@ async def get_active_config(s: AsyncSession) -> SecurityScoreConfig:
 
 # ═══════════════════ PILLAR 1: RISK ═══════════════════
 
+RISK_STATUS_WEIGHTS = {
+    "zidentyfikowane": 1.0, "identified": 1.0,
+    "w analizie": 0.9, "in analysis": 0.9,
+    "w mitygacji": 0.5, "in mitigation": 0.5,
+    "zaakceptowane": 0.3, "accepted": 0.3,
+    "zamknięte": 0.0, "closed": 0.0,
+}
+RISK_MAX_SCORE = 602.6
+
+
+def _risk_pillar(x: PillarInputs, cfg: SecurityScoreConfig) -> float:
+    n = x.get("n", 0)
+    if not n:
+        return 100.0
+    return _clamp(100 - (x.get("impact", 0) / max(n, 1)) * 100)
+
+
 async def calc_risk_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
     q = select(Risk).where(Risk.is_active.is_(True))
     risks = (await s.execute(q)).scalars().all()
-    if not risks:
-        return 100.0
 
-    status_weights = {
-        "zidentyfikowane": 1.0, "identified": 1.0,
-        "w analizie": 0.9, "in analysis": 0.9,
-        "w mitygacji": 0.5, "in mitigation": 0.5,
-        "zaakceptowane": 0.3, "accepted": 0.3,
-        "zamknięte": 0.0, "closed": 0.0,
-    }
-    max_r = 602.6
-    total_impact = 0.0
+    x: PillarInputs = {}
     for r in risks:
         score = float(r.risk_score) if r.risk_score else 0
-        normalized = score / max_r
         status_label = await _de_label(s, r.status_id)
-        sw = status_weights.get(status_label or "", 0.5)
-        total_impact += normalized * sw
-
-    max_possible = len(risks)
-    return _clamp(100 - (total_impact / max(max_possible, 1)) * 100)
+        sw = RISK_STATUS_WEIGHTS.get(status_label or "", 0.5)
+        _add(x, "n")
+        _add(x, "impact", score / RISK_MAX_SCORE * sw)
+    return _risk_pillar(x, cfg)
 
 
 # ═══════════════════ PILLAR 2: VULNERABILITY ═══════════════════
 
-async def calc_vulnerability_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
-    q = select(VulnerabilityRecord).where(VulnerabilityRecord.is_active.is_(True))
-    vulns = (await s.execute(q)).scalars().all()
-    if not vulns:
-        return 100.0
+VULN_SEV_WEIGHTS = {"krytyczna": 10, "critical": 10, "wysoka": 5, "high": 5,
+                    "średnia": 2, "medium": 2, "niska": 0.5, "low": 0.5}
+VULN_CLOSED = ("zamknięte", "closed")
+
+
+def vuln_thresholds(cfg: SecurityScoreConfig) -> dict[str, int]:
+    return {"krytyczna": cfg.vuln_threshold_critical or 3, "critical": cfg.vuln_threshold_critical or 3,
+            "wysoka": cfg.vuln_threshold_high or 10, "high": cfg.vuln_threshold_high or 10,
+            "średnia": cfg.vuln_threshold_medium or 30, "medium": cfg.vuln_threshold_medium or 30,
+            "niska": cfg.vuln_threshold_low or 100, "low": cfg.vuln_threshold_low or 100}
+
+
+def _vuln_sla_multiplier(sla_pct: float) -> float:
+    if sla_pct > 80:
+        return 1.05
+    elif sla_pct >= 60:
+        return 1.0
+    return 0.90
 
-    sev_weights = {"krytyczna": 10, "critical": 10, "wysoka": 5, "high": 5,
-                   "średnia": 2, "medium": 2, "niska": 0.5, "low": 0.5}
-    thresholds = {"krytyczna": cfg.vuln_threshold_critical or 3, "critical": cfg.vuln_threshold_critical or 3,
-                  "wysoka": cfg.vuln_threshold_high or 10, "high": cfg.vuln_threshold_high or 10,
-                  "średnia": cfg.vuln_threshold_medium or 30, "medium": cfg.vuln_threshold_medium or 30,
-                  "niska": cfg.vuln_threshold_low or 100, "low": cfg.vuln_threshold_low or 100}
 
-    # Count open vulns by severity
-    open_vulns = [v for v in vulns if (await _de_label(s, v.status_id) or "") not in ("zamknięte", "closed")]
-    sev_counts: dict[str, int] = {}
-    for v in open_vulns:
-        sev = await _de_label(s, v.severity_id) or "medium"
-        sev_counts[sev] = sev_counts.get(sev, 0) + 1
+def _vuln_pillar(x: PillarInputs, cfg: SecurityScoreConfig) -> float:
+    total_v = x.get("n", 0)
+    if not total_v:
+        return 100.0
 
+    thresholds = vuln_thresholds(cfg)
     penalty = 0.0
-    for sev, count in sev_counts.items():
-        w = sev_weights.get(sev, 1)
+    for key, count in x.items():
+        if not key.startswith("open:") or not count:
+            continue
+        sev = key[5:]
+        w = VULN_SEV_WEIGHTS.get(sev, 1)
         t = thresholds.get(sev, 30)
         penalty += w * min(count, t) / t
 
     base_score = 100 - penalty * 100
 
     # SLA multiplier
-    total_v = len(vulns)
-    on_time = sum(1 for v in vulns if v.sla_deadline and v.sla_deadline >= date.today())
-    sla_pct = (on_time / total_v * 100) if total_v > 0 else 100
-    if sla_pct > 80:
-        mult = 1.05
-    elif sla_pct >= 60:
-        mult = 1.0
-    else:
-        mult = 0.90
+    sla_pct = (x.get("on_time", 0) / total_v * 100) if total_v > 0 else 100
+    return _clamp(base_score * _vuln_sla_multiplier(sla_pct))
+
 
-    return _clamp(base_score * mult)
+async def calc_vulnerability_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
+    q = select(VulnerabilityRecord).where(VulnerabilityRecord.is_active.is_(True))
+    vulns = (await s.execute(q)).scalars().all()
+
+    today = date.today()
+    x: PillarInputs = {}
+    for v in vulns:
+        _add(x, "n")
+        if v.sla_deadline and v.sla_deadline >= today:
+            _add(x, "on_time")
+        # Count open vulns by severity
+        if (await _de_label(s, v.status_id) or "") not in VULN_CLOSED:
+            sev = await _de_label(s, v.severity_id) or "medium"
+            _add(x, f"open:{sev}")
+    return _vuln_pillar(x, cfg)
 
 
 # ═══════════════════ PILLAR 3: INCIDENT ═══════════════════
 
-async def calc_incident_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
-    window = cfg.incident_window_days or 90
-    cutoff = date.today() - timedelta(days=window)
-    q = select(Incident).where(Incident.is_active.is_(True), Incident.reported_at >= cutoff)
-    incidents = (await s.execute(q)).scalars().all()
-    if not incidents:
-        return 100.0
+INCIDENT_SEV_PARAMS = {
+    "krytyczny": (25, 2), "critical": (25, 2),
+    "wysoki": (10, 5), "high": (10, 5),
+    "średni": (3, 15), "medium": (3, 15),
+    "niski": (1, 30), "low": (1, 30),
+}
 
-    sev_params = {
-        "krytyczny": (25, 2), "critical": (25, 2),
-        "wysoki": (10, 5), "high": (10, 5),
-        "średni": (3, 15), "medium": (3, 15),
-        "niski": (1, 30), "low": (1, 30),
-    }
-    ttr_targets = {
+
+def incident_ttr_targets(cfg: SecurityScoreConfig) -> dict[str, int]:
+    return {
         "krytyczny": (cfg.incident_ttr_critical or 4), "critical": (cfg.incident_ttr_critical or 4),
         "wysoki": (cfg.incident_ttr_high or 24), "high": (cfg.incident_ttr_high or 24),
         "średni": (cfg.incident_ttr_medium or 72), "medium": (cfg.incident_ttr_medium or 72),
         "niski": (cfg.incident_ttr_low or 168), "low": (cfg.incident_ttr_low or 168),
     }
 
-    sev_counts: dict[str, int] = {}
-    sev_ttrs: dict[str, list[float]] = {}
-    lessons_total = 0
-    lessons_with = 0
 
-    for inc in incidents:
-        sev = await _de_label(s, inc.severity_id) or "medium"
-        sev_counts[sev] = sev_counts.get(sev, 0) + 1
-        if inc.ttr_minutes:
-            sev_ttrs.setdefault(sev, []).append(float(inc.ttr_minutes) / 60)
-        lessons_total += 1
-        if inc.lessons_learned:
-            lessons_with += 1
+def incident_cutoff(cfg: SecurityScoreConfig) -> date:
+    return date.today() - timedelta(days=cfg.incident_window_days or 90)
+
+
+def _incident_pillar(x: PillarInputs, cfg: SecurityScoreConfig) -> float:
+    lessons_total = x.get("n", 0)
+    if not lessons_total:
+        return 100.0
+
+    ttr_targets = incident_ttr_targets(cfg)
 
     # Incident penalty
     incident_penalty = 0.0
-    for sev, count in sev_counts.items():
-        w, t = sev_params.get(sev, (1, 30))
+    for key, count in x.items():
+        if not key.startswith("count:") or not count:
+            continue
+        w, t = INCIDENT_SEV_PARAMS.get(key[6:], (1, 30))
         incident_penalty += w * min(count, t) / t
     incident_penalty *= 50
 
     # TTR penalty
     ttr_penalty = 0.0
-    for sev, ttrs in sev_ttrs.items():
+    for key, ttr_n in x.items():
+        if not key.startswith("ttr_n:") or not ttr_n:
+            continue
+        sev = key[6:]
         target = ttr_targets.get(sev, 72)
-        avg_ttr = sum(ttrs) / len(ttrs)
+        avg_ttr = x.get(f"ttr_sum:{sev}", 0) / ttr_n
         ttr_penalty += max(0, (avg_ttr - target) / target * 10)
 
     # Lessons bonus
-    lessons_bonus = (lessons_with / lessons_total * 10) if lessons_total > 0 else 0
+    lessons_bonus = (x.get("lessons_with", 0) / lessons_total * 10) if lessons_total > 0 else 0
 
     return _clamp(100 - incident_penalty - ttr_penalty + lessons_bonus)
 
 
+async def calc_incident_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
+    q = select(Incident).where(Incident.is_active.is_(True), Incident.reported_at >= incident_cutoff(cfg))
+    incidents = (await s.execute(q)).scalars().all()
+
+    x: PillarInputs = {}
+    for inc in incidents:
+        sev = await _de_label(s, inc.severity_id) or "medium"
+        _add(x, f"count:{sev}")
+        if inc.ttr_minutes:
+            _add(x, f"ttr_sum:{sev}", float(inc.ttr_minutes) / 60)
+            _add(x, f"ttr_n:{sev}")
+        _add(x, "n")
+        if inc.lessons_learned:
+            _add(x, "lessons_with")
+    return _incident_pillar(x, cfg)
+
+
 # ═══════════════════ PILLAR 4: EXCEPTION ═══════════════════
 
-async def calc_exception_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
-    q = select(PolicyException).where(PolicyException.is_active.is_(True))
-    exceptions = (await s.execute(q)).scalars().all()
-    if not exceptions:
+EXCEPTION_RISK_WEIGHTS = {
+    "krytyczne": 15, "critical": 15, "krytyczny": 15,
+    "wysokie": 8, "high": 8, "wysoki": 8,
+    "średnie": 3, "medium": 3, "średni": 3,
+    "niskie": 1, "low": 1, "niski": 1,
+}
+CLOSED_STATUSES = ("zamknięte", "closed", "zamknięty")
+
+
+def _exception_pillar(x: PillarInputs, cfg: SecurityScoreConfig) -> float:
+    n = x.get("n", 0)
+    if not n:
         return 100.0
+    expired_penalty = x.get("expired", 0) * 10
+    comp_bonus = min(5, x.get("with_compensating", 0) / n * 5)
+    return _clamp(100 - x.get("active_penalty", 0) - expired_penalty + comp_bonus)
 
-    risk_weights = {
-        "krytyczne": 15, "critical": 15, "krytyczny": 15,
-        "wysokie": 8, "high": 8, "wysoki": 8,
-        "średnie": 3, "medium": 3, "średni": 3,
-        "niskie": 1, "low": 1, "niski": 1,
-    }
 
-    active_penalty = 0.0
-    expired_count = 0
-    with_compensating = 0
+async def calc_exception_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
+    q = select(PolicyException).where(PolicyException.is_active.is_(True))
+    exceptions = (await s.execute(q)).scalars().all()
 
+    today = date.today()
+    x: PillarInputs = {}
     for ex in exceptions:
+        _add(x, "n")
         risk_label = await _de_label(s, ex.risk_level_id)
-        w = risk_weights.get(risk_label or "", 3)
+        w = EXCEPTION_RISK_WEIGHTS.get(risk_label or "", 3)
         status_label = await _de_label(s, ex.status_id)
-        if status_label not in ("zamknięte", "closed", "zamknięty"):
-            active_penalty += w
-            if ex.expiry_date and ex.expiry_date < date.today() and status_label not in ("zamknięte", "closed", "zamknięty"):
-                expired_count += 1
+        if status_label not in CLOSED_STATUSES:
+            _add(x, "active_penalty", w)
+            if ex.expiry_date and ex.expiry_date < today:
+                _add(x, "expired")
         if ex.compensating_controls:
-            with_compensating += 1
-
-    expired_penalty = expired_count * 10
-    comp_bonus = min(5, (with_compensating / len(exceptions) * 5) if exceptions else 0)
-
-    return _clamp(100 - active_penalty - expired_penalty + comp_bonus)
+            _add(x, "with_compensating")
+    return _exception_pillar(x, cfg)
 
 
 # ═══════════════════ PILLAR 5: CONTROL MATURITY ═══════════════════
 
-async def _calc_framework_maturity(s: AsyncSession) -> float | None:
-    """Sub-score from framework assessment (0–100 or None if no data)."""
+async def _latest_framework_assessment(s: AsyncSession) -> Assessment | None:
     q = (select(Assessment)
          .where(Assessment.is_active.is_(True), Assessment.status == "approved")
          .order_by(Assessment.created_at.desc()))
@@ -216,6 +281,12 @@ async def _calc_framework_maturity(s: AsyncSession) -> float | None:
              .where(Assessment.is_active.is_(True))
              .order_by(Assessment.created_at.desc()))
         assessment = (await s.execute(q)).scalars().first()
+    return assessment
+
+
+async def _calc_framework_maturity(s: AsyncSession) -> float | None:
+    """Sub-score from framework assessment (0–100 or None if no data)."""
+    assessment = await _latest_framework_assessment(s)
     if not assessment:
         return None
 
@@ -242,23 +313,25 @@ async def _calc_framework_maturity(s: AsyncSession) -> float | None:
     return sum(scores) / len(scores) * 100
 
 
+CONTROL_STATUS_WEIGHTS = {"implemented": 1.0, "partial": 0.5}
+
+
 async def _calc_control_effectiveness(s: AsyncSession) -> float | None:
     """Sub-score from control effectiveness assessments (0–100 or None if no data)."""
     q = select(ControlImplementation).where(
         ControlImplementation.is_active.is_(True),
-        ControlImplementation.status.in_(["implemented", "partial"]),
+        ControlImplementation.status.in_(list(CONTROL_STATUS_WEIGHTS)),
     )
     impls = (await s.execute(q)).scalars().all()
     if not impls:
         return None
 
     # Weighted score: implemented=1.0, partial=0.5
-    status_w = {"implemented": 1.0, "partial": 0.5}
     weighted_scores = []
     for i in impls:
         eff = float(i.overall_effectiveness) if i.overall_effectiveness is not None else None
         if eff is not None:
-            w = status_w.get(i.status, 0.5)
+            w = CONTROL_STATUS_WEIGHTS.get(i.status, 0.5)
             weighted_scores.append(eff * w)
 
     if not weighted_scores:
@@ -267,10 +340,7 @@ async def _calc_control_effectiveness(s: AsyncSession) -> float | None:
     return sum(weighted_scores) / len(weighted_scores)
 
 
-async def calc_maturity_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
-    fw_score = await _calc_framework_maturity(s)
-    eff_score = await _calc_control_effectiveness(s)
-
+def _maturity_pillar(fw_score: float | None, eff_score: float | None) -> float:
     if fw_score is not None and eff_score is not None:
         # Blend: 60% framework maturity + 40% operational effectiveness
         return _clamp(fw_score * 0.6 + eff_score * 0.4)
@@ -281,166 +351,209 @@ async def calc_maturity_score(s: AsyncSession, cfg: SecurityScoreConfig) -> floa
     return 0.0
 
 
+async def calc_maturity_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
+    fw_score = await _calc_framework_maturity(s)
+    eff_score = await _calc_control_effectiveness(s)
+    return _maturity_pillar(fw_score, eff_score)
+
+
 # ═══════════════════ PILLAR 6: AUDIT ═══════════════════
 
+AUDIT_SEV_WEIGHTS = {
+    "krytyczny": 20, "critical": 20, "krytyczna": 20,
+    "wysoki": 10, "high": 10, "wysoka": 10,
+    "średni": 4, "medium": 4, "średnia": 4,
+    "niski": 1, "low": 1, "niska": 1,
+}
+
+
+def _audit_sla_multiplier(sla_pct: float) -> float:
+    if sla_pct > 90:
+        return 1.05
+    elif sla_pct >= 70:
+        return 1.0
+    elif sla_pct >= 50:
+        return 0.90
+    return 0.80
+
+
+def _audit_pillar(x: PillarInputs, cfg: SecurityScoreConfig) -> float:
+    if not x.get("n", 0):
+        return 100.0
+
+    base_score = 100 - x.get("penalty", 0)
+    total_with_sla = x.get("with_sla", 0)
+    sla_pct = (x.get("on_time", 0) / total_with_sla * 100) if total_with_sla > 0 else 100
+    return _clamp(base_score * _audit_sla_multiplier(sla_pct))
+
+
 async def calc_audit_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
     q = select(AuditFinding).where(AuditFinding.is_active.is_(True))
     findings = (await s.execute(q)).scalars().all()
-    if not findings:
-        return 100.0
-
-    sev_weights = {
-        "krytyczny": 20, "critical": 20, "krytyczna": 20,
-        "wysoki": 10, "high": 10, "wysoka": 10,
-        "średni": 4, "medium": 4, "średnia": 4,
-        "niski": 1, "low": 1, "niska": 1,
-    }
 
-    open_findings = []
+    today = date.today()
+    x: PillarInputs = {}
     for f in findings:
+        _add(x, "n")
         status_label = await _de_label(s, f.status_id)
-        if status_label not in ("zamknięte", "closed", "zamknięty"):
-            open_findings.append(f)
-
-    penalty = 0.0
-    on_time = 0
-    total_with_sla = 0
-    for f in open_findings:
+        if status_label in CLOSED_STATUSES:
+            continue
         sev = await _de_label(s, f.severity_id) or "medium"
-        w = sev_weights.get(sev, 4)
-        penalty += w
+        _add(x, "penalty", AUDIT_SEV_WEIGHTS.get(sev, 4))
         if f.sla_deadline:
-            total_with_sla += 1
-            if f.sla_deadline >= date.today():
-                on_time += 1
+            _add(x, "with_sla")
+            if f.sla_deadline >= today:
+                _add(x, "on_time")
+    return _audit_pillar(x, cfg)
 
-    base_score = 100 - penalty
 
-    sla_pct = (on_time / total_with_sla * 100) if total_with_sla > 0 else 100
-    if sla_pct > 90:
-        mult = 1.05
-    elif sla_pct >= 70:
-        mult = 1.0
-    elif sla_pct >= 50:
-        mult = 0.90
-    else:
-        mult = 0.80
+# ═══════════════════ PILLAR 7: ASSET ═══════════════════
 
-    return _clamp(base_score * mult)
+def _asset_pillar(x: PillarInputs, cfg: SecurityScoreConfig) -> float:
+    total = x.get("n", 0)
+    if total == 0:
+        return 100.0
 
+    coverage = (x.get("with_owner_crit", 0) / total) * 100
+    eol_score = 100 - (x.get("eol", 0) / total * 100)
+    scan_score = (x.get("scanned_30d", 0) / total) * 100
+    hygiene = 100 - (x.get("orphan", 0) / total * 100)
+
+    return _clamp(coverage * 0.4 + eol_score * 0.25 + scan_score * 0.2 + hygiene * 0.15)
 
-# ═══════════════════ PILLAR 7: ASSET ═══════════════════
 
 async def calc_asset_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
     q = select(Asset).where(Asset.is_active.is_(True))
     assets = (await s.execute(q)).scalars().all()
-    total = len(assets)
-    if total == 0:
-        return 100.0
 
-    with_owner_crit = sum(1 for a in assets if a.owner and a.criticality_id)
-    coverage = (with_owner_crit / total) * 100
+    today = date.today()
+    scan_cutoff = today - timedelta(days=30)
+    x: PillarInputs = {
+        "n": len(assets),
+        "with_owner_crit": sum(1 for a in assets if a.owner and a.criticality_id),
+        "eol": sum(1 for a in assets if a.support_end_date and a.support_end_date < today),
+        "scanned_30d": sum(1 for a in assets if a.last_scan_date and a.last_scan_date >= scan_cutoff),
+        "orphan": sum(1 for a in assets if not a.owner),
+    }
+    return _asset_pillar(x, cfg)
+
 
-    eol_count = sum(1 for a in assets if a.support_end_date and a.support_end_date < date.today())
-    eol_score = 100 - (eol_count / total * 100)
+# ═══════════════════ PILLAR 8: TPRM ═══════════════════
 
-    scanned_30d = sum(1 for a in assets if a.last_scan_date and a.last_scan_date >= date.today() - timedelta(days=30))
-    scan_score = (scanned_30d / total) * 100
+VENDOR_CRIT_WEIGHTS = {"krytyczny": 4, "wysoki": 3, "średni": 2, "niski": 1}
 
-    orphan = sum(1 for a in assets if not a.owner)
-    hygiene = 100 - (orphan / total * 100)
 
-    return _clamp(coverage * 0.4 + eol_score * 0.25 + scan_score * 0.2 + hygiene * 0.15)
+def _tprm_pillar(x: PillarInputs, cfg: SecurityScoreConfig) -> float:
+    total = x.get("n", 0)
+    if total == 0:
+        return 100.0
 
+    coverage = (x.get("assessed", 0) / total) * 100
+    weight_total = x.get("weight_total", 0)
+    rating = (x.get("weighted_sum", 0) / weight_total) if weight_total > 0 else 0
+    timeliness = 100 - (x.get("overdue", 0) / total * 100)
+
+    return _clamp(coverage * 0.4 + rating * 0.4 + timeliness * 0.2)
 
-# ═══════════════════ PILLAR 8: TPRM ═══════════════════
 
 async def calc_tprm_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
     q = select(Vendor).where(Vendor.is_active.is_(True))
     vendors = (await s.execute(q)).scalars().all()
-    total = len(vendors)
-    if total == 0:
-        return 100.0
 
-    one_year_ago = date.today() - timedelta(days=365)
-    assessed = sum(1 for v in vendors if v.last_assessment_date and v.last_assessment_date >= one_year_ago)
-    coverage = (assessed / total) * 100
-
-    crit_weights = {"krytyczny": 4, "wysoki": 3, "średni": 2, "niski": 1}
-    weighted_sum = 0.0
-    weight_total = 0.0
+    today = date.today()
+    one_year_ago = today - timedelta(days=365)
+    x: PillarInputs = {
+        "n": len(vendors),
+        "assessed": sum(1 for v in vendors if v.last_assessment_date and v.last_assessment_date >= one_year_ago),
+        "overdue": sum(1 for v in vendors if v.next_assessment_date and v.next_assessment_date < today),
+    }
     for v in vendors:
         if v.risk_score is not None and v.criticality_id:
             crit_label = await _de_label(s, v.criticality_id)
-            w = crit_weights.get(crit_label or "", 1)
-            weighted_sum += float(v.risk_score) * w
-            weight_total += w
-    rating = (weighted_sum / weight_total) if weight_total > 0 else 0
+            w = VENDOR_CRIT_WEIGHTS.get(crit_label or "", 1)
+            _add(x, "weighted_sum", float(v.risk_score) * w)
+            _add(x, "weight_total", w)
+    return _tprm_pillar(x, cfg)
 
-    overdue = sum(1 for v in vendors if v.next_assessment_date and v.next_assessment_date < date.today())
-    timeliness = 100 - (overdue / total * 100)
 
-    return _clamp(coverage * 0.4 + rating * 0.4 + timeliness * 0.2)
+# ═══════════════════ PILLAR 9: POLICY ═══════════════════
 
+POLICY_APPROVED = ("zatwierdzona", "approved", "zatwierdzony")
+
+
+def _policy_pillar(x: PillarInputs, cfg: SecurityScoreConfig) -> float:
+    total = x.get("n", 0)
+    if total == 0:
+        return 100.0
+
+    ack_n = x.get("ack_n", 0)
+    ack_score = (x.get("ack_sum", 0) / ack_n) if ack_n else 0
+    review_score = 100 - (x.get("overdue_review", 0) / total * 100)
+    coverage = (x.get("mapped", 0) / total) * 100
+    approval = (x.get("approved", 0) / total) * 100
+
+    return _clamp(ack_score * 0.35 + review_score * 0.30 + coverage * 0.20 + approval * 0.15)
 
-# ═══════════════════ PILLAR 9: POLICY ═══════════════════
 
 async def calc_policy_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
     q = select(Policy).where(Policy.is_active.is_(True))
     policies = (await s.execute(q)).scalars().all()
-    total = len(policies)
-    if total == 0:
-        return 100.0
 
-    # Acknowledgment score
-    ack_rates = []
+    today = date.today()
+    x: PillarInputs = {"n": len(policies)}
     for p in policies:
+        # Acknowledgment rate
         if p.target_audience_count and p.target_audience_count > 0:
             ack_q = select(func.count()).select_from(PolicyAcknowledgment).where(PolicyAcknowledgment.policy_id == p.id)
             ack_count = (await s.execute(ack_q)).scalar() or 0
-            ack_rates.append(ack_count / p.target_audience_count * 100)
-    ack_score = (sum(ack_rates) / len(ack_rates)) if ack_rates else 0
+            _add(x, "ack_n")
+            _add(x, "ack_sum", ack_count / p.target_audience_count * 100)
+        # Review
+        if p.review_date and p.review_date < today:
+            _add(x, "overdue_review")
+        # Coverage (mapped to standard)
+        map_q = select(func.count()).select_from(PolicyStandardMapping).where(PolicyStandardMapping.policy_id == p.id)
+        if ((await s.execute(map_q)).scalar() or 0) > 0:
+            _add(x, "mapped")
+        # Approval
+        if await _de_label(s, p.status_id) in POLICY_APPROVED:
+            _add(x, "approved")
+    return _policy_pillar(x, cfg)
 
-    # Review score
-    overdue_review = sum(1 for p in policies if p.review_date and p.review_date < date.today())
-    review_score = 100 - (overdue_review / total * 100)
 
-    # Coverage (mapped to standard)
-    mapped = 0
-    for p in policies:
-        map_q = select(func.count()).select_from(PolicyStandardMapping).where(PolicyStandardMapping.policy_id == p.id)
-        count = (await s.execute(map_q)).scalar() or 0
-        if count > 0:
-            mapped += 1
-    coverage = (mapped / total) * 100
+# ═══════════════════ PILLAR 10: AWARENESS ═══════════════════
 
-    # Approval score
-    approved = 0
-    for p in policies:
-        status_label = await _de_label(s, p.status_id)
-        if status_label in ("zatwierdzona", "approved", "zatwierdzony"):
-            approved += 1
-    approval = (approved / total) * 100
+AWARENESS_TRAINING_TYPES = ("szkolenie online", "szkolenie stacjonarne")
+AWARENESS_PHISHING_TYPE = "phishing simulation"
 
-    return _clamp(ack_score * 0.35 + review_score * 0.30 + coverage * 0.20 + approval * 0.15)
 
+def _awareness_pillar(x: PillarInputs, cfg: SecurityScoreConfig) -> float:
+    if not x.get("campaigns", 0):
+        return 0.0
+
+    def _avg(key: str) -> float:
+        n = x.get(f"{key}_n", 0)
+        return (x.get(f"{key}_sum", 0) / n) if n else 0
+
+    training = _avg("training")
+    phishing = max(0, 100 - _avg("click") * 2)
+    reporting = min(100, _avg("report") * 3)
+
+    return _clamp(training * 0.4 + phishing * 0.4 + reporting * 0.2)
+
+
+def awareness_cutoff() -> date:
+    return date.today() - timedelta(days=365)
 
-# ═══════════════════ PILLAR 10: AWARENESS ═══════════════════
 
 async def calc_awareness_score(s: AsyncSession, cfg: SecurityScoreConfig) -> float:
-    one_year_ago = date.today() - timedelta(days=365)
     q = select(AwarenessCampaign).where(
         AwarenessCampaign.is_active.is_(True),
-        AwarenessCampaign.start_date >= one_year_ago,
+        AwarenessCampaign.start_date >= awareness_cutoff(),
     )
     campaigns = (await s.execute(q)).scalars().all()
-    if not campaigns:
-        return 0.0
-
-    training_rates = []
-    click_rates = []
-    report_rates = []
 
+    x: PillarInputs = {"campaigns": len(campaigns)}
     for c in campaigns:
         type_label = await _de_label(s, c.campaign_type_id)
         results_q = select(AwarenessResult).where(AwarenessResult.campaign_id == c.id)
@@ -448,46 +561,41 @@ async def calc_awareness_score(s: AsyncSession, cfg: SecurityScoreConfig) -> flo
         if not results:
             continue
 
-        if type_label in ("szkolenie online", "szkolenie stacjonarne"):
+        if type_label in AWARENESS_TRAINING_TYPES:
             rates = [float(r.completion_rate) for r in results if r.completion_rate is not None]
             if rates:
-                training_rates.append(sum(rates) / len(rates))
-        elif type_label == "phishing simulation":
+                _add(x, "training_sum", sum(rates) / len(rates))
+                _add(x, "training_n")
+        elif type_label == AWARENESS_PHISHING_TYPE:
             clicks = [float(r.click_rate) for r in results if r.click_rate is not None]
             reports = [float(r.report_rate) for r in results if r.report_rate is not None]
             if clicks:
-                click_rates.append(sum(clicks) / len(clicks))
+                _add(x, "click_sum", sum(clicks) / len(clicks))
+                _add(x, "click_n")
             if reports:
-                report_rates.append(sum(reports) / len(reports))
-
-    training = (sum(training_rates) / len(training_rates)) if training_rates else 0
-    avg_click = (sum(click_rates) / len(click_rates)) if click_rates else 0
-    phishing = max(0, 100 - avg_click * 2)
-    avg_report = (sum(report_rates) / len(report_rates)) if report_rates else 0
-    reporting = min(100, avg_report * 3)
-
-    return _clamp(training * 0.4 + phishing * 0.4 + reporting * 0.2)
+                _add(x, "report_sum", sum(reports) / len(reports))
+                _add(x, "report_n")
+    return _awareness_pillar(x, cfg)
 
 
 # ═══════════════════ MAIN CALCULATION ═══════════════════
 
-async def calculate_all_pillars(s: AsyncSession) -> dict:
-    cfg = await get_active_config(s)
-
-    scores = {
-        "risk": await calc_risk_score(s, cfg),
-        "vulnerability": await calc_vulnerability_score(s, cfg),
-        "incident": await calc_incident_score(s, cfg),
-        "exception": await calc_exception_score(s, cfg),
-        "maturity": await calc_maturity_score(s, cfg),
-        "audit": await calc_audit_score(s, cfg),
-        "asset": await calc_asset_score(s, cfg),
-        "tprm": await calc_tprm_score(s, cfg),
-        "policy": await calc_policy_score(s, cfg),
-        "awareness": await calc_awareness_score(s, cfg),
-    }
-
-    weights = {
+# Pure input → score functions (maturity is blended from two sub-scores instead)
+PILLAR_SCORERS = {
+    "risk": _risk_pillar,
+    "vulnerability": _vuln_pillar,
+    "incident": _incident_pillar,
+    "exception": _exception_pillar,
+    "audit": _audit_pillar,
+    "asset": _asset_pillar,
+    "tprm": _tprm_pillar,
+    "policy": _policy_pillar,
+    "awareness": _awareness_pillar,
+}
+
+
+def pillar_weights(cfg: SecurityScoreConfig) -> dict[str, float]:
+    return {
         "risk": float(cfg.w_risk or 20),
         "vulnerability": float(cfg.w_vulnerability or 15),
         "incident": float(cfg.w_incident or 12),
@@ -500,13 +608,19 @@ async def calculate_all_pillars(s: AsyncSession) -> dict:
         "awareness": float(cfg.w_awareness or 4),
     }
 
-    total = sum(scores[k] * weights[k] / 100 for k in scores)
 
-    # Extra detail: control effectiveness sub-scores
-    fw_maturity = await _calc_framework_maturity(s)
-    ctrl_eff = await _calc_control_effectiveness(s)
+def build_result(
+    cfg: SecurityScoreConfig,
+    scores: dict[str, float],
+    fw_maturity: float | None,
+    ctrl_eff: float | None,
+    timings_ms: dict[str, float] | None = None,
+) -> dict:
+    """Combine raw pillar scores into the public result dict."""
+    weights = pillar_weights(cfg)
+    total = sum(scores[k] * weights[k] / 100 for k in scores)
 
-    return {
+    result = {
         "total_score": round(total, 1),
         "pillars": {k: round(v, 1) for k, v in scores.items()},
         "weights": weights,
@@ -516,3 +630,109 @@ async def calculate_all_pillars(s: AsyncSession) -> dict:
             "control_effectiveness": round(ctrl_eff, 1) if ctrl_eff is not None else None,
         },
     }
+    if timings_ms is not None:
+        result["timings_ms"] = timings_ms
+    return result
+
+
+# ═══════════════════ PILLAR EXECUTION ═══════════════════
+
+PillarTask = Callable[[AsyncSession, SecurityScoreConfig], Awaitable[Any]]
+
+
+async def run_pillar_tasks(
+    s: AsyncSession,
+    cfg: SecurityScoreConfig,
+    tasks: dict[str, PillarTask],
+    concurrency: int = 1,
+) -> tuple[dict[str, Any], dict[str, float]]:
+    """Run independent pillar tasks and time each one.
+
+    concurrency <= 1 awaits the tasks one after another on ``s``.  Otherwise
+    every task gets its own pooled session and at most ``concurrency`` of them
+    run at once (keep it below the engine's pool size).  The separate sessions
+    only see committed data — fine for read-only scoring.
+
+    Returns ``(results, timings_ms)``; timings include a ``"total"`` entry.
+    """
+    results: dict[str, Any] = {}
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+
+    if concurrency <= 1:
+        for key, fn in tasks.items():
+            t0 = time.perf_counter()
+            results[key] = await fn(s, cfg)
+            timings[key] = round((time.perf_counter() - t0) * 1000, 1)
+    else:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _run(key: str, fn: PillarTask) -> None:
+            async with sem:
+                async with async_session() as ps:
+                    t0 = time.perf_counter()
+                    results[key] = await fn(ps, cfg)
+                    timings[key] = round((time.perf_counter() - t0) * 1000, 1)
+
+        await asyncio.gather(*(_run(k, fn) for k, fn in tasks.items()))
+
+    timings = {k: timings[k] for k in tasks}
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    return results, timings
+
+
+async def _maturity_subscores(s: AsyncSession, cfg: SecurityScoreConfig) -> tuple[float | None, float | None]:
+    return await _calc_framework_maturity(s), await _calc_control_effectiveness(s)
+
+
+ORM_PILLAR_TASKS: dict[str, PillarTask] = {
+    "risk": calc_risk_score,
+    "vulnerability": calc_vulnerability_score,
+    "incident": calc_incident_score,
+    "exception": calc_exception_score,
+    # Framework maturity + control effectiveness, computed once and reused for
+    # both the maturity pillar and ``maturity_detail``
+    "maturity": _maturity_subscores,
+    "audit": calc_audit_score,
+    "asset": calc_asset_score,
+    "tprm": calc_tprm_score,
+    "policy": calc_policy_score,
+    "awareness": calc_awareness_score,
+}
+
+
+async def calculate_all_pillars(
+    s: AsyncSession,
+    mode: str | None = None,
+    concurrency: int | None = None,
+) -> dict:
+    """Compute the full Security Score.
+
+    mode: "orm" (row-by-row, default), "sql" (grouped aggregates, see
+    ``score_engine_sql``) or "incremental" (persisted per-pillar state, see
+    ``score_state`` — runs on its own session). When omitted,
+    ``settings.SCORE_ENGINE_MODE`` is used.
+    concurrency: max pillars evaluated in parallel on separate sessions
+    (1 = sequential on ``s``). Defaults to ``settings.SCORE_ENGINE_CONCURRENCY``.
+    """
+    mode = mode or settings.SCORE_ENGINE_MODE
+    if concurrency is None:
+        concurrency = settings.SCORE_ENGINE_CONCURRENCY
+    if mode == "sql":
+        from app.services.score_engine_sql import calculate_all_pillars_sql
+        return await calculate_all_pillars_sql(s, concurrency)
+    if mode == "incremental":
+        from app.services.score_state import calculate_incremental
+        return await calculate_incremental(concurrency)
+    if mode != "orm":
+        raise ValueError(f"Unknown score engine mode: {mode}")
+
+    cfg = await get_active_config(s)
+    results, timings = await run_pillar_tasks(s, cfg, ORM_PILLAR_TASKS, concurrency)
+
+    fw_maturity, ctrl_eff = results["maturity"]
+    scores = {
+        key: _maturity_pillar(fw_maturity, ctrl_eff) if key == "maturity" else results[key]
+        for key in PILLARS
+    }
+    return build_result(cfg, scores, fw_maturity, ctrl_eff, timings)
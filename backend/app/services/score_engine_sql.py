@@ -0,0 +1,479 @@
+"""Set-based Security Score engine — every pillar from grouped SQL aggregates.
+
+Produces exactly the same numbers as the row-by-row engine in ``score_engine``:
+each ``_collect_*`` function builds the same additive pillar inputs, only from
+``GROUP BY`` queries joined to ``dictionary_entries`` instead of ORM objects.
+Python work is proportional to the number of distinct dictionary labels, not
+to the number of rows, so the cost stays flat for 40k+ vulnerabilities.
+
+With ``by_org=True`` the org-attributable collectors additionally group by
+the owning org unit and return ``{org_unit_id: inputs}`` — one pass for the
+whole tree, used by the per-unit roll-up in ``score_org``.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.asset import Asset
+from app.models.audit_register import Audit, AuditFinding
+from app.models.awareness import AwarenessCampaign, AwarenessResult
+from app.models.control_effectiveness import ControlImplementation
+from app.models.dictionary import DictionaryEntry
+from app.models.framework import AssessmentAnswer, DimensionLevel
+from app.models.incident import Incident
+from app.models.policy import Policy, PolicyAcknowledgment, PolicyStandardMapping
+from app.models.policy_exception import PolicyException
+from app.models.risk import Risk
+from app.models.security_score import SecurityScoreConfig
+from app.models.vendor import Vendor
+from app.models.vulnerability import VulnerabilityRecord
+from app.services.score_engine import (
+    AUDIT_SEV_WEIGHTS,
+    AWARENESS_PHISHING_TYPE,
+    AWARENESS_TRAINING_TYPES,
+    CLOSED_STATUSES,
+    CONTROL_STATUS_WEIGHTS,
+    EXCEPTION_RISK_WEIGHTS,
+    PILLAR_SCORERS,
+    PILLARS,
+    POLICY_APPROVED,
+    RISK_MAX_SCORE,
+    RISK_STATUS_WEIGHTS,
+    VENDOR_CRIT_WEIGHTS,
+    VULN_CLOSED,
+    PillarInputs,
+    _add,
+    _latest_framework_assessment,
+    _maturity_pillar,
+    awareness_cutoff,
+    build_result,
+    get_active_config,
+    incident_cutoff,
+    run_pillar_tasks,
+)
+
+
+def _lbl(label: str | None) -> str:
+    """Normalise a joined dictionary label the same way ``_de_label`` does."""
+    return (label or "").lower()
+
+
+def _flag(cond) -> case:
+    """SUM()-able 1/0 column for a boolean condition."""
+    return case((cond, 1), else_=0)
+
+
+def _truthy_text(col):
+    return and_(col.isnot(None), col != "")
+
+
+def _f(v) -> float:
+    return float(v) if v is not None else 0.0
+
+
+# inputs keyed by org unit (None = rows without a unit / organisation-wide)
+OrgInputs = dict[int | None, PillarInputs]
+
+
+def _org_cols(col, by_org: bool) -> list:
+    """Extra SELECT / GROUP BY column for the optional org-unit split."""
+    return [col.label("org_unit_id")] if by_org else []
+
+
+def _bucket(out: OrgInputs, r, by_org: bool) -> PillarInputs:
+    return out.setdefault(r.org_unit_id if by_org else None, {})
+
+
+def _result(out: OrgInputs, by_org: bool) -> PillarInputs | OrgInputs:
+    return out if by_org else out.get(None, {})
+
+
+# ═══════════════════ PILLAR 1: RISK ═══════════════════
+
+async def _collect_risk(s: AsyncSession, cfg: SecurityScoreConfig, by_org: bool = False):
+    st = aliased(DictionaryEntry)
+    org = _org_cols(Risk.org_unit_id, by_org)
+    q = (
+        select(*org, st.label, func.count().label("n"), func.sum(func.coalesce(Risk.risk_score, 0)).label("score"))
+        .select_from(Risk)
+        .outerjoin(st, Risk.status_id == st.id)
+        .where(Risk.is_active.is_(True))
+        .group_by(*org, st.label)
+    )
+    out: OrgInputs = {}
+    for r in (await s.execute(q)).all():
+        x = _bucket(out, r, by_org)
+        sw = RISK_STATUS_WEIGHTS.get(_lbl(r.label), 0.5)
+        _add(x, "n", r.n)
+        _add(x, "impact", _f(r.score) / RISK_MAX_SCORE * sw)
+    return _result(out, by_org)
+
+
+# ═══════════════════ PILLAR 2: VULNERABILITY ═══════════════════
+
+async def _collect_vulnerability(s: AsyncSession, cfg: SecurityScoreConfig, by_org: bool = False):
+    st = aliased(DictionaryEntry)
+    sv = aliased(DictionaryEntry)
+    v = VulnerabilityRecord
+    org = _org_cols(v.org_unit_id, by_org)
+    q = (
+        select(
+            *org, st.label.label("status"), sv.label.label("severity"),
+            func.count().label("n"),
+            func.sum(_flag(and_(v.sla_deadline.isnot(None), v.sla_deadline >= date.today()))).label("on_time"),
+        )
+        .select_from(v)
+        .outerjoin(st, v.status_id == st.id)
+        .outerjoin(sv, v.severity_id == sv.id)
+        .where(v.is_active.is_(True))
+        .group_by(*org, st.label, sv.label)
+    )
+    out: OrgInputs = {}
+    for r in (await s.execute(q)).all():
+        x = _bucket(out, r, by_org)
+        _add(x, "n", r.n)
+        _add(x, "on_time", r.on_time or 0)
+        if _lbl(r.status) not in VULN_CLOSED:
+            _add(x, f"open:{_lbl(r.severity) or 'medium'}", r.n)
+    return _result(out, by_org)
+
+
+# ═══════════════════ PILLAR 3: INCIDENT ═══════════════════
+
+async def _collect_incident(s: AsyncSession, cfg: SecurityScoreConfig, by_org: bool = False):
+    sv = aliased(DictionaryEntry)
+    org = _org_cols(Incident.org_unit_id, by_org)
+    has_ttr = and_(Incident.ttr_minutes.isnot(None), Incident.ttr_minutes != 0)
+    q = (
+        select(
+            *org, sv.label,
+            func.count().label("n"),
+            func.sum(case((has_ttr, Incident.ttr_minutes), else_=0)).label("ttr_sum"),
+            func.sum(_flag(has_ttr)).label("ttr_n"),
+            func.sum(_flag(_truthy_text(Incident.lessons_learned))).label("lessons"),
+        )
+        .select_from(Incident)
+        .outerjoin(sv, Incident.severity_id == sv.id)
+        .where(Incident.is_active.is_(True), Incident.reported_at >= incident_cutoff(cfg))
+        .group_by(*org, sv.label)
+    )
+    out: OrgInputs = {}
+    for r in (await s.execute(q)).all():
+        x = _bucket(out, r, by_org)
+        sev = _lbl(r.label) or "medium"
+        _add(x, "n", r.n)
+        _add(x, f"count:{sev}", r.n)
+        _add(x, "lessons_with", r.lessons or 0)
+        if r.ttr_n:
+            _add(x, f"ttr_sum:{sev}", _f(r.ttr_sum) / 60)
+            _add(x, f"ttr_n:{sev}", r.ttr_n)
+    return _result(out, by_org)
+
+
+# ═══════════════════ PILLAR 4: EXCEPTION ═══════════════════
+
+async def _collect_exception(s: AsyncSession, cfg: SecurityScoreConfig, by_org: bool = False):
+    rl = aliased(DictionaryEntry)
+    st = aliased(DictionaryEntry)
+    pe = PolicyException
+    org = _org_cols(pe.org_unit_id, by_org)
+    q = (
+        select(
+            *org, rl.label.label("risk_level"), st.label.label("status"),
+            func.count().label("n"),
+            func.sum(_flag(and_(pe.expiry_date.isnot(None), pe.expiry_date < date.today()))).label("expired"),
+            func.sum(_flag(_truthy_text(pe.compensating_controls))).label("comp"),
+        )
+        .select_from(pe)
+        .outerjoin(rl, pe.risk_level_id == rl.id)
+        .outerjoin(st, pe.status_id == st.id)
+        .where(pe.is_active.is_(True))
+        .group_by(*org, rl.label, st.label)
+    )
+    out: OrgInputs = {}
+    for r in (await s.execute(q)).all():
+        x = _bucket(out, r, by_org)
+        _add(x, "n", r.n)
+        _add(x, "with_compensating", r.comp or 0)
+        if _lbl(r.status) not in CLOSED_STATUSES:
+            _add(x, "active_penalty", EXCEPTION_RISK_WEIGHTS.get(_lbl(r.risk_level), 3) * r.n)
+            _add(x, "expired", r.expired or 0)
+    return _result(out, by_org)
+
+
+# ═══════════════════ PILLAR 5: CONTROL MATURITY ═══════════════════
+
+async def _framework_maturity_sql(s: AsyncSession) -> float | None:
+    assessment = await _latest_framework_assessment(s)
+    if not assessment:
+        return None
+    if assessment.overall_score is not None:
+        return float(assessment.overall_score)
+
+    q = (
+        select(func.avg(DimensionLevel.value))
+        .select_from(AssessmentAnswer)
+        .join(DimensionLevel, AssessmentAnswer.level_id == DimensionLevel.id)
+        .where(
+            AssessmentAnswer.assessment_id == assessment.id,
+            AssessmentAnswer.not_applicable.is_(False),
+            DimensionLevel.value.isnot(None),
+        )
+    )
+    avg = (await s.execute(q)).scalar()
+    return float(avg) * 100 if avg is not None else None
+
+
+async def _control_effectiveness_sql(s: AsyncSession) -> float | None:
+    ci = ControlImplementation
+    weight = case(
+        *[(ci.status == status, w) for status, w in CONTROL_STATUS_WEIGHTS.items()],
+        else_=0.5,
+    )
+    q = select(func.avg(ci.overall_effectiveness * weight)).where(
+        ci.is_active.is_(True),
+        ci.status.in_(list(CONTROL_STATUS_WEIGHTS)),
+        ci.overall_effectiveness.isnot(None),
+    )
+    avg = (await s.execute(q)).scalar()
+    return float(avg) if avg is not None else None
+
+
+# ═══════════════════ PILLAR 6: AUDIT ═══════════════════
+
+async def _collect_audit(s: AsyncSession, cfg: SecurityScoreConfig, by_org: bool = False):
+    st = aliased(DictionaryEntry)
+    sv = aliased(DictionaryEntry)
+    af = AuditFinding
+    # Findings belong to a unit through their audit
+    org = _org_cols(Audit.org_unit_id, by_org)
+    q = (
+        select(
+            *org, st.label.label("status"), sv.label.label("severity"),
+            func.count().label("n"),
+            func.sum(_flag(af.sla_deadline.isnot(None))).label("with_sla"),
+            func.sum(_flag(and_(af.sla_deadline.isnot(None), af.sla_deadline >= date.today()))).label("on_time"),
+        )
+        .select_from(af)
+        .outerjoin(st, af.status_id == st.id)
+        .outerjoin(sv, af.severity_id == sv.id)
+        .where(af.is_active.is_(True))
+        .group_by(*org, st.label, sv.label)
+    )
+    if by_org:
+        q = q.outerjoin(Audit, af.audit_id == Audit.id)
+    out: OrgInputs = {}
+    for r in (await s.execute(q)).all():
+        x = _bucket(out, r, by_org)
+        _add(x, "n", r.n)
+        if _lbl(r.status) in CLOSED_STATUSES:
+            continue
+        _add(x, "penalty", AUDIT_SEV_WEIGHTS.get(_lbl(r.severity) or "medium", 4) * r.n)
+        _add(x, "with_sla", r.with_sla or 0)
+        _add(x, "on_time", r.on_time or 0)
+    return _result(out, by_org)
+
+
+# ═══════════════════ PILLAR 7: ASSET ═══════════════════
+
+async def _collect_asset(s: AsyncSession, cfg: SecurityScoreConfig, by_org: bool = False):
+    today = date.today()
+    has_owner = _truthy_text(Asset.owner)
+    org = _org_cols(Asset.org_unit_id, by_org)
+    q = (
+        select(
+            *org,
+            func.count().label("n"),
+            func.sum(_flag(and_(has_owner, Asset.criticality_id.isnot(None), Asset.criticality_id != 0))).label("with_owner_crit"),
+            func.sum(_flag(and_(Asset.support_end_date.isnot(None), Asset.support_end_date < today))).label("eol"),
+            func.sum(_flag(and_(Asset.last_scan_date.isnot(None),
+                                Asset.last_scan_date >= today - timedelta(days=30)))).label("scanned_30d"),
+            func.sum(_flag(~has_owner)).label("orphan"),
+        )
+        .where(Asset.is_active.is_(True))
+        .group_by(*org)
+    )
+    out: OrgInputs = {}
+    for r in (await s.execute(q)).all():
+        _bucket(out, r, by_org).update(
+            {k: r._mapping[k] or 0 for k in ("n", "with_owner_crit", "eol", "scanned_30d", "orphan")}
+        )
+    return _result(out, by_org)
+
+
+# ═══════════════════ PILLAR 8: TPRM ═══════════════════
+
+async def _collect_tprm(s: AsyncSession, cfg: SecurityScoreConfig) -> PillarInputs:
+    today = date.today()
+    cr = aliased(DictionaryEntry)
+    rated = and_(Vendor.risk_score.isnot(None), Vendor.criticality_id.isnot(None), Vendor.criticality_id != 0)
+    q = (
+        select(
+            cr.label,
+            func.count().label("n"),
+            func.sum(_flag(and_(Vendor.last_assessment_date.isnot(None),
+                                Vendor.last_assessment_date >= today - timedelta(days=365)))).label("assessed"),
+            func.sum(_flag(and_(Vendor.next_assessment_date.isnot(None),
+                                Vendor.next_assessment_date < today))).label("overdue"),
+            func.sum(case((rated, Vendor.risk_score), else_=0)).label("score_sum"),
+            func.sum(_flag(rated)).label("rated"),
+        )
+        .select_from(Vendor)
+        .outerjoin(cr, Vendor.criticality_id == cr.id)
+        .where(Vendor.is_active.is_(True))
+        .group_by(cr.label)
+    )
+    x: PillarInputs = {}
+    for r in (await s.execute(q)).all():
+        _add(x, "n", r.n)
+        _add(x, "assessed", r.assessed or 0)
+        _add(x, "overdue", r.overdue or 0)
+        if r.rated:
+            w = VENDOR_CRIT_WEIGHTS.get(_lbl(r.label), 1)
+            _add(x, "weighted_sum", _f(r.score_sum) * w)
+            _add(x, "weight_total", w * r.rated)
+    return x
+
+
+# ═══════════════════ PILLAR 9: POLICY ═══════════════════
+
+async def _collect_policy(s: AsyncSession, cfg: SecurityScoreConfig) -> PillarInputs:
+    st = aliased(DictionaryEntry)
+    ack = (
+        select(PolicyAcknowledgment.policy_id, func.count().label("cnt"))
+        .group_by(PolicyAcknowledgment.policy_id)
+        .subquery()
+    )
+    mapping = (
+        select(PolicyStandardMapping.policy_id, func.count().label("cnt"))
+        .group_by(PolicyStandardMapping.policy_id)
+        .subquery()
+    )
+    has_audience = and_(Policy.target_audience_count.isnot(None), Policy.target_audience_count > 0)
+    ack_pct = func.coalesce(ack.c.cnt, 0) * 1.0 / Policy.target_audience_count * 100
+    q = (
+        select(
+            st.label,
+            func.count().label("n"),
+            func.sum(_flag(has_audience)).label("ack_n"),
+            func.sum(case((has_audience, ack_pct), else_=0)).label("ack_sum"),
+            func.sum(_flag(and_(Policy.review_date.isnot(None), Policy.review_date < date.today()))).label("overdue_review"),
+            func.sum(_flag(func.coalesce(mapping.c.cnt, 0) > 0)).label("mapped"),
+        )
+        .select_from(Policy)
+        .outerjoin(st, Policy.status_id == st.id)
+        .outerjoin(ack, ack.c.policy_id == Policy.id)
+        .outerjoin(mapping, mapping.c.policy_id == Policy.id)
+        .where(Policy.is_active.is_(True))
+        .group_by(st.label)
+    )
+    x: PillarInputs = {}
+    for r in (await s.execute(q)).all():
+        _add(x, "n", r.n)
+        _add(x, "ack_n", r.ack_n or 0)
+        _add(x, "ack_sum", _f(r.ack_sum))
+        _add(x, "overdue_review", r.overdue_review or 0)
+        _add(x, "mapped", r.mapped or 0)
+        if _lbl(r.label) in POLICY_APPROVED:
+            _add(x, "approved", r.n)
+    return x
+
+
+# ═══════════════════ PILLAR 10: AWARENESS ═══════════════════
+
+async def _collect_awareness(s: AsyncSession, cfg: SecurityScoreConfig, by_org: bool = False):
+    ct = aliased(DictionaryEntry)
+    org = _org_cols(AwarenessCampaign.org_unit_id, by_org)
+    per_campaign = (
+        select(
+            AwarenessResult.campaign_id,
+            func.avg(AwarenessResult.completion_rate).label("completion"),
+            func.avg(AwarenessResult.click_rate).label("click"),
+            func.avg(AwarenessResult.report_rate).label("report"),
+        )
+        .group_by(AwarenessResult.campaign_id)
+        .subquery()
+    )
+    q = (
+        select(
+            *org, ct.label,
+            func.count(AwarenessCampaign.id).label("campaigns"),
+            func.sum(per_campaign.c.completion).label("training_sum"),
+            func.count(per_campaign.c.completion).label("training_n"),
+            func.sum(per_campaign.c.click).label("click_sum"),
+            func.count(per_campaign.c.click).label("click_n"),
+            func.sum(per_campaign.c.report).label("report_sum"),
+            func.count(per_campaign.c.report).label("report_n"),
+        )
+        .select_from(AwarenessCampaign)
+        .outerjoin(ct, AwarenessCampaign.campaign_type_id == ct.id)
+        .outerjoin(per_campaign, per_campaign.c.campaign_id == AwarenessCampaign.id)
+        .where(
+            AwarenessCampaign.is_active.is_(True),
+            AwarenessCampaign.start_date >= awareness_cutoff(),
+        )
+        .group_by(*org, ct.label)
+    )
+    out: OrgInputs = {}
+    for r in (await s.execute(q)).all():
+        x = _bucket(out, r, by_org)
+        _add(x, "campaigns", r.campaigns)
+        type_label = _lbl(r.label)
+        if type_label in AWARENESS_TRAINING_TYPES:
+            if r.training_n:
+                _add(x, "training_sum", _f(r.training_sum))
+                _add(x, "training_n", r.training_n)
+        elif type_label == AWARENESS_PHISHING_TYPE:
+            if r.click_n:
+                _add(x, "click_sum", _f(r.click_sum))
+                _add(x, "click_n", r.click_n)
+            if r.report_n:
+                _add(x, "report_sum", _f(r.report_sum))
+                _add(x, "report_n", r.report_n)
+    return _result(out, by_org)
+
+
+# ═══════════════════ MAIN CALCULATION ═══════════════════
+
+PILLAR_COLLECTORS = {
+    "risk": _collect_risk,
+    "vulnerability": _collect_vulnerability,
+    "incident": _collect_incident,
+    "exception": _collect_exception,
+    "audit": _collect_audit,
+    "asset": _collect_asset,
+    "tprm": _collect_tprm,
+    "policy": _collect_policy,
+    "awareness": _collect_awareness,
+}
+
+# Pillars whose source rows carry an org unit (their collectors accept by_org=True)
+ORG_PILLARS = ("risk", "vulnerability", "incident", "exception", "audit", "asset", "awareness")
+
+
+async def collect_pillar_inputs(s: AsyncSession, cfg: SecurityScoreConfig) -> dict[str, PillarInputs]:
+    """Gather the additive inputs of every pillar except maturity."""
+    return {key: await collect(s, cfg) for key, collect in PILLAR_COLLECTORS.items()}
+
+
+async def _maturity_subscores_sql(s: AsyncSession, cfg: SecurityScoreConfig) -> tuple[float | None, float | None]:
+    return await _framework_maturity_sql(s), await _control_effectiveness_sql(s)
+
+
+async def calculate_all_pillars_sql(s: AsyncSession, concurrency: int = 1) -> dict:
+    cfg = await get_active_config(s)
+
+    tasks = {**PILLAR_COLLECTORS, "maturity": _maturity_subscores_sql}
+    results, timings = await run_pillar_tasks(s, cfg, tasks, concurrency)
+
+    fw_maturity, ctrl_eff = results["maturity"]
+    scores: dict[str, float] = {}
+    for key in PILLARS:
+        if key == "maturity":
+            scores[key] = _maturity_pillar(fw_maturity, ctrl_eff)
+        else:
+            scores[key] = PILLAR_SCORERS[key](results[key], cfg)
+
+    return build_result(cfg, scores, fw_maturity, ctrl_eff, timings)
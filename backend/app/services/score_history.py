@@ -0,0 +1,272 @@
+"""Security Score history — scheduled snapshots and time-series downsampling.
+
+* Scheduler: ``run_snapshot_scheduler`` (started on app startup) wakes every
+  ``SCORE_SNAPSHOT_POLL_SECONDS`` and takes a snapshot when the last one is
+  older than the cadence of the active config (``snapshot_frequency``:
+  hourly / daily / weekly; anything else = manual only).
+* Downsampling: completed buckets are rolled up raw -> hour -> day -> week
+  into ``security_score_rollups`` with min/avg/max of the total and of every
+  pillar.  Rows older than the retention of their level are pruned once the
+  next level covers them; weekly roll-ups are kept forever, so the snapshot
+  table stays bounded.
+* Reads: ``get_history`` serves a date range from the finest resolution that
+  still covers its start and keeps the series short (see ``pick_resolution``).
+
+All timestamps are naive local time, like ``snapshot_date``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.models.security_score import SecurityScoreRollup, SecurityScoreSnapshot
+from app.services.score_engine import PILLARS, calculate_all_pillars, get_active_config
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = ("hour", "day", "week")
+_SOURCE = {"hour": "raw", "day": "hour", "week": "day"}
+_STEP = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+# Longest range served from a resolution before switching to a coarser one
+_MAX_SPAN = {"raw": timedelta(days=2), "hour": timedelta(days=60), "day": timedelta(days=3 * 365)}
+
+METRICS = ("total", *PILLARS)
+SNAPSHOT_FREQUENCIES = {"hourly": timedelta(hours=1), "daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+
+Stats = dict[str, dict[str, float]]
+
+
+def bucket_start(ts: datetime, resolution: str) -> datetime:
+    if resolution == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return day
+    return day - timedelta(days=day.weekday())  # weeks start on Monday
+
+
+def retention(resolution: str) -> timedelta | None:
+    days = {
+        "raw": settings.SCORE_SNAPSHOT_RAW_RETENTION_DAYS,
+        "hour": settings.SCORE_ROLLUP_HOURLY_RETENTION_DAYS,
+        "day": settings.SCORE_ROLLUP_DAILY_RETENTION_DAYS,
+    }.get(resolution)
+    return timedelta(days=days) if days else None
+
+
+# ═══════════════════ SNAPSHOTS ═══════════════════
+
+async def take_snapshot(
+    s: AsyncSession, triggered_by: str = "manual", created_by: str = "admin", at: datetime | None = None,
+) -> SecurityScoreSnapshot:
+    result = await calculate_all_pillars(s)
+    cfg = await get_active_config(s)
+
+    snap = SecurityScoreSnapshot(
+        snapshot_date=at or datetime.now(),
+        total_score=result["total_score"],
+        **{f"{p}_score": result["pillars"][p] for p in PILLARS},
+        w_risk=cfg.w_risk, w_vulnerability=cfg.w_vulnerability,
+        w_incident=cfg.w_incident, w_exception=cfg.w_exception,
+        w_maturity=cfg.w_maturity, w_audit=cfg.w_audit,
+        w_asset=cfg.w_asset, w_tprm=cfg.w_tprm,
+        w_policy=cfg.w_policy, w_awareness=cfg.w_awareness,
+        config_version=cfg.version,
+        triggered_by=triggered_by,
+        created_by=created_by,
+    )
+    s.add(snap)
+    await s.commit()
+    await s.refresh(snap)
+    return snap
+
+
+# ═══════════════════ DOWNSAMPLING ═══════════════════
+
+def _snapshot_stats(snap) -> Stats:
+    values = {"total": snap.total_score, **{p: getattr(snap, f"{p}_score") for p in PILLARS}}
+    return {k: {"min": float(v), "avg": float(v), "max": float(v)} for k, v in values.items() if v is not None}
+
+
+def _merge(parts: list[tuple[int, Stats]]) -> tuple[int, Stats]:
+    """Combine (samples, stats) parts: min of mins, max of maxes, sample-weighted avg."""
+    samples = sum(n for n, _ in parts)
+    out: Stats = {}
+    for m in METRICS:
+        present = [(n, st[m]) for n, st in parts if m in st]
+        if not present:
+            continue
+        weight = sum(n for n, _ in present)
+        out[m] = {
+            "min": round(min(v["min"] for _, v in present), 2),
+            "avg": round(sum(n * v["avg"] for n, v in present) / weight, 2),
+            "max": round(max(v["max"] for _, v in present), 2),
+        }
+    return samples, out
+
+
+async def _last_bucket(s: AsyncSession, resolution: str) -> datetime | None:
+    return (await s.execute(
+        select(func.max(SecurityScoreRollup.bucket_start)).where(SecurityScoreRollup.resolution == resolution)
+    )).scalar()
+
+
+async def _source_points(s: AsyncSession, source: str, since: datetime | None, until: datetime) -> list:
+    """(timestamp, samples, stats, config_version) of the finer level in [since, until)."""
+    if source == "raw":
+        t = SecurityScoreSnapshot.snapshot_date
+        q = select(SecurityScoreSnapshot).where(t < until).order_by(t)
+        if since is not None:
+            q = q.where(t >= since)
+        return [(r.snapshot_date, 1, _snapshot_stats(r), r.config_version)
+                for r in (await s.execute(q)).scalars().all()]
+
+    t = SecurityScoreRollup.bucket_start
+    q = select(SecurityScoreRollup).where(SecurityScoreRollup.resolution == source, t < until).order_by(t)
+    if since is not None:
+        q = q.where(t >= since)
+    return [(r.bucket_start, r.samples, r.stats, r.config_version) for r in (await s.execute(q)).scalars().all()]
+
+
+async def rollup(s: AsyncSession, now: datetime | None = None) -> dict[str, int]:
+    """Roll every completed, not yet rolled bucket up one level; returns buckets written."""
+    now = now or datetime.now()
+    written: dict[str, int] = {}
+    for res in RESOLUTIONS:
+        last = await _last_bucket(s, res)
+        since = last + _STEP[res] if last is not None else None
+        points = await _source_points(s, _SOURCE[res], since, bucket_start(now, res))
+
+        buckets: dict[datetime, list] = {}
+        for ts, samples, stats, version in points:
+            buckets.setdefault(bucket_start(ts, res), []).append((samples, stats, version))
+        for start, parts in buckets.items():
+            samples, stats = _merge([(n, st) for n, st, _ in parts])
+            s.add(SecurityScoreRollup(
+                resolution=res, bucket_start=start, samples=samples,
+                total_min=stats["total"]["min"], total_avg=stats["total"]["avg"], total_max=stats["total"]["max"],
+                stats=stats, config_version=parts[-1][2],
+            ))
+        # Flush per level: the next level reads these rows
+        await s.flush()
+        written[res] = len(buckets)
+    await s.commit()
+    return written
+
+
+async def prune(s: AsyncSession, now: datetime | None = None) -> dict[str, int]:
+    """Delete rows past their retention that the next level already covers."""
+    now = now or datetime.now()
+    deleted: dict[str, int] = {}
+    for level, covering in (("raw", "hour"), ("hour", "day"), ("day", "week")):
+        keep = retention(level)
+        last = await _last_bucket(s, covering)
+        if keep is None or last is None:
+            continue
+        cutoff = min(now - keep, last + _STEP[covering])
+        if level == "raw":
+            stmt = delete(SecurityScoreSnapshot).where(SecurityScoreSnapshot.snapshot_date < cutoff)
+        else:
+            stmt = delete(SecurityScoreRollup).where(
+                SecurityScoreRollup.resolution == level, SecurityScoreRollup.bucket_start < cutoff,
+            )
+        deleted[level] = (await s.execute(stmt)).rowcount or 0
+    await s.commit()
+    return deleted
+
+
+# ═══════════════════ READS ═══════════════════
+
+def pick_resolution(date_from: datetime, date_to: datetime, now: datetime | None = None) -> str:
+    """Finest resolution whose retention reaches ``date_from`` and whose span limit fits the range."""
+    now = now or datetime.now()
+    span = date_to - date_from
+    for res in ("raw", "hour", "day"):
+        keep = retention(res)
+        if span <= _MAX_SPAN[res] and (keep is None or date_from >= now - keep):
+            return res
+    return "week"
+
+
+def _rollup_out(r: SecurityScoreRollup) -> dict:
+    return {
+        "id": r.id,
+        "snapshot_date": r.bucket_start,
+        "total_score": float(r.total_avg),
+        **{f"{p}_score": r.stats[p]["avg"] if p in r.stats else None for p in PILLARS},
+        "config_version": r.config_version,
+        "triggered_by": f"rollup:{r.resolution}",
+        "resolution": r.resolution,
+        "samples": r.samples,
+        "total_min": float(r.total_min),
+        "total_max": float(r.total_max),
+        "stats": r.stats,
+    }
+
+
+async def get_history(
+    s: AsyncSession,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    resolution: str = "auto",
+    limit: int | None = None,
+) -> tuple[str, list]:
+    """Newest-first history points and the resolution they come from."""
+    if resolution not in ("auto", "raw", *RESOLUTIONS):
+        raise ValueError(f"Nieznana rozdzielczość: {resolution}")
+    if resolution == "auto":
+        resolution = pick_resolution(date_from, date_to or datetime.now()) if date_from else "raw"
+
+    if resolution == "raw":
+        t = SecurityScoreSnapshot.snapshot_date
+        q = select(SecurityScoreSnapshot).order_by(t.desc())
+    else:
+        t = SecurityScoreRollup.bucket_start
+        q = select(SecurityScoreRollup).where(SecurityScoreRollup.resolution == resolution).order_by(t.desc())
+    if date_from is not None:
+        q = q.where(t >= bucket_start(date_from, resolution) if resolution != "raw" else t >= date_from)
+    if date_to is not None:
+        q = q.where(t <= date_to)
+    if limit is not None:
+        q = q.limit(limit)
+
+    rows = (await s.execute(q)).scalars().all()
+    if resolution == "raw":
+        return resolution, list(rows)
+    return resolution, [_rollup_out(r) for r in rows]
+
+
+# ═══════════════════ SCHEDULER ═══════════════════
+
+async def scheduled_tick(now: datetime | None = None) -> bool:
+    """One scheduler pass: snapshot if due, then roll up and prune.  True if a snapshot was taken."""
+    now = now or datetime.now()
+    taken = False
+    async with async_session() as s:
+        cfg = await get_active_config(s)
+        cadence = SNAPSHOT_FREQUENCIES.get(cfg.snapshot_frequency or "daily")
+        if cadence is not None:
+            last = (await s.execute(select(func.max(SecurityScoreSnapshot.snapshot_date)))).scalar()
+            # Several workers may run the scheduler — the newest snapshot decides
+            if last is None or now - last >= cadence:
+                await take_snapshot(s, triggered_by="scheduler", created_by="system", at=now)
+                taken = True
+        await rollup(s, now)
+        await prune(s, now)
+    return taken
+
+
+async def run_snapshot_scheduler(poll_seconds: int) -> None:
+    """In-process snapshot scheduler (started on app startup)."""
+    while True:
+        try:
+            await scheduled_tick()
+        except Exception:
+            logger.exception("Scheduled Security Score snapshot failed")
+        await asyncio.sleep(poll_seconds)
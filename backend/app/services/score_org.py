@@ -0,0 +1,156 @@
+"""Security Score per org unit — the whole ``org_units`` tree in one pass.
+
+Every org-attributable pillar (see ``score_engine_sql.ORG_PILLARS``) is
+collected once, grouped by ``org_unit_id``.  Pillar inputs are additive, so a
+unit's inputs are rolled up bottom-up along ``parent_id``: a node's score
+covers its own rows plus those of all its descendants.  The remaining pillars
+(maturity, TPRM, policies) have no org attribution in the data model and are
+inherited from the organisation-wide values — they are listed under
+``inherited_pillars``.
+
+The tree result is cached per (config version, day) and dropped by the
+table-change hooks whenever any source table or ``org_units`` changes, so a
+300-unit tree costs one computation and is then served from memory.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.middleware.audit_auto import add_table_change_listener
+from app.models.org_unit import OrgUnit
+from app.services.score_engine import (
+    PILLAR_SCORERS,
+    PILLARS,
+    PillarInputs,
+    _add,
+    _maturity_pillar,
+    build_result,
+    get_active_config,
+    pillar_weights,
+)
+from app.services.score_engine_sql import ORG_PILLARS, PILLAR_COLLECTORS, _maturity_subscores_sql
+from app.services.score_state import PILLAR_TABLES
+
+INHERITED_PILLARS = tuple(p for p in PILLARS if p not in ORG_PILLARS)
+
+_SOURCE_TABLES = frozenset({"org_units"}.union(*PILLAR_TABLES.values()))
+
+_cache: dict[tuple[int | None, date], dict] = {}
+# Bumped on every invalidation so a computation racing with a write is not cached
+_generation = 0
+
+
+def invalidate_org_scores() -> None:
+    global _generation
+    _generation += 1
+    _cache.clear()
+
+
+@add_table_change_listener
+def _on_table_change(tables: set[str], phase: str) -> None:
+    if tables & _SOURCE_TABLES:
+        invalidate_org_scores()
+
+
+def _merge(into: PillarInputs, x: PillarInputs) -> None:
+    for k, v in x.items():
+        _add(into, k, v)
+
+
+def _rollup(units: list, own: dict[str, dict]) -> dict[int, dict[str, PillarInputs]]:
+    """Subtree inputs for every unit: own rows + all descendants' rows."""
+    ids = {u.id for u in units}
+    children: dict[int | None, list[int]] = {}
+    for u in units:
+        parent = u.parent_id if u.parent_id in ids else None
+        children.setdefault(parent, []).append(u.id)
+
+    # Iterative DFS from the roots, post-order via the reversed visit order.
+    # Units on a parent_id cycle are unreachable from a root and get own rows only.
+    order: list[int] = []
+    stack = list(children.get(None, []))
+    while stack:
+        uid = stack.pop()
+        order.append(uid)
+        stack.extend(children.get(uid, []))
+
+    subtree: dict[int, dict[str, PillarInputs]] = {}
+    for uid in ids:
+        subtree[uid] = {p: dict(own[p].get(uid, {})) for p in ORG_PILLARS}
+    for uid in reversed(order):
+        for child in children.get(uid, []):
+            for p in ORG_PILLARS:
+                _merge(subtree[uid][p], subtree[child][p])
+    return subtree
+
+
+async def _compute(s: AsyncSession, cfg) -> dict:
+    units = (await s.execute(
+        select(OrgUnit.id, OrgUnit.parent_id, OrgUnit.name, OrgUnit.symbol, OrgUnit.is_active)
+        .order_by(OrgUnit.id)
+    )).all()
+
+    own = {p: await PILLAR_COLLECTORS[p](s, cfg, by_org=True) for p in ORG_PILLARS}
+    inherited = {p: PILLAR_SCORERS[p](await PILLAR_COLLECTORS[p](s, cfg), cfg)
+                 for p in INHERITED_PILLARS if p != "maturity"}
+    fw_maturity, ctrl_eff = await _maturity_subscores_sql(s, cfg)
+    inherited["maturity"] = _maturity_pillar(fw_maturity, ctrl_eff)
+
+    subtree = _rollup(units, own)
+    nodes = []
+    for u in units:
+        scores = {
+            p: inherited[p] if p in inherited else PILLAR_SCORERS[p](subtree[u.id][p], cfg)
+            for p in PILLARS
+        }
+        result = build_result(cfg, scores, fw_maturity, ctrl_eff)
+        nodes.append({
+            "org_unit_id": u.id,
+            "parent_id": u.parent_id,
+            "name": u.name,
+            "symbol": u.symbol,
+            "is_active": u.is_active,
+            "total_score": result["total_score"],
+            "pillars": result["pillars"],
+        })
+
+    return {
+        "config_version": cfg.version,
+        "computed_at": datetime.utcnow(),
+        "weights": pillar_weights(cfg),
+        "inherited_pillars": list(INHERITED_PILLARS),
+        "units": nodes,
+    }
+
+
+async def get_org_scores(s: AsyncSession) -> dict:
+    """Security Score of every org unit (subtree roll-up), cached per config version."""
+    cfg = await get_active_config(s)
+    key = (cfg.version, date.today())
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = _generation
+    result = await _compute(s, cfg)
+    if generation == _generation:
+        _cache.clear()
+        _cache[key] = result
+    return result
+
+
+async def get_org_unit_score(s: AsyncSession, org_unit_id: int) -> dict | None:
+    """Result of a single unit in the ``calculate_all_pillars`` shape, or None."""
+    tree = await get_org_scores(s)
+    node = next((n for n in tree["units"] if n["org_unit_id"] == org_unit_id), None)
+    if node is None:
+        return None
+    return {
+        "total_score": node["total_score"],
+        "pillars": node["pillars"],
+        "weights": tree["weights"],
+        "config_version": tree["config_version"],
+    }
@@ -0,0 +1,294 @@
+"""Incremental Security Score — persisted per-pillar state + reconciliation.
+
+``security_score_state`` keeps, for every pillar, its additive inputs (the
+accumulators produced by the ``score_engine_sql`` collectors) and the score
+derived from them.
+
+* Writes: a table-change listener (installed with the audit listeners when
+  ``SCORE_ENGINE_MODE=incremental``) maps the tables of a *committed*
+  transaction to pillars and marks them pending.  A task then sets
+  ``is_stale`` and bumps ``change_seq`` in a short transaction of its own,
+  so writers never lock the shared state rows; rolled-back changes mark
+  nothing.  Until that update commits, this process treats pending pillars
+  as stale; other workers catch up once it commits (reconciliation covers
+  anything missed).
+* Reads: ``calculate_incremental`` recomputes only pillars that are stale,
+  were computed on a previous day (SLA / window based pillars depend on the
+  date) or under another config version.  With nothing stale a GET is two
+  tiny queries.  Results are stored with an optimistic ``change_seq`` check,
+  so a write racing with the recompute keeps the pillar stale.
+* Reconciliation: ``reconcile_score_state`` runs the full engine and reports
+  drift between the stored (fresh) pillars and the recomputed ones — e.g.
+  writes made outside the ORM by other tools.  Drifted pillars are marked
+  stale so the next read repairs them.
+
+The state is only ever *derived* data: deleting all rows is always safe.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.middleware.audit_auto import (
+    add_table_change_listener,
+    remove_table_change_listener,
+)
+from app.models.security_score import SecurityScoreConfig, SecurityScoreState
+from app.services.score_engine import (
+    PILLAR_SCORERS,
+    PILLARS,
+    _maturity_pillar,
+    build_result,
+    calculate_all_pillars,
+    get_active_config,
+    run_pillar_tasks,
+)
+from app.services.score_engine_sql import PILLAR_COLLECTORS, _maturity_subscores_sql
+
+logger = logging.getLogger(__name__)
+
+# Source tables of every pillar.  Changes to the "_all" tables (labels drive
+# weights everywhere) invalidate every pillar.
+PILLAR_TABLES: dict[str, set[str]] = {
+    "risk": {"risks"},
+    "vulnerability": {"vulnerabilities_registry"},
+    "incident": {"incidents"},
+    "exception": {"policy_exceptions"},
+    "maturity": {"assessments", "assessment_answers", "dimension_levels", "control_implementations"},
+    "audit": {"audit_findings"},
+    "asset": {"assets"},
+    "tprm": {"vendors"},
+    "policy": {"policies", "policy_acknowledgments", "policy_standard_mappings"},
+    "awareness": {"awareness_campaigns", "awareness_results"},
+    "_all": {"dictionary_entries", "dictionary_types", "security_score_config"},
+}
+
+_state = SecurityScoreState.__table__
+# Pillars written by committed transactions whose stale-mark is not committed yet
+_pending: set[str] = set()
+_mark_tasks: set[asyncio.Task] = set()
+
+
+def pillars_for_tables(tables: set[str]) -> set[str]:
+    if tables & PILLAR_TABLES["_all"]:
+        return set(PILLARS)
+    return {p for p in PILLARS if tables & PILLAR_TABLES[p]}
+
+
+# ═══════════════════ WRITE PATH (after commit) ═══════════════════
+
+def _on_tables_changed(tables: set[str], phase: str) -> None:
+    if phase != "commit":
+        return
+    pillars = pillars_for_tables(tables)
+    if not pillars:
+        return
+    _pending.update(pillars)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # no loop (scripts): the next read applies the marks
+    task = loop.create_task(mark_pending_stale())
+    _mark_tasks.add(task)
+    task.add_done_callback(_mark_tasks.discard)
+
+
+async def mark_pending_stale() -> None:
+    """Commit the stale-marks of pending pillars in a short transaction of their own."""
+    if not _pending:
+        return
+    pillars = sorted(_pending)
+    try:
+        async with async_session() as s:
+            await s.execute(
+                update(_state)
+                .where(_state.c.pillar.in_(pillars))
+                .values(is_stale=True, change_seq=_state.c.change_seq + 1)
+            )
+            await s.commit()
+    except Exception:
+        # Derived data: keep the pillars pending (reads still treat them as
+        # stale) and retry on the next write or read
+        logger.exception("Could not mark Security Score pillars stale: %s", pillars)
+        return
+    _pending.difference_update(pillars)
+
+
+def install_score_state_hooks() -> None:
+    """Register the commit listener that invalidates pillars (incremental mode only)."""
+    if settings.SCORE_ENGINE_MODE == "incremental":
+        add_table_change_listener(_on_tables_changed)
+
+
+def uninstall_score_state_hooks() -> None:
+    remove_table_change_listener(_on_tables_changed)
+    _pending.clear()
+
+
+# ═══════════════════ READ PATH ═══════════════════
+
+def _needs_refresh(row, cfg: SecurityScoreConfig, today: date) -> bool:
+    return (
+        row is None
+        or row.is_stale
+        or row.score is None
+        or row.computed_on != today
+        or row.config_version != cfg.version
+    )
+
+
+async def _load_state(s: AsyncSession) -> dict:
+    rows = (await s.execute(select(_state))).all()
+    return {r.pillar: r for r in rows}
+
+
+async def _ensure_rows(s: AsyncSession, rows: dict) -> dict:
+    missing = [p for p in PILLARS if p not in rows]
+    if not missing:
+        return rows
+    try:
+        await s.execute(_state.insert(), [{"pillar": p, "is_stale": True, "change_seq": 0} for p in missing])
+        await s.commit()
+    except IntegrityError:
+        # Another worker created them first
+        await s.rollback()
+    return await _load_state(s)
+
+
+_PILLAR_TASKS = {**PILLAR_COLLECTORS, "maturity": _maturity_subscores_sql}
+
+
+def _score_from_inputs(pillar: str, inputs, cfg: SecurityScoreConfig) -> tuple[dict, float]:
+    if pillar == "maturity":
+        fw, eff = inputs
+        return {"framework_maturity": fw, "control_effectiveness": eff}, _maturity_pillar(fw, eff)
+    return inputs, PILLAR_SCORERS[pillar](inputs, cfg)
+
+
+async def calculate_incremental(concurrency: int | None = None) -> dict:
+    """Security Score from the persisted state, recomputing stale pillars only.
+
+    Uses its own session (state maintenance commits), so it sees committed
+    data only.  Same result shape as ``calculate_all_pillars`` plus
+    ``incremental.recomputed``.
+    """
+    if concurrency is None:
+        concurrency = settings.SCORE_ENGINE_CONCURRENCY
+    async with async_session() as s:
+        await mark_pending_stale()
+        cfg = await get_active_config(s)
+        rows = await _ensure_rows(s, await _load_state(s))
+        today = date.today()
+
+        stale = [p for p in PILLARS if p in _pending or _needs_refresh(rows.get(p), cfg, today)]
+        fresh: dict[str, tuple[dict, float]] = {}
+        timings: dict[str, float] = {}
+        if stale:
+            results, timings = await run_pillar_tasks(
+                s, cfg, {p: _PILLAR_TASKS[p] for p in stale}, concurrency,
+            )
+            now = datetime.utcnow()
+            for p in stale:
+                inputs, score = _score_from_inputs(p, results[p], cfg)
+                fresh[p] = (inputs, score)
+                await s.execute(
+                    update(_state)
+                    .where(_state.c.pillar == p, _state.c.change_seq == rows[p].change_seq)
+                    .values(inputs=inputs, score=score, is_stale=False, computed_on=today,
+                            config_version=cfg.version, computed_at=now)
+                )
+            await s.commit()
+
+    scores: dict[str, float] = {}
+    maturity_inputs: dict = {}
+    for p in PILLARS:
+        inputs, score = fresh[p] if p in fresh else (rows[p].inputs, rows[p].score)
+        scores[p] = score
+        if p == "maturity":
+            maturity_inputs = inputs or {}
+
+    result = build_result(
+        cfg, scores,
+        maturity_inputs.get("framework_maturity"), maturity_inputs.get("control_effectiveness"),
+        timings,
+    )
+    result["incremental"] = {"recomputed": stale}
+    return result
+
+
+# ═══════════════════ RECONCILIATION ═══════════════════
+
+_last_report: dict | None = None
+
+
+def _full_mode() -> str:
+    mode = settings.SCORE_ENGINE_MODE
+    return "sql" if mode == "incremental" else mode
+
+
+def last_reconcile_report() -> dict | None:
+    return _last_report
+
+
+async def reconcile_score_state(tolerance: float = 0.05, repair: bool = True) -> dict:
+    """Compare fresh stored pillars with a full recompute and report drift."""
+    global _last_report
+    async with async_session() as s:
+        cfg = await get_active_config(s)
+        full = await calculate_all_pillars(s, mode=_full_mode(), concurrency=1)
+        rows = await _load_state(s)
+        today = date.today()
+
+        checked, skipped = [], []
+        drift: dict[str, dict] = {}
+        for p in PILLARS:
+            row = rows.get(p)
+            if _needs_refresh(row, cfg, today):
+                # Will be recomputed on the next read anyway
+                skipped.append(p)
+                continue
+            checked.append(p)
+            stored = round(row.score, 1)
+            actual = full["pillars"][p]
+            if abs(actual - stored) > tolerance:
+                drift[p] = {"stored": stored, "actual": actual, "delta": round(actual - stored, 1)}
+
+        if drift and repair:
+            await s.execute(
+                update(_state)
+                .where(_state.c.pillar.in_(list(drift)))
+                .values(is_stale=True, change_seq=_state.c.change_seq + 1)
+            )
+            await s.commit()
+
+    if drift:
+        logger.warning("Security Score state drift detected: %s", drift)
+
+    _last_report = {
+        "checked_at": datetime.utcnow(),
+        "full_mode": _full_mode(),
+        "total_score": full["total_score"],
+        "checked": checked,
+        "skipped": skipped,
+        "drift": drift,
+        "max_delta": max((abs(d["delta"]) for d in drift.values()), default=0.0),
+        "repaired": bool(drift and repair),
+    }
+    return _last_report
+
+
+async def run_reconciliation_loop(interval_minutes: int) -> None:
+    """Periodic reconciliation (started on app startup in incremental mode)."""
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            await reconcile_score_state()
+        except Exception:
+            logger.exception("Security Score reconciliation failed")
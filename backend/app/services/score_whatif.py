@@ -0,0 +1,294 @@
+"""What-if simulator for ``SecurityScoreConfig`` — many candidate configs in one pass.
+
+Only four things in the Security Score depend on the config: the pillar
+weights, the vulnerability thresholds, the incident TTR targets and the
+incident window.  Everything else is config-independent, so the simulator:
+
+1. extracts the data once — the cfg-independent pillars are scored by the
+   ``score_engine_sql`` collectors, vulnerabilities become per-label open
+   counts, incidents become per-incident vectors (severity, TTR hours,
+   lessons flag, age in days) for the widest window any candidate asks for;
+2. stacks the candidates into ``(C, …)`` NumPy arrays and evaluates the
+   vulnerability / incident pillars and the weighted total for all of them
+   at once.
+
+The formulas mirror ``_vuln_pillar`` / ``_incident_pillar`` exactly (including
+the ``value or default`` handling of the config columns).  Nothing is ever
+written — the active config stays untouched.
+"""
+from __future__ import annotations
+
+import itertools
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.dictionary import DictionaryEntry
+from app.models.incident import Incident
+from app.models.security_score import SecurityScoreConfig
+from app.schemas.security_score import WhatIfCandidate
+from app.services.score_engine import (
+    INCIDENT_SEV_PARAMS,
+    PILLAR_SCORERS,
+    PILLARS,
+    VULN_SEV_WEIGHTS,
+    _maturity_pillar,
+    _vuln_sla_multiplier,
+    get_active_config,
+)
+from app.services.score_engine_sql import PILLAR_COLLECTORS, _lbl, _maturity_subscores_sql
+
+MAX_CANDIDATES = 2000
+
+# Config column -> default used by the engine (``cfg.x or default``)
+WEIGHT_FIELDS = {
+    "w_risk": 20, "w_vulnerability": 15, "w_incident": 12, "w_exception": 10, "w_maturity": 10,
+    "w_audit": 10, "w_asset": 8, "w_tprm": 6, "w_policy": 5, "w_awareness": 4,
+}
+VULN_THRESHOLD_FIELDS = {
+    "vuln_threshold_critical": 3, "vuln_threshold_high": 10,
+    "vuln_threshold_medium": 30, "vuln_threshold_low": 100,
+}
+INCIDENT_TTR_FIELDS = {
+    "incident_ttr_critical": 4, "incident_ttr_high": 24,
+    "incident_ttr_medium": 72, "incident_ttr_low": 168,
+}
+WINDOW_FIELD = "incident_window_days"
+SIMULATED_FIELDS = {**WEIGHT_FIELDS, **VULN_THRESHOLD_FIELDS, **INCIDENT_TTR_FIELDS, WINDOW_FIELD: 90}
+
+# Severity label -> column of the threshold / target matrix; unknown labels use the last
+# (fixed) column, exactly like the ``.get(sev, default)`` fallbacks in the engine.
+_VULN_LEVEL = {"krytyczna": 0, "critical": 0, "wysoka": 1, "high": 1,
+               "średnia": 2, "medium": 2, "niska": 3, "low": 3}
+_INCIDENT_LEVEL = {"krytyczny": 0, "critical": 0, "wysoki": 1, "high": 1,
+                   "średni": 2, "medium": 2, "niski": 3, "low": 3}
+_VULN_FALLBACK_THRESHOLD = 30
+_INCIDENT_FALLBACK_TARGET = 72
+
+_FIXED_PILLARS = tuple(p for p in PILLARS if p not in ("vulnerability", "incident"))
+
+
+@dataclass(slots=True)
+class WhatIfInputs:
+    """Config-independent data, extracted once per simulation."""
+    fixed_scores: dict[str, float]
+    # vulnerabilities: one entry per open severity label
+    vuln_n: int
+    vuln_sla_multiplier: float
+    vuln_counts: np.ndarray
+    vuln_weights: np.ndarray
+    vuln_level: np.ndarray
+    # incidents: one entry per incident within the widest window
+    inc_labels: list[str]
+    inc_label_idx: np.ndarray
+    inc_age_days: np.ndarray
+    inc_ttr_hours: np.ndarray
+    inc_lessons: np.ndarray
+
+
+# ═══════════════════ CANDIDATES ═══════════════════
+
+def expand_grid(grid: dict[str, list[float]]) -> list[dict[str, float]]:
+    """Cartesian product of ``{field: [values]}``, each value checked against ``WhatIfCandidate``."""
+    unknown = set(grid) - set(SIMULATED_FIELDS)
+    if unknown:
+        raise ValueError(f"Nieznane pola konfiguracji: {', '.join(sorted(unknown))}")
+    size = 1
+    for values in grid.values():
+        size *= max(len(values), 1)
+    if size > MAX_CANDIDATES:
+        raise ValueError(f"Siatka daje {size} kandydatów (limit {MAX_CANDIDATES})")
+    # Same bounds as explicit candidates; they are per field, so checking every
+    # value once covers every combination
+    checked: dict[str, list] = {}
+    for f, values in grid.items():
+        checked[f] = []
+        for v in values:
+            try:
+                checked[f].append(getattr(WhatIfCandidate.model_validate({f: v}), f))
+            except ValidationError as e:
+                raise ValueError(f"Siatka, pole {f}={v}: {e.errors()[0]['msg']}") from None
+    keys = list(checked)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(checked[k] for k in keys))]
+
+
+def _matrix(cfg: SecurityScoreConfig, candidates: list[dict], fields: dict[str, float]) -> np.ndarray:
+    """(C, len(fields)) array of effective values: override -> active cfg -> engine default."""
+    out = np.empty((len(candidates), len(fields)), dtype=float)
+    for j, (f, default) in enumerate(fields.items()):
+        current = getattr(cfg, f, None)
+        for i, c in enumerate(candidates):
+            v = c.get(f)
+            if v is None:
+                v = current
+            out[i, j] = float(v or default)
+    return out
+
+
+# ═══════════════════ EXTRACTION ═══════════════════
+
+async def extract_inputs(s: AsyncSession, cfg: SecurityScoreConfig, max_window_days: int) -> WhatIfInputs:
+    fixed: dict[str, float] = {}
+    for p in _FIXED_PILLARS:
+        if p == "maturity":
+            fixed[p] = _maturity_pillar(*(await _maturity_subscores_sql(s, cfg)))
+        else:
+            fixed[p] = PILLAR_SCORERS[p](await PILLAR_COLLECTORS[p](s, cfg), cfg)
+
+    vx = await PILLAR_COLLECTORS["vulnerability"](s, cfg)
+    vuln_n = vx.get("n", 0)
+    open_labels = [k[5:] for k, v in vx.items() if k.startswith("open:") and v]
+    sla_pct = (vx.get("on_time", 0) / vuln_n * 100) if vuln_n else 100
+
+    sv = aliased(DictionaryEntry)
+    today = date.today()
+    rows = (await s.execute(
+        select(Incident.reported_at, sv.label, Incident.ttr_minutes, Incident.lessons_learned)
+        .outerjoin(sv, Incident.severity_id == sv.id)
+        .where(Incident.is_active.is_(True), Incident.reported_at >= today - timedelta(days=max_window_days))
+    )).all()
+
+    labels: dict[str, int] = {}
+    idx = np.fromiter((labels.setdefault(_lbl(r.label) or "medium", len(labels)) for r in rows),
+                      dtype=np.int64, count=len(rows))
+    # reported_at >= (today - window) at midnight  <=>  age in days <= window
+    reported = np.array([r.reported_at for r in rows], dtype="datetime64[D]")
+    age = np.maximum((np.datetime64(today) - reported).astype(np.int64), 0)
+
+    return WhatIfInputs(
+        fixed_scores=fixed,
+        vuln_n=vuln_n,
+        vuln_sla_multiplier=_vuln_sla_multiplier(sla_pct),
+        vuln_counts=np.array([vx[f"open:{lb}"] for lb in open_labels], dtype=float),
+        vuln_weights=np.array([VULN_SEV_WEIGHTS.get(lb, 1) for lb in open_labels], dtype=float),
+        vuln_level=np.array([_VULN_LEVEL.get(lb, 4) for lb in open_labels], dtype=np.int64),
+        inc_labels=list(labels),
+        inc_label_idx=idx,
+        inc_age_days=age,
+        inc_ttr_hours=np.array([(r.ttr_minutes or 0) / 60 for r in rows], dtype=float),
+        inc_lessons=np.array([bool(r.lessons_learned) for r in rows], dtype=float),
+    )
+
+
+# ═══════════════════ VECTORISED PILLARS ═══════════════════
+
+def _vuln_scores(x: WhatIfInputs, thresholds: np.ndarray) -> np.ndarray:
+    """Vulnerability pillar for (C, 4) thresholds -> (C,)."""
+    n_cand = thresholds.shape[0]
+    if not x.vuln_n:
+        return np.full(n_cand, 100.0)
+    t = np.hstack([thresholds, np.full((n_cand, 1), _VULN_FALLBACK_THRESHOLD)])[:, x.vuln_level]
+    penalty = (x.vuln_weights * np.minimum(x.vuln_counts, t) / t).sum(axis=1)
+    return np.clip((100 - penalty * 100) * x.vuln_sla_multiplier, 0, 100)
+
+
+def _incident_scores(x: WhatIfInputs, targets: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """Incident pillar for (C, 4) TTR targets and (C,) windows -> (C,)."""
+    n_cand = targets.shape[0]
+    n_lbl = len(x.inc_labels)
+    if not n_lbl:
+        return np.full(n_cand, 100.0)
+
+    # Per (age, label) sums, cumulated over age: row a = everything at most a days old
+    max_age = int(max(x.inc_age_days.max(), windows.max()))
+    has_ttr = (x.inc_ttr_hours != 0).astype(float)
+    acc = np.zeros((4, max_age + 1, n_lbl))
+    for k, values in enumerate((np.ones_like(x.inc_ttr_hours), has_ttr, x.inc_ttr_hours, x.inc_lessons)):
+        np.add.at(acc[k], (x.inc_age_days, x.inc_label_idx), values)
+    acc = acc.cumsum(axis=1)
+
+    counts, ttr_n, ttr_sum, lessons = acc[:, windows.astype(np.int64), :]
+    lessons = lessons.sum(axis=1)
+    n = counts.sum(axis=1)
+
+    w = np.array([INCIDENT_SEV_PARAMS.get(lb, (1, 30))[0] for lb in x.inc_labels], dtype=float)
+    t = np.array([INCIDENT_SEV_PARAMS.get(lb, (1, 30))[1] for lb in x.inc_labels], dtype=float)
+    incident_penalty = (w * np.minimum(counts, t) / t).sum(axis=1) * 50
+
+    level = np.array([_INCIDENT_LEVEL.get(lb, 4) for lb in x.inc_labels], dtype=np.int64)
+    target = np.hstack([targets, np.full((n_cand, 1), _INCIDENT_FALLBACK_TARGET)])[:, level]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_ttr = np.where(ttr_n > 0, ttr_sum / ttr_n, 0.0)
+        ttr_penalty = np.where(ttr_n > 0, np.maximum(0, (avg_ttr - target) / target * 10), 0.0).sum(axis=1)
+        bonus = np.where(n > 0, lessons / n * 10, 0.0)
+
+    score = np.clip(100 - incident_penalty - ttr_penalty + bonus, 0, 100)
+    return np.where(n > 0, score, 100.0)
+
+
+# ═══════════════════ SIMULATION ═══════════════════
+
+def evaluate(x: WhatIfInputs, cfg: SecurityScoreConfig, candidates: list[dict]) -> dict[str, np.ndarray]:
+    """Pillar matrix (C, len(PILLARS)), weights (C, len(PILLARS)) and totals (C,)."""
+    n_cand = len(candidates)
+    weights = _matrix(cfg, candidates, WEIGHT_FIELDS)
+    windows = _matrix(cfg, candidates, {WINDOW_FIELD: 90})[:, 0]
+
+    by_pillar = {p: np.full(n_cand, x.fixed_scores[p]) for p in _FIXED_PILLARS}
+    by_pillar["vulnerability"] = _vuln_scores(x, _matrix(cfg, candidates, VULN_THRESHOLD_FIELDS))
+    by_pillar["incident"] = _incident_scores(x, _matrix(cfg, candidates, INCIDENT_TTR_FIELDS), windows)
+
+    pillars = np.column_stack([by_pillar[p] for p in PILLARS])
+    return {"pillars": pillars, "weights": weights, "total": (pillars * weights / 100).sum(axis=1)}
+
+
+def _distribution(values: np.ndarray) -> dict[str, float]:
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {
+        "min": round(float(values.min()), 1), "max": round(float(values.max()), 1),
+        "mean": round(float(values.mean()), 1), "std": round(float(values.std()), 2),
+        "p10": round(float(p10), 1), "p50": round(float(p50), 1), "p90": round(float(p90), 1),
+    }
+
+
+async def simulate(s: AsyncSession, candidates: list[dict], labels: list[str | None] | None = None) -> dict:
+    """Score every candidate config (partial overrides of the active one)."""
+    if not candidates:
+        raise ValueError("Brak kandydatów do symulacji")
+    if len(candidates) > MAX_CANDIDATES:
+        raise ValueError(f"Za dużo kandydatów: {len(candidates)} (limit {MAX_CANDIDATES})")
+
+    t0 = time.perf_counter()
+    cfg = await get_active_config(s)
+    all_configs = [{}, *candidates]  # row 0 = the active config as-is
+    max_window = int(_matrix(cfg, all_configs, {WINDOW_FIELD: 90}).max())
+    x = await extract_inputs(s, cfg, max_window)
+    t1 = time.perf_counter()
+
+    ev = evaluate(x, cfg, all_configs)
+    totals = ev["total"]
+    t2 = time.perf_counter()
+
+    weight_sums = ev["weights"].sum(axis=1)
+    baseline = round(float(totals[0]), 1)
+    rows = []
+    for i, overrides in enumerate(candidates, start=1):
+        total = round(float(totals[i]), 1)
+        rows.append({
+            "index": i - 1,
+            "label": labels[i - 1] if labels else None,
+            "overrides": overrides,
+            "weights_sum": round(float(weight_sums[i]), 2),
+            "valid": bool(abs(weight_sums[i] - 100) <= 0.1),
+            "total_score": total,
+            "delta": round(total - baseline, 1),
+            "pillars": {p: round(float(v), 1) for p, v in zip(PILLARS, ev["pillars"][i])},
+        })
+
+    return {
+        "config_version": cfg.version,
+        "baseline": {
+            "total_score": baseline,
+            "pillars": {p: round(float(v), 1) for p, v in zip(PILLARS, ev["pillars"][0])},
+        },
+        "candidates": rows,
+        "distribution": _distribution(totals[1:]),
+        "pillar_distribution": {p: _distribution(ev["pillars"][1:, j]) for j, p in enumerate(PILLARS)},
+        "timings_ms": {"extract": round((t1 - t0) * 1000, 2), "evaluate": round((t2 - t1) * 1000, 2)},
+    }
@@ -0,0 +1,161 @@
+"""
+Write-only XLSX export for large registers.
+
+Reports are built with openpyxl's write-only mode: each appended row is
+serialised to the sheet's temporary XML file right away, so memory does not
+grow with the number of rows.  A write-only sheet cannot be revisited, so
+column widths come from the first ``REPORT_WIDTH_SAMPLE_ROWS`` rows — they
+are buffered, measured (same formula as before: longest value + 3, max 40)
+and written out together with the header once the sample is full.
+
+Serialising rows is CPU-bound, so large sheets take them a cursor batch
+at a time with ``SheetWriter.extend``: the rows are mapped and written in a
+worker thread while the event loop keeps serving other requests.  The
+finished workbook is saved to a temporary file in a worker thread as well
+and sent to the client in chunks (``FileResponse``); the file is removed
+after the response.  Rows should come from prefetched lookups and a
+server-side cursor (``s.stream``) — no per-row queries.
+
+Usage in a router:
+    from app.services.xlsx_export import SheetWriter, new_workbook, xlsx_response
+
+    wb = new_workbook()
+    sheet = SheetWriter(wb, "Rejestr Ryzyk", ["ID", "Aktywo", ...])
+    result = await s.stream(q.execution_options(yield_per=STREAM_BATCH))
+    async for batch in result.partitions():
+        await sheet.extend([...] for r in batch)
+    sheet.close()
+    return await xlsx_response(wb)
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from collections.abc import Iterable
+from datetime import datetime
+
+from fastapi.responses import FileResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+HEADER_FILL = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
+HEADER_ALIGN = Alignment(horizontal="center", vertical="center", wrap_text=True)
+THIN_BORDER = Border(
+    left=Side(style="thin"), right=Side(style="thin"),
+    top=Side(style="thin"), bottom=Side(style="thin"),
+)
+MAX_COLUMN_WIDTH = 40
+STREAM_BATCH = 1000  # rows fetched per round-trip from the server-side cursor
+
+
+def new_workbook() -> Workbook:
+    """Write-only workbook (no default sheet — use ``SheetWriter`` / ``wb.create_sheet``)."""
+    return Workbook(write_only=True)
+
+
+def cell(ws, value, font: Font | None = None, border: Border | None = None) -> WriteOnlyCell:
+    """Styled cell for a write-only sheet."""
+    c = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        c.font = font
+    if border is not None:
+        c.border = border
+    return c
+
+
+class SheetWriter:
+    """Write-only sheet with a styled header row and column widths sampled from the first rows."""
+
+    def __init__(self, wb: Workbook, title: str, headers: list[str], border: bool = True,
+                 sample_rows: int | None = None, header_font: Font = HEADER_FONT,
+                 padding: int = 3, max_width: int = MAX_COLUMN_WIDTH):
+        self.ws = wb.create_sheet(title)
+        self.headers = headers
+        self.border = THIN_BORDER if border else None
+        self.header_font = header_font
+        self.padding = padding
+        self.max_width = max_width
+        self.sample_rows = settings.REPORT_WIDTH_SAMPLE_ROWS if sample_rows is None else sample_rows
+        self._widths = [len(h) for h in headers]
+        self._pending: list[list] | None = []
+        self.rows = 0
+
+    def append(self, values: list) -> None:
+        self.rows += 1
+        if self._pending is None:
+            self._write(values)
+            return
+        for i, v in enumerate(values):
+            n = len(str(v if v is not None else ""))
+            if i >= len(self._widths):
+                self._widths.append(n)
+            elif n > self._widths[i]:
+                self._widths[i] = n
+        self._pending.append(values)
+        if len(self._pending) >= self.sample_rows:
+            self._flush()
+
+    async def extend(self, rows: Iterable[list]) -> None:
+        """Append a batch of rows in a worker thread (a generator is consumed there too)."""
+        await run_in_threadpool(self._extend, rows)
+
+    def _extend(self, rows: Iterable[list]) -> None:
+        for values in rows:
+            self.append(values)
+
+    def close(self) -> None:
+        """Write out the header and buffered rows of a sheet shorter than the sample."""
+        if self._pending is not None:
+            self._flush()
+
+    def _flush(self) -> None:
+        for i, w in enumerate(self._widths, 1):
+            self.ws.column_dimensions[get_column_letter(i)].width = min(w + self.padding, self.max_width)
+        header = []
+        for h in self.headers:
+            c = cell(self.ws, h, font=self.header_font, border=THIN_BORDER)
+            c.fill = HEADER_FILL
+            c.alignment = HEADER_ALIGN
+            header.append(c)
+        self.ws.append(header)
+        pending, self._pending = self._pending, None
+        for values in pending:
+            self._write(values)
+
+    def _write(self, values: list) -> None:
+        if self.border is None:
+            self.ws.append(values)
+        else:
+            self.ws.append([cell(self.ws, v, border=self.border) for v in values])
+
+
+def _save(wb: Workbook) -> str:
+    fd, path = tempfile.mkstemp(prefix="raport_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        wb.save(path)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
+
+
+async def xlsx_response(wb: Workbook, filename_prefix: str = "raport") -> FileResponse:
+    """Save ``wb`` off the event loop and send it in chunks; the temp file is removed afterwards."""
+    path = await run_in_threadpool(_save, wb)
+    filename = f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        background=BackgroundTask(os.unlink, path),
+    )
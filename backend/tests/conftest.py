@@ -9,7 +9,8 @@ Strategy:
 import os
 import sys
 import types
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 
 import pytest
 import pytest_asyncio
@@ -111,8 +112,20 @@ fastapi_app.dependency_overrides[_test_get_session] = _test_get_session
 @pytest_asyncio.fixture(autouse=True)
 async def setup_database():
     """Create all tables before each test, drop after."""
+    from app.services.asset_graph import asset_graph
+    from app.services.dashboard_cache import dashboard_cache
+    from app.services.dictionary_cache import dict_cache
+    from app.services.score_org import invalidate_org_scores
+
     async with TEST_ENGINE.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Tables are recreated per test, so ids get reused — start from a cold cache
+    dict_cache.invalidate()
+    dict_cache.reset_stats()
+    invalidate_org_scores()
+    dashboard_cache.clear()
+    dashboard_cache.reset_stats()
+    asset_graph.invalidate()
     yield
     async with TEST_ENGINE.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -131,6 +144,25 @@ async def db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+@pytest.fixture
+def count_statements() -> Callable[[], AbstractContextManager[list[tuple[str, bool]]]]:
+    """``with count_statements() as stmts:`` collects ``(sql, executemany)`` for every statement sent meanwhile."""
+    @contextmanager
+    def _count() -> Iterator[list[tuple[str, bool]]]:
+        statements: list[tuple[str, bool]] = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, executemany))
+
+        event.listen(TEST_ENGINE.sync_engine, "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(TEST_ENGINE.sync_engine, "before_cursor_execute", listener)
+
+    return _count
+
+
 # ── Seed data helpers ──
 
 @pytest_asyncio.fixture
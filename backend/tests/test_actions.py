@@ -176,3 +176,73 @@ async def test_update_links(client: AsyncClient, seed_org):
     # Replace links with empty
     r = await client.put(f"/api/v1/actions/{action_id}", json={"links": []})
     assert len(r.json()["links"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_list_actions_pagination_nulls_last(client: AsyncClient, seed_org):
+    _, unit_id = seed_org
+    for title, due in (("bez terminu", None), ("pozniej", "2030-06-01T00:00:00"), ("wczesniej", "2030-01-01T00:00:00")):
+        body = {"title": title, "org_unit_id": unit_id}
+        if due:
+            body["due_date"] = due
+        assert (await client.post("/api/v1/actions", json=body)).status_code == 201
+
+    expected = ["wczesniej", "pozniej", "bez terminu"]
+    assert [a["title"] for a in (await client.get("/api/v1/actions")).json()] == expected
+
+    titles, cursor = [], None
+    for _ in range(3):
+        r = await client.get("/api/v1/actions?limit=1" + (f"&cursor={cursor}" if cursor else ""))
+        titles += [a["title"] for a in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+    assert titles == expected and cursor is None
+
+    r = await client.get("/api/v1/actions?sort=-due_date&limit=2")
+    assert [a["title"] for a in r.json()] == ["pozniej", "wczesniej"]
+    r = await client.get(f"/api/v1/actions?sort=-due_date&limit=2&cursor={r.headers['x-next-cursor']}")
+    assert [a["title"] for a in r.json()] == ["bez terminu"]
+
+
+@pytest.mark.asyncio
+async def test_export_actions_prefetched(client: AsyncClient, seed_org, count_statements):
+    """Export resolves names/links/history up front: query count does not grow with the data."""
+    import io
+
+    from openpyxl import load_workbook
+
+    _, unit_id = seed_org
+    asset = (await client.post("/api/v1/assets", json={"name": "Serwer DB", "org_unit_id": unit_id})).json()
+    risk = (await client.post("/api/v1/risks", json={
+        "org_unit_id": unit_id, "asset_name": "Ryzyko DB", "impact_level": 1,
+        "probability_level": 1, "safeguard_rating": 0.25,
+    })).json()
+
+    async def create(n: int):
+        for i in range(n):
+            r = await client.post("/api/v1/actions", json={
+                "title": f"Dzialanie {i}", "org_unit_id": unit_id,
+                "links": [{"entity_type": "risk", "entity_id": risk["id"]},
+                          {"entity_type": "asset", "entity_id": asset["id"]}],
+            })
+            await client.put(f"/api/v1/actions/{r.json()['id']}", json={"owner": "Nowy", "change_reason": "test"})
+
+    async def export():
+        with count_statements() as statements:
+            r = await client.get("/api/v1/actions/export")
+        assert r.status_code == 200
+        return load_workbook(io.BytesIO(r.content), read_only=True), len(statements)
+
+    await create(1)
+    await export()  # warm the dictionary cache
+    _, few = await export()
+    await create(4)
+    wb, many = await export()
+    assert many == few
+
+    actions = list(wb["Dzialania"].iter_rows(values_only=True))
+    assert len(actions) == 6 and actions[1][3] == "IT"
+    links = list(wb["Powiazane ryzyka"].iter_rows(values_only=True))
+    assert len(links) == 11
+    assert {(row[2], row[4]) for row in links[1:]} == {("risk", "Ryzyko DB"), ("asset", "Serwer DB")}
+    history = list(wb["Historia zmian"].iter_rows(values_only=True))
+    assert len(history) >= 6 and history[1][4] == "test"
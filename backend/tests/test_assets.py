@@ -205,3 +205,172 @@ async def test_graph_with_relationships(client: AsyncClient, seed_org):
     node_names = {n["name"] for n in data["nodes"]}
     assert "App" in node_names
     assert "DB" in node_names
+
+
+async def _chain(client: AsyncClient, unit_id: int, names: list[str]) -> list[dict]:
+    """Assets linked a -> b -> c ... with depends_on relationships."""
+    assets = [
+        (await client.post("/api/v1/assets", json={"name": n, "org_unit_id": unit_id})).json()
+        for n in names
+    ]
+    for src, dst in zip(assets, assets[1:]):
+        r = await client.post("/api/v1/assets/relationships", json={
+            "source_asset_id": src["id"], "target_asset_id": dst["id"], "relationship_type": "depends_on",
+        })
+        assert r.status_code == 201
+    return assets
+
+
+@pytest.mark.asyncio
+async def test_graph_neighbourhood_and_path(client: AsyncClient, seed_org):
+    _, unit_id = seed_org
+    a, b, c, d = await _chain(client, unit_id, ["A", "B", "C", "D"])
+    child = (await client.post("/api/v1/assets", json={
+        "name": "A-child", "org_unit_id": unit_id, "parent_id": a["id"],
+    })).json()
+
+    r = await client.get(f"/api/v1/assets/graph/neighbourhood/{b['id']}", params={"depth": 1})
+    assert r.status_code == 200
+    data = r.json()
+    assert {n["name"] for n in data["nodes"]} == {"A", "B", "C"}
+    assert len(data["edges"]) == 2 and data["truncated"] is False
+
+    r = await client.get(f"/api/v1/assets/graph/neighbourhood/{b['id']}",
+                         params={"depth": 2, "direction": "out"})
+    assert {n["name"] for n in r.json()["nodes"]} == {"B", "C", "D"}
+
+    r = await client.get("/api/v1/assets/graph/path", params={"source": child["id"], "target": d["id"]})
+    assert r.status_code == 200
+    assert [n["name"] for n in r.json()["nodes"]] == ["A-child", "A", "B", "C", "D"]
+    assert r.json()["edges"][0]["type"] == "contains"
+
+    r = await client.get("/api/v1/assets/graph/path",
+                         params={"source": d["id"], "target": a["id"], "direction": "out"})
+    assert r.status_code == 404
+    assert (await client.get("/api/v1/assets/graph/neighbourhood/999999")).status_code == 404
+    bad = await client.get(f"/api/v1/assets/graph/neighbourhood/{a['id']}", params={"direction": "up"})
+    assert bad.status_code == 400
+
+    # Writes invalidate the cached index
+    await client.post("/api/v1/assets/relationships", json={
+        "source_asset_id": d["id"], "target_asset_id": a["id"], "relationship_type": "supports",
+    })
+    r = await client.get("/api/v1/assets/graph/path",
+                         params={"source": d["id"], "target": a["id"], "direction": "out"})
+    assert [n["name"] for n in r.json()["nodes"]] == ["D", "A"]
+
+
+@pytest.mark.asyncio
+async def test_graph_blast_radius(client: AsyncClient, seed_org):
+    _, unit_id = seed_org
+    a, b, c = await _chain(client, unit_id, ["App", "DB", "Storage"])
+    for asset in (b, c, c):
+        await client.post("/api/v1/risks", json={
+            "org_unit_id": unit_id, "asset_id": asset["id"], "asset_name": asset["name"],
+            "impact_level": 2, "probability_level": 2, "safeguard_rating": 0.25,
+        })
+
+    r = await client.get(f"/api/v1/assets/graph/blast-radius/{a['id']}")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["asset_count"] == 2 and data["risk_count"] == 3
+    assert [(n["name"], n["distance"], n["risk_count"]) for n in data["assets"]] == [
+        ("DB", 1, 1), ("Storage", 2, 2),
+    ]
+
+    r = await client.get(f"/api/v1/assets/graph/blast-radius/{a['id']}", params={"depth": 1})
+    assert r.json()["asset_count"] == 1 and r.json()["risk_count"] == 1
+    r = await client.get(f"/api/v1/assets/graph/blast-radius/{c['id']}")
+    assert r.json()["asset_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_list_assets_sparse_fields(client: AsyncClient, seed_org):
+    _, unit_id = seed_org
+    await client.post("/api/v1/assets", json={"name": "Serwer", "org_unit_id": unit_id, "description": "x" * 500})
+    r = await client.get("/api/v1/assets?fields=name,org_unit_name,risk_count")
+    assert r.status_code == 200
+    assert r.json() == [{"id": r.json()[0]["id"], "name": "Serwer", "org_unit_name": "IT", "risk_count": 0}]
+    full = (await client.get("/api/v1/assets")).json()[0]
+    assert full["description"] == "x" * 500 and full["org_unit_name"] == "IT"
+
+
+@pytest.mark.asyncio
+async def test_list_assets_ndjson_stream(client: AsyncClient, seed_org):
+    import json
+
+    _, unit_id = seed_org
+    for name in ("Router", "Baza", "Serwer"):
+        await client.post("/api/v1/assets", json={"name": name, "org_unit_id": unit_id})
+    r = await client.get("/api/v1/assets", headers={"Accept": "application/x-ndjson"})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in r.text.splitlines()] == (await client.get("/api/v1/assets")).json()
+
+
+def _csv(text: str) -> dict:
+    return {"file": ("aktywa.csv", text.encode("utf-8"), "text/csv")}
+
+
+@pytest.mark.asyncio
+async def test_import_csv_batches_and_ref_ids(client: AsyncClient, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "ASSET_IMPORT_BATCH_SIZE", 2)
+    rows = "\n".join(f"Serwer {i};Jan;DC{i % 2};Linux" for i in range(5))
+    r = await client.post("/api/v1/assets/import/csv", files=_csv(f"name;owner;location;os\n{rows}\n;bez nazwy;;\n"))
+    body = r.json()
+    assert body["status"] == "ok" and body["created"] == 5
+    assert body["errors"] == ["Wiersz 7: brak nazwy"] and body["total_errors"] == 1
+
+    assets = (await client.get("/api/v1/assets")).json()
+    assert all(a["ref_id"] == f"AST-{a['id']:04d}" for a in assets)
+    first = next(a for a in assets if a["name"] == "Serwer 0")
+    assert first["owner"] == "Jan" and first["custom_attributes"] == {"os": "Linux"}
+
+
+@pytest.mark.asyncio
+async def test_import_csv_upsert_and_dry_run(client: AsyncClient, db):
+    from sqlalchemy import func, select
+
+    from app.models.audit import AuditLog
+
+    await client.post("/api/v1/assets/import/csv", files=_csv("name,owner,os\nRouter,Anna,IOS\nBaza,Piotr,\n"))
+    csv_text = "name,owner,os\nRouter,Ewa,IOS\nBaza,Piotr,\nProxy,Ola,\n"
+
+    dry = (await client.post("/api/v1/assets/import/csv?key=name&dry_run=true", files=_csv(csv_text))).json()
+    assert (dry["dry_run"], dry["created"], dry["updated"], dry["unchanged"]) == (True, 1, 1, 1)
+    assert len((await client.get("/api/v1/assets")).json()) == 2
+
+    audit_before = await db.scalar(select(func.count()).select_from(AuditLog))
+    r = await client.post("/api/v1/assets/import/csv?key=name", files=_csv(csv_text))
+    assert (r.json()["created"], r.json()["updated"], r.json()["unchanged"]) == (1, 1, 1)
+    by_name = {a["name"]: a for a in (await client.get("/api/v1/assets")).json()}
+    assert by_name["Router"]["owner"] == "Ewa" and by_name["Proxy"]["ref_id"].startswith("AST-")
+    changes = (await db.execute(
+        select(AuditLog.action, AuditLog.entity_id, AuditLog.field_name, AuditLog.old_value, AuditLog.new_value)
+        .order_by(AuditLog.id).offset(audit_before)
+    )).all()
+    assert ("update", by_name["Router"]["id"], "owner", "Anna", "Ewa") in changes
+    assert ("create", by_name["Proxy"]["id"], None, None, None) in changes
+
+    bad = await client.post("/api/v1/assets/import/csv?key=hostname", files=_csv(csv_text))
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_import_csv_ndjson_progress(client: AsyncClient, monkeypatch):
+    import json
+
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "ASSET_IMPORT_BATCH_SIZE", 2)
+    rows = "\n".join(f"Host {i}" for i in range(5))
+    r = await client.post(
+        "/api/v1/assets/import/csv", files=_csv(f"name\n{rows}\n"),
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [p["processed"] for p in lines] == [2, 4, 5]
+    assert not lines[0]["done"] and lines[-1]["done"] and lines[-1]["created"] == 5
+    assert len((await client.get("/api/v1/assets")).json()) == 5
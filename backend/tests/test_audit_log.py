@@ -0,0 +1,163 @@
+"""Functional tests — automatic audit log writer (core executemany vs. ORM objects)."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.asset import Asset
+from app.models.audit import AuditLog
+
+
+async def _bulk_edit(db) -> list[tuple]:
+    assets = [Asset(name=f"Serwer {i}", owner="Jan") for i in range(20)]
+    db.add_all(assets)
+    await db.flush()
+    for a in assets:
+        a.owner, a.location = "Anna", "DC1"
+    await db.delete(assets[0])
+    await db.commit()
+    rows = (await db.execute(
+        select(AuditLog.action, AuditLog.entity_type, AuditLog.entity_id,
+               AuditLog.field_name, AuditLog.old_value, AuditLog.new_value)
+    )).all()
+    return sorted((r[0], r[1], r[2] - assets[0].id, r[3] or "", r[4] or "", r[5] or "") for r in rows)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["core", "orm"])
+async def test_audit_modes_write_same_entries(db, monkeypatch, mode):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "AUDIT_WRITE_MODE", mode)
+    entries = await _bulk_edit(db)
+    assert len(entries) == 20 + 19 * 2 + 1  # creates, owner+location per updated asset, delete
+    assert ("update", "assets", 1, "owner", "Jan", "Anna") in entries
+    assert ("delete", "assets", 0, "", "", "") in entries
+
+
+def test_unknown_audit_write_mode_is_rejected(monkeypatch):
+    from app.config import settings
+    from app.middleware.audit_auto import install_audit_listeners
+
+    monkeypatch.setattr(settings, "AUDIT_WRITE_MODE", "asnyc")
+    with pytest.raises(ValueError, match="AUDIT_WRITE_MODE"):
+        install_audit_listeners()
+
+
+@pytest.mark.asyncio
+async def test_core_audit_single_insert_and_stats(client: AsyncClient, db, monkeypatch, count_statements):
+    from app.config import settings
+    from app.middleware.audit_auto import reset_audit_write_stats
+
+    monkeypatch.setattr(settings, "AUDIT_WRITE_MODE", "core")
+    reset_audit_write_stats()
+    db.add_all([Asset(name=f"Host {i}") for i in range(50)])
+    await db.commit()
+
+    assets = (await db.execute(select(Asset))).scalars().all()
+    for a in assets:
+        a.description, a.location = "opis", "DC2"
+    with count_statements() as statements:
+        await db.commit()
+    audit_inserts = [many for stmt, many in statements if stmt.lstrip().upper().startswith("INSERT INTO AUDIT_LOG")]
+    assert audit_inserts == [True]
+
+    stats = (await client.get("/api/v1/audit-log/write-stats")).json()
+    assert stats["mode"] == "core"
+    assert stats["core"]["flushes"] == 2 and stats["core"]["entries"] == 150
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    from app.config import settings
+    from app.middleware import audit_auto
+    from app.services.audit_queue import AuditQueue
+
+    q = AuditQueue()
+    monkeypatch.setattr(settings, "AUDIT_WRITE_MODE", "async")
+    monkeypatch.setattr(settings, "AUDIT_SPILL_DIR", str(tmp_path))
+    monkeypatch.setattr(audit_auto, "audit_queue", q)
+    return q
+
+
+@pytest.mark.asyncio
+async def test_async_audit_written_after_commit_only(db, queue):
+    from sqlalchemy import func
+
+    queue.start()
+    asset = Asset(name="Router", owner="Jan")
+    db.add(asset)
+    await db.commit()
+    asset_id = asset.id
+    asset.owner = "Anna"
+    await db.flush()
+    await db.rollback()  # the update's entries are dropped with the transaction
+
+    await queue.stop()
+    actions = (await db.execute(select(AuditLog.action, AuditLog.entity_id))).all()
+    assert actions == [("create", asset_id)]
+    assert await db.scalar(select(func.count()).select_from(Asset)) == 1
+    st = queue.stats()
+    assert (st["enqueued"], st["written"], st["depth"], st["running"]) == (1, 1, 0, False)
+
+
+@pytest.mark.asyncio
+async def test_async_audit_spills_overflow_and_replays(db, queue, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "AUDIT_QUEUE_MAX_ENTRIES", 5)
+    monkeypatch.setattr(settings, "AUDIT_QUEUE_BATCH_SIZE", 4)
+    queue.start()
+    db.add_all([Asset(name=f"Host {i}") for i in range(12)])
+    await db.commit()  # 12 entries: 5 queued, 7 spilled to disk
+    assert queue.stats()["spilled"] == 7 and queue.has_spill()
+
+    await queue.stop()
+    st = queue.stats()
+    assert (st["written"], st["replayed"], st["spill_bytes"]) == (12, 7, 0)
+    assert not queue.has_spill()
+    ids = (await db.execute(select(AuditLog.entity_id).order_by(AuditLog.entity_id))).scalars().all()
+    assert len(ids) == 12 and len(set(ids)) == 12
+
+    # Committed after stop(): kept on disk and replayed on the next start
+    from app.middleware.audit_auto import audit_entry
+
+    queue.put([audit_entry("assets", "create", 999)])
+    assert queue.has_spill()
+    queue.start()
+    await queue.stop()
+    assert await db.scalar(select(AuditLog.id).where(AuditLog.entity_id == 999)) is not None
+
+
+@pytest.mark.asyncio
+async def test_async_audit_replays_orphan_spill_and_sets_bad_lines_aside(db, queue, tmp_path, monkeypatch):
+    import json
+    import os
+    from datetime import datetime
+
+    from app.middleware.audit_auto import audit_entry
+
+    good = {**audit_entry("assets", "create", 7), "created_at": datetime(2026, 1, 1).isoformat()}
+    # Spill file of a process that is gone: one valid entry, one truncated line
+    (tmp_path / "audit_spill.ndjson").write_text(json.dumps(good) + "\n" + '{"module": "Aktywa", "act\n')
+    assert queue.has_spill()
+
+    queue.start()
+    await queue.stop()
+    assert await db.scalar(select(AuditLog.id).where(AuditLog.entity_id == 7)) is not None
+    st = queue.stats()
+    assert (st["replayed"], st["bad_lines"], st["spill_bytes"]) == (1, 1, 0)
+    assert not queue.has_spill()
+    bad = [p for p in tmp_path.iterdir() if p.name.endswith(".bad")]
+    assert len(bad) == 1 and bad[0].read_text().startswith('{"module": "Aktywa"')
+
+    # A file another worker claimed first is skipped, not fatal
+    (tmp_path / "audit_spill.ndjson").write_text(json.dumps(good) + "\n")
+    original_replace = os.replace
+
+    def claimed_elsewhere(src, dst):
+        if str(src).endswith("audit_spill.ndjson"):
+            raise FileNotFoundError(src)
+        return original_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", claimed_elsewhere)
+    assert queue._claim() is None
@@ -56,7 +56,7 @@ async def test_archive_threat(client: AsyncClient, seed_catalog):
 
 @pytest.mark.asyncio
 async def test_create_vulnerability(client: AsyncClient, seed_security_area):
-    r = await client.post("/api/v1/vulnerabilities", json={
+    r = await client.post("/api/v1/vulnerability-catalog", json={
         "name": "Slabe hasla",
         "security_area_id": seed_security_area,
     })
@@ -66,7 +66,7 @@ async def test_create_vulnerability(client: AsyncClient, seed_security_area):
 
 @pytest.mark.asyncio
 async def test_list_vulnerabilities(client: AsyncClient, seed_catalog):
-    r = await client.get("/api/v1/vulnerabilities")
+    r = await client.get("/api/v1/vulnerability-catalog")
     assert r.status_code == 200
     assert len(r.json()) >= 1
 
@@ -74,7 +74,7 @@ async def test_list_vulnerabilities(client: AsyncClient, seed_catalog):
 @pytest.mark.asyncio
 async def test_get_vulnerability(client: AsyncClient, seed_catalog):
     vuln_id = seed_catalog[1]
-    r = await client.get(f"/api/v1/vulnerabilities/{vuln_id}")
+    r = await client.get(f"/api/v1/vulnerability-catalog/{vuln_id}")
     assert r.status_code == 200
     assert r.json()["name"] == "Brak backupu"
 
@@ -82,7 +82,7 @@ async def test_get_vulnerability(client: AsyncClient, seed_catalog):
 @pytest.mark.asyncio
 async def test_update_vulnerability(client: AsyncClient, seed_catalog):
     vuln_id = seed_catalog[1]
-    r = await client.put(f"/api/v1/vulnerabilities/{vuln_id}", json={"name": "Brak backupu danych"})
+    r = await client.put(f"/api/v1/vulnerability-catalog/{vuln_id}", json={"name": "Brak backupu danych"})
     assert r.status_code == 200
     assert r.json()["name"] == "Brak backupu danych"
 
@@ -90,7 +90,7 @@ async def test_update_vulnerability(client: AsyncClient, seed_catalog):
 @pytest.mark.asyncio
 async def test_archive_vulnerability(client: AsyncClient, seed_catalog):
     vuln_id = seed_catalog[1]
-    r = await client.delete(f"/api/v1/vulnerabilities/{vuln_id}")
+    r = await client.delete(f"/api/v1/vulnerability-catalog/{vuln_id}")
     assert r.status_code == 200
 
 
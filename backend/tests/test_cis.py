@@ -244,3 +244,81 @@ async def test_copy_assessment(client: AsyncClient, seed_org, seed_cis):
     r = await client.get(f"/api/v1/cis/assessments/{a2_id}/answers")
     assert len(r.json()) == 1
     assert r.json()[0]["policy_value"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_cis_comparison_batched(client: AsyncClient, db: AsyncSession, seed_org, seed_cis):
+    """Comparison picks each unit's latest assessment and matches the per-unit dashboard."""
+    from app.models.org_unit import OrgUnit
+
+    level_id, unit_id = seed_org
+    _, sc1_id, sc2_id = seed_cis
+    other = OrgUnit(level_id=level_id, name="HR", symbol="HR")
+    db.add(other)
+    await db.commit()
+
+    async def assess(uid, values):
+        aid = (await client.post("/api/v1/cis/assessments", json={
+            "org_unit_id": uid, "assessor_name": "Audytor",
+        })).json()["id"]
+        await client.post(f"/api/v1/cis/assessments/{aid}/answers", json={"answers": [
+            {"sub_control_id": sc, "policy_value": v, "impl_value": v, "auto_value": v, "report_value": v}
+            for sc, v in zip((sc1_id, sc2_id), values)
+        ]})
+        return aid
+
+    await assess(unit_id, (0.0, 0.0))
+    latest = await assess(unit_id, (1.0, 0.5))
+
+    r = await client.get(f"/api/v1/dashboard/cis/comparison?org_unit_ids={unit_id},null,{other.id}")
+    assert r.status_code == 200
+    units = r.json()["units"]
+    assert [u["org_unit"] and u["org_unit"]["id"] for u in units] == [unit_id, None, other.id]
+
+    first = units[0]
+    assert first["assessment_id"] == latest
+    assert first["ig_scores"] == {"ig1": 100.0, "ig2": 75.0, "ig3": 75.0}
+    single = (await client.get(f"/api/v1/dashboard/cis?org_unit_id={unit_id}")).json()
+    assert first["controls"] == single["controls"]
+    assert first["ig_scores"] == single["ig_scores"]
+
+    assert units[1]["assessment_id"] is None
+    assert units[2]["assessment_id"] is None and units[2]["controls"] == []
+
+
+@pytest.mark.asyncio
+async def test_materialised_scores_and_backfill(client: AsyncClient, db: AsyncSession, seed_org, seed_cis):
+    """Upsert stores IG + dimension scores; the trend reads them; backfill fills legacy rows."""
+    from sqlalchemy import update
+
+    from app.models.cis import CisAssessment
+    from app.services.cis_scores import backfill_assessment_scores
+
+    _, unit_id = seed_org
+    _, sc1_id, sc2_id = seed_cis
+    aid = (await client.post("/api/v1/cis/assessments", json={
+        "org_unit_id": unit_id, "assessor_name": "Audytor",
+    })).json()["id"]
+    await client.post(f"/api/v1/cis/assessments/{aid}/answers", json={"answers": [
+        {"sub_control_id": sc1_id, "policy_value": 1.0, "impl_value": 0.5, "auto_value": 0.5, "report_value": 0.0},
+        {"sub_control_id": sc2_id, "policy_value": 0.0, "impl_value": 0.0, "auto_value": 0.0, "report_value": 0.0},
+    ]})
+
+    data = (await client.get(f"/api/v1/cis/assessments/{aid}")).json()
+    assert data["ig1_score"] == 50.0 and data["ig2_score"] == 25.0
+    assert data["policy_pct"] == 50.0 and data["implementation_pct"] == 25.0 and data["reporting_pct"] == 0.0
+
+    trend = (await client.get(f"/api/v1/dashboard/cis/trend?org_unit_id={unit_id}")).json()
+    assert trend["points"][0]["ig1"] == 50.0 and trend["points"][0]["automation_pct"] == 25.0
+
+    # Legacy row (created before materialisation): the trend aggregates it on the fly, backfill stores it
+    await db.execute(update(CisAssessment).values(scores_computed_at=None, ig1_score=None, policy_pct=None))
+    await db.commit()
+    legacy = (await client.get(f"/api/v1/dashboard/cis/trend?org_unit_id={unit_id}")).json()
+    assert legacy["points"] == trend["points"]
+
+    assert await backfill_assessment_scores(db) == 1
+    assert await backfill_assessment_scores(db) == 0
+    a = await db.get(CisAssessment, aid)
+    await db.refresh(a)
+    assert float(a.ig1_score) == 50.0 and float(a.policy_pct) == 50.0 and a.scores_computed_at is not None
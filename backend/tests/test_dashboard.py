@@ -1,8 +1,6 @@
 """Functional tests — Dashboard endpoints (smoke tests).
 
 Dashboard endpoints aggregate data from multiple modules.
-risk_dashboard uses MySQL-specific SQL (aliased join, date_format, group_concat)
-that doesn't translate to SQLite. Marked xfail where applicable.
 """
 import pytest
 from httpx import AsyncClient
@@ -18,7 +16,6 @@ async def test_executive_summary_empty(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-@pytest.mark.xfail(reason="MySQL-specific SQL: aliased join, date_format, group_concat")
 async def test_risk_dashboard_empty(client: AsyncClient):
     r = await client.get("/api/v1/dashboard/risks")
     assert r.status_code == 200
@@ -53,8 +50,127 @@ async def test_executive_summary_with_data(client: AsyncClient, seed_org, seed_d
 
 
 @pytest.mark.asyncio
-@pytest.mark.xfail(reason="MySQL-specific SQL: risk dashboard aliased joins")
 async def test_risk_dashboard_with_org_filter(client: AsyncClient, seed_org):
     _, unit_id = seed_org
     r = await client.get(f"/api/v1/dashboard/risks?org_unit_id={unit_id}")
     assert r.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_dashboard_cache_hit_and_table_invalidation(client: AsyncClient, seed_org, seed_dicts):
+    from app.services.dashboard_cache import dashboard_cache
+
+    _, unit_id = seed_org
+    first = (await client.get("/api/v1/dashboard/posture-score")).json()
+    again = (await client.get("/api/v1/dashboard/posture-score")).json()
+    assert again == first
+    stats = (await client.get("/api/v1/dashboard/admin/cache-stats")).json()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+
+    # CIS entry is not tagged with `risks` and survives a risk write
+    await client.get("/api/v1/dashboard/cis")
+    r = await client.post("/api/v1/risks", json={
+        "org_unit_id": unit_id, "asset_name": "Cache", "impact_level": 3,
+        "probability_level": 3, "safeguard_rating": 0.10,
+    })
+    assert r.status_code == 201
+    assert dashboard_cache.stats()["entries"] == 1
+
+    await client.get("/api/v1/dashboard/posture-score")
+    assert dashboard_cache.stats()["misses"] == 3
+
+
+def test_dashboard_cache_lru_caps():
+    from app.services.dashboard_cache import DashboardCache
+
+    cache = DashboardCache(max_entries=2, max_bytes=0, ttl_seconds=0)
+    tags = frozenset({"risks"})
+    for k in ("a", "b"):
+        cache.put((k,), k, tags)
+    cache.get(("a",))  # "b" becomes least recently used
+    cache.put(("c",), "c", tags)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None and cache.get(("c",)) is not None
+    assert cache.stats()["evictions"] == 1
+
+    # A value computed while its table was written is not stored
+    versions = cache._versions(tags)
+    cache.invalidate_tables({"risks"})
+    assert cache.put(("d",), "d", tags, versions) is False
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_risk_trend_and_heatmap_from_daily_rollup(client: AsyncClient, db, seed_org, seed_dicts):
+    from datetime import date, timedelta
+
+    from sqlalchemy import delete, func, select
+
+    from app.models.risk import Risk, RiskDailyRollup
+
+    _, unit_id = seed_org
+    for w, p in ((3, 3), (3, 3), (1, 1)):
+        await client.post("/api/v1/risks", json={
+            "org_unit_id": unit_id, "asset_name": "Rollup", "impact_level": w,
+            "probability_level": p, "safeguard_rating": 0.10,
+        })
+    # A month-end record from an earlier month — history the live table cannot provide
+    past = date.today().replace(day=1) - timedelta(days=1)
+    db.add(RiskDailyRollup(day=past, org_unit_id=unit_id, impact_level=2, probability_level=2,
+                           risk_level="medium", risk_count=4, score_sum=200))
+    await db.commit()
+
+    # Reads never write the roll-up: nothing for today until a roll-up runs
+    data = (await client.get(f"/api/v1/dashboard/risks?org_unit_id={unit_id}")).json()
+    assert {(c["impact"], c["probability"]): c["count"] for c in data["matrix"]} == {(2, 2): 4}
+    assert (await db.execute(select(func.count()).select_from(RiskDailyRollup))).scalar() == 1
+
+    # Re-runs of the same day are idempotent (upsert on the day + group key)
+    for _ in range(2):
+        assert (await client.post("/api/v1/dashboard/admin/risk-rollup")).json()["rows"] == 2
+    data = (await client.get(f"/api/v1/dashboard/risks?org_unit_id={unit_id}")).json()
+    assert {(c["impact"], c["probability"]): c["count"] for c in data["matrix"]} == {(3, 3): 2, (1, 1): 1}
+    trend = {p["period"]: p for p in data["trend"]}
+    assert trend[past.strftime("%Y-%m")]["total"] == 4
+    assert trend[past.strftime("%Y-%m")]["avg_score"] == 50.0
+    current = trend[date.today().strftime("%Y-%m")]
+    assert current["total"] == 3 and current["high"] == 2
+
+    # The next roll-up picks up new risks and drops groups that no longer exist
+    await client.post("/api/v1/risks", json={
+        "org_unit_id": unit_id, "asset_name": "Rollup", "impact_level": 1,
+        "probability_level": 1, "safeguard_rating": 0.10,
+    })
+    await db.execute(delete(Risk).where(Risk.impact_level == 3))
+    await db.commit()
+    from app.services.risk_rollup import run_rollup
+
+    assert await run_rollup() == 1
+    data = (await client.get("/api/v1/dashboard/risks")).json()
+    assert {(c["impact"], c["probability"]): c["count"] for c in data["matrix"]} == {(1, 1): 2}
+
+
+@pytest.mark.asyncio
+async def test_dashboard_conditional_get_skips_aggregation(client: AsyncClient, seed_org, seed_dicts):
+    from app.services.dashboard_cache import dashboard_cache
+
+    _, unit_id = seed_org
+    r = await client.get("/api/v1/dashboard/cis")
+    etag = r.headers["etag"]
+    misses = dashboard_cache.stats()["misses"]
+    hits = dashboard_cache.stats()["hits"]
+
+    r2 = await client.get("/api/v1/dashboard/cis", headers={"If-None-Match": f'"other", {etag}'})
+    assert r2.status_code == 304
+    # Handler did not run: neither a cache hit nor a miss was recorded
+    assert dashboard_cache.stats()["misses"] == misses and dashboard_cache.stats()["hits"] == hits
+
+    # A risk write does not touch CIS tables; it does change the risk dashboard's ETag
+    risk_etag = (await client.get("/api/v1/dashboard/risks")).headers["etag"]
+    r = await client.post("/api/v1/risks", json={
+        "org_unit_id": unit_id, "asset_name": "ETag", "impact_level": 2,
+        "probability_level": 2, "safeguard_rating": 0.25,
+    })
+    assert r.status_code == 201
+    assert (await client.get("/api/v1/dashboard/cis", headers={"If-None-Match": etag})).status_code == 304
+    assert (await client.get("/api/v1/dashboard/risks", headers={"If-None-Match": risk_etag})).status_code == 200
@@ -91,3 +91,41 @@ async def test_reorder_entries(client: AsyncClient, seed_dicts):
     })
     assert r.status_code == 200
     assert r.json()["updated"] == 2
+
+
+@pytest.mark.asyncio
+async def test_label_cache_invalidated_on_update(client: AsyncClient, seed_org, seed_dicts):
+    _, unit_id = seed_org
+    crit_id = seed_dicts["criticality"]["high"]
+    cr = await client.post("/api/v1/assets", json={
+        "name": "Cache", "org_unit_id": unit_id, "criticality_id": crit_id,
+    })
+    asset_id = cr.json()["id"]
+    assert cr.json()["criticality_name"] == "Wysoka"
+
+    r = await client.get(f"/api/v1/assets/{asset_id}")
+    assert r.json()["criticality_name"] == "Wysoka"
+    stats = (await client.get("/api/v1/dictionaries/admin/cache-stats")).json()
+    assert stats["loaded"] is True
+    assert stats["hits"] >= 1
+
+    await client.put(f"/api/v1/dictionaries/entries/{crit_id}", json={"label": "Bardzo wysoka"})
+    r = await client.get(f"/api/v1/assets/{asset_id}")
+    assert r.json()["criticality_name"] == "Bardzo wysoka"
+
+
+@pytest.mark.asyncio
+async def test_label_cache_invalidated_on_bulk_update(db, seed_dicts):
+    from sqlalchemy import update
+
+    from app.models.dictionary import DictionaryEntry
+    from app.services.dictionary_cache import dict_cache
+
+    entry_id = seed_dicts["risk_status"]["open"]
+    assert await dict_cache.label(db, entry_id) == "Otwarty"
+    loads = dict_cache.loads
+
+    await db.execute(update(DictionaryEntry).where(DictionaryEntry.id == entry_id).values(label="Nowy"))
+    await db.commit()
+    assert await dict_cache.label(db, entry_id) == "Nowy"
+    assert dict_cache.loads == loads + 1
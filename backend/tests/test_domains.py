@@ -119,3 +119,48 @@ async def test_domain_with_org_filter(client: AsyncClient, seed_org, seed_securi
     r = await client.get(f"/api/v1/domains/dashboard/scores?org_unit_id={unit_id}")
     assert r.status_code == 200
     assert r.json()["org_unit_id"] == unit_id
+
+
+@pytest.mark.asyncio
+async def test_domain_dashboard_batched(client: AsyncClient, db, seed_org, seed_dicts, count_statements):
+    """Per-domain stats, CIS coverage and top-N risks; query count does not grow with domains."""
+    from app.models.cis import CisControl, CisSubControl
+    from app.models.security_area import SecurityDomain
+    from app.services.domain_score import get_domain_dashboard
+
+    _, unit_id = seed_org
+    ctrl = CisControl(control_number=1, name_en="Inventory", name_pl="Inwentaryzacja", sub_control_count=1)
+    db.add(ctrl)
+    await db.flush()
+    sub = CisSubControl(control_id=ctrl.id, sub_id="1.1", detail_en="d", detail_pl="d", implementation_groups="1")
+    db.add(sub)
+    await db.commit()
+
+    mapped = (await client.post("/api/v1/domains", json={"name": "Sieci", "cis_control_ids": [ctrl.id]})).json()["id"]
+    plain = (await client.post("/api/v1/domains", json={"name": "Dane"})).json()["id"]
+    for impact in (1, 3, 2):
+        await client.post("/api/v1/risks", json={
+            "org_unit_id": unit_id, "asset_name": f"R{impact}", "security_area_id": mapped,
+            "impact_level": impact, "probability_level": 3, "safeguard_rating": 0.10,
+        })
+    aid = (await client.post("/api/v1/cis/assessments", json={"org_unit_id": None, "assessor_name": "A"})).json()["id"]
+    await client.post(f"/api/v1/cis/assessments/{aid}/answers", json={"answers": [
+        {"sub_control_id": sub.id, "policy_value": 0.5, "impl_value": 0.5, "auto_value": 0.5, "report_value": 0.5},
+    ]})
+
+    data = (await client.get("/api/v1/domains/dashboard/scores?top_n=2")).json()
+    cards = {d["domain_id"]: d for d in data["domains"]}
+    assert cards[mapped]["risk_count"] == 3
+    assert [r["asset_name"] for r in cards[mapped]["top_risks"]] == ["R3", "R2"]
+    assert cards[mapped]["cis_control_count"] == 1 and cards[mapped]["cis_pct"] == 50.0
+    assert cards[plain]["risk_count"] == 0 and cards[plain]["top_risks"] == []
+    assert cards[plain]["cis_control_count"] == 0 and cards[plain]["cis_pct"] is None
+
+    with count_statements() as statements:
+        await get_domain_dashboard(db)
+    few = len(statements)
+    db.add_all([SecurityDomain(name=f"D{i}") for i in range(5)])
+    await db.commit()
+    with count_statements() as statements:
+        await get_domain_dashboard(db)
+    assert len(statements) == few
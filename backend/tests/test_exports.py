@@ -0,0 +1,140 @@
+"""Functional tests — background export jobs with cached artefacts."""
+import asyncio
+import io
+
+import pytest
+from httpx import AsyncClient
+from openpyxl import load_workbook
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+async def _wait(client: AsyncClient, job_id: str) -> dict:
+    for _ in range(200):
+        job = (await client.get(f"/api/v1/exports/{job_id}")).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("export job did not finish")
+
+
+async def _risk(client: AsyncClient, unit_id: int, name: str):
+    r = await client.post("/api/v1/risks", json={
+        "org_unit_id": unit_id, "asset_name": name, "impact_level": 2,
+        "probability_level": 2, "safeguard_rating": 0.25,
+    })
+    assert r.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_export_job_cached_until_data_changes(client: AsyncClient, seed_org, export_dir):
+    _, unit_id = seed_org
+    await _risk(client, unit_id, "Serwer 1")
+
+    r = await client.post("/api/v1/exports", json={"kind": "risks", "params": {"org_unit_id": unit_id}})
+    assert r.status_code == 202
+    job = await _wait(client, r.json()["id"])
+    assert job["status"] == "done" and job["download_url"]
+
+    d = await client.get(job["download_url"])
+    assert d.status_code == 200
+    assert "raport_" in d.headers["content-disposition"]
+    rows = list(load_workbook(io.BytesIO(d.content), read_only=True)["Rejestr Ryzyk"].iter_rows(values_only=True))
+    assert len(rows) == 2
+    assert len(list(export_dir.glob("*.xlsx"))) == 1
+
+    # Unchanged data: the finished artefact is reused
+    again = (await client.post("/api/v1/exports", json={"kind": "risks", "params": {"org_unit_id": unit_id}})).json()
+    assert again["id"] == job["id"] and again["cached"] is True
+
+    # A write to a table the report reads invalidates it
+    await _risk(client, unit_id, "Serwer 2")
+    fresh = (await client.post("/api/v1/exports", json={"kind": "risks", "params": {"org_unit_id": unit_id}})).json()
+    assert fresh["id"] != job["id"] and fresh["cached"] is False
+    assert (await _wait(client, fresh["id"]))["status"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_export_job_actions_and_validation(client: AsyncClient, export_dir):
+    kinds = (await client.get("/api/v1/exports/kinds")).json()
+    assert {"risks", "assets", "executive", "actions"} <= set(kinds)
+
+    assert (await client.post("/api/v1/exports", json={"kind": "nope"})).status_code == 400
+    bad = await client.post("/api/v1/exports", json={"kind": "actions", "params": {"org_unit_id": 1}})
+    assert bad.status_code == 400
+    assert (await client.get("/api/v1/exports/missing")).status_code == 404
+
+    job = (await client.post("/api/v1/exports", json={"kind": "actions"})).json()
+    job = await _wait(client, job["id"])
+    assert job["status"] == "done"
+    d = await client.get(job["download_url"])
+    assert "dzialania_export_" in d.headers["content-disposition"]
+
+    # Artefact removed behind the job's back: 410 instead of a failing FileResponse
+    for f in export_dir.glob("*.xlsx"):
+        f.unlink()
+    assert (await client.get(job["download_url"])).status_code == 410
+
+
+@pytest.mark.asyncio
+async def test_export_retention(client: AsyncClient, export_dir, monkeypatch):
+    from app.config import settings
+    from app.services import export_jobs
+
+    job = (await client.post("/api/v1/exports", json={"kind": "executive"})).json()
+    assert (await _wait(client, job["id"]))["status"] == "done"
+    assert any(export_dir.iterdir())
+
+    monkeypatch.setattr(settings, "EXPORT_RETENTION_MINUTES", 0)
+    assert export_jobs.prune() == 1
+    assert not any(export_dir.iterdir())
+    assert (await client.get(f"/api/v1/exports/{job['id']}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_export_prune_scheduler(client: AsyncClient, export_dir, monkeypatch):
+    from app.config import settings
+    from app.services import export_jobs
+
+    job = (await client.post("/api/v1/exports", json={"kind": "executive"})).json()
+    assert (await _wait(client, job["id"]))["status"] == "done"
+
+    monkeypatch.setattr(settings, "EXPORT_RETENTION_MINUTES", 0)
+    task = asyncio.create_task(export_jobs.run_prune_scheduler(3600))
+    try:
+        for _ in range(200):
+            if not any(export_dir.iterdir()):
+                break
+            await asyncio.sleep(0.01)
+        assert not any(export_dir.iterdir())
+        assert (await client.get(f"/api/v1/exports/{job['id']}")).status_code == 404
+    finally:
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_export_job_visible_to_every_worker(client: AsyncClient, seed_org, export_dir):
+    """Job state and the cache key live outside the process: another worker sees the same job."""
+    from app.services import export_jobs
+
+    _, unit_id = seed_org
+    await _risk(client, unit_id, "Serwer 1")
+    job = (await client.post("/api/v1/exports", json={"kind": "risks", "params": {"org_unit_id": unit_id}})).json()
+    job = await _wait(client, job["id"])
+
+    # Only the manifest next to the artefact is needed to answer status / download
+    manifest = export_dir / f"{job['id']}.json"
+    assert manifest.exists()
+    assert (await export_jobs.get_job(job["id"])).status == "done"
+    assert (await client.get(job["download_url"])).status_code == 200
+
+    # The key is derived from the data, not from process-local counters
+    spec = export_jobs._specs["risks"]
+    assert await export_jobs._cache_key(spec, {"org_unit_id": unit_id}) == job["id"]
+    assert (await client.get("/api/v1/exports/..%2F..%2Fetc")).status_code == 404
@@ -187,6 +187,16 @@ async def test_list_nodes_ig3_filter(client: AsyncClient, seed_framework):
     assert len(r.json()) == 2
 
 
+@pytest.mark.asyncio
+async def test_list_nodes_sparse_fields(client: AsyncClient, seed_framework):
+    fw_id = seed_framework["fw_id"]
+    r = await client.get(f"/api/v1/frameworks/{fw_id}/nodes?assessable=true&fields=ref_id,name")
+    assert r.status_code == 200
+    assert len(r.json()) == 4
+    assert all(set(n) == {"id", "ref_id", "name"} for n in r.json())
+    assert (await client.get(f"/api/v1/frameworks/{fw_id}/nodes?fields=annotation")).status_code == 400
+
+
 # ═══════════════════════════════════════════════
 # DIMENSIONS
 # ═══════════════════════════════════════════════
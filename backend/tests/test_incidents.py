@@ -0,0 +1,35 @@
+"""Functional tests — Incident registry."""
+import json
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_list_incidents_ndjson_batch_loaded(client: AsyncClient, seed_org, count_statements):
+    """Streamed rows resolve org unit / asset names with IN-queries: query count does not grow with rows."""
+    _, unit_id = seed_org
+
+    async def create(n: int):
+        for i in range(n):
+            asset = (await client.post("/api/v1/assets", json={"name": f"Host {i}", "org_unit_id": unit_id})).json()
+            r = await client.post("/api/v1/incidents", json={
+                "title": f"Incydent {i}", "description": "Opis", "org_unit_id": unit_id, "asset_id": asset["id"],
+                "reported_by": "Jan", "assigned_to": "Anna", "reported_at": "2026-01-01T10:00:00",
+            })
+            assert r.status_code == 201
+
+    async def stream() -> tuple[list, int]:
+        with count_statements() as statements:
+            r = await client.get("/api/v1/incidents", headers={"Accept": "application/x-ndjson"})
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in r.text.splitlines()], len(statements)
+
+    await create(2)
+    _, few = await stream()
+    await create(4)
+    rows, many = await stream()
+    assert len(rows) == 6 and many == few
+    assert rows == (await client.get("/api/v1/incidents")).json()
+    assert {r["org_unit_name"] for r in rows} == {"IT"}
+    assert sorted(r["asset_name"] for r in rows)[-1] == "Host 3"
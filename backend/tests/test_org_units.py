@@ -111,3 +111,27 @@ async def test_tree_hierarchy(client: AsyncClient, seed_org):
     it_node = next(n for n in tree if n["name"] == "IT")
     assert len(it_node["children"]) == 1
     assert it_node["children"][0]["name"] == "Bezpieczenstwo"
+
+
+@pytest.mark.asyncio
+async def test_tree_conditional_get(client: AsyncClient, seed_org):
+    level_id, _ = seed_org
+    r = await client.get("/api/v1/org-units/tree")
+    etag = r.headers["etag"]
+    assert r.status_code == 200 and etag.startswith('W/"')
+
+    r2 = await client.get("/api/v1/org-units/tree", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.content == b""
+    assert r2.headers["etag"] == etag
+
+    # Different query -> different representation
+    r3 = await client.get("/api/v1/org-units/tree?include_inactive=true", headers={"If-None-Match": etag})
+    assert r3.status_code == 200
+
+    r = await client.post("/api/v1/org-units", json={"level_id": level_id, "name": "Nowa", "symbol": "NEW"})
+    assert r.status_code == 201
+    r4 = await client.get("/api/v1/org-units/tree", headers={"If-None-Match": etag})
+    assert r4.status_code == 200
+    assert r4.headers["etag"] != etag
+    assert any(n["name"] == "Nowa" for n in r4.json())
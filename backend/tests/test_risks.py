@@ -253,3 +253,121 @@ async def test_risk_safeguards_sync(client: AsyncClient, seed_org, seed_catalog)
     # Remove all safeguards
     r = await client.put(f"/api/v1/risks/{risk_id}", json={"safeguard_ids": []})
     assert len(r.json()["safeguards"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_list_risks_bulk_loader(client: AsyncClient, db, seed_org, seed_dicts, count_statements):
+    """List resolves names/M2M with IN-queries: query count does not grow with the page."""
+    from app.models.smart_catalog import ControlCatalog, ThreatCatalog
+
+    _, unit_id = seed_org
+    threat = ThreatCatalog(ref_id="T-01", name="Phishing", category="HUMAN")
+    control = ControlCatalog(ref_id="C-01", name="MFA", category="TECHNICAL", implementation_type="PREVENTIVE")
+    db.add_all([threat, control])
+    await db.commit()
+
+    async def create(n: int):
+        for i in range(n):
+            r = await client.post("/api/v1/risks", json=_risk_body(
+                unit_id, asset_name=f"Bulk {i}", status_id=seed_dicts["risk_status"]["open"],
+                threat_ids=[threat.id], safeguard_ids=[control.id], planned_safeguard_id=control.id,
+            ))
+            assert r.status_code == 201
+
+    async def list_count() -> tuple[list, int]:
+        with count_statements() as statements:
+            data = (await client.get("/api/v1/risks")).json()
+        return data, len(statements)
+
+    await create(2)
+    data, few = await list_count()
+    await create(6)
+    data, many = await list_count()
+    assert len(data) == 8 and many == few
+
+    single = (await client.get(f"/api/v1/risks/{data[0]['id']}")).json()
+    assert single == data[0]
+    assert single["org_unit_name"] == "IT"
+    assert single["status_name"] is not None
+    assert single["threats"] == [{"threat_id": threat.id, "threat_name": "Phishing"}]
+    assert single["safeguards"] == [{"safeguard_id": control.id, "safeguard_name": "MFA"}]
+    assert single["planned_safeguard_name"] == "MFA"
+
+
+@pytest.mark.asyncio
+async def test_list_risks_keyset_pagination(client: AsyncClient, seed_org):
+    _, unit_id = seed_org
+    for name in ("E", "B", "D", "A", "C"):
+        assert (await client.post("/api/v1/risks", json=_risk_body(unit_id, asset_name=name))).status_code == 201
+
+    unpaged = (await client.get("/api/v1/risks?sort=asset_name")).json()
+    assert [r["asset_name"] for r in unpaged] == ["A", "B", "C", "D", "E"]
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/v1/risks?sort=asset_name&limit=2&include_total=true"
+        r = await client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert r.status_code == 200 and r.headers["x-total-count"] == "5"
+        seen += [x["asset_name"] for x in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert seen == ["A", "B", "C", "D", "E"]
+
+    # Descending, risk_score ties broken by id; pages do not overlap
+    first = await client.get("/api/v1/risks?limit=3")
+    rest = await client.get(f"/api/v1/risks?cursor={first.headers['x-next-cursor']}")
+    ids = [x["id"] for x in first.json() + rest.json()]
+    assert sorted(ids) == sorted(x["id"] for x in unpaged)
+
+    assert (await client.get("/api/v1/risks?sort=owner")).status_code == 400
+    assert (await client.get("/api/v1/risks?cursor=garbage")).status_code == 400
+    # A cursor is bound to its sort order
+    assert (await client.get(f"/api/v1/risks?sort=asset_name&cursor={first.headers['x-next-cursor']}")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_risks_sparse_fields(client: AsyncClient, seed_org, count_statements):
+    _, unit_id = seed_org
+    for name in ("A", "B", "C"):
+        await client.post("/api/v1/risks", json=_risk_body(
+            unit_id, asset_name=name, consequence_description="Dlugi opis " * 200,
+        ))
+
+    with count_statements() as statements:
+        r = await client.get("/api/v1/risks?fields=asset_name,org_unit_name&sort=asset_name&limit=2")
+    assert r.status_code == 200
+    assert r.json() == [
+        {"id": r.json()[0]["id"], "asset_name": "A", "org_unit_name": "IT"},
+        {"id": r.json()[1]["id"], "asset_name": "B", "org_unit_name": "IT"},
+    ]
+    assert "x-next-cursor" in r.headers
+    sql = " ".join(stmt for stmt, _ in statements)
+    assert "consequence_description" not in sql
+    assert "risk_threats" not in sql and "action_links" not in sql
+
+    assert (await client.get("/api/v1/risks?fields=asset_name,nope")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_risks_ndjson_stream(client: AsyncClient, seed_org, monkeypatch):
+    import json
+
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "NDJSON_BATCH_SIZE", 2)
+    _, unit_id = seed_org
+    for name in ("A", "B", "C", "D", "E"):
+        await client.post("/api/v1/risks", json=_risk_body(unit_id, asset_name=name))
+
+    r = await client.get("/api/v1/risks?sort=asset_name", headers={"Accept": "application/x-ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert rows == (await client.get("/api/v1/risks?sort=asset_name")).json()
+
+    r = await client.get("/api/v1/risks?sort=-asset_name&fields=asset_name,org_unit_name",
+                         headers={"Accept": "application/x-ndjson"})
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [x["asset_name"] for x in rows] == ["E", "D", "C", "B", "A"]
+    assert set(rows[0]) == {"id", "asset_name", "org_unit_name"}
@@ -0,0 +1,404 @@
+"""Security Score engine — the set-based (SQL) mode must match the ORM mode."""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.score_engine import PILLARS, calculate_all_pillars
+
+
+async def _score(db: AsyncSession, **kwargs) -> dict:
+    result = await calculate_all_pillars(db, **kwargs)
+    result.pop("timings_ms")
+    return result
+
+
+async def _dict(db: AsyncSession, code: str, labels: list[str]) -> dict[str, int]:
+    from app.models.dictionary import DictionaryEntry, DictionaryType
+
+    dt = DictionaryType(code=code, name=code)
+    db.add(dt)
+    await db.flush()
+    ids = {}
+    for i, label in enumerate(labels):
+        de = DictionaryEntry(dict_type_id=dt.id, code=f"{code}_{i}", label=label, sort_order=i)
+        db.add(de)
+        await db.flush()
+        ids[label] = de.id
+    return ids
+
+
+@pytest_asyncio.fixture
+async def seed_score_data(db: AsyncSession, seed_org):
+    from app.models.asset import Asset
+    from app.models.audit_register import Audit, AuditFinding
+    from app.models.awareness import AwarenessCampaign, AwarenessResult
+    from app.models.incident import Incident
+    from app.models.policy import Policy, PolicyAcknowledgment, PolicyStandardMapping
+    from app.models.policy_exception import PolicyException
+    from app.models.risk import Risk
+    from app.models.vendor import Vendor
+    from app.models.vulnerability import VulnerabilityRecord
+
+    _, unit_id = seed_org
+    today = date.today()
+    status = await _dict(db, "score_status", ["Zidentyfikowane", "W mitygacji", "Zamknięte", "Approved", ""])
+    sev = await _dict(db, "score_severity", ["Krytyczna", "Wysoka", "Niska", "Krytyczny", "Wysoki"])
+    crit = await _dict(db, "score_criticality", ["Krytyczny", "Niski"])
+    ctype = await _dict(db, "score_campaign_type", ["Szkolenie online", "Phishing simulation"])
+
+    for i, st in enumerate([status["Zidentyfikowane"], status["W mitygacji"], status["Zamknięte"], None]):
+        db.add(Risk(org_unit_id=unit_id, asset_name=f"A{i}", impact_level=2, probability_level=2,
+                    safeguard_rating=Decimal("0.25"), risk_score=Decimal(str(40 + i * 35)), status_id=st))
+
+    for i, (st, sv) in enumerate([(None, sev["Krytyczna"]), (None, sev["Krytyczna"]), (None, sev["Wysoka"]),
+                                  (status["Zamknięte"], sev["Niska"]), (status[""], None)]):
+        db.add(VulnerabilityRecord(title=f"V{i}", org_unit_id=unit_id, owner="x", detected_at=today,
+                                   status_id=st, severity_id=sv,
+                                   sla_deadline=today + timedelta(days=(-3 if i % 2 else 5))))
+
+    now = datetime.utcnow()
+    for i, (sv, ttr, lessons) in enumerate([(sev["Krytyczny"], 600, "ok"), (sev["Krytyczny"], None, ""),
+                                            (sev["Wysoki"], 30, None), (None, 5000, "x")]):
+        db.add(Incident(title=f"I{i}", description="d", org_unit_id=unit_id, reported_by="a", assigned_to="b",
+                        reported_at=now - timedelta(days=i), severity_id=sv, ttr_minutes=ttr,
+                        lessons_learned=lessons))
+    db.add(Incident(title="old", description="d", org_unit_id=unit_id, reported_by="a", assigned_to="b",
+                    reported_at=now - timedelta(days=400), severity_id=sev["Krytyczny"]))
+
+    policies = []
+    for i, (st, audience, review) in enumerate([(status["Approved"], 10, today - timedelta(days=1)),
+                                                (None, 0, None), (status["Zamknięte"], 4, today)]):
+        p = Policy(title=f"P{i}", owner="o", status_id=st, target_audience_count=audience, review_date=review)
+        db.add(p)
+        policies.append(p)
+    await db.flush()
+    for _ in range(3):
+        db.add(PolicyAcknowledgment(policy_id=policies[0].id, acknowledged_by="u"))
+    db.add(PolicyAcknowledgment(policy_id=policies[2].id, acknowledged_by="u"))
+    db.add(PolicyStandardMapping(policy_id=policies[0].id, standard_name="ISO"))
+    db.add(PolicyStandardMapping(policy_id=policies[0].id, standard_name="NIST"))
+
+    for i, (rl, st, exp, comp) in enumerate([(sev["Krytyczny"], None, -1, "fw"), (sev["Wysoki"], None, 10, None),
+                                             (None, status["Zamknięte"], -5, "")]):
+        db.add(PolicyException(title=f"E{i}", description="d", policy_id=policies[0].id, org_unit_id=unit_id,
+                               requested_by="r", risk_level_id=rl, status_id=st, start_date=today,
+                               expiry_date=today + timedelta(days=exp), compensating_controls=comp))
+
+    audit = Audit(title="Audit", auditor="aud")
+    db.add(audit)
+    await db.flush()
+    for i, (st, sv, sla) in enumerate([(None, sev["Krytyczny"], 3), (None, None, -2),
+                                       (status["Zamknięte"], sev["Wysoki"], 1), (None, sev["Wysoki"], None)]):
+        db.add(AuditFinding(audit_id=audit.id, title=f"F{i}", status_id=st, severity_id=sv,
+                            sla_deadline=today + timedelta(days=sla) if sla is not None else None))
+
+    for i, (owner, cr, eol, scan) in enumerate([("Jan", crit["Niski"], -10, -3), ("", crit["Niski"], None, -60),
+                                                (None, None, 30, None), ("Ola", None, None, 0)]):
+        db.add(Asset(name=f"S{i}", owner=owner, criticality_id=cr,
+                     support_end_date=today + timedelta(days=eol) if eol is not None else None,
+                     last_scan_date=today + timedelta(days=scan) if scan is not None else None))
+
+    for i, (cr, score, last, nxt) in enumerate([(crit["Krytyczny"], "70", -100, 10), (crit["Niski"], "40", -500, -5),
+                                                (crit["Krytyczny"], None, None, None), (None, "90", -1, -1)]):
+        db.add(Vendor(name=f"Ven{i}", criticality_id=cr, risk_score=Decimal(score) if score else None,
+                      last_assessment_date=today + timedelta(days=last) if last is not None else None,
+                      next_assessment_date=today + timedelta(days=nxt) if nxt is not None else None))
+
+    campaigns = []
+    for i, (ct, start) in enumerate([(ctype["Szkolenie online"], -10), (ctype["Phishing simulation"], -20),
+                                     (ctype["Phishing simulation"], -30), (None, -5), (ctype["Szkolenie online"], -800)]):
+        c = AwarenessCampaign(title=f"C{i}", campaign_type_id=ct, start_date=today + timedelta(days=start))
+        db.add(c)
+        campaigns.append(c)
+    await db.flush()
+    for c, completion, click, report in [(campaigns[0], "80", None, None), (campaigns[0], "60", None, None),
+                                         (campaigns[1], None, "12.5", "30"), (campaigns[1], None, "7.5", None),
+                                         (campaigns[2], None, None, None), (campaigns[4], "10", None, None)]:
+        db.add(AwarenessResult(campaign_id=c.id,
+                               completion_rate=Decimal(completion) if completion else None,
+                               click_rate=Decimal(click) if click else None,
+                               report_rate=Decimal(report) if report else None))
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_sql_mode_matches_orm_empty(db: AsyncSession):
+    assert await _score(db, mode="sql") == await _score(db, mode="orm")
+
+
+@pytest.mark.asyncio
+async def test_sql_mode_matches_orm(db: AsyncSession, seed_score_data):
+    orm = await _score(db, mode="orm")
+    sql = await _score(db, mode="sql")
+    assert sql == orm
+    assert orm["pillars"]["risk"] < 100
+    assert orm["pillars"]["awareness"] > 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_mode_rejected(db: AsyncSession):
+    with pytest.raises(ValueError):
+        await calculate_all_pillars(db, mode="bogus")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["orm", "sql"])
+async def test_concurrent_matches_sequential(db: AsyncSession, seed_score_data, mode):
+    sequential = await calculate_all_pillars(db, mode=mode, concurrency=1)
+    concurrent = await calculate_all_pillars(db, mode=mode, concurrency=4)
+
+    assert set(concurrent["timings_ms"]) == {*PILLARS, "total"}
+    assert all(v >= 0 for v in concurrent["timings_ms"].values())
+    sequential.pop("timings_ms")
+    concurrent.pop("timings_ms")
+    assert concurrent == sequential
+
+
+@pytest.mark.asyncio
+async def test_posture_score_timings(client):
+    r = await client.get("/api/v1/dashboard/posture-score")
+    assert r.status_code == 200
+    assert "total" in r.json()["timings_ms"]
+
+
+# ── Incremental mode (persisted per-pillar state) ──
+
+@pytest.fixture
+def incremental_mode(monkeypatch):
+    from app.config import settings
+    from app.services.score_state import (
+        install_score_state_hooks,
+        uninstall_score_state_hooks,
+    )
+
+    monkeypatch.setattr(settings, "SCORE_ENGINE_MODE", "incremental")
+    install_score_state_hooks()
+    yield
+    uninstall_score_state_hooks()
+
+
+@pytest.mark.asyncio
+async def test_score_state_untouched_outside_incremental_mode(db: AsyncSession, seed_org, count_statements):
+    from app.models.risk import Risk
+    from app.services.score_state import install_score_state_hooks
+
+    install_score_state_hooks()  # default mode "orm": nothing is registered
+    _, unit_id = seed_org
+    with count_statements() as statements:
+        db.add(Risk(org_unit_id=unit_id, asset_name="Orm", impact_level=1, probability_level=1,
+                    safeguard_rating=Decimal("0.50"), risk_score=Decimal("10")))
+        await db.commit()
+    assert not [stmt for stmt, _ in statements if "security_score_state" in stmt]
+
+
+@pytest.mark.asyncio
+async def test_incremental_matches_full_and_reuses_state(db: AsyncSession, seed_score_data, incremental_mode):
+    full = await _score(db, mode="sql")
+
+    first = await calculate_all_pillars(db, mode="incremental")
+    assert first["incremental"]["recomputed"] == list(PILLARS)
+    second = await calculate_all_pillars(db, mode="incremental")
+    assert second["incremental"]["recomputed"] == []
+
+    for result in (first, second):
+        result.pop("timings_ms")
+        result.pop("incremental")
+        assert result == full
+
+
+@pytest.mark.asyncio
+async def test_incremental_recomputes_only_touched_pillar(db: AsyncSession, seed_score_data, seed_org, incremental_mode):
+    from sqlalchemy import select
+
+    from app.models.risk import Risk
+    from app.models.security_score import SecurityScoreState
+
+    await calculate_all_pillars(db, mode="incremental")
+    risk_seq = select(SecurityScoreState.change_seq).where(SecurityScoreState.pillar == "risk")
+    seq = await db.scalar(risk_seq)
+
+    _, unit_id = seed_org
+    db.add(Risk(org_unit_id=unit_id, asset_name="New", impact_level=3, probability_level=3,
+                safeguard_rating=Decimal("0.10"), risk_score=Decimal("300")))
+    await db.flush()
+    assert await db.scalar(risk_seq) == seq  # the writer's transaction leaves the state rows alone
+    await db.commit()
+
+    result = await calculate_all_pillars(db, mode="incremental")
+    assert result["incremental"]["recomputed"] == ["risk"]
+    assert result["pillars"] == (await _score(db, mode="sql"))["pillars"]
+
+
+@pytest.mark.asyncio
+async def test_incremental_rollback_keeps_state(db: AsyncSession, seed_score_data, seed_org, incremental_mode):
+    from app.models.risk import Risk
+
+    await calculate_all_pillars(db, mode="incremental")
+
+    _, unit_id = seed_org
+    db.add(Risk(org_unit_id=unit_id, asset_name="Tmp", impact_level=1, probability_level=1,
+                safeguard_rating=Decimal("0.95"), risk_score=Decimal("1")))
+    await db.flush()
+    await db.rollback()
+
+    result = await calculate_all_pillars(db, mode="incremental")
+    assert result["incremental"]["recomputed"] == []
+
+
+@pytest.mark.asyncio
+async def test_reconcile_reports_and_repairs_drift(client, db: AsyncSession, seed_score_data, incremental_mode):
+    from sqlalchemy import text
+
+    await calculate_all_pillars(db, mode="incremental")
+
+    r = await client.post("/api/v1/security-score/reconcile")
+    assert r.status_code == 200
+    assert r.json()["drift"] == {}
+    assert len(r.json()["checked"]) == len(PILLARS)
+
+    # A write that bypasses the ORM (e.g. a maintenance script) leaves the state behind
+    await db.execute(text("UPDATE security_score_state SET score = 12.0 WHERE pillar = 'asset'"))
+    await db.commit()
+
+    r = await client.post("/api/v1/security-score/reconcile")
+    data = r.json()
+    assert set(data["drift"]) == {"asset"}
+    assert data["repaired"] is True
+
+    result = await calculate_all_pillars(db, mode="incremental")
+    assert result["incremental"]["recomputed"] == ["asset"]
+    assert (await client.get("/api/v1/security-score/reconcile")).json()["drift"]["asset"]["stored"] == 12.0
+
+
+# ── Per org unit (tree roll-up) ──
+
+@pytest_asyncio.fixture
+async def child_unit(db: AsyncSession, seed_org) -> int:
+    from app.models.org_unit import OrgUnit
+
+    level_id, unit_id = seed_org
+    child = OrgUnit(level_id=level_id, parent_id=unit_id, name="SOC", symbol="SOC")
+    db.add(child)
+    await db.commit()
+    return child.id
+
+
+@pytest.mark.asyncio
+async def test_org_scores_roll_up_to_parent(db: AsyncSession, seed_score_data, seed_org, child_unit):
+    from app.models.risk import Risk
+    from app.services.score_org import INHERITED_PILLARS, get_org_scores
+
+    _, unit_id = seed_org
+    db.add(Risk(org_unit_id=child_unit, asset_name="Child", impact_level=3, probability_level=3,
+                safeguard_rating=Decimal("0.10"), risk_score=Decimal("500")))
+    await db.commit()
+
+    full = await _score(db, mode="sql")
+    tree = await get_org_scores(db)
+    nodes = {n["org_unit_id"]: n for n in tree["units"]}
+    parent, child = nodes[unit_id], nodes[child_unit]
+
+    assert child["parent_id"] == unit_id
+    # All risks live under the parent's subtree, so its risk pillar is organisation-wide
+    assert parent["pillars"]["risk"] == full["pillars"]["risk"]
+    assert child["pillars"]["risk"] < parent["pillars"]["risk"]
+    # Vulnerabilities are owned by the parent only
+    assert child["pillars"]["vulnerability"] == 100.0
+    assert parent["pillars"]["vulnerability"] == full["pillars"]["vulnerability"]
+    for p in INHERITED_PILLARS:
+        assert child["pillars"][p] == parent["pillars"][p] == full["pillars"][p]
+
+
+@pytest.mark.asyncio
+async def test_org_scores_cached_until_write(db: AsyncSession, seed_org, child_unit):
+    from app.models.risk import Risk
+    from app.services.score_org import get_org_scores
+
+    first = await get_org_scores(db)
+    assert await get_org_scores(db) is first
+
+    db.add(Risk(org_unit_id=child_unit, asset_name="New", impact_level=3, probability_level=3,
+                safeguard_rating=Decimal("0.10"), risk_score=Decimal("300")))
+    await db.commit()
+
+    second = await get_org_scores(db)
+    assert second is not first
+    child = next(n for n in second["units"] if n["org_unit_id"] == child_unit)
+    assert child["pillars"]["risk"] < 100
+
+
+@pytest.mark.asyncio
+async def test_org_scores_endpoint_and_posture(client, db: AsyncSession, seed_org, child_unit):
+    from app.models.risk import Risk
+
+    db.add(Risk(org_unit_id=child_unit, asset_name="New", impact_level=3, probability_level=3,
+                safeguard_rating=Decimal("0.10"), risk_score=Decimal("300")))
+    await db.commit()
+
+    r = await client.get("/api/v1/security-score/org-units")
+    assert r.status_code == 200
+    units = {u["org_unit_id"]: u for u in r.json()["units"]}
+    assert "tprm" in r.json()["inherited_pillars"]
+
+    r = await client.get("/api/v1/dashboard/posture-score", params={"org_unit_id": child_unit})
+    assert r.status_code == 200
+    assert r.json()["org_unit"]["id"] == child_unit
+    assert r.json()["score"] == units[child_unit]["total_score"]
+
+
+# ── What-if simulation ──
+
+_WHATIF_CANDIDATES = [
+    {},
+    {"vuln_threshold_critical": 1, "vuln_threshold_high": 50},
+    {"incident_ttr_critical": 20, "incident_ttr_high": 2, "incident_window_days": 3},
+    {"incident_window_days": 365, "w_risk": 40, "w_awareness": 0, "w_policy": 1},
+]
+
+
+@pytest.mark.asyncio
+async def test_what_if_matches_engine(db: AsyncSession, seed_score_data):
+    from app.models.security_score import SecurityScoreConfig
+    from app.services.score_whatif import simulate
+
+    sim = await simulate(db, _WHATIF_CANDIDATES)
+    assert sim["baseline"]["total_score"] == (await _score(db, mode="sql"))["total_score"]
+
+    for i, overrides in enumerate(_WHATIF_CANDIDATES):
+        db.add(SecurityScoreConfig(version=i + 1, **overrides))
+        await db.commit()
+        expected = await _score(db, mode="sql")
+        got = sim["candidates"][i]
+        assert got["total_score"] == pytest.approx(expected["total_score"], abs=0.1)
+        assert got["pillars"] == pytest.approx(expected["pillars"], abs=0.1)
+    assert sim["distribution"]["min"] <= sim["distribution"]["p50"] <= sim["distribution"]["max"]
+
+
+@pytest.mark.asyncio
+async def test_what_if_grid_endpoint(client, db: AsyncSession, seed_score_data):
+    r = await client.post("/api/v1/security-score/what-if", json={
+        "candidates": [{"label": "strict", "vuln_threshold_critical": 1}],
+        "grid": {"w_risk": [10, 20, 30], "incident_ttr_critical": [1, 4, 48]},
+    })
+    assert r.status_code == 200
+    data = r.json()
+    assert len(data["candidates"]) == 10
+    assert data["candidates"][0]["label"] == "strict"
+    assert data["candidates"][0]["overrides"] == {"vuln_threshold_critical": 1}
+    assert sum(c["valid"] for c in data["candidates"][1:]) == 3  # only w_risk=20 keeps the sum at 100
+
+    # Nothing is persisted
+    assert (await client.get("/api/v1/security-score/config/history")).json() == []
+
+    r = await client.post("/api/v1/security-score/what-if", json={"grid": {"w_bogus": [1]}})
+    assert r.status_code == 400
+
+    # Grid values get the same bounds as explicit candidates
+    for grid in ({"incident_window_days": [10_000_000]}, {"incident_window_days": [30, -5]},
+                 {"w_risk": [150]}, {"vuln_threshold_high": [2.5]}):
+        r = await client.post("/api/v1/security-score/what-if", json={"grid": grid})
+        assert r.status_code == 400, grid
+    assert "vuln_threshold_high" in r.json()["detail"]
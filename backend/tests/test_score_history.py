@@ -0,0 +1,119 @@
+"""Security Score history — scheduled snapshots and downsampled roll-ups."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.security_score import SecurityScoreRollup, SecurityScoreSnapshot
+from app.services.score_history import get_history, pick_resolution, prune, rollup, scheduled_tick
+
+NOW = datetime(2025, 3, 12, 15, 30)  # a Wednesday
+
+
+async def _snap(db: AsyncSession, at: datetime, total: float, risk: float | None = None) -> None:
+    db.add(SecurityScoreSnapshot(snapshot_date=at, total_score=total, risk_score=risk, triggered_by="test"))
+    await db.commit()
+
+
+async def _rollups(db: AsyncSession, resolution: str) -> list[SecurityScoreRollup]:
+    q = (select(SecurityScoreRollup)
+         .where(SecurityScoreRollup.resolution == resolution)
+         .order_by(SecurityScoreRollup.bucket_start))
+    return list((await db.execute(q)).scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_rollup_min_avg_max(db: AsyncSession):
+    await _snap(db, datetime(2025, 3, 10, 9, 5), 60, risk=50)
+    await _snap(db, datetime(2025, 3, 10, 9, 40), 70, risk=70)
+    await _snap(db, datetime(2025, 3, 10, 10, 15), 80)
+    await _snap(db, NOW - timedelta(minutes=10), 90)  # current hour — not complete yet
+
+    written = await rollup(db, NOW)
+    assert written == {"hour": 2, "day": 1, "week": 0}
+
+    hours = await _rollups(db, "hour")
+    assert [h.bucket_start for h in hours] == [datetime(2025, 3, 10, 9), datetime(2025, 3, 10, 10)]
+    assert hours[0].samples == 2
+    assert hours[0].stats["total"] == {"min": 60, "avg": 65, "max": 70}
+    assert hours[0].stats["risk"] == {"min": 50, "avg": 60, "max": 70}
+    assert "risk" not in hours[1].stats
+
+    (day,) = await _rollups(db, "day")
+    assert day.samples == 3
+    assert day.stats["total"] == {"min": 60, "avg": 70, "max": 80}
+
+    # Idempotent: nothing new to roll
+    assert await rollup(db, NOW) == {"hour": 0, "day": 0, "week": 0}
+
+
+@pytest.mark.asyncio
+async def test_prune_keeps_uncovered_and_recent(db: AsyncSession):
+    old = NOW - timedelta(days=60)
+    await _snap(db, old, 40)
+    await _snap(db, NOW - timedelta(hours=3), 50)
+
+    # Not rolled up yet — nothing may be deleted
+    assert await prune(db, NOW) == {}
+
+    await rollup(db, NOW)
+    deleted = await prune(db, NOW)
+    assert deleted["raw"] == 1
+    remaining = (await db.execute(select(func.count()).select_from(SecurityScoreSnapshot))).scalar()
+    assert remaining == 1
+    # The old value survives in the roll-ups
+    assert (await _rollups(db, "day"))[0].stats["total"]["avg"] == 40
+
+
+def test_pick_resolution():
+    assert pick_resolution(NOW - timedelta(hours=12), NOW, NOW) == "raw"
+    assert pick_resolution(NOW - timedelta(days=20), NOW, NOW) == "hour"
+    assert pick_resolution(NOW - timedelta(days=400), NOW, NOW) == "day"
+    assert pick_resolution(NOW - timedelta(days=5 * 365), NOW, NOW) == "week"
+    # Short range beyond raw retention falls back to roll-ups
+    assert pick_resolution(NOW - timedelta(days=100), NOW - timedelta(days=99), NOW) == "hour"
+
+
+@pytest.mark.asyncio
+async def test_history_endpoint_serves_rollups(client, db: AsyncSession):
+    for day in range(1, 4):
+        await _snap(db, datetime(2025, 1, day, 8), 50 + day)
+        await _snap(db, datetime(2025, 1, day, 20), 60 + day)
+    await rollup(db, NOW)
+
+    r = await client.get("/api/v1/security-score/history", params={"limit": 2})
+    assert r.status_code == 200
+    assert r.headers["X-History-Resolution"] == "raw"
+    assert [p["total_score"] for p in r.json()] == [63, 53]
+
+    r = await client.get("/api/v1/security-score/history",
+                         params={"date_from": "2025-01-01T00:00:00", "date_to": "2025-01-31T00:00:00",
+                                 "resolution": "day"})
+    points = r.json()
+    assert r.headers["X-History-Resolution"] == "day"
+    assert [p["total_score"] for p in points] == [58, 57, 56]
+    assert points[0]["samples"] == 2
+    assert (points[0]["total_min"], points[0]["total_max"]) == (53, 63)
+
+    resolution, _ = await get_history(db, datetime(2024, 1, 1), datetime(2025, 2, 1))
+    assert resolution == "day"
+
+    r = await client.get("/api/v1/security-score/history", params={"resolution": "minute"})
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_scheduled_tick_respects_cadence(db: AsyncSession):
+    from app.models.security_score import SecurityScoreConfig
+
+    db.add(SecurityScoreConfig(version=1, snapshot_frequency="hourly"))
+    await db.commit()
+
+    assert await scheduled_tick(NOW) is True
+    assert await scheduled_tick(NOW + timedelta(minutes=20)) is False
+    assert await scheduled_tick(NOW + timedelta(minutes=65)) is True
+
+    snaps = (await db.execute(select(SecurityScoreSnapshot))).scalars().all()
+    assert {s.triggered_by for s in snaps} == {"scheduler"}
+    assert len(snaps) == 2
@@ -0,0 +1,68 @@
+"""Functional tests — Vulnerability registry."""
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+
+@pytest.mark.asyncio
+async def test_vuln_outs_batch_loaded(db, seed_org, count_statements):
+    """Org unit / asset names come from IN-queries: query count does not grow with the batch.
+
+    (The catalog router registers GET /api/v1/vulnerabilities first, so the loader is called directly.)
+    """
+    from app.models.asset import Asset
+    from app.models.vulnerability import VulnerabilityRecord
+    from app.routers.vulnerability import _vuln_outs
+
+    _, unit_id = seed_org
+
+    async def create(n: int):
+        for i in range(n):
+            asset = Asset(name=f"Host {i}", org_unit_id=unit_id)
+            db.add(asset)
+            await db.flush()
+            db.add(VulnerabilityRecord(
+                title=f"Podatnosc {i}", org_unit_id=unit_id, asset_id=asset.id, owner="Jan", detected_at=date(2026, 1, 1),
+            ))
+        await db.commit()
+
+    async def build() -> tuple[list, int]:
+        vulns = (await db.execute(select(VulnerabilityRecord).order_by(VulnerabilityRecord.id))).scalars().all()
+        with count_statements() as statements:
+            outs = await _vuln_outs(db, list(vulns))
+        return outs, len(statements)
+
+    await create(2)
+    _, few = await build()
+    await create(4)
+    outs, many = await build()
+    assert len(outs) == 6 and many == few
+    assert {v.org_unit_name for v in outs} == {"IT"}
+    assert [v.asset_name for v in outs][-1] == "Host 3"
+
+
+@pytest.mark.asyncio
+async def test_list_vulnerabilities_keyset_pagination(client: AsyncClient, seed_org):
+    _, unit_id = seed_org
+    for title in ("E", "B", "D", "A", "C"):
+        r = await client.post("/api/v1/vulnerabilities", json={
+            "title": title, "org_unit_id": unit_id, "owner": "Jan", "detected_at": "2026-01-01",
+        })
+        assert r.status_code == 201
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/v1/vulnerabilities?sort=title&limit=2&include_total=true"
+        r = await client.get(url + (f"&cursor={cursor}" if cursor else ""))
+        assert r.status_code == 200 and r.headers["x-total-count"] == "5"
+        assert len(r.json()) <= 2
+        seen += [x["title"] for x in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert seen == ["A", "B", "C", "D", "E"]
+
+    assert (await client.get("/api/v1/vulnerabilities?sort=owner")).status_code == 400
+    assert (await client.get("/api/v1/vulnerabilities?cursor=garbage")).status_code == 400
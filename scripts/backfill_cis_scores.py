@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""SecurePosture — uzupełnienie zmaterializowanych wyników ocen CIS.
+
+Po migracji 028 istniejące oceny CIS mają scores_computed_at = NULL; trend
+liczy je wtedy w locie.  Skrypt przelicza IG1/IG2/IG3, procent ryzyka,
+dojrzałość i procenty wymiarów i zapisuje je na cis_assessments.
+
+Uruchom z katalogu backend/ (z aktywnym venv):
+    python ../scripts/backfill_cis_scores.py           # tylko brakujące
+    python ../scripts/backfill_cis_scores.py --all     # przelicz wszystkie
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+os.chdir(str(backend_dir))
+
+from app.database import async_session, engine  # noqa: E402
+from app.services.cis_scores import backfill_assessment_scores  # noqa: E402
+
+
+async def main(recompute_all: bool, batch_size: int) -> None:
+    async with async_session() as s:
+        n = await backfill_assessment_scores(s, only_missing=not recompute_all, batch_size=batch_size)
+    await engine.dispose()
+    print(f"Przeliczono oceny CIS: {n}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Uzupełnij wyniki ocen CIS (IG + wymiary)")
+    parser.add_argument("--all", action="store_true", help="przelicz również oceny już zmaterializowane")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.all, args.batch_size))
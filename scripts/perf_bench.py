@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""SecurePosture — benchmark silnika Security Score i dashboardów.
+
+Dla każdej skali generuje świeżą bazę SQLite (perf_datagen.py) i mierzy:
+  * czas (mediana z --repeat przebiegów po rozgrzewce, każdy w nowej sesji),
+  * liczbę zapytań SQL (listener before_cursor_execute),
+  * szczyt alokacji Pythona (tracemalloc).
+
+Wynik trafia do JSON-a; z --baseline porównywany jest z zapisanym wzorcem.
+Liczba zapytań nie zależy od maszyny, więc jej wzrost jest zawsze regresją;
+czas i pamięć mają tolerancję (--time-tolerance / --mem-tolerance) i próg
+szumu, poniżej którego różnice są ignorowane.  Kod wyjścia 1 = regresja.
+
+Uruchom z katalogu backend/:
+    python ../scripts/perf_bench.py --scales tiny small
+    python ../scripts/perf_bench.py --scales small --baseline ../scripts/perf_baseline.json
+    python ../scripts/perf_bench.py --scales small --save-baseline ../scripts/perf_baseline.json
+    python ../scripts/perf_bench.py --database-url mysql+asyncmy://... --repeat 3   # istniejące dane
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from perf_datagen import SCALES, generate  # noqa: E402
+
+TIME_NOISE_MS = 5.0
+MEM_NOISE_KB = 256.0
+
+
+async def _audit_flush(s, mode: str) -> None:
+    """Bulk edit of up to 1000 assets (3 fields each) flushed with audit logging, then rolled back."""
+    from sqlalchemy import select
+
+    from app.config import settings
+    from app.models.asset import Asset
+
+    previous, settings.AUDIT_WRITE_MODE = settings.AUDIT_WRITE_MODE, mode
+    try:
+        for a in (await s.execute(select(Asset).order_by(Asset.id).limit(1000))).scalars():
+            a.owner, a.location, a.hostname = "bench", "DC-bench", "bench.local"
+        await s.flush()
+        await s.flush()  # "orm" mode: the AuditLog objects queued by the first flush
+        await s.rollback()
+    finally:
+        settings.AUDIT_WRITE_MODE = previous
+
+
+def _targets():
+    from app.middleware.audit_auto import install_audit_listeners
+    from app.services import dashboard, domain_score, score_engine
+
+    install_audit_listeners()
+    return {
+        "score_engine.orm": lambda s: score_engine.calculate_all_pillars(s, mode="orm"),
+        "score_engine.sql": lambda s: score_engine.calculate_all_pillars(s, mode="sql"),
+        "risk_dashboard": lambda s: dashboard.get_risk_dashboard(s),
+        "cis_dashboard": lambda s: dashboard.get_cis_dashboard(s),
+        "cis_comparison": lambda s: dashboard.get_cis_comparison(s, [None, *range(1, 51)]),
+        "executive_summary": lambda s: dashboard.get_executive_summary(s),
+        "domain_dashboard": lambda s: domain_score.get_domain_dashboard(s),
+        "audit_flush.core": lambda s: _audit_flush(s, "core"),
+        "audit_flush.orm": lambda s: _audit_flush(s, "orm"),
+    }
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def _register_sqlite_functions(engine) -> None:
+    """MySQL functions used by the dashboards (cf. the shims in tests/conftest.py)."""
+    from sqlalchemy import event
+
+    def find_in_set(needle, haystack):
+        if needle is None or haystack is None:
+            return 0
+        items = [x.strip() for x in str(haystack).split(",")]
+        return items.index(str(needle)) + 1 if str(needle) in items else 0
+
+    def datediff(d1, d2):
+        if d1 is None or d2 is None:
+            return None
+        return (datetime.fromisoformat(str(d1)[:19]) - datetime.fromisoformat(str(d2)[:19])).days
+
+    def date_format(d, fmt):
+        return None if d is None else datetime.fromisoformat(str(d)[:19]).strftime(fmt)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _connect(dbapi_conn, _record):
+        dbapi_conn.create_function("FIND_IN_SET", 2, find_in_set)
+        dbapi_conn.create_function("datediff", 2, datediff)
+        dbapi_conn.create_function("date_format", 2, date_format)
+
+
+def _reset_caches() -> None:
+    from app.services.dictionary_cache import dict_cache
+    from app.services.score_org import invalidate_org_scores
+
+    dict_cache.invalidate()
+    invalidate_org_scores()
+
+
+async def _measure(session_factory, counter: QueryCounter, fn, repeat: int) -> dict:
+    async with session_factory() as s:  # warm-up (imports, dictionary cache, statement cache)
+        await fn(s)
+
+    times, queries, peaks = [], [], []
+    for _ in range(repeat):
+        async with session_factory() as s:
+            before = counter.count
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            await fn(s)
+            times.append((time.perf_counter() - t0) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+            queries.append(counter.count - before)
+    return {
+        "time_ms": round(statistics.median(times), 2),
+        "time_min_ms": round(min(times), 2),
+        "queries": max(queries),
+        "peak_kb": round(max(peaks), 1),
+    }
+
+
+async def _bench_scale(label: str, args, generate_data: bool, counter: QueryCounter) -> dict:
+    from app.database import async_session, engine
+    from app.models import Base
+
+    if generate_data:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        counts = await generate(engine, SCALES[label], seed=args.seed, verbose=False)
+        from app.services.risk_rollup import run_rollup
+
+        await run_rollup()  # the risk dashboard reads the roll-up, it no longer builds it
+    else:
+        counts = {}
+    _reset_caches()
+
+    results = {}
+    for name, fn in _targets().items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = await _measure(async_session, counter, fn, args.repeat)
+        r = results[name]
+        print(f"  {name:<20} {r['time_ms']:>10.1f} ms {r['queries']:>6} q {r['peak_kb']:>10.0f} KB")
+    return {"rows": counts, "results": results}
+
+
+def compare(current: dict, baseline: dict, time_tol: float, mem_tol: float) -> list[str]:
+    """Regression messages for every (scale, target) present in both reports."""
+    problems = []
+    for scale, data in current["scales"].items():
+        base_scale = baseline.get("scales", {}).get(scale)
+        if base_scale is None:
+            continue
+        for name, cur in data["results"].items():
+            base = base_scale["results"].get(name)
+            if base is None:
+                continue
+            if cur["queries"] > base["queries"]:
+                problems.append(f"{scale}/{name}: zapytania {base['queries']} -> {cur['queries']}")
+            if cur["time_ms"] > base["time_ms"] * (1 + time_tol) and cur["time_ms"] - base["time_ms"] > TIME_NOISE_MS:
+                problems.append(f"{scale}/{name}: czas {base['time_ms']} -> {cur['time_ms']} ms")
+            if cur["peak_kb"] > base["peak_kb"] * (1 + mem_tol) and cur["peak_kb"] - base["peak_kb"] > MEM_NOISE_KB:
+                problems.append(f"{scale}/{name}: pamięć {base['peak_kb']} -> {cur['peak_kb']} KB")
+    return problems
+
+
+async def _main(args, generate_data: bool) -> dict:
+    from app.database import engine
+
+    if engine.dialect.name == "sqlite":
+        _register_sqlite_functions(engine)
+    counter = QueryCounter(engine)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "dialect": engine.dialect.name,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "scales": {},
+    }
+    labels = args.scales if generate_data else ["existing"]
+    for label in labels:
+        print(f"[{label}]")
+        report["scales"][label] = await _bench_scale(label, args, generate_data, counter)
+    await engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=["tiny", "small"])
+    parser.add_argument("--database-url", help="mierzy istniejące dane zamiast generować (bez resetu bazy)")
+    parser.add_argument("--only", nargs="+", help="tylko wybrane cele, np. risk_dashboard score_engine.sql")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="zapisz raport JSON")
+    parser.add_argument("--baseline", help="porównaj z raportem wzorcowym")
+    parser.add_argument("--save-baseline", help="zapisz raport jako nowy wzorzec")
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--mem-tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    generate_data = args.database_url is None
+    workdir = None
+    if generate_data:
+        workdir = tempfile.mkdtemp(prefix="secureposture-perf-")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/perf.db"
+    else:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DEBUG"] = "false"
+    os.environ["DASHBOARD_CACHE_MAX_ENTRIES"] = "0"  # measure the computation, not cache hits
+    os.chdir(str(backend_dir))  # .env is read relative to backend/
+
+    report = asyncio.run(_main(args, generate_data))
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+            print(f"Zapisano {path}")
+    if workdir:
+        for f in Path(workdir).iterdir():
+            f.unlink()
+        os.rmdir(workdir)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        problems = compare(report, baseline, args.time_tolerance, args.mem_tolerance)
+        if problems:
+            print("REGRESJE:")
+            for p in problems:
+                print(f"  - {p}")
+            sys.exit(1)
+        print("Brak regresji względem wzorca.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""SecurePosture — generator syntetycznych danych do testów wydajności.
+
+Wypełnia PUSTĄ bazę (SQLite lub MariaDB) powtarzalnym zestawem danych:
+drzewo jednostek org., ryzyka, podatności, incydenty, aktywa, dostawcy,
+polityki, wyjątki, audyty, kampanie awareness, CIS (kontrolki + oceny)
+oraz framework z węzłami i oceną dojrzałości.  Ten sam --seed daje te same
+dane.  Wiersze wstawiane są paczkami (executemany), z jawnymi id.
+
+Uruchom z katalogu backend/:
+    python ../scripts/perf_datagen.py --scale small --database-url sqlite+aiosqlite:///perf.db --reset
+    python ../scripts/perf_datagen.py --scale medium --risks 20000 --vulns 40000
+
+Bez --database-url używany jest DATABASE_URL z .env / środowiska.
+--reset (drop_all + create_all) jest dozwolony tylko dla SQLite — bazę
+MariaDB przygotuj migracjami alembic.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+BATCH = 2000
+
+
+@dataclass(frozen=True)
+class Scale:
+    org_units: int
+    risks: int
+    vulns: int
+    incidents: int
+    assets: int
+    vendors: int
+    policies: int
+    campaigns: int
+    framework_nodes: int
+
+
+SCALES = {
+    "tiny": Scale(org_units=5, risks=50, vulns=200, incidents=30, assets=100,
+                  vendors=10, policies=10, campaigns=5, framework_nodes=40),
+    "small": Scale(org_units=20, risks=500, vulns=2000, incidents=300, assets=1000,
+                   vendors=100, policies=50, campaigns=30, framework_nodes=200),
+    "medium": Scale(org_units=100, risks=5000, vulns=20000, incidents=3000, assets=10000,
+                    vendors=500, policies=200, campaigns=120, framework_nodes=1000),
+    "large": Scale(org_units=300, risks=20000, vulns=40000, incidents=10000, assets=30000,
+                   vendors=1500, policies=500, campaigns=300, framework_nodes=3000),
+}
+
+# Labels as understood by the score engine (score_engine.py)
+DICTIONARIES = {
+    "risk_status": ["Zidentyfikowane", "W analizie", "W mitygacji", "Zaakceptowane", "Zamknięte"],
+    "severity": ["Krytyczna", "Wysoka", "Średnia", "Niska"],
+    "incident_severity": ["Krytyczny", "Wysoki", "Średni", "Niski"],
+    "status": ["Otwarte", "W trakcie", "Zamknięte"],
+    "criticality": ["Krytyczny", "Wysoki", "Średni", "Niski"],
+    "policy_status": ["Zatwierdzona", "Robocza", "W przeglądzie"],
+    "exception_risk": ["Krytyczne", "Wysokie", "Średnie", "Niskie"],
+    "campaign_type": ["Szkolenie online", "Szkolenie stacjonarne", "Phishing simulation"],
+}
+
+CIS_CONTROLS = 18
+CIS_SUBS_PER_CONTROL = 9
+SECURITY_DOMAINS = 12
+ATTACK_ACTIVITIES = ["Initial Access", "Execution", "Persistence", "Privilege Escalation",
+                     "Defense Evasion", "Credential Access", "Discovery", "Lateral Movement",
+                     "Collection", "Exfiltration", "Impact"]
+
+
+class _Ids:
+    """Explicit, sequential primary keys per table (the target DB must be empty)."""
+
+    def __init__(self):
+        self._next: dict[str, int] = {}
+
+    def take(self, table: str, n: int = 1) -> list[int]:
+        start = self._next.get(table, 1)
+        self._next[table] = start + n
+        return list(range(start, start + n))
+
+
+async def _insert(conn, model, rows: list[dict]) -> int:
+    table = model.__table__
+    for i in range(0, len(rows), BATCH):
+        await conn.execute(table.insert(), rows[i:i + BATCH])
+    return len(rows)
+
+
+async def generate(engine, scale: Scale, seed: int = 42, verbose: bool = True) -> dict[str, int]:
+    """Populate an empty database; returns row counts per table."""
+    from sqlalchemy import func, select
+
+    from app.models.asset import Asset
+    from app.models.audit_register import Audit, AuditFinding
+    from app.models.awareness import AwarenessCampaign, AwarenessResult
+    from app.models.cis import CisAssessment, CisAssessmentAnswer, CisAttackMapping, CisControl, CisSubControl
+    from app.models.dictionary import DictionaryEntry, DictionaryType
+    from app.models.framework import (
+        Assessment, AssessmentAnswer, AssessmentDimension, DimensionLevel, Framework, FrameworkNode,
+    )
+    from app.models.incident import Incident
+    from app.models.org_unit import OrgLevel, OrgUnit
+    from app.models.policy import Policy, PolicyAcknowledgment
+    from app.models.policy_exception import PolicyException
+    from app.models.risk import Risk, compute_risk_level, compute_risk_score
+    from app.models.security_area import DomainCisControl, SecurityArea
+    from app.models.vendor import Vendor
+    from app.models.vulnerability import VulnerabilityRecord
+
+    rnd = random.Random(seed)
+    ids = _Ids()
+    today = date.today()
+    now = datetime.utcnow()
+    counts: dict[str, int] = {}
+
+    def pick(xs):
+        return rnd.choice(xs)
+
+    def maybe(p: float, value):
+        return value if rnd.random() < p else None
+
+    async with engine.begin() as conn:
+        if (await conn.execute(select(func.count()).select_from(OrgUnit))).scalar():
+            raise SystemExit("Baza nie jest pusta (org_units) — użyj czystej bazy lub --reset (SQLite)")
+
+        # ── Dictionaries ──
+        types, entries, dicts = [], [], {}
+        for code, labels in DICTIONARIES.items():
+            (tid,) = ids.take("dictionary_types")
+            types.append({"id": tid, "code": f"perf_{code}", "name": code})
+            eids = ids.take("dictionary_entries", len(labels))
+            dicts[code] = eids
+            entries += [{"id": eid, "dict_type_id": tid, "code": f"perf_{code}_{i}", "label": label, "sort_order": i}
+                        for i, (eid, label) in enumerate(zip(eids, labels))]
+        counts["dictionary_types"] = await _insert(conn, DictionaryType, types)
+        counts["dictionary_entries"] = await _insert(conn, DictionaryEntry, entries)
+
+        # ── Org tree: 3 levels, every unit below a random earlier unit ──
+        level_ids = ids.take("org_levels", 3)
+        await _insert(conn, OrgLevel, [{"id": lid, "level_number": i + 1, "name": f"Poziom {i + 1}"}
+                                       for i, lid in enumerate(level_ids)])
+        unit_ids = ids.take("org_units", scale.org_units)
+        depth: dict[int, int] = {}
+        units = []
+        for i, uid in enumerate(unit_ids):
+            parent = None if i == 0 else pick([u for u in unit_ids[:i] if depth[u] < 2] or unit_ids[:1])
+            depth[uid] = 0 if parent is None else depth[parent] + 1
+            units.append({"id": uid, "parent_id": parent, "level_id": level_ids[depth[uid]],
+                          "name": f"Jednostka {i + 1}", "symbol": f"U{i + 1}", "is_active": True})
+        counts["org_units"] = await _insert(conn, OrgUnit, units)
+
+        # ── Security domains + CIS ──
+        domain_ids = ids.take("security_domains", SECURITY_DOMAINS)
+        await _insert(conn, SecurityArea, [{"id": d, "name": f"Obszar {i + 1}", "code": f"PERF{i + 1}", "sort_order": i}
+                                           for i, d in enumerate(domain_ids)])
+        control_ids = ids.take("cis_controls", CIS_CONTROLS)
+        await _insert(conn, CisControl, [{"id": c, "control_number": i + 1, "name_en": f"Control {i + 1}",
+                                          "name_pl": f"Kontrola {i + 1}", "sub_control_count": CIS_SUBS_PER_CONTROL}
+                                         for i, c in enumerate(control_ids)])
+        await _insert(conn, DomainCisControl, [{"domain_id": domain_ids[i % SECURITY_DOMAINS], "cis_control_id": c}
+                                               for i, c in enumerate(control_ids)])
+        subs = []
+        for ci, c in enumerate(control_ids):
+            for j in range(CIS_SUBS_PER_CONTROL):
+                (sid,) = ids.take("cis_sub_controls")
+                subs.append({"id": sid, "control_id": c, "sub_id": f"{ci + 1}.{j + 1}", "detail_en": "Safeguard",
+                             "implementation_groups": pick(["1,2,3", "2,3", "3"])})
+        counts["cis_sub_controls"] = await _insert(conn, CisSubControl, subs)
+        await _insert(conn, CisAttackMapping, [
+            {"sub_control_id": sub["id"], "attack_activity": pick(ATTACK_ACTIVITIES),
+             "capability_type": pick(["preventive", "detective"])}
+            for sub in subs if rnd.random() < 0.5
+        ])
+        cis_scopes = [None, *unit_ids[:50]]
+        assessment_ids = ids.take("cis_assessments", len(cis_scopes))
+        await _insert(conn, CisAssessment, [
+            {"id": aid, "org_unit_id": scope, "assessment_date": now - timedelta(days=rnd.randint(0, 200)),
+             "maturity_rating": Decimal(str(round(rnd.uniform(1, 4), 2))),
+             "risk_addressed_pct": Decimal(str(round(rnd.uniform(20, 90), 2)))}
+            for aid, scope in zip(assessment_ids, cis_scopes)
+        ])
+
+        def _val():
+            return Decimal(pick(["0", "0.25", "0.5", "0.75", "1"]))
+
+        answers = [{"assessment_id": aid, "sub_control_id": sub["id"], "is_not_applicable": rnd.random() < 0.05,
+                    "policy_value": _val(), "impl_value": _val(), "auto_value": _val(), "report_value": _val()}
+                   for aid in assessment_ids for sub in subs]
+        counts["cis_assessment_answers"] = await _insert(conn, CisAssessmentAnswer, answers)
+
+        # ── Framework + nodes + maturity assessment ──
+        (fw_id,) = ids.take("frameworks")
+        await _insert(conn, Framework, [{"id": fw_id, "name": "Perf Framework", "lifecycle_status": "published"}])
+        node_ids = ids.take("framework_nodes", scale.framework_nodes)
+        nodes = []
+        for i, nid in enumerate(node_ids):
+            parent = None if i < 10 else node_ids[rnd.randrange(0, i)]
+            nodes.append({"id": nid, "framework_id": fw_id, "parent_id": parent, "name": f"Wymaganie {i + 1}",
+                          "ref_id": f"R{i + 1}", "depth": 1 if parent is None else 2, "order_id": i,
+                          "assessable": parent is not None})
+        counts["framework_nodes"] = await _insert(conn, FrameworkNode, nodes)
+        dim_ids = ids.take("assessment_dimensions", 2)
+        await _insert(conn, AssessmentDimension, [{"id": d, "framework_id": fw_id, "dimension_key": f"d{i}",
+                                                   "name": f"Wymiar {i + 1}", "order_id": i}
+                                                  for i, d in enumerate(dim_ids)])
+        levels = {}
+        level_rows = []
+        for d in dim_ids:
+            levels[d] = ids.take("dimension_levels", 5)
+            level_rows += [{"id": lv, "dimension_id": d, "level_order": k, "value": Decimal(str(k / 4)),
+                            "label": f"Poziom {k}"} for k, lv in enumerate(levels[d])]
+        await _insert(conn, DimensionLevel, level_rows)
+        (fa_id,) = ids.take("assessments")
+        await _insert(conn, Assessment, [{"id": fa_id, "framework_id": fw_id, "assessment_date": today,
+                                          "status": "approved", "title": "Perf assessment"}])
+        counts["assessment_answers"] = await _insert(conn, AssessmentAnswer, [
+            {"assessment_id": fa_id, "framework_node_id": n["id"], "dimension_id": d,
+             "level_id": pick(levels[d]), "not_applicable": rnd.random() < 0.05}
+            for n in nodes if n["assessable"] for d in dim_ids
+        ])
+
+        # ── Assets ──
+        asset_ids = ids.take("assets", scale.assets)
+        counts["assets"] = await _insert(conn, Asset, [
+            {"id": a, "name": f"Aktywo {i + 1}", "org_unit_id": maybe(0.9, pick(unit_ids)),
+             "owner": maybe(0.8, f"owner{i % 50}"), "criticality_id": maybe(0.8, pick(dicts["criticality"])),
+             "support_end_date": maybe(0.3, today + timedelta(days=rnd.randint(-400, 800))),
+             "last_scan_date": maybe(0.7, today - timedelta(days=rnd.randint(0, 90)))}
+            for i, a in enumerate(asset_ids)
+        ])
+
+        # ── Risks ──
+        risks = []
+        for i in range(scale.risks):
+            w, p = rnd.randint(1, 3), rnd.randint(1, 3)
+            z = Decimal(pick(["0.10", "0.25", "0.70", "0.95"]))
+            score = compute_risk_score(w, p, z)
+            risks.append({
+                "id": ids.take("risks")[0], "org_unit_id": pick(unit_ids), "asset_name": f"Aktywo {i + 1}",
+                "asset_id": maybe(0.5, pick(asset_ids)), "security_area_id": pick(domain_ids),
+                "impact_level": w, "probability_level": p, "safeguard_rating": z,
+                "risk_score": Decimal(str(score)), "risk_level": compute_risk_level(score),
+                "status_id": pick(dicts["risk_status"]), "owner": f"owner{i % 50}",
+                "identified_at": now - timedelta(days=rnd.randint(0, 700)),
+                "last_review_at": maybe(0.6, now - timedelta(days=rnd.randint(0, 400))),
+            })
+        counts["risks"] = await _insert(conn, Risk, risks)
+
+        # ── Vulnerabilities ──
+        counts["vulnerabilities_registry"] = await _insert(conn, VulnerabilityRecord, [
+            {"title": f"CVE-{i}", "org_unit_id": pick(unit_ids), "asset_id": maybe(0.7, pick(asset_ids)),
+             "owner": f"owner{i % 50}", "detected_at": today - timedelta(days=rnd.randint(0, 365)),
+             "severity_id": pick(dicts["severity"]), "status_id": pick(dicts["status"]),
+             "sla_deadline": maybe(0.8, today + timedelta(days=rnd.randint(-60, 60)))}
+            for i in range(scale.vulns)
+        ])
+
+        # ── Incidents ──
+        counts["incidents"] = await _insert(conn, Incident, [
+            {"title": f"Incydent {i}", "description": "-", "org_unit_id": pick(unit_ids),
+             "reported_by": "soc", "assigned_to": "cert",
+             "reported_at": now - timedelta(days=rnd.randint(0, 365), minutes=rnd.randint(0, 1440)),
+             "severity_id": pick(dicts["incident_severity"]), "ttr_minutes": maybe(0.7, rnd.randint(10, 20000)),
+             "lessons_learned": maybe(0.4, "Wnioski")}
+            for i in range(scale.incidents)
+        ])
+
+        # ── Vendors ──
+        counts["vendors"] = await _insert(conn, Vendor, [
+            {"name": f"Dostawca {i}", "criticality_id": pick(dicts["criticality"]),
+             "risk_score": maybe(0.8, Decimal(str(rnd.randint(10, 95)))),
+             "last_assessment_date": maybe(0.7, today - timedelta(days=rnd.randint(0, 700))),
+             "next_assessment_date": maybe(0.7, today + timedelta(days=rnd.randint(-120, 365)))}
+            for i in range(scale.vendors)
+        ])
+
+        # ── Policies, acknowledgments, exceptions ──
+        policy_ids = ids.take("policies", scale.policies)
+        await _insert(conn, Policy, [
+            {"id": pid, "title": f"Polityka {i + 1}", "owner": "ciso", "status_id": pick(dicts["policy_status"]),
+             "target_audience_count": rnd.randint(0, 500),
+             "review_date": maybe(0.8, today + timedelta(days=rnd.randint(-200, 300)))}
+            for i, pid in enumerate(policy_ids)
+        ])
+        counts["policies"] = len(policy_ids)
+        counts["policy_acknowledgments"] = await _insert(conn, PolicyAcknowledgment, [
+            {"policy_id": pick(policy_ids), "acknowledged_by": f"user{i}", "org_unit_id": pick(unit_ids)}
+            for i in range(scale.policies * 20)
+        ])
+        counts["policy_exceptions"] = await _insert(conn, PolicyException, [
+            {"title": f"Wyjątek {i}", "description": "-", "policy_id": pick(policy_ids), "org_unit_id": pick(unit_ids),
+             "requested_by": "owner", "risk_level_id": pick(dicts["exception_risk"]), "status_id": pick(dicts["status"]),
+             "start_date": today - timedelta(days=90), "expiry_date": today + timedelta(days=rnd.randint(-60, 180)),
+             "compensating_controls": maybe(0.5, "Monitoring")}
+            for i in range(max(scale.risks // 20, 1))
+        ])
+
+        # ── Audits + findings ──
+        audit_ids = ids.take("audits", max(scale.org_units // 2, 1))
+        await _insert(conn, Audit, [{"id": a, "title": f"Audyt {i + 1}", "auditor": "IA", "org_unit_id": pick(unit_ids)}
+                                    for i, a in enumerate(audit_ids)])
+        counts["audit_findings"] = await _insert(conn, AuditFinding, [
+            {"audit_id": pick(audit_ids), "title": f"Ustalenie {i}", "severity_id": pick(dicts["incident_severity"]),
+             "status_id": pick(dicts["status"]),
+             "sla_deadline": maybe(0.7, today + timedelta(days=rnd.randint(-60, 90)))}
+            for i in range(max(scale.risks // 10, 1))
+        ])
+
+        # ── Awareness ──
+        campaign_ids = ids.take("awareness_campaigns", scale.campaigns)
+        await _insert(conn, AwarenessCampaign, [
+            {"id": c, "title": f"Kampania {i + 1}", "campaign_type_id": pick(dicts["campaign_type"]),
+             "org_unit_id": maybe(0.7, pick(unit_ids)), "start_date": today - timedelta(days=rnd.randint(0, 500))}
+            for i, c in enumerate(campaign_ids)
+        ])
+        counts["awareness_campaigns"] = len(campaign_ids)
+        counts["awareness_results"] = await _insert(conn, AwarenessResult, [
+            {"campaign_id": c, "org_unit_id": pick(unit_ids), "participants_count": 50,
+             "completion_rate": Decimal(str(rnd.randint(20, 100))),
+             "click_rate": Decimal(str(rnd.randint(0, 40))), "report_rate": Decimal(str(rnd.randint(0, 60)))}
+            for c in campaign_ids for _ in range(3)
+        ])
+
+    if verbose:
+        for table, n in counts.items():
+            print(f"  {table:<28} {n:>8}")
+    return counts
+
+
+def scale_from_args(args) -> Scale:
+    scale = SCALES[args.scale]
+    overrides = {f.name: getattr(args, f.name) for f in fields(Scale) if getattr(args, f.name) is not None}
+    return replace(scale, **overrides)
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser) -> None:
+    for f in fields(Scale):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", dest=f.name, type=int, default=None,
+                            help=f"nadpisuje liczbę: {f.name}")
+
+
+async def _main(args) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.models import Base
+
+    url = args.database_url or os.environ["DATABASE_URL"]
+    engine = create_async_engine(url)
+    if args.reset:
+        if not url.startswith("sqlite"):
+            raise SystemExit("--reset jest dozwolony tylko dla SQLite")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    scale = scale_from_args(args)
+    print(f"Generowanie danych ({args.scale}, seed={args.seed}): {asdict(scale)}")
+    t0 = time.perf_counter()
+    await generate(engine, scale, seed=args.seed)
+    print(f"Gotowe w {time.perf_counter() - t0:.1f} s")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="np. sqlite+aiosqlite:///perf.db (domyślnie DATABASE_URL)")
+    parser.add_argument("--reset", action="store_true", help="drop_all + create_all przed generowaniem (SQLite)")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.chdir(str(backend_dir))  # .env is read relative to backend/
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()